@@ -0,0 +1,119 @@
+"""
+Chart Delta Cache - Cursor/ETag support for incremental /chart polling.
+
+Each chart window (symbol, interval, bars) keeps its last computed result
+keyed by a version fingerprint of the underlying candles. Unchanged candles
+mean the client gets a 304 (or the cached result is reused without
+re-running iceberg detection). A bounded history of version -> zone keys
+lets a delta response report which iceberg zones disappeared since the
+version the client holds.
+
+The ETag sent to clients is the candle version plus a tag for the
+representation (model JSON vs columnar, negotiated media type, delta
+cursor), so a 304 never confirms a cached body of a different shape.
+"""
+
+import hashlib
+from bisect import bisect_left
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+
+def as_utc(dt: datetime) -> datetime:
+    """Treat naive datetimes as UTC so client cursors compare with feed times."""
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt
+
+
+def candles_version(symbol: str, interval: str, bars: int, candles: List[Dict]) -> str:
+    """Fingerprint of the raw candle window."""
+    digest = hashlib.sha1(f"{symbol}|{interval}|{bars}".encode("utf-8"))
+    for c in candles:
+        digest.update(
+            f"{c.get('timestamp')}|{c.get('open')}|{c.get('high')}|{c.get('low')}|"
+            f"{c.get('close')}|{c.get('volume')}\n".encode("utf-8")
+        )
+    return digest.hexdigest()[:20]
+
+
+def representation_etag(version: str, columnar: bool, media_type: str,
+                        since: Optional[datetime] = None) -> str:
+    """Weak ETag for one representation of a candle version."""
+    representation = f"{'columnar' if columnar else 'model'}|{media_type}|{as_utc(since).isoformat() if since else ''}"
+    tag = hashlib.sha1(representation.encode("utf-8")).hexdigest()[:8]
+    return f'W/"{version}-{tag}"'
+
+
+def etag_version(etag: Optional[str]) -> Optional[str]:
+    """Candle version inside an ETag from representation_etag (None if foreign)."""
+    if not etag:
+        return None
+    value = etag.strip()
+    if value.startswith("W/"):
+        value = value[2:]
+    version, _, tag = value.strip('"').partition("-")
+    return version if tag else None
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """True if an If-None-Match header lists this ETag."""
+    if not if_none_match:
+        return False
+    return any(candidate.strip() == etag for candidate in if_none_match.split(","))
+
+
+def zone_key(zone) -> Tuple[float, float]:
+    return (round(zone.price_bottom, 2), round(zone.price_top, 2))
+
+
+class ChartDeltaCache:
+    """Latest computed chart per window plus a short ETag history."""
+
+    def __init__(self, max_windows: int = 32, max_versions: int = 256):
+        self.max_windows = max_windows
+        self.max_versions = max_versions
+        self.windows = OrderedDict()  # (symbol, interval, bars) -> entry
+        self.versions = OrderedDict()  # candle version -> list of zone visuals
+
+    def get(self, key: Tuple, version: str) -> Optional[Dict]:
+        """Cached result for this window if the candles are unchanged."""
+        entry = self.windows.get(key)
+        if entry is None or entry["version"] != version:
+            return None
+        self.windows.move_to_end(key)
+        return entry
+
+    def put(self, key: Tuple, version: str, bars: List, levels: List, zones: List) -> Dict:
+        entry = {
+            "version": version,
+            "bars": bars,
+            "times": [as_utc(b.timestamp) for b in bars],
+            "levels": levels,
+            "zones": zones,
+        }
+        self.windows[key] = entry
+        self.windows.move_to_end(key)
+        while len(self.windows) > self.max_windows:
+            self.windows.popitem(last=False)
+
+        self.versions[version] = zones
+        self.versions.move_to_end(version)
+        while len(self.versions) > self.max_versions:
+            self.versions.popitem(last=False)
+        return entry
+
+    @staticmethod
+    def bars_since(entry: Dict, since: datetime) -> List:
+        """Bars at or after the cursor (the cursor bar itself may still be forming)."""
+        start = bisect_left(entry["times"], as_utc(since))
+        return entry["bars"][start:]
+
+    def removed_zones(self, base_version: Optional[str], zones: List) -> List:
+        """Zones present in the client's version but gone from the current one."""
+        previous = self.versions.get(base_version) if base_version else None
+        if not previous:
+            return []
+        current = {zone_key(z) for z in zones}
+        return [z for z in previous if zone_key(z) not in current]
@@ -0,0 +1,70 @@
+"""
+Fast response encoding for large chart and histogram payloads.
+
+Builds columnar payloads (one array per field instead of one object per
+row) from trusted engine output and encodes them without going through
+pydantic validation. Uses orjson / msgpack when installed, falling back
+to compact stdlib JSON.
+"""
+
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+from fastapi import Response
+
+try:
+    import orjson
+except ImportError:  # Optional speedup
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # Optional binary encoding
+    msgpack = None
+
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+
+HISTOGRAM_FIELDS = ("price", "volume", "buy_volume", "sell_volume", "volume_pct", "is_poc", "in_value_area")
+BAR_FIELDS = ("timestamp", "open", "high", "low", "close", "volume", "iceberg_detected")
+
+
+def columnar(rows: Sequence[Any], fields: Sequence[str]) -> Dict[str, List[Any]]:
+    """Transpose rows (dicts or objects) into {field: [values...]}."""
+    if rows and not isinstance(rows[0], dict):
+        return {f: [getattr(row, f) for row in rows] for f in fields}
+    return {f: [row[f] for row in rows] for f in fields}
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if hasattr(value, "dict"):
+        return value.dict()
+    raise TypeError(f"Type is not serializable: {type(value).__name__}")
+
+
+def negotiated_media_type(accept: Optional[str]) -> str:
+    """Media type encode_payload will answer with for this Accept header."""
+    if msgpack is not None and accept and MSGPACK_MEDIA_TYPE in accept:
+        return MSGPACK_MEDIA_TYPE
+    return "application/json"
+
+
+def encode_payload(payload: Dict[str, Any], accept: Optional[str] = None,
+                   headers: Optional[Dict[str, str]] = None) -> Response:
+    """
+    Encode a trusted payload directly into a Response.
+
+    Returns msgpack when the client asks for it (Accept: application/msgpack)
+    and msgpack is installed, otherwise compact JSON.
+    """
+    if negotiated_media_type(accept) == MSGPACK_MEDIA_TYPE:
+        body = msgpack.packb(payload, default=_default, use_bin_type=True)
+        return Response(content=body, media_type=MSGPACK_MEDIA_TYPE, headers=headers)
+
+    if orjson is not None:
+        body = orjson.dumps(payload, default=_default)
+    else:
+        body = json.dumps(payload, default=_default, separators=(",", ":")).encode("utf-8")
+    return Response(content=body, media_type="application/json", headers=headers)
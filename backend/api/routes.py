@@ -3,13 +3,14 @@ FastAPI routes - Expose all engines via REST endpoints.
 Zero logic change to existing engines (pure wrapper layer).
 """
 
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
 from datetime import datetime, timedelta
 from typing import Optional
 import asyncio
 import csv
 import io
+import time
 
 # Import all engines
 from backend.core.gann_engine import GannEngine
@@ -25,6 +26,16 @@ from backend.mentor.confidence_engine import ConfidenceEngine
 from backend.mentor.mentor_brain import MentorBrain
 from backend.mentor.signal_builder import SignalBuilder
 from backend.volume_profile_engine import VolumeProfileEngine
+from backend.rolling_volume_profile import check_profile_window, live_profiles
+from backend.tick_volume_profile import CONTRACT_ROOT, TickVolumeProfile, contract_for_symbol
+from backend.composite_profile import CandleHistogramSource, CompositeProfileCache, TickHistogramSource
+from backend.api.shared_state import SharedMarketState, export_route_state, apply_route_state
+from backend.api.encoding import encode_payload, columnar, negotiated_media_type, BAR_FIELDS
+from backend.api.chart_delta import (
+    ChartDeltaCache, candles_version, representation_etag, etag_version, etag_matches
+)
+from backend.engines.bar_builder import bar_service
+from backend.feeds.resampler import TIMEFRAME_SECONDS
 
 # Import CME adapters
 from data.cme_adapter import CMEAdapter, GCPriceCache
@@ -33,7 +44,9 @@ from data.cme_adapter import CMEAdapter, GCPriceCache
 from backend.feeds.market_data_fetcher import (
     fetch_live_market_data,
     fetch_current_price,
-    fetch_ohlc_candles
+    fetch_ohlc_candles,
+    fetch_cache_stats,
+    get_fetcher
 )
 
 # Import schemas
@@ -47,12 +60,75 @@ from backend.api.schemas import (
     MentorPanelRequest, MentorPanelResponse, HTFStructure, IcebergActivityReport, RiskAssessment, ConfirmationStatus,
     MarketRequest, MarketResponse,
     ChartRequest, ChartResponse, ChartBarData, ChartLevel, IcebergZoneVisual,
-    VolumeProfileRequest, VolumeProfileResponse, VolumeProfileHistogramBar,
+    VolumeProfileRequest, VolumeProfileResponse, VolumeProfileHistogramBar, CompositeProfileRequest,
+    BatchRequest, BatchResponse, BatchCallResult,
     HealthResponse
 )
 
+# ===== SHARED STATE (MULTI-WORKER) =====
+
+shared_state = SharedMarketState()
+_shared_version = 0  # Snapshot version currently applied to this worker's globals
+
+
+def _route_state():
+    """Route globals kept in the shared snapshot, in export/apply order."""
+    return market_state, price_cache, absorption_memory, iceberg_detector, bar_service, LIVE_BAR_SYMBOL
+
+
+async def _sync_shared_state():
+    """
+    Pull the latest shared snapshot into this worker's globals.
+
+    The SQLite lookup runs off the event loop; the in-place refresh runs on
+    it, so it never races a handler. Only newer versions are applied. No-op
+    when nothing changed.
+    """
+    global _shared_version
+    version, state = await asyncio.to_thread(shared_state.latest)
+    if state is not None and version > _shared_version:
+        apply_route_state(state, *_route_state())
+        _shared_version = version
+
+
+_shared_writer_lock = asyncio.Lock()  # One writer section per worker at a time
+
+
+async def _write_shared_state(mutate):
+    """
+    Single-writer section for mutating shared globals (ingest path only).
+
+    Takes the SQLite write lock and reloads the newest snapshot off the
+    event loop, runs `mutate()` (sync, no awaits) on the loop, then
+    publishes the new version off the loop. Returns mutate()'s result.
+    """
+    global _shared_version
+    async with _shared_writer_lock:
+        version, state = await asyncio.to_thread(shared_state.begin)
+        try:
+            if state is not None and version != _shared_version:
+                apply_route_state(state, *_route_state())
+            _shared_version = version
+            result = mutate()
+            payload = export_route_state(*_route_state())
+        except Exception:
+            _shared_version = 0  # Force a reload of the last good snapshot
+            await asyncio.to_thread(shared_state.rollback)
+            raise
+        try:
+            _shared_version = await asyncio.to_thread(shared_state.commit, payload)
+        except Exception:
+            _shared_version = 0
+            raise
+        return result
+
+
 # Initialize router
-router = APIRouter(prefix="/api/v1", tags=["institutional"])
+router = APIRouter(
+    prefix="/api/v1",
+    tags=["institutional"],
+    dependencies=[Depends(_sync_shared_state)],
+)
 
 # Initialize all engines as singletons
 gann_engine = GannEngine()
@@ -73,10 +149,60 @@ iceberg_detector = IcebergDetector()
 absorption_memory = AbsorptionZoneMemory()
 price_cache = GCPriceCache(max_bars=1000)
 order_recorder = RawOrderRecorder()  # NEW: Raw order tracking
+tick_volume_profile = TickVolumeProfile(order_recorder)  # Trade-accurate profiles from the tick store
+composite_profiles = CompositeProfileCache({"ticks": tick_volume_profile})  # Cached per-session profiles
+chart_delta_cache = ChartDeltaCache()  # Cursor/ETag state for incremental /chart polls
 
 # Initialize 5-minute candle predictor with AI and memory
 from backend.intelligence.candle_predictor_5min import FiveMinuteCandlePredictor
-candle_predictor_5min = FiveMinuteCandlePredictor(mentor_brain=mentor_brain, max_history=100)
+from backend.intelligence.pattern_memory import PatternMemory
+pattern_memory = PatternMemory()  # Persistent k-NN over every closed 5-minute period
+candle_predictor_5min = FiveMinuteCandlePredictor(
+    mentor_brain=mentor_brain, max_history=100, pattern_memory=pattern_memory
+)
+
+# ==================== EVENT-TIME BARS ====================
+
+LIVE_BAR_SYMBOL = "GC"  # Symbol the CME ingest feeds into the bar service
+LIVE_PROFILE_CONTRACT = contract_for_symbol(LIVE_BAR_SYMBOL)  # Chart and mentor profiles both read the live bars
+MENTOR_PROFILE_BARS = 100  # ...over the same window (VolumeProfileRequest.bars default)
+
+
+def _replay_recorded_ticks():
+    """Rebuild bars from the recorder's in-memory ticks so restarts keep history."""
+    replayed = 0
+    for order in list(order_recorder.memory_orders):
+        try:
+            bar_service.ingest_trade(order.get("contract_type", "ES"), order["price"], order["size"], order["timestamp"])
+            replayed += 1
+        except (KeyError, ValueError, TypeError):
+            continue
+    print(f"✅ Bar service: replayed {replayed} recorded ticks")
+
+
+def _on_5min_close(symbol, timeframe, bar):
+    """Label the pattern of the period that ended where this closed 5m candle started."""
+    move = bar["close"] - bar["open"]
+    bar_start = datetime.fromisoformat(bar["timestamp"].replace("Z", "+00:00"))
+    candle_predictor_5min.record_actual_outcome(
+        "UP" if move > 0 else "DOWN" if move < 0 else "SIDEWAYS", bar_start=bar_start
+    )
+
+
+async def _chart_candles(interval: str, limit: int):
+    """
+    Live event-time bars when the feed has enough history, else the upstream fetcher.
+
+    The live symbol's bars travel in the shared snapshot, so every worker
+    makes the same choice.
+    """
+    if bar_service.has_history(LIVE_BAR_SYMBOL, interval, limit):
+        return bar_service.bars(LIVE_BAR_SYMBOL, interval, limit)
+    return await fetch_ohlc_candles(limit=limit, interval=interval)
+
+
+_replay_recorded_ticks()
+bar_service.subscribe(_on_5min_close, timeframe="5m", symbol=LIVE_BAR_SYMBOL)
 
 # Global state - will be fed by CME data
 market_state = {
@@ -110,13 +236,21 @@ def _bars_to_trades(bars):
     return trades
 
 
-def _detect_icebergs_from_bars(bars):
+async def _detect_icebergs_from_bars(bars):
     """Run advanced iceberg detection on bars and return (flags, zones)."""
     if not bars:
         return [], []
 
+    # Detect on a scratch detector; found zones are recorded into the shared
+    # detector inside the writer so every worker keeps the same state
     trades = _bars_to_trades(bars)
-    zones = iceberg_detector.detect_absorption_zones(trades)
+    zones = IcebergDetector().detect_absorption_zones(trades)
+    if zones:
+        def record_zones():
+            for zone in zones:
+                iceberg_detector._record_zone(zone)
+
+        await _write_shared_state(record_zones)
 
     # Build visuals for frontend (thin band around detected price)
     visuals = []
@@ -166,11 +300,12 @@ async def predict_5min_candle():
     Returns comprehensive prediction with confidence, AI insights, and pattern analysis.
     """
     try:
-        # Get current orders from database
-        recent_orders = order_recorder.get_recent_orders(limit=500)
+        # Only orders at/after the predictor's watermark (or this period's start on first call)
+        since = candle_predictor_5min.watermark or candle_predictor_5min.get_5min_period_start(datetime.utcnow())
+        new_orders = order_recorder.get_orders_since(since, limit=5000)
         
         # Feed orders to predictor
-        candle_predictor_5min.add_orders(recent_orders)
+        candle_predictor_5min.add_orders(new_orders)
         
         # Generate prediction
         prediction = candle_predictor_5min.predict_next_candle()
@@ -183,8 +318,9 @@ async def predict_5min_candle():
                 "predictor_type": "5-MINUTE CANDLE WITH AI + MEMORY",
                 "ai_mentor_active": True,
                 "memory_patterns_available": len(candle_predictor_5min.historical_patterns),
+                "stored_patterns": len(pattern_memory),
                 "current_period": candle_predictor_5min.current_period_start.isoformat() if candle_predictor_5min.current_period_start else None,
-                "orders_in_period": len(candle_predictor_5min.period_orders),
+                "orders_in_period": candle_predictor_5min.orders_in_period,
             }
         }
     except Exception as e:
@@ -204,6 +340,7 @@ async def get_5min_prediction_stats():
             "memory": {
                 "total_patterns_recorded": len(candle_predictor_5min.historical_patterns),
                 "max_patterns_stored": candle_predictor_5min.max_history,
+                "pattern_store": pattern_memory.stats(),
             }
         }
     except Exception as e:
@@ -212,15 +349,20 @@ async def get_5min_prediction_stats():
 
 # ==================== MARKET DATA ====================
 
-@router.post("/market", response_model=MarketResponse)
-async def get_market_data(request: MarketRequest):
-    """Get current market state and levels."""
-    
+def _memoized(memo, key, compute):
+    """Reuse an engine result across calls in one batch (memo=None: no sharing)."""
+    if memo is None:
+        return compute()
+    return memo.get(key, compute)
+
+
+def _market_result(request: MarketRequest, memo=None) -> MarketResponse:
     # Use global market state (will be replaced with live CME data)
     price = market_state["current_price"]
     
     # Calculate Gann levels for support/resistance
-    gann_levels = gann_engine.levels(price * 1.05, price * 0.95)
+    high, low = price * 1.05, price * 0.95
+    gann_levels = _memoized(memo, ("gann.levels", high, low), lambda: gann_engine.levels(high, low))
     
     return MarketResponse(
         symbol=request.symbol,
@@ -241,81 +383,110 @@ async def get_market_data(request: MarketRequest):
     )
 
 
+@router.post("/market", response_model=MarketResponse)
+async def get_market_data(request: MarketRequest):
+    """Get current market state and levels."""
+    return _market_result(request)
+
+
 # ==================== GANN ENGINE ====================
 
+def _gann_result(request: GannRequest, memo=None) -> GannResponse:
+    levels = _memoized(
+        memo, ("gann.levels", request.high, request.low),
+        lambda: gann_engine.levels(request.high, request.low)
+    )
+    range_size = abs(request.high - request.low)
+    
+    return GannResponse(
+        range=range_size,
+        levels=levels,
+        timestamp=datetime.utcnow()
+    )
+
+
 @router.post("/gann", response_model=GannResponse)
 async def calculate_gann_levels(request: GannRequest):
     """Calculate Gann harmonic price levels."""
     try:
-        levels = gann_engine.levels(request.high, request.low)
-        range_size = abs(request.high - request.low)
-        
-        return GannResponse(
-            range=range_size,
-            levels=levels,
-            timestamp=datetime.utcnow()
-        )
+        return _gann_result(request)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 # ==================== ASTRO ENGINE ====================
 
+def _astro_result(request: AstroRequest, memo=None) -> AstroResponse:
+    key = (request.degree_1, request.degree_2)
+    aspect = _memoized(memo, ("astro.aspect",) + key, lambda: astro_engine.aspect(*key))
+    is_major = _memoized(memo, ("astro.is_major",) + key, lambda: astro_engine.is_major(*key))
+    
+    return AstroResponse(
+        aspect_angle=aspect,
+        is_major_aspect=is_major,
+        major_aspects=astro_engine.major_aspects,
+        timestamp=datetime.utcnow()
+    )
+
+
 @router.post("/astro", response_model=AstroResponse)
 async def calculate_astro_aspect(request: AstroRequest):
     """Calculate astrological aspect between two degrees."""
     try:
-        aspect = astro_engine.aspect(request.degree_1, request.degree_2)
-        is_major = astro_engine.is_major(request.degree_1, request.degree_2)
-        
-        return AstroResponse(
-            aspect_angle=aspect,
-            is_major_aspect=is_major,
-            major_aspects=astro_engine.major_aspects,
-            timestamp=datetime.utcnow()
-        )
+        return _astro_result(request)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 # ==================== CYCLE ENGINE ====================
 
+def _cycle_result(request: CycleRequest, memo=None) -> CycleResponse:
+    is_cycle = _memoized(memo, ("cycle.is_cycle", request.bars), lambda: cycle_engine.is_cycle(request.bars))
+    active = [c for c in cycle_engine.cycles if c <= request.bars]
+    next_cycle = min([c for c in cycle_engine.cycles if c > request.bars]) if any(c > request.bars for c in cycle_engine.cycles) else None
+    
+    return CycleResponse(
+        bars=request.bars,
+        is_cycle=is_cycle,
+        active_cycles=active,
+        next_cycle=next_cycle or 0,
+        timestamp=datetime.utcnow()
+    )
+
+
 @router.post("/cycle", response_model=CycleResponse)
 async def check_cycle(request: CycleRequest):
     """Check if bar count matches cycle."""
     try:
-        is_cycle = cycle_engine.is_cycle(request.bars)
-        active = [c for c in cycle_engine.cycles if c <= request.bars]
-        next_cycle = min([c for c in cycle_engine.cycles if c > request.bars]) if any(c > request.bars for c in cycle_engine.cycles) else None
-        
-        return CycleResponse(
-            bars=request.bars,
-            is_cycle=is_cycle,
-            active_cycles=active,
-            next_cycle=next_cycle or 0,
-            timestamp=datetime.utcnow()
-        )
+        return _cycle_result(request)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 # ==================== ICEBERG DETECTION ====================
 
+def _iceberg_result(request: IcebergRequest, memo=None) -> IcebergResponse:
+    detected = _memoized(
+        memo, ("iceberg.detect", request.volume, request.delta),
+        lambda: iceberg_engine.detect(request.volume, request.delta)
+    )
+    confidence = 0.8 if detected else 0.2
+    
+    return IcebergResponse(
+        detected=detected,
+        confidence=confidence,
+        volume=request.volume,
+        delta=request.delta,
+        absorption_level=market_state["current_price"] if detected else None,
+        timestamp=datetime.utcnow()
+    )
+
+
 @router.post("/iceberg", response_model=IcebergResponse)
 async def detect_iceberg(request: IcebergRequest):
     """Detect iceberg order activity."""
     try:
-        detected = iceberg_engine.detect(request.volume, request.delta)
-        confidence = 0.8 if detected else 0.2
-        
-        return IcebergResponse(
-            detected=detected,
-            confidence=confidence,
-            volume=request.volume,
-            delta=request.delta,
-            absorption_level=market_state["current_price"] if detected else None,
-            timestamp=datetime.utcnow()
-        )
+        return _iceberg_result(request)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -519,6 +690,12 @@ async def record_raw_order(
         side=side,
         contract_type=contract_type
     )
+    args = (order["contract_type"], order["price"], order["size"], order["timestamp"])
+    if order["contract_type"] == LIVE_BAR_SYMBOL:
+        # Live bars are shared: every worker serves the same /chart
+        await _write_shared_state(lambda: bar_service.ingest_trade(*args))
+    else:
+        bar_service.ingest_trade(*args)
     return {"order": order, "status": "recorded"}
 
 
@@ -545,101 +722,190 @@ async def export_orders(
 
 # ==================== LIQUIDITY ANALYSIS ====================
 
+def _liquidity_result(request: LiquidityRequest, memo=None) -> LiquidityResponse:
+    key = (request.support, request.resistance, request.volume)
+    result = _memoized(memo, ("liquidity.pool",) + key, lambda: liquidity_engine.detect_liquidity_pool(*key))
+    sweep_prob = _memoized(memo, ("liquidity.sweep",) + key, lambda: liquidity_engine.sweep_probability(*key))
+    
+    zone = None
+    if result:
+        zone = LiquidityZone(
+            price_from=request.support,
+            price_to=request.resistance,
+            volume_absorbed=result["strength"],
+            sweeps_count=1,
+            session=market_state["session"],
+            created_at=datetime.utcnow()
+        )
+    
+    return LiquidityResponse(
+        detected=result is not None,
+        pool_level=result["level"] if result else None,
+        pool_strength=result["strength"] if result else None,
+        sweep_probability=sweep_prob,
+        zones=[zone] if zone else [],
+        timestamp=datetime.utcnow()
+    )
+
+
 @router.post("/liquidity", response_model=LiquidityResponse)
 async def analyze_liquidity(request: LiquidityRequest):
     """Analyze institutional liquidity zones."""
     try:
-        result = liquidity_engine.detect_liquidity_pool(request.support, request.resistance, request.volume)
-        sweep_prob = liquidity_engine.sweep_probability(request.support, request.resistance, request.volume)
-        
-        zone = None
-        if result:
-            zone = LiquidityZone(
-                price_from=request.support,
-                price_to=request.resistance,
-                volume_absorbed=result["strength"],
-                sweeps_count=1,
-                session=market_state["session"],
-                created_at=datetime.utcnow()
-            )
-        
-        return LiquidityResponse(
-            detected=result is not None,
-            pool_level=result["level"] if result else None,
-            pool_strength=result["strength"] if result else None,
-            sweep_probability=sweep_prob,
-            zones=[zone] if zone else [],
-            timestamp=datetime.utcnow()
-        )
+        return _liquidity_result(request)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 # ==================== SIGNAL GENERATION ====================
 
-@router.post("/signal", response_model=SignalResponse)
-async def generate_signal(request: SignalRequest):
-    """Generate trading signal from all engines."""
-    try:
-        # Build signal from individual engines
-        signal_components = [
-            SignalData(engine="QMO", value=request.qmo_value, description="Market State - Accumulation bias"),
-            SignalData(engine="IMO", value=request.imo_value, description="Liquidity - Buy-side swept"),
-            SignalData(engine="GANN", value=request.gann_value, description="Price harmonics aligned"),
-            SignalData(engine="ASTRO", value=request.astro_value, description="Moon square Saturn"),
-            SignalData(engine="CYCLE", value=request.cycle_value, description="90-bar cycle active"),
-        ]
-        
-        # Calculate confidence
-        weights = {
-            "QMO": 0.3,
-            "IMO": 0.25,
-            "GANN": 0.2,
-            "ASTRO": 0.15,
-            "CYCLE": 0.1
-        }
-        
-        score_dict = {
-            "QMO": request.qmo_value,
-            "IMO": request.imo_value,
-            "GANN": request.gann_value,
-            "ASTRO": request.astro_value,
-            "CYCLE": request.cycle_value,
-        }
-        
-        confidence = confidence_engine.score(score_dict)
-        
-        # Use mentor brain to decide
-        ctx = {
-            "qmo": request.qmo_value > 0.5,
-            "imo": request.imo_value > 0.5,
-            "confidence": confidence
-        }
-        
-        decision = mentor_brain.decide(ctx)
-        
-        # Generate recommendation
-        recommendation = signal_builder.generate_recommendation(
+def _signal_result(request: SignalRequest, memo=None) -> SignalResponse:
+    # Build signal from individual engines
+    signal_components = [
+        SignalData(engine="QMO", value=request.qmo_value, description="Market State - Accumulation bias"),
+        SignalData(engine="IMO", value=request.imo_value, description="Liquidity - Buy-side swept"),
+        SignalData(engine="GANN", value=request.gann_value, description="Price harmonics aligned"),
+        SignalData(engine="ASTRO", value=request.astro_value, description="Moon square Saturn"),
+        SignalData(engine="CYCLE", value=request.cycle_value, description="90-bar cycle active"),
+    ]
+    
+    score_dict = {
+        "QMO": request.qmo_value,
+        "IMO": request.imo_value,
+        "GANN": request.gann_value,
+        "ASTRO": request.astro_value,
+        "CYCLE": request.cycle_value,
+    }
+    
+    confidence = _memoized(
+        memo, ("confidence.score",) + tuple(score_dict.values()),
+        lambda: confidence_engine.score(score_dict)
+    )
+    
+    # Use mentor brain to decide
+    qmo_active = request.qmo_value > 0.5
+    imo_active = request.imo_value > 0.5
+    ctx = {
+        "qmo": qmo_active,
+        "imo": imo_active,
+        "confidence": confidence
+    }
+    
+    decision = _memoized(
+        memo, ("mentor.decide", qmo_active, imo_active, confidence),
+        lambda: mentor_brain.decide(ctx)
+    )
+    
+    # Generate recommendation
+    recommendation = _memoized(
+        memo, ("signal.recommendation", qmo_active, imo_active, confidence),
+        lambda: signal_builder.generate_recommendation(
             {
-                "qmo": request.qmo_value > 0.5,
-                "imo": request.imo_value > 0.5,
+                "qmo": qmo_active,
+                "imo": imo_active,
             },
             confidence
         )
-        
-        return SignalResponse(
-            decision="SELL" if decision else None,
-            confidence=confidence,
-            signals=signal_components,
-            recommendation=recommendation,
-            target_levels=[2430.0, 2415.0],
-            stop_level=2465.0,
-            timestamp=datetime.utcnow()
-        )
+    )
+    
+    return SignalResponse(
+        decision="SELL" if decision else None,
+        confidence=confidence,
+        signals=signal_components,
+        recommendation=recommendation,
+        target_levels=[2430.0, 2415.0],
+        stop_level=2465.0,
+        timestamp=datetime.utcnow()
+    )
+
+
+@router.post("/signal", response_model=SignalResponse)
+async def generate_signal(request: SignalRequest):
+    """Generate trading signal from all engines."""
+    try:
+        return _signal_result(request)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
+# ==================== BATCH ====================
+
+class _BatchMemo:
+    """Shared engine inputs for one batch request."""
+
+    def __init__(self):
+        self.values = {}
+        self.hits = 0
+
+    def get(self, key, compute):
+        if key in self.values:
+            self.hits += 1
+            return self.values[key]
+        value = compute()
+        self.values[key] = value
+        return value
+
+
+BATCH_ENGINES = {
+    "market": (MarketRequest, _market_result),
+    "gann": (GannRequest, _gann_result),
+    "astro": (AstroRequest, _astro_result),
+    "cycle": (CycleRequest, _cycle_result),
+    "iceberg": (IcebergRequest, _iceberg_result),
+    "liquidity": (LiquidityRequest, _liquidity_result),
+    "signal": (SignalRequest, _signal_result),
+}
+
+MAX_BATCH_CALLS = 32  # Larger batches are rejected with 413 (split them client-side)
+
+
+@router.post("/batch", response_model=BatchResponse)
+async def run_batch(request: BatchRequest):
+    """
+    Evaluate several engine calls in one pass.
+    
+    Each call uses the same params as its standalone endpoint. Engine results
+    with identical inputs (e.g. Gann levels for the same range) are computed
+    once and shared across the batch. A failing call does not fail the batch.
+    At most MAX_BATCH_CALLS calls per request (413 otherwise).
+    """
+    if len(request.calls) > MAX_BATCH_CALLS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch has {len(request.calls)} calls; limit is {MAX_BATCH_CALLS}"
+        )
+    
+    memo = _BatchMemo()
+    results = []
+    batch_start = time.perf_counter()
+    
+    for index, call in enumerate(request.calls):
+        call_id = call.id or str(index)
+        engine = call.engine.lower()
+        start = time.perf_counter()
+        try:
+            if engine not in BATCH_ENGINES:
+                raise ValueError(f"Unknown engine '{call.engine}' (available: {', '.join(BATCH_ENGINES)})")
+            request_model, compute = BATCH_ENGINES[engine]
+            result = compute(request_model(**call.params), memo).dict()
+            results.append(BatchCallResult(
+                id=call_id, engine=engine, ok=True, result=result,
+                elapsed_ms=round((time.perf_counter() - start) * 1000, 3)
+            ))
+        except Exception as e:
+            results.append(BatchCallResult(
+                id=call_id, engine=engine, ok=False, error=str(e),
+                elapsed_ms=round((time.perf_counter() - start) * 1000, 3)
+            ))
+    
+    return BatchResponse(
+        results=results,
+        total_ms=round((time.perf_counter() - batch_start) * 1000, 3),
+        shared_inputs_reused=memo.hits,
+        timestamp=datetime.utcnow()
+    )
+
+
 # ==================== AI MENTOR LIVE PANEL ====================
 
 @router.post("/mentor", response_model=MentorPanelResponse)
@@ -653,9 +919,6 @@ async def get_mentor_panel(request: MentorPanelRequest):
         # Fallback to mock data if API fails
         if price is None:
             price = market_state["current_price"]
-        else:
-            # Update market state with live price
-            market_state["current_price"] = price
         
         # Calculate all analyses
         # Get comprehensive Gann analysis
@@ -707,10 +970,6 @@ async def get_mentor_panel(request: MentorPanelRequest):
         sell_volume = sum(o['size'] for o in recent_orders if o['side'] == 'SELL')
         order_flow_balance = buy_volume - sell_volume
         
-        # Update market state with live order flow
-        market_state["buys"] = buy_volume
-        market_state["sells"] = sell_volume
-        
         # Derive iceberg signal from recent candles AND live order flow
         iceberg_detected = False
         iceberg_from = price
@@ -719,7 +978,17 @@ async def get_mentor_panel(request: MentorPanelRequest):
         absorption_count = 0
 
         try:
-            recent_candles = await fetch_ohlc_candles(limit=50)
+            # Same live profile the volume-profile endpoint serves: sync its window, read levels
+            mentor_profile = live_profiles.get(LIVE_PROFILE_CONTRACT, "5m", 0.10, window=MENTOR_PROFILE_BARS)
+            recent_candles = await _chart_candles("5m", MENTOR_PROFILE_BARS)
+            if recent_candles:
+                mentor_profile.sync(recent_candles)
+                levels = mentor_profile.snapshot()
+                if levels["total_volume"] > 0:
+                    htf_structure.range_high = levels["VAH"]
+                    htf_structure.range_low = levels["VAL"]
+                    htf_structure.equilibrium = levels["POC"]
+            recent_candles = (recent_candles or [])[-50:]
             recent_bars = []
             for candle in recent_candles or []:
                 recent_bars.append(ChartBarData(
@@ -730,7 +999,7 @@ async def get_mentor_panel(request: MentorPanelRequest):
                     close=candle.get("close", price),
                     volume=candle.get("volume", 0)
                 ))
-            flags, visuals = _detect_icebergs_from_bars(recent_bars)
+            flags, visuals = await _detect_icebergs_from_bars(recent_bars)
             iceberg_detected = any(flags)
             if visuals:
                 iceberg_from = min(v.price_bottom for v in visuals)
@@ -1135,77 +1404,123 @@ async def get_mentor_panel(request: MentorPanelRequest):
 # ==================== CHART DATA ====================
 
 @router.post("/chart", response_model=ChartResponse)
-async def get_chart_data(request: ChartRequest):
-    """Get chart data with all levels and overlays from live market."""
+async def get_chart_data(request: ChartRequest, http_request: Request, response: Response):
+    """
+    Get chart data with all levels and overlays from live market.
+    
+    Incremental polling:
+    - `since`: only bars at/after this timestamp are returned (is_delta=true)
+    - `If-None-Match`: 304 when the candle window is unchanged; on a delta,
+      zones present in that version but no longer detected come back in
+      `removed_zones`
+    
+    The ETag covers the representation too (columnar, Accept media type,
+    `since`), so each response shape is validated separately.
+    """
     try:
         # Fetch live candles for requested timeframe
-        candles_data = await fetch_ohlc_candles(limit=request.bars, interval=request.interval)
-        
-        if candles_data:
-            # Convert to ChartBarData objects
-            bars = []
-            for candle in candles_data:
-                bars.append(ChartBarData(
-                    timestamp=datetime.fromisoformat(candle["timestamp"].replace("Z", "+00:00")) if isinstance(candle["timestamp"], str) else datetime.utcnow(),
-                    open=candle["open"],
-                    high=candle["high"],
-                    low=candle["low"],
-                    close=candle["close"],
-                    volume=candle.get("volume", 0)
-                ))
-            base_price = bars[-1].close if bars else 2450.0
+        candles_data = await _chart_candles(request.interval, request.bars)
+        
+        window_key = (request.symbol, request.interval, request.bars)
+        version = candles_version(request.symbol, request.interval, request.bars, candles_data or [])
+        media_type = negotiated_media_type(http_request.headers.get("accept")) if request.columnar else "application/json"
+        etag = representation_etag(version, request.columnar, media_type, request.since)
+        headers = {"ETag": etag, "Vary": "Accept"}
+        client_etag = http_request.headers.get("if-none-match")
+        if candles_data and etag_matches(client_etag, etag):
+            return Response(status_code=304, headers=headers)
+        
+        entry = chart_delta_cache.get(window_key, version) if candles_data else None
+        if entry is None:
+            bars, levels, iceberg_visuals = await _build_chart_window(request, candles_data)
+            if candles_data:
+                entry = chart_delta_cache.put(window_key, version, bars, levels, iceberg_visuals)
         else:
-            # Fallback to sample candles if API fails
-            bars = []
-            base_price = market_state["current_price"]
-            for i in range(request.bars):
-                open_p = base_price + (i * 0.5)
-                close_p = open_p + (2.0 if i % 2 == 0 else -2.0)
-                bars.append(ChartBarData(
-                    timestamp=datetime.utcnow(),
-                    open=open_p,
-                    high=max(open_p, close_p) + 3,
-                    low=min(open_p, close_p) - 3,
-                    close=close_p,
-                    volume=int(market_state["volume_avg"] * (1 + (i % 3) * 0.2))
-                ))
-        
-        # Detect iceberg zones and flag bars
-        iceberg_flags, iceberg_visuals = _detect_icebergs_from_bars(bars)
-        enriched_bars = []
-        for bar, flag in zip(bars, iceberg_flags):
-            enriched_bars.append(ChartBarData(
-                timestamp=bar.timestamp,
-                open=bar.open,
-                high=bar.high,
-                low=bar.low,
-                close=bar.close,
-                volume=bar.volume,
-                iceberg_detected=flag
-            ))
-
-        # Chart levels
-        gann_levels = gann_engine.levels(base_price * 1.05, base_price * 0.95)
-        levels = [
-            ChartLevel(price=base_price, label="Current", color="white", style="solid"),
-            ChartLevel(price=base_price + 20, label="R1 (Gann)", color="red", style="dashed"),
-            ChartLevel(price=base_price - 15, label="S1 (Gann)", color="green", style="dashed"),
-        ]
-        
+            bars, levels, iceberg_visuals = entry["bars"], entry["levels"], entry["zones"]
+        
+        removed_zones = None
+        is_delta = request.since is not None and entry is not None
+        if is_delta:
+            bars = ChartDeltaCache.bars_since(entry, request.since)
+            removed_zones = chart_delta_cache.removed_zones(etag_version(client_etag), iceberg_visuals)
+        cursor = bars[-1].timestamp if bars else request.since
+        
+        if request.columnar:
+            return encode_payload({
+                "symbol": request.symbol,
+                "interval": request.interval,
+                "bars": columnar(bars, BAR_FIELDS),
+                "levels": [level.dict() for level in levels],
+                "iceberg_zones": [zone.dict() for zone in iceberg_visuals],
+                "removed_zones": [zone.dict() for zone in removed_zones] if removed_zones is not None else None,
+                "cursor": cursor,
+                "is_delta": is_delta,
+                "timestamp": datetime.utcnow(),
+            }, accept=http_request.headers.get("accept"), headers=headers)
+        
+        response.headers.update(headers)
         return ChartResponse(
             symbol=request.symbol,
             interval=request.interval,
-            bars=enriched_bars,
+            bars=bars,
             levels=levels,
             iceberg_zones=iceberg_visuals,
+            cursor=cursor,
+            is_delta=is_delta,
+            removed_zones=removed_zones,
             timestamp=datetime.utcnow()
         )
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
+async def _build_chart_window(request: ChartRequest, candles_data):
+    """Build bars (one model per bar, no validation), levels and iceberg overlays."""
+    bars = []
+    if candles_data:
+        for candle in candles_data:
+            bars.append(ChartBarData.construct(
+                timestamp=datetime.fromisoformat(candle["timestamp"].replace("Z", "+00:00")) if isinstance(candle["timestamp"], str) else datetime.utcnow(),
+                open=float(candle["open"]),
+                high=float(candle["high"]),
+                low=float(candle["low"]),
+                close=float(candle["close"]),
+                volume=int(candle.get("volume", 0)),
+                iceberg_detected=False
+            ))
+        base_price = bars[-1].close if bars else 2450.0
+    else:
+        # Fallback to sample candles if API fails
+        base_price = market_state["current_price"]
+        for i in range(request.bars):
+            open_p = base_price + (i * 0.5)
+            close_p = open_p + (2.0 if i % 2 == 0 else -2.0)
+            bars.append(ChartBarData.construct(
+                timestamp=datetime.utcnow(),
+                open=open_p,
+                high=max(open_p, close_p) + 3,
+                low=min(open_p, close_p) - 3,
+                close=close_p,
+                volume=int(market_state["volume_avg"] * (1 + (i % 3) * 0.2)),
+                iceberg_detected=False
+            ))
+    
+    # Detect iceberg zones and flag bars in place
+    iceberg_flags, iceberg_visuals = await _detect_icebergs_from_bars(bars)
+    for bar, flag in zip(bars, iceberg_flags):
+        bar.iceberg_detected = flag
+
+    # Chart levels
+    levels = [
+        ChartLevel(price=base_price, label="Current", color="white", style="solid"),
+        ChartLevel(price=base_price + 20, label="R1 (Gann)", color="red", style="dashed"),
+        ChartLevel(price=base_price - 15, label="S1 (Gann)", color="green", style="dashed"),
+    ]
+    return bars, levels, iceberg_visuals
+
+
 @router.post("/indicators/volume-profile", response_model=VolumeProfileResponse)
-async def get_volume_profile(request: VolumeProfileRequest):
+async def get_volume_profile(request: VolumeProfileRequest, http_request: Request):
     """
     Calculate Volume Profile for the specified chart data.
     
@@ -1214,16 +1529,29 @@ async def get_volume_profile(request: VolumeProfileRequest):
     - VAH/VAL (Value Area High/Low): Boundaries containing 70% of volume
     - VWAP (Volume Weighted Average Price): Institutional benchmark price
     - Histogram: Full price distribution for visual rendering
+    
+    With `columnar=true` the histogram is returned as parallel arrays
+    (price[], volume[], ...) encoded directly, skipping model validation.
     """
     try:
+        bars = check_profile_window(request.tick_size, request.bars)
+        if request.source == "ticks":
+            return await _tick_volume_profile(request, http_request)
+        
         # Fetch live candles for volume profile calculation
-        candles_data = await fetch_ohlc_candles(limit=request.bars, interval=request.interval)
+        candles_data = await _chart_candles(request.interval, bars)
+        live_profile = None
         
-        if not candles_data:
+        if candles_data:
+            # Shared live profile per bar count: only bars that changed since the last call are re-applied.
+            # Keyed on the live contract, since the bars do not depend on request.symbol.
+            live_profile = live_profiles.get(LIVE_PROFILE_CONTRACT, request.interval, request.tick_size, window=bars)
+            live_profile.sync(candles_data)
+        else:
             # Fallback to sample data if API fails
             candles_data = []
             base_price = market_state["current_price"]
-            for i in range(request.bars):
+            for i in range(bars):
                 open_p = base_price + (i * 0.5)
                 close_p = open_p + (2.0 if i % 2 == 0 else -2.0)
                 candles_data.append({
@@ -1240,43 +1568,134 @@ async def get_volume_profile(request: VolumeProfileRequest):
             volume_profile_engine.tick_size = request.tick_size
         
         # Build volume profile
-        profile = volume_profile_engine.build_profile(
-            candles=candles_data,
-            value_area_pct=request.value_area_pct
-        )
-        
-        # Convert histogram to schema format
-        histogram_bars = [
-            VolumeProfileHistogramBar(
-                price=bar["price"],
-                volume=bar["volume"],
-                buy_volume=bar["buy_volume"],
-                sell_volume=bar["sell_volume"],
-                volume_pct=bar["volume_pct"],
-                is_poc=bar["is_poc"],
-                in_value_area=bar["in_value_area"]
+        if live_profile is not None:
+            profile = live_profile.snapshot(request.value_area_pct, columnar=request.columnar)
+        else:
+            profile = volume_profile_engine.build_profile(
+                candles=candles_data,
+                value_area_pct=request.value_area_pct,
+                columnar=request.columnar
             )
+        
+        summary = {
+            "symbol": request.symbol,
+            "interval": request.interval,
+            "bars_analyzed": len(candles_data),
+            "poc": profile["POC"],
+            "vah": profile["VAH"],
+            "val": profile["VAL"],
+            "vwap": profile["VWAP"],
+            "total_volume": profile["total_volume"],
+            "total_buy_volume": profile["total_buy_volume"],
+            "total_sell_volume": profile["total_sell_volume"],
+            "timestamp": datetime.utcnow(),
+        }
+        
+        if request.columnar:
+            summary["histogram"] = profile["histogram"]  # Already {field: [...]} from the engine
+            return encode_payload(summary, accept=http_request.headers.get("accept"))
+        
+        # Histogram rows come straight from the engine: skip per-level validation
+        summary["histogram"] = [
+            VolumeProfileHistogramBar.construct(**bar)
             for bar in profile["histogram"]
         ]
-        
-        return VolumeProfileResponse(
-            symbol=request.symbol,
-            interval=request.interval,
-            bars_analyzed=len(candles_data),
-            poc=profile["POC"],
-            vah=profile["VAH"],
-            val=profile["VAL"],
-            vwap=profile["VWAP"],
-            total_volume=profile["total_volume"],
-            total_buy_volume=profile["total_buy_volume"],
-            total_sell_volume=profile["total_sell_volume"],
-            histogram=histogram_bars,
-            timestamp=datetime.utcnow()
-        )
+        return VolumeProfileResponse(**summary)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Volume Profile calculation failed: {str(e)}")
 
 
+async def _tick_volume_profile(request: VolumeProfileRequest, http_request: Request):
+    """Volume profile from recorded trades over [start, end) (default: the last bars x interval)."""
+    end = request.end or datetime.utcnow()
+    start = request.start or end - timedelta(seconds=TIMEFRAME_SECONDS.get(request.interval, 300) * request.bars)
+    # The recorded-trade scan is a SQLite query: keep it off the event loop
+    profile = await asyncio.to_thread(
+        tick_volume_profile.build_profile,
+        start, end,
+        tick_size=request.tick_size,
+        contract=contract_for_symbol(request.symbol),
+        value_area_pct=request.value_area_pct,
+        columnar=request.columnar
+    )
+    return _profile_response(profile, request.symbol, request.interval, profile["trades"],
+                             request.columnar, http_request)
+
+
+def _profile_response(profile: dict, symbol: str, interval: str, analyzed: int, columnar: bool,
+                      http_request: Request):
+    """VolumeProfileResponse (or encoded columnar payload) for an engine-shaped profile."""
+    summary = {
+        "symbol": symbol,
+        "interval": interval,
+        "bars_analyzed": analyzed,
+        "poc": profile["POC"],
+        "vah": profile["VAH"],
+        "val": profile["VAL"],
+        "vwap": profile["VWAP"],
+        "total_volume": profile["total_volume"],
+        "total_buy_volume": profile["total_buy_volume"],
+        "total_sell_volume": profile["total_sell_volume"],
+        "timestamp": datetime.utcnow(),
+    }
+    if columnar:
+        summary["histogram"] = profile["histogram"]
+        return encode_payload(summary, accept=http_request.headers.get("accept"))
+    summary["histogram"] = [VolumeProfileHistogramBar.construct(**bar) for bar in profile["histogram"]]
+    return VolumeProfileResponse(**summary)
+
+
+async def _composite_source(source: str, symbol: str) -> str:
+    """Composite cache source name for one contract ("ticks:GC"), registered on first use."""
+    contract = contract_for_symbol(symbol)
+    if contract and not CONTRACT_ROOT.match(contract):
+        raise HTTPException(status_code=400, detail=f"Invalid symbol: {symbol}")
+    name = f"{source}:{contract}" if contract else source
+    if name in composite_profiles.sources:
+        return name
+    
+    if source == "ticks":
+        # Only contracts the recorder has seen, so sources cannot grow with arbitrary symbols
+        if contract and not await asyncio.to_thread(tick_volume_profile.covered_until, contract):
+            raise HTTPException(status_code=400, detail=f"No recorded trades for {symbol}")
+        composite_profiles.sources[name] = TickHistogramSource(tick_volume_profile, contract)
+    elif source == "candles":
+        fetcher = await get_fetcher()
+        if contract and contract_for_symbol(fetcher.symbol) != contract:
+            raise HTTPException(status_code=400, detail=f"No stored candles for {symbol}")
+        composite_profiles.sources[name] = CandleHistogramSource(fetcher.store, fetcher.symbol, "5m")
+    else:
+        raise HTTPException(status_code=400, detail=f"Unknown profile source: {source}")
+    return name
+
+
+@router.post("/indicators/volume-profile/composite", response_model=VolumeProfileResponse)
+async def get_composite_volume_profile(request: CompositeProfileRequest, http_request: Request):
+    """
+    Composite volume profile over several sessions (e.g. last 5 London sessions,
+    this week, this month). Closed sessions come from the on-disk session cache;
+    only the session still trading is computed live.
+    """
+    source = await _composite_source(request.source, request.symbol)
+    try:
+        profile = await asyncio.to_thread(
+            composite_profiles.build_profile,
+            source, request.session, request.sessions, request.period, None,
+            request.tick_size, request.value_area_pct, request.columnar,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    interval = f"{request.session}:{request.period or request.sessions}"
+    return _profile_response(profile, request.symbol, interval, profile["sessions"],
+                             request.columnar, http_request)
+
+
+@router.get("/indicators/volume-profile/ticks/stats")
+async def get_tick_profile_stats():
+    """Tick-profile and composite-cache counters (SQL scans, disk loads, cache hits)."""
+    return {"ticks": tick_volume_profile.stats(), "composite": composite_profiles.stats()}
+
+
 # ==================== CME DATA INGESTION ====================
 
 @router.post("/cme/ingest")
@@ -1300,27 +1719,34 @@ async def ingest_cme_data(trades: list):
         # Process trades through CME adapter
         processed = cme_adapter.stream_processor(trades)
         
-        # Update market state with real data
-        if processed["aggregated"]["mid_price"] > 0:
-            market_state["current_price"] = processed["aggregated"]["mid_price"]
-            market_state["volume_current"] = processed["aggregated"]["total_volume"]
-            market_state["session"] = processed["aggregated"]["session"]
-            market_state["cme_connected"] = True
-            market_state["data_source"] = "CME_LIVE"
-        
-        # Detect icebergs
-        if processed["trades"]:
-            zones = iceberg_detector.detect_absorption_zones(processed["trades"])
-            for zone in zones:
-                absorption_memory.record(zone)
-        
-        # Cache prices for technical analysis
-        if processed["aggregated"]["mid_price"] > 0:
-            price_cache.add(
-                processed["aggregated"]["mid_price"],
-                processed["trades"][0]["timestamp"] if processed["trades"] else datetime.utcnow().isoformat()
-            )
+        # Single shared writer: all workers see this ingest
+        def apply_ingest():
+            # Update market state with real data
+            if processed["aggregated"]["mid_price"] > 0:
+                market_state["current_price"] = processed["aggregated"]["mid_price"]
+                market_state["volume_current"] = processed["aggregated"]["total_volume"]
+                market_state["session"] = processed["aggregated"]["session"]
+                market_state["cme_connected"] = True
+                market_state["data_source"] = "CME_LIVE"
+            
+            # Event-time bars for every timeframe
+            bar_service.ingest_trades(LIVE_BAR_SYMBOL, processed["trades"])
+            
+            # Detect icebergs
+            if processed["trades"]:
+                zones = iceberg_detector.detect_absorption_zones(processed["trades"])
+                for zone in zones:
+                    absorption_memory.record(zone)
+            
+            # Cache prices for technical analysis
+            if processed["aggregated"]["mid_price"] > 0:
+                price_cache.add(
+                    processed["aggregated"]["mid_price"],
+                    processed["trades"][0]["timestamp"] if processed["trades"] else datetime.utcnow().isoformat()
+                )
         
+        await _write_shared_state(apply_ingest)
+
         return {
             "status": "ingested",
             "trades_processed": len(processed["trades"]),
@@ -1351,8 +1777,7 @@ async def ingest_cme_quote(quote: dict):
         normalized = cme_adapter.normalize_quote(quote)
         
         if normalized:
-            market_state["bid"] = normalized["bid"]
-            market_state["ask"] = normalized["ask"]
+            await _write_shared_state(lambda: market_state.update(bid=normalized["bid"], ask=normalized["ask"]))
         
         return {
             "status": "quote_updated",
@@ -1379,6 +1804,18 @@ async def cme_status():
     }
 
 
+@router.get("/bars/stats")
+async def bar_service_stats():
+    """Event-time bar service counters and closed-bar depth per symbol/timeframe."""
+    return bar_service.stats()
+
+
+@router.get("/feeds/cache")
+async def market_data_cache_stats():
+    """Market data fetch cache counters (hits, stale hits, misses, load latency)."""
+    return await fetch_cache_stats()
+
+
 # ==================== ENHANCED MENTOR PANEL (WITH CME DATA) ====================
 
 @router.post("/mentor/v2")
@@ -332,6 +332,8 @@ class ChartRequest(BaseModel):
     bars: int = 100
     include_levels: bool = True
     include_icebergs: bool = True
+    columnar: bool = False  # Compact column arrays, skips per-bar validation
+    since: Optional[datetime] = None  # Cursor: only bars at/after this time
 
 
 class ChartResponse(BaseModel):
@@ -343,6 +345,9 @@ class ChartResponse(BaseModel):
     iceberg_zones: List[IcebergZoneVisual]
     vwap: Optional[List[float]] = None
     session_boxes: Optional[List[Dict[str, Any]]] = None
+    cursor: Optional[datetime] = None  # Timestamp of last bar (pass back as `since`)
+    is_delta: bool = False  # True when bars only cover the `since` window
+    removed_zones: Optional[List[IcebergZoneVisual]] = None  # Zones gone since If-None-Match version
     timestamp: datetime
 
 
@@ -366,6 +371,22 @@ class VolumeProfileRequest(BaseModel):
     bars: int = 100  # Number of bars to analyze
     tick_size: float = 0.10  # Price granularity (0.10 for gold futures)
     value_area_pct: float = 0.70  # Value area percentage (default 70%)
+    columnar: bool = False  # Compact column arrays, skips per-level validation
+    source: str = "candles"  # "candles" (OHLC range estimate) or "ticks" (recorded trades)
+    start: Optional[datetime] = None  # Tick window start (default: bars x interval ago)
+    end: Optional[datetime] = None  # Tick window end (default: now)
+
+
+class CompositeProfileRequest(BaseModel):
+    """Request a multi-session composite volume profile."""
+    symbol: str = "GCG6"
+    source: str = "ticks"  # "ticks" (recorded trades) or "candles" (stored OHLCV bars)
+    session: str = "globex"  # "globex", "asia", "london", "ny"
+    sessions: Optional[int] = 5  # Last N sessions with volume (ignored when period is set)
+    period: Optional[str] = None  # "week" or "month"
+    tick_size: float = 0.10
+    value_area_pct: float = 0.70
+    columnar: bool = False
 
 
 class VolumeProfileResponse(BaseModel):
@@ -384,6 +405,38 @@ class VolumeProfileResponse(BaseModel):
     timestamp: datetime
 
 
+# ==================== BATCH SCHEMAS ====================
+
+class BatchCall(BaseModel):
+    """Single engine call inside a batch."""
+    id: Optional[str] = None  # Client correlation id (defaults to index)
+    engine: str  # "gann", "astro", "cycle", "iceberg", "liquidity", "signal", "market"
+    params: Dict[str, Any] = {}  # Same body as the standalone endpoint
+
+
+class BatchRequest(BaseModel):
+    """Evaluate several engine calls in one pass."""
+    calls: List[BatchCall]
+
+
+class BatchCallResult(BaseModel):
+    """Result of one batched engine call."""
+    id: str
+    engine: str
+    ok: bool
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    elapsed_ms: float
+
+
+class BatchResponse(BaseModel):
+    """Combined batch result with per-call timing."""
+    results: List[BatchCallResult]
+    total_ms: float
+    shared_inputs_reused: int  # Memoized engine results served to later calls
+    timestamp: datetime
+
+
 # ==================== HEALTH / STATUS SCHEMAS ====================
 
 class HealthResponse(BaseModel):
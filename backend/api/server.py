@@ -16,8 +16,9 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 # Import routes
-from backend.api.routes import router
+from backend.api.routes import router, pattern_memory
 from backend.api.v2 import router as router_v2
+from backend.deployment.admission_control import AdmissionController, AdmissionRejected
 
 # ==================== FASTAPI APP INITIALIZATION ====================
 
@@ -51,6 +52,34 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# ==================== ADMISSION CONTROL ====================
+# Heavy routes share a priority-ordered slot pool; live views beat analytics
+
+admission = AdmissionController()
+
+
+@app.middleware("http")
+async def admission_control(request, call_next):
+    """Queue or shed requests to policed routes (503 + Retry-After)."""
+    policy = admission.policy_for(request.url.path)
+    if policy is None or request.method == "OPTIONS":
+        return await call_next(request)
+
+    try:
+        await admission.acquire(policy)
+    except AdmissionRejected as e:
+        return JSONResponse(
+            status_code=503,
+            content={"error": "Server busy", "reason": e.reason, "route": policy.path},
+            headers={"Retry-After": str(policy.retry_after)},
+        )
+
+    try:
+        return await call_next(request)
+    finally:
+        admission.release(policy)
+
+
 # ==================== ROUTE REGISTRATION ====================
 
 app.include_router(router)
@@ -93,11 +122,18 @@ async def api_info():
             "signal": "POST /api/v1/signal - Trading signal",
             "mentor": "POST /api/v1/mentor - AI Mentor panel",
             "chart": "POST /api/v1/chart - Chart data",
+            "batch": "POST /api/v1/batch - Several engine calls in one pass",
             "health": "GET /api/v1/health - System health"
         }
     }
 
 
+@app.get("/api/admission")
+async def admission_stats():
+    """Admission control queue depths and shed counters."""
+    return admission.stats()
+
+
 # ==================== ERROR HANDLERS ====================
 
 @app.exception_handler(Exception)
@@ -141,6 +177,9 @@ async def shutdown_event():
     print("\n" + "=" * 60)
     print("🛑 Quantum Market Observer Backend Shutting Down...")
     print("=" * 60)
+    saved = pattern_memory.flush()  # Labelled periods still buffered
+    if saved:
+        print(f"💾 Pattern memory: {saved} labelled periods saved")
 
 
 # ==================== MAIN ====================
@@ -0,0 +1,247 @@
+"""
+Shared Market State - Multi-worker safe store for live API state
+Backs market_state, price_cache, absorption_memory and iceberg_detector
+with versioned snapshots in a local SQLite (WAL) file so every uvicorn
+worker sees the same view.
+
+Writers serialize through SQLite's write lock (BEGIN IMMEDIATE), so only
+one ingest writer publishes at a time. Readers never take a lock: each
+worker polls the latest version number and only reloads the snapshot
+when it changed. Every call blocks on SQLite, so async callers run them
+with asyncio.to_thread (begin/commit may run on different threads).
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+DB_PATH = Path(
+    os.getenv(
+        "QMO_SHARED_STATE_DB",
+        str(Path(__file__).parent.parent.parent / "data" / "market_state.db"),
+    )
+)
+
+
+class SharedMarketState:
+    """Versioned snapshot store shared by all API worker processes."""
+
+    def __init__(self, db_path: Path = DB_PATH, keep_versions: int = 16):
+        self.db_path = Path(db_path)
+        self.keep_versions = keep_versions
+        self.read_lock = threading.Lock()  # Guards the read connection
+        self.write_lock = threading.Lock()  # Held from begin() to commit()/rollback()
+        self.state_lock = threading.Lock()  # Guards the cached (version, snapshot) pair
+        self._latest: Tuple[int, Optional[Dict]] = (0, None)
+        self._init_db()
+        self._read_conn = self._connect()
+        self._write_conn = self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            str(self.db_path),
+            timeout=10.0,
+            isolation_level=None,  # Explicit transactions only
+            check_same_thread=False,
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _init_db(self):
+        """Create snapshot table (one row per published version)."""
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connect()
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS snapshots (
+                version INTEGER PRIMARY KEY,
+                created_at TEXT NOT NULL,
+                payload TEXT NOT NULL
+            )
+        ''')
+        conn.close()
+
+    # ==================== READERS ====================
+
+    def latest_version(self) -> int:
+        """Most recently published version (0 when nothing published)."""
+        with self.read_lock:
+            row = self._read_conn.execute(
+                "SELECT MAX(version) FROM snapshots"
+            ).fetchone()
+        return row[0] or 0
+
+    def latest(self) -> Tuple[int, Optional[Dict]]:
+        """
+        Latest published (version, state) for this worker.
+
+        Returns the cached pair when no newer version exists, so the hot
+        path is a single indexed MAX() lookup.
+        """
+        version = self.latest_version()
+        if version and version != self._latest[0]:
+            with self.read_lock:
+                row = self._read_conn.execute(
+                    "SELECT payload FROM snapshots WHERE version = ?", (version,)
+                ).fetchone()
+            if row:
+                self._store(version, json.loads(row[0]))
+        return self._latest
+
+    def snapshot(self) -> Optional[Dict]:
+        """Latest published state for this worker."""
+        return self.latest()[1]
+
+    @property
+    def version(self) -> int:
+        """Version of the snapshot currently held by this worker."""
+        return self._latest[0]
+
+    def _store(self, version: int, state: Optional[Dict]):
+        # A slow reader must not replace a newer snapshot the writer just published
+        with self.state_lock:
+            if version > self._latest[0]:
+                self._latest = (version, state)
+
+    # ==================== WRITER ====================
+
+    def begin(self) -> Tuple[int, Optional[Dict]]:
+        """
+        Start the exclusive ingest writer section.
+
+        Takes the SQLite write lock (waiting up to the busy timeout for other
+        workers) and returns the latest (version, state) as seen under it.
+        Must be followed by commit() or rollback().
+        """
+        self.write_lock.acquire()
+        try:
+            self._write_conn.execute("BEGIN IMMEDIATE")
+        except Exception:
+            self.write_lock.release()
+            raise
+        try:
+            return self.current_version()
+        except Exception:
+            self.rollback()
+            raise
+
+    def commit(self, state: Dict) -> int:
+        """Publish `state` as a new version and end the writer section."""
+        try:
+            version = self.publish(state)
+            self._write_conn.execute("COMMIT")
+        except Exception:
+            self.rollback()
+            raise
+        self.write_lock.release()
+        return version
+
+    def rollback(self):
+        """End the writer section without publishing."""
+        try:
+            self._write_conn.execute("ROLLBACK")
+        finally:
+            with self.state_lock:
+                self._latest = (0, None)  # May hold an unpublished version; reload
+            self.write_lock.release()
+
+    @contextmanager
+    def writer(self):
+        """
+        Exclusive ingest writer section (synchronous form of begin/commit).
+
+        Holds the SQLite write lock for the duration of the block, so the
+        caller can refresh from `current()`, mutate, and `publish()`
+        without another worker interleaving. Readers are not blocked.
+        """
+        self.begin()
+        try:
+            yield self
+        except Exception:
+            self.rollback()
+            raise
+        try:
+            self._write_conn.execute("COMMIT")
+        except Exception:
+            self.rollback()
+            raise
+        self.write_lock.release()
+
+    def current_version(self) -> Tuple[int, Optional[Dict]]:
+        """Latest (version, state) as seen inside the writer section."""
+        row = self._write_conn.execute(
+            "SELECT version, payload FROM snapshots ORDER BY version DESC LIMIT 1"
+        ).fetchone()
+        if row and row[0] != self._latest[0]:
+            self._store(row[0], json.loads(row[1]))
+        return self._latest
+
+    def current(self) -> Optional[Dict]:
+        """Latest snapshot as seen inside `writer()` (no extra locking)."""
+        return self.current_version()[1]
+
+    def publish(self, state: Dict) -> int:
+        """Write a new snapshot version. Must be called inside the writer section."""
+        latest = self._write_conn.execute(
+            "SELECT MAX(version) FROM snapshots"
+        ).fetchone()[0] or 0
+        version = max(self.version, latest) + 1
+
+        self._write_conn.execute(
+            "INSERT INTO snapshots (version, created_at, payload) VALUES (?, ?, ?)",
+            (version, datetime.utcnow().isoformat(), json.dumps(state, default=str)),
+        )
+        # Old versions are only kept for readers mid-fetch
+        self._write_conn.execute(
+            "DELETE FROM snapshots WHERE version <= ?",
+            (version - self.keep_versions,),
+        )
+        self._store(version, state)
+        return version
+
+
+# ==================== ROUTE STATE (DE)SERIALIZATION ====================
+
+def export_route_state(market_state: Dict, price_cache, absorption_memory, iceberg_detector,
+                       bar_service=None, bar_symbol: Optional[str] = None) -> Dict:
+    """Collect the mutable route globals (and the live bar series) into one JSON-safe payload."""
+    return {
+        "market_state": dict(market_state),
+        "price_cache": {
+            "prices": list(price_cache.prices),
+            "timestamps": list(price_cache.timestamps),
+        },
+        "absorption_zones": list(absorption_memory.zones),
+        # JSON object keys must be strings; price keys are restored as floats
+        "detector_zones": [
+            [price, zone] for price, zone in iceberg_detector.absorption_zones.items()
+        ],
+        "detector_last_detection": iceberg_detector.last_detection_time,
+        "live_bars": bar_service.export_series(bar_symbol) if bar_service else None,
+    }
+
+
+def apply_route_state(state: Dict, market_state: Dict, price_cache, absorption_memory, iceberg_detector,
+                      bar_service=None, bar_symbol: Optional[str] = None):
+    """Load a snapshot payload back into the route globals (in place)."""
+    market_state.clear()
+    market_state.update(state.get("market_state", {}))
+
+    cache = state.get("price_cache", {})
+    price_cache.prices = list(cache.get("prices", []))
+    price_cache.timestamps = list(cache.get("timestamps", []))
+
+    absorption_memory.zones = list(state.get("absorption_zones", []))
+
+    iceberg_detector.absorption_zones = {
+        float(price): zone for price, zone in state.get("detector_zones", [])
+    }
+    iceberg_detector.last_detection_time = state.get("detector_last_detection")
+
+    if bar_service is not None and "live_bars" in state:
+        bar_service.load_series(bar_symbol, state["live_bars"])
@@ -4,6 +4,7 @@ Provides a health check and a simple user-context probe to be reused
 by downstream endpoints (mentor signal, dashboard, overlays).
 """
 
+import asyncio
 from datetime import datetime
 from enum import Enum
 from fastapi import APIRouter, Header, Depends
@@ -359,8 +360,9 @@ async def run_backtest(request: BacktestRequest, profile=Depends(get_user_profil
         instrument=request.instrument
     )
 
-    # Run backtest
-    results = backtest_engine.run_backtest(
+    # Run backtest off the event loop so live routes keep being served
+    results = await asyncio.to_thread(
+        backtest_engine.run_backtest,
         historical_data=historical_data,
         start_date=start_date,
         end_date=end_date
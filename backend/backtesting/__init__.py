@@ -3,5 +3,6 @@ Backtesting module - Historical simulation and edge analysis
 """
 
 from backend.backtesting.backtest_engine import BacktestEngine
+from backend.backtesting.predictor_evaluator import PredictorEvaluator
 
-__all__ = ["BacktestEngine"]
+__all__ = ["BacktestEngine", "PredictorEvaluator"]
@@ -1,9 +1,17 @@
 """
 Backtesting Engine - Replay historical data through the trading system
 Tests edge validity before live trading
+
+Candle times are parsed once into an int64 array; signals find their exit
+window by searchsorted and read forward-window high/low from vectorized
+sliding-window extrema, so evaluation is linear in the data length.
 """
 
-from datetime import datetime, timedelta
+import warnings
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
 from backend.intelligence.step3_imo_pipeline import Step3IMOPipeline
 from backend.core.gann_engine import GannEngine
 from backend.core.astro_engine import AstroEngine
@@ -11,6 +19,42 @@ from backend.core.cycle_engine import CycleEngine
 from backend.mentor.mentor_brain import MentorBrain
 from backend.mentor.confidence_engine import ConfidenceEngine
 
+CONTEXT_CANDLES = 50  # Previous candles handed to the pipeline
+EXIT_WINDOW = 20  # Candles after a signal used to score it
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _to_us(value):
+    """datetime / ISO string -> µs since epoch (aware times in UTC)."""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - _EPOCH) // timedelta(microseconds=1)
+
+
+def time_array(historical_data):
+    """Parse every candle time once into an int64 µs array."""
+    times = [c.get("time", "") for c in historical_data]
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            return np.array(times, dtype="datetime64[us]").astype(np.int64)
+    except (ValueError, TypeError, Warning):
+        return np.array([_to_us(t) for t in times], dtype=np.int64)
+
+
+def forward_extrema(values, window, fill):
+    """
+    max (fill=-inf) or min (fill=+inf) of values[i:i + window] for every i,
+    via a sliding window over the padded array.
+    """
+    if not len(values):
+        return np.empty(0)
+    padded = np.concatenate([np.asarray(values, dtype=float), np.full(window - 1, fill)])
+    windows = np.lib.stride_tricks.sliding_window_view(padded, window)
+    return windows.max(axis=1) if fill < 0 else windows.min(axis=1)
+
 
 class BacktestEngine:
     """
@@ -47,23 +91,28 @@ class BacktestEngine:
         print(f"{'='*70}\n")
         
         trade_signals = []
+        times = time_array(historical_data)
+        in_range = np.flatnonzero((times >= _to_us(start_date)) & (times <= _to_us(end_date)))
+        # Running count of tick records ("price" key) to skip empty trade scans
+        ticks_before = np.concatenate([[0], np.cumsum([("price" in c) for c in historical_data])])
         
-        for i, candle in enumerate(historical_data):
-            candle_time = datetime.fromisoformat(candle.get("time", ""))
-            
-            if not (start_date <= candle_time <= end_date):
-                continue
+        for i in in_range.tolist():
+            candle = historical_data[i]
             
             # Get previous 50 candles for context
-            context_candles = historical_data[max(0, i-50):i+1]
-            trades_in_window = [t for t in context_candles if "price" in t]
+            first = max(0, i - CONTEXT_CANDLES)
+            context_candles = historical_data[first:i+1]
+            if ticks_before[i + 1] > ticks_before[first]:
+                trades_in_window = [t for t in context_candles if "price" in t]
+            else:
+                trades_in_window = []
             
             # Run through pipeline
             decision = self.pipeline.process_tick(trades_in_window, context_candles)
             
             if decision["decision"] in ["BUY", "SELL"]:
                 signal = {
-                    "time": candle_time,
+                    "time": datetime.fromisoformat(candle.get("time", "")),
                     "direction": decision["decision"],
                     "price": candle.get("close"),
                     "confidence": decision["confidence"],
@@ -73,12 +122,15 @@ class BacktestEngine:
                 trade_signals.append(signal)
         
         # Evaluate signals
-        results = self._evaluate_signals(trade_signals, historical_data)
+        results = self._evaluate_signals(trade_signals, historical_data, times)
         return results
     
-    def _evaluate_signals(self, signals, historical_data):
+    def _evaluate_signals(self, signals, historical_data, times=None):
         """
         Score signals against actual price movement.
+        
+        Exit window = first 20 candles after the signal time, found by
+        binary search on the (pre-parsed) time array.
         """
         results = {
             "total_signals": len(signals),
@@ -91,6 +143,12 @@ class BacktestEngine:
         
         total_r = 0
         
+        if times is None:
+            times = time_array(historical_data)
+        time_sorted = len(times) < 2 or bool((np.diff(times) >= 0).all())
+        window_high = forward_extrema([c.get("high", 0) for c in historical_data], EXIT_WINDOW, -np.inf)
+        window_low = forward_extrema([c.get("low", 0) for c in historical_data], EXIT_WINDOW, np.inf)
+        
         for signal in signals:
             signal_time = signal["time"]
             signal_price = signal["price"]
@@ -98,14 +156,19 @@ class BacktestEngine:
             confidence = signal["confidence"]
             
             # Find exit (next 20 candles)
-            future_data = [c for c in historical_data 
-                          if datetime.fromisoformat(c.get("time", "")) > signal_time][:20]
-            
-            if not future_data:
-                continue
-            
-            exit_high = max([c.get("high", 0) for c in future_data])
-            exit_low = min([c.get("low", 0) for c in future_data])
+            if time_sorted:
+                start = int(np.searchsorted(times, _to_us(signal_time), side="right"))
+                if start >= len(times):
+                    continue
+                exit_high = float(window_high[start])
+                exit_low = float(window_low[start])
+            else:
+                # Unordered data: first 20 later candles in list order
+                future = np.flatnonzero(times > _to_us(signal_time))[:EXIT_WINDOW]
+                if not len(future):
+                    continue
+                exit_high = max(historical_data[j].get("high", 0) for j in future.tolist())
+                exit_low = min(historical_data[j].get("low", 0) for j in future.tolist())
             
             # Calculate outcome
             if direction == "SELL":
@@ -0,0 +1,197 @@
+"""
+Predictor Evaluator - Offline accuracy harness for the 5-minute candle predictor
+
+Replays recorded ticks from the order store through FiveMinuteCandlePredictor
+period by period in event time: an EventClock follows the tick timestamps,
+so the predictor selects periods and stamps predictions with recorded time.
+A prediction is taken when each period closes and scored against the
+direction of the next recorded 5-minute candle (which is also fed back
+through record_actual_outcome, like the live 5m close hook).
+
+CME sessions (22:00 UTC opens) are independent shards evaluated across a
+process pool; each worker reads its session as column arrays and returns a
+compact record matrix, so a month of history evaluates in minutes.
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from itertools import repeat
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from backend.intelligence.candle_predictor_5min import PERIOD_SECONDS, FiveMinuteCandlePredictor
+from backend.intelligence.order_recorder import DB_PATH, RawOrderRecorder
+from backend.tick_volume_profile import SESSION_SECONDS, _iso, session_start
+from backend.time.clock import EventClock
+
+DIRECTION_CODES = {"BULLISH": 1, "BEARISH": -1, "NEUTRAL": 0}
+OUTCOME_NAMES = {1: "UP", -1: "DOWN", 0: "SIDEWAYS"}
+
+# Record columns returned by the workers
+PERIOD, DIRECTION, CONFIDENCE, BALANCE_RATIO, OUTCOME = range(5)
+
+CONFIDENCE_BINS = (0.5, 0.6, 0.7, 0.8, 0.9, 1.0)
+# Same cut points as FiveMinuteCandlePredictor._calculate_base_confidence
+BALANCE_RATIO_BINS = (0, 10, 20, 30, 40, 101)
+
+
+def evaluate_session(db_path: str, day: int, contract_type: Optional[str] = None) -> np.ndarray:
+    """
+    Replay one CME session through a fresh predictor.
+
+    Returns an (n, 5) array: period index, predicted direction (+1/-1/0),
+    confidence, balance ratio, next-candle direction (+1/-1/0).
+    """
+    recorder = RawOrderRecorder(db_path=Path(db_path), max_memory=0, auto_cleanup_days=0)
+    columns = recorder.get_trade_columns(_iso(day), _iso(day + SESSION_SECONDS), contract_type)
+    ts = columns["ts"]
+    if len(ts) == 0:
+        return np.empty((0, 5))
+
+    periods = ts // (PERIOD_SECONDS * 1000)
+    bounds = np.flatnonzero(np.diff(periods)) + 1
+    stamps = np.datetime_as_string(ts.astype("datetime64[ms]")).tolist()
+    prices = columns["price"]
+    price_list = prices.tolist()
+    size_list = columns["size"].tolist()
+    side_list = np.where(columns["buy"], "BUY", "SELL").tolist()
+
+    clock = EventClock()
+    predictor = FiveMinuteCandlePredictor(clock=clock)
+    records = []
+    pending = None  # Prediction made at the close of the previous period
+    for i0, i1 in zip(np.r_[0, bounds].tolist(), np.r_[bounds, len(ts)].tolist()):
+        period = int(periods[i0])
+        orders = [
+            {"timestamp": stamps[j], "price": price_list[j], "size": size_list[j], "side": side_list[j]}
+            for j in range(i0, i1)
+        ]
+        clock.observe(stamps[i0])
+        predictor.add_orders(orders)
+        clock.observe(stamps[i1 - 1])
+
+        move = int(np.sign(prices[i1 - 1] - prices[i0]))
+        if pending is not None and pending[PERIOD] == period - 1:
+            # This candle closes the previous prediction (and labels its stored pattern)
+            predictor.record_actual_outcome(
+                OUTCOME_NAMES[move], bar_start=datetime.fromtimestamp(period * PERIOD_SECONDS, tz=timezone.utc)
+            )
+            records.append(pending + (move,))
+
+        prediction = predictor.predict_next_candle()
+        pending = (
+            period,
+            DIRECTION_CODES.get(prediction["prediction"], 0),
+            prediction["confidence_decimal"],
+            predictor._analyze_5min_orderflow().get("balance_ratio", 0),
+        )
+    return np.array(records, dtype=float).reshape(-1, 5)
+
+
+def _buckets(values: np.ndarray, hits: np.ndarray, confidence: np.ndarray, bins) -> List[Dict[str, Any]]:
+    index = np.digitize(values, bins[1:-1])
+    buckets = []
+    for i in range(len(bins) - 1):
+        mask = index == i
+        count = int(mask.sum())
+        buckets.append({
+            "range": f"{bins[i]:g}-{bins[i + 1]:g}",
+            "predictions": count,
+            "hits": int(hits[mask].sum()),
+            "hit_rate": round(float(hits[mask].mean()), 4) if count else None,
+            "mean_confidence": round(float(confidence[mask].mean()), 4) if count else None,
+        })
+    return buckets
+
+
+def summarize(records: np.ndarray) -> Dict[str, Any]:
+    """Hit rate, calibration and confidence/balance-ratio buckets for evaluation records."""
+    directional = records[records[:, DIRECTION] != 0]
+    hits = (directional[:, DIRECTION] == directional[:, OUTCOME]).astype(float)
+    confidence = directional[:, CONFIDENCE]
+
+    confidence_buckets = _buckets(confidence, hits, confidence, CONFIDENCE_BINS)
+    filled = [b for b in confidence_buckets if b["predictions"]]
+    calibration_error = sum(
+        b["predictions"] * abs(b["mean_confidence"] - b["hit_rate"]) for b in filled
+    ) / len(directional) if len(directional) else None
+
+    return {
+        "periods": len(records),
+        "directional_predictions": len(directional),
+        "neutral_predictions": int((records[:, DIRECTION] == 0).sum()),
+        "hits": int(hits.sum()),
+        "hit_rate": round(float(hits.mean()), 4) if len(hits) else None,
+        "outcomes": {name: int((records[:, OUTCOME] == code).sum()) for code, name in OUTCOME_NAMES.items()},
+        "brier_score": round(float(((confidence - hits) ** 2).mean()), 4) if len(hits) else None,
+        "calibration_error": round(calibration_error, 4) if calibration_error is not None else None,
+        "calibration": [(b["mean_confidence"], b["hit_rate"]) for b in filled],
+        "confidence_buckets": confidence_buckets,
+        "balance_ratio_buckets": _buckets(directional[:, BALANCE_RATIO], hits, confidence, BALANCE_RATIO_BINS),
+    }
+
+
+class PredictorEvaluator:
+    """Batch accuracy evaluation of FiveMinuteCandlePredictor over recorded ticks."""
+
+    def __init__(self, db_path: Path = DB_PATH, contract_type: Optional[str] = None,
+                 workers: Optional[int] = None):
+        self.db_path = Path(db_path)
+        self.contract_type = contract_type
+        self.workers = workers or os.cpu_count() or 1
+
+    def sessions(self, start, end) -> List[int]:
+        """CME session opens covering [start, end)."""
+        first = session_start(start.timestamp() if isinstance(start, datetime) else start)
+        last = end.timestamp() if isinstance(end, datetime) else end
+        return list(range(first, int(last), SESSION_SECONDS))
+
+    def evaluate(self, start, end) -> Dict[str, Any]:
+        """Evaluate every session in [start, end); returns summarize() plus run details."""
+        started = time.perf_counter()
+        days = self.sessions(start, end)
+        args = (repeat(str(self.db_path)), days, repeat(self.contract_type))
+        if self.workers > 1 and len(days) > 1:
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(days))) as pool:
+                parts = list(pool.map(evaluate_session, *args))
+        else:
+            parts = list(map(evaluate_session, *args))
+
+        records = np.concatenate(parts) if parts else np.empty((0, 5))
+        report = summarize(records)
+        report.update({
+            "sessions": len(days),
+            "sessions_with_data": sum(1 for p in parts if len(p)),
+            "workers": self.workers,
+            "elapsed_seconds": round(time.perf_counter() - started, 2),
+        })
+        return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Evaluate the 5-minute predictor on recorded ticks")
+    parser.add_argument("--days", type=int, default=30, help="Sessions to evaluate, ending now")
+    parser.add_argument("--contract", default=None, help="Contract type filter (e.g. GC)")
+    parser.add_argument("--workers", type=int, default=None)
+    cli = parser.parse_args()
+
+    now = datetime.now(timezone.utc)
+    report = PredictorEvaluator(contract_type=cli.contract, workers=cli.workers).evaluate(
+        now - timedelta(days=cli.days), now
+    )
+    print("\n" + "=" * 70)
+    print("5-MINUTE PREDICTOR — OFFLINE EVALUATION")
+    print("=" * 70)
+    print(f"Sessions: {report['sessions_with_data']}/{report['sessions']}  "
+          f"Periods: {report['periods']}  Time: {report['elapsed_seconds']}s ({report['workers']} workers)")
+    print(f"Hit rate: {report['hit_rate']}  Brier: {report['brier_score']}  "
+          f"Calibration error: {report['calibration_error']}")
+    for bucket in report["confidence_buckets"]:
+        print(f"  confidence {bucket['range']:>8}: {bucket['predictions']:6d} predictions, hit rate {bucket['hit_rate']}")
+    for bucket in report["balance_ratio_buckets"]:
+        print(f"  balance %  {bucket['range']:>8}: {bucket['predictions']:6d} predictions, hit rate {bucket['hit_rate']}")
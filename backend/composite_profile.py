@@ -0,0 +1,294 @@
+"""
+Composite Profile Cache - Multi-session volume profiles from cached sessions
+
+Finalized per-session profiles are stored once in SQLite as sparse tick
+arrays (level offsets + volumes). Composites such as "last 5 London
+sessions", "this week" or "this month" are built by merging the cached
+arrays with offset alignment; only a session that is still open is
+computed on the fly from its source.
+
+Sources provide histogram(start, end, tick_size) -> LevelHistogram and
+covered_until() -> epoch up to which they have data:
+- "ticks": TickVolumeProfile (recorded trades), or TickHistogramSource for
+  one contract
+- "candles": CandleHistogramSource (stored OHLCV bars, range-spread like
+  VolumeProfileEngine.build_profile)
+"""
+
+import sqlite3
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from backend.engines.bar_builder import tick_epoch
+from backend.rolling_volume_profile import WEEK_OFFSET_SECONDS
+from backend.tick_volume_profile import SESSION_SECONDS, LevelHistogram, profile_from_histogram, session_start
+from backend.volume_profile_engine import VolumeProfileEngine
+
+DB_PATH = Path(__file__).parent.parent / "data" / "profiles.db"
+
+# Session windows as (open, close) seconds after the CME trading-day open (22:00 UTC)
+SESSIONS = {
+    "globex": (0, SESSION_SECONDS),     # 22:00 - 22:00 UTC
+    "asia": (0, 9 * 3600),              # 22:00 - 07:00 UTC
+    "london": (9 * 3600, 18 * 3600),    # 07:00 - 16:00 UTC
+    "ny": (15 * 3600 + 1800, 22 * 3600),  # 13:30 - 20:00 UTC
+}
+
+
+class TickHistogramSource:
+    """One contract's recorded trades from a shared TickVolumeProfile."""
+
+    def __init__(self, ticks, contract: Optional[str]):
+        self.ticks = ticks
+        self.contract = contract
+
+    def covered_until(self) -> float:
+        return self.ticks.covered_until(self.contract)
+
+    def histogram(self, start, end=None, tick_size: float = 0.10) -> LevelHistogram:
+        return self.ticks.histogram(start, end, tick_size, self.contract)
+
+
+class CandleHistogramSource:
+    """Level histograms from a CandleStore series (candle volume spread over each range)."""
+
+    def __init__(self, store, symbol: str, interval: str = "5m"):
+        self.store = store
+        self.symbol = symbol
+        self.interval = interval
+
+    def covered_until(self) -> float:
+        return self.store.last_epoch(self.symbol, self.interval) or 0
+
+    def histogram(self, start, end=None, tick_size: float = 0.10) -> LevelHistogram:
+        lo, hi = tick_epoch(start), tick_epoch(end)
+        key = (self.symbol, self.interval)
+        with self.store.lock:
+            times = self.store.times.get(key, [])
+            i0, i1 = bisect_left(times, lo), bisect_left(times, hi)
+            candles = self.store.series.get(key, [])[i0:i1]
+        candles = [c for c in candles if c.get("volume") and c.get("high")]
+        if not candles:
+            return LevelHistogram.empty()
+
+        high, low, close, open_price, volume = np.array(
+            [(c["high"], c["low"], c["close"], c.get("open", c["close"]), c["volume"]) for c in candles],
+            dtype=float,
+        ).T
+        is_bullish = close >= open_price
+        levels, weights, buy_weights = VolumeProfileEngine(tick_size)._distribute(high, low, close, volume, is_bullish)
+        if not len(levels):
+            return LevelHistogram.empty()
+        base = int(levels.min())
+        offsets = levels - base
+        return LevelHistogram(
+            base,
+            np.bincount(offsets, weights=weights),
+            np.bincount(offsets, weights=buy_weights, minlength=int(offsets.max()) + 1),
+            float(np.dot((high + low + close) / 3, volume)),
+            len(candles),
+        )
+
+
+def _encode(hist: LevelHistogram) -> Tuple[int, bytes, bytes, bytes]:
+    """Sparse form: base level, nonzero offsets (int32), volume and buy (float64)."""
+    touched = np.flatnonzero(hist.volume)
+    return (
+        hist.base,
+        touched.astype(np.int32).tobytes(),
+        hist.volume[touched].tobytes(),
+        hist.buy[touched].tobytes(),
+    )
+
+
+def _decode(base: int, offsets: bytes, volume: bytes, buy: bytes, vwap_numerator: float, trades: int) -> LevelHistogram:
+    offsets = np.frombuffer(offsets, dtype=np.int32)
+    if len(offsets) == 0:
+        return LevelHistogram(base, np.zeros(0), np.zeros(0), vwap_numerator, trades)
+    span = int(offsets[-1]) + 1
+    dense_volume, dense_buy = np.zeros(span), np.zeros(span)
+    dense_volume[offsets] = np.frombuffer(volume, dtype=float)
+    dense_buy[offsets] = np.frombuffer(buy, dtype=float)
+    return LevelHistogram(base, dense_volume, dense_buy, vwap_numerator, trades)
+
+
+class CompositeProfileCache:
+    """Per-session profiles cached on disk, merged on read into composites."""
+
+    def __init__(self, sources: Optional[Dict[str, Any]] = None, db_path: Path = DB_PATH,
+                 settle_seconds: int = 300, max_sessions: int = 512):
+        self.sources = sources or {}
+        self.db_path = Path(db_path)
+        self.settle_seconds = settle_seconds  # Grace period before a closed session is frozen
+        self.max_sessions = max_sessions  # Finalized session histograms kept in memory (LRU)
+        self.memory: "OrderedDict[Tuple[str, str, int, float], LevelHistogram]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.counters = {"computed": 0, "disk_hits": 0, "memory_hits": 0, "live": 0, "evictions": 0}
+        self._init_db()
+
+    def _init_db(self):
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.db_path))
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS session_profiles (
+                source TEXT NOT NULL,
+                session TEXT NOT NULL,
+                day INTEGER NOT NULL,  -- Epoch of the trading-day open (22:00 UTC)
+                tick_size REAL NOT NULL,
+                base INTEGER NOT NULL,
+                offsets BLOB NOT NULL,
+                volume BLOB NOT NULL,
+                buy BLOB NOT NULL,
+                vwap_numerator REAL NOT NULL,
+                trades INTEGER NOT NULL,
+                PRIMARY KEY (source, session, tick_size, day)
+            )
+        ''')
+        conn.commit()
+        conn.close()
+
+    # ==================== SESSION PROFILES ====================
+
+    def _window(self, session: str, day: int) -> Tuple[int, int]:
+        open_offset, close_offset = SESSIONS[session]
+        return day + open_offset, day + close_offset
+
+    def _load(self, source: str, session: str, tick_size: float, days: List[int]):
+        """Pull any of `days` not yet in memory from disk in one query."""
+        missing = [d for d in days if (source, session, d, tick_size) not in self.memory]
+        if not missing:
+            return
+        conn = sqlite3.connect(str(self.db_path))
+        rows = conn.execute('''
+            SELECT day, base, offsets, volume, buy, vwap_numerator, trades
+            FROM session_profiles
+            WHERE source = ? AND session = ? AND tick_size = ? AND day >= ? AND day <= ?
+        ''', (source, session, tick_size, min(missing), max(missing))).fetchall()
+        conn.close()
+        for day, *fields in rows:
+            key = (source, session, day, tick_size)
+            if key not in self.memory:
+                self._remember(key, _decode(*fields))
+                self.counters["disk_hits"] += 1
+
+    def _remember(self, key: Tuple[str, str, int, float], hist: LevelHistogram):
+        self.memory[key] = hist
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_sessions:
+            self.memory.popitem(last=False)
+            self.counters["evictions"] += 1
+
+    def _store(self, source: str, session: str, day: int, tick_size: float, hist: LevelHistogram):
+        base, offsets, volume, buy = _encode(hist)
+        conn = sqlite3.connect(str(self.db_path))
+        conn.execute('''
+            INSERT OR REPLACE INTO session_profiles
+            (source, session, day, tick_size, base, offsets, volume, buy, vwap_numerator, trades)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (source, session, day, tick_size, base, offsets, volume, buy, hist.vwap_numerator, hist.trades))
+        conn.commit()
+        conn.close()
+
+    def session_histogram(self, source: str, session: str, day: int, tick_size: float = 0.10,
+                          until: Optional[float] = None) -> LevelHistogram:
+        """One session's histogram: cached when finalized, computed on the fly while open."""
+        tick_size = round(tick_size, 6)
+        start, end = self._window(session, day)
+        now = time.time()
+        feed = self.sources[source]
+        if end + self.settle_seconds > now or (until is not None and until < end):
+            self.counters["live"] += 1
+            return feed.histogram(start, min(end, until or end), tick_size)
+
+        key = (source, session, day, tick_size)
+        hist = self.memory.get(key)
+        if hist is not None:
+            self.memory.move_to_end(key)
+            self.counters["memory_hits"] += 1
+            return hist
+        self._load(source, session, tick_size, [day])
+        hist = self.memory.get(key)
+        if hist is not None:
+            return hist
+
+        hist = feed.histogram(start, end, tick_size)
+        self.counters["computed"] += 1
+        if feed.covered_until() >= end:
+            # Only freeze sessions the source has fully seen (an empty pre-backfill read is not final)
+            self._remember(key, hist)
+            self._store(source, session, day, tick_size, hist)
+        return hist
+
+    # ==================== COMPOSITES ====================
+
+    def composite(self, source: str = "ticks", session: str = "globex", count: Optional[int] = None,
+                  period: Optional[str] = None, end=None, tick_size: float = 0.10) -> Tuple[LevelHistogram, List[int]]:
+        """
+        Merge sessions into one histogram.
+
+        period="week"/"month": every session since the CME week/month opened.
+        count=N: the last N sessions with volume (skipping weekends/holidays).
+        Returns (histogram, trading days used).
+        """
+        if session not in SESSIONS:
+            raise ValueError(f"Unknown session: {session}")
+        end_epoch = tick_epoch(end)
+        today = session_start(end_epoch)
+        if period == "week":
+            first = int((today - WEEK_OFFSET_SECONDS) // (7 * 86400)) * 7 * 86400 + WEEK_OFFSET_SECONDS
+            candidates = list(range(today, first - 1, -SESSION_SECONDS))
+        elif period == "month":
+            closing = datetime.fromtimestamp(today + SESSION_SECONDS, tz=timezone.utc)
+            month_open = datetime(closing.year, closing.month, 1, tzinfo=timezone.utc).timestamp()
+            candidates = list(range(today, session_start(month_open) - 1, -SESSION_SECONDS))
+        elif period is None:
+            count = count or 5
+            candidates = list(range(today, today - (count * 3 + 7) * SESSION_SECONDS, -SESSION_SECONDS))
+        else:
+            raise ValueError(f"Unknown period: {period}")
+
+        parts, days = [], []
+        with self.lock:
+            self._load(source, session, round(tick_size, 6), candidates)
+            for day in candidates:
+                if self._window(session, day)[0] >= end_epoch:
+                    continue  # Session has not opened yet
+                hist = self.session_histogram(source, session, day, tick_size, until=end_epoch)
+                if period is None and hist.trades == 0:
+                    continue
+                parts.append(hist)
+                days.append(day)
+                if period is None and len(days) >= count:
+                    break
+        return LevelHistogram.merge(parts), sorted(days)
+
+    def build_profile(self, source: str = "ticks", session: str = "globex", count: Optional[int] = None,
+                      period: Optional[str] = None, end=None, tick_size: float = 0.10,
+                      value_area_pct: float = 0.70, columnar: bool = False) -> Dict[str, Any]:
+        """Composite POC/VAH/VAL/VWAP and histogram."""
+        hist, days = self.composite(source, session, count, period, end, tick_size)
+        profile = profile_from_histogram(hist, tick_size, value_area_pct, columnar)
+        profile["sessions"] = len(days)
+        return profile
+
+    def invalidate(self, source: Optional[str] = None):
+        """Drop cached session profiles (all, or one source), e.g. after a backfill."""
+        with self.lock:
+            self.memory = OrderedDict((k, v) for k, v in self.memory.items() if source is not None and k[0] != source)
+            conn = sqlite3.connect(str(self.db_path))
+            if source is None:
+                conn.execute("DELETE FROM session_profiles")
+            else:
+                conn.execute("DELETE FROM session_profiles WHERE source = ?", (source,))
+            conn.commit()
+            conn.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.counters, "sessions_in_memory": len(self.memory), "sources": list(self.sources)}
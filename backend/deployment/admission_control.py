@@ -0,0 +1,162 @@
+"""
+Admission Control & Load Shedding
+Keeps expensive API routes from starving each other on one event loop.
+
+- Per-route concurrency limits
+- Shared slot pool, handed out in priority order (LIVE before ANALYTICS)
+- Queue deadlines: waiters that cannot start in time are shed
+- Shed policy: 503 + Retry-After
+- Queue depths and shed counts exposed via stats()
+"""
+
+import asyncio
+import heapq
+import itertools
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Dict, List, Optional
+
+
+class RoutePriority(IntEnum):
+    """Lower value = served first."""
+    LIVE = 0       # Live trading views (chart, mentor)
+    ANALYTICS = 1  # Research workloads (profiles, backtests)
+
+
+@dataclass
+class RoutePolicy:
+    """Admission rules for one route."""
+    path: str
+    priority: RoutePriority
+    max_concurrent: int
+    queue_timeout: float  # Seconds a request may wait for a slot
+    max_queue: int
+    retry_after: int  # Seconds suggested to shed clients
+
+
+DEFAULT_POLICIES = [
+    RoutePolicy("/api/v1/chart", RoutePriority.LIVE, max_concurrent=6, queue_timeout=2.0, max_queue=32, retry_after=1),
+    RoutePolicy("/api/v1/mentor", RoutePriority.LIVE, max_concurrent=4, queue_timeout=3.0, max_queue=16, retry_after=2),
+    RoutePolicy("/api/v1/mentor/v2", RoutePriority.LIVE, max_concurrent=4, queue_timeout=3.0, max_queue=16, retry_after=2),
+    RoutePolicy("/api/v1/indicators/volume-profile", RoutePriority.ANALYTICS, max_concurrent=3, queue_timeout=5.0, max_queue=16, retry_after=5),
+    RoutePolicy("/api/v2/backtest/run", RoutePriority.ANALYTICS, max_concurrent=1, queue_timeout=10.0, max_queue=4, retry_after=30),
+]
+
+
+class AdmissionRejected(Exception):
+    """Request shed by admission control."""
+
+    def __init__(self, policy: RoutePolicy, reason: str):
+        super().__init__(f"{policy.path} shed: {reason}")
+        self.policy = policy
+        self.reason = reason
+
+
+class AdmissionController:
+    """
+    Priority-aware admission for heavy routes.
+
+    All policed routes share `total_slots`. When a slot frees up, queued
+    requests are admitted in (priority, arrival) order, skipping any whose
+    route is already at its own concurrency limit.
+    """
+
+    def __init__(self, policies: Optional[List[RoutePolicy]] = None, total_slots: int = 8):
+        self.policies = {p.path: p for p in (policies or DEFAULT_POLICIES)}
+        self.total_slots = total_slots
+        self.active_total = 0
+        self.active = {path: 0 for path in self.policies}
+        self.queued = {path: 0 for path in self.policies}
+        self.waiters = []  # heap of (priority, seq, future, path)
+        self._seq = itertools.count()
+        self.counters = {
+            path: {"admitted": 0, "shed_queue_full": 0, "shed_timeout": 0, "max_queue_depth": 0}
+            for path in self.policies
+        }
+
+    def policy_for(self, path: str) -> Optional[RoutePolicy]:
+        """Policy for an exact route path (unpoliced routes return None)."""
+        return self.policies.get(path.rstrip("/") or "/")
+
+    # ==================== ACQUIRE / RELEASE ====================
+
+    async def acquire(self, policy: RoutePolicy):
+        """Wait for a slot or raise AdmissionRejected."""
+        path = policy.path
+        if self.queued[path] >= policy.max_queue:
+            self.counters[path]["shed_queue_full"] += 1
+            raise AdmissionRejected(policy, "queue full")
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self.waiters, (int(policy.priority), next(self._seq), future, path))
+        self.queued[path] += 1
+        self.counters[path]["max_queue_depth"] = max(
+            self.counters[path]["max_queue_depth"], self.queued[path]
+        )
+        self._dispatch()
+
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout=policy.queue_timeout)
+        except asyncio.TimeoutError:
+            if future.done() and not future.cancelled():
+                # Admitted at the deadline: keep the slot
+                return
+            self._abandon(future, path)
+            self.counters[path]["shed_timeout"] += 1
+            raise AdmissionRejected(policy, "queue deadline exceeded")
+        except asyncio.CancelledError:
+            # Client went away while queued (or just after admission)
+            if future.done() and not future.cancelled():
+                self.release(policy)
+            else:
+                self._abandon(future, path)
+            raise
+
+    def _abandon(self, future: asyncio.Future, path: str):
+        """Drop a queued waiter; its heap entry is skipped lazily."""
+        future.cancel()
+        self.queued[path] -= 1
+
+    def release(self, policy: RoutePolicy):
+        """Return a slot and admit the next eligible waiters."""
+        self.active[policy.path] -= 1
+        self.active_total -= 1
+        self._dispatch()
+
+    def _dispatch(self):
+        """Admit queued requests in priority order while slots remain."""
+        skipped = []
+        while self.waiters and self.active_total < self.total_slots:
+            entry = heapq.heappop(self.waiters)
+            _, _, future, path = entry
+            if future.cancelled():
+                continue  # Already removed from queue counts by _abandon
+            if self.active[path] >= self.policies[path].max_concurrent:
+                skipped.append(entry)
+                continue
+            self.queued[path] -= 1
+            self.active[path] += 1
+            self.active_total += 1
+            self.counters[path]["admitted"] += 1
+            future.set_result(True)
+        for entry in skipped:
+            heapq.heappush(self.waiters, entry)
+
+    # ==================== STATS ====================
+
+    def stats(self) -> Dict:
+        """Queue depths, active counts and shed counters per route."""
+        return {
+            "total_slots": self.total_slots,
+            "active_total": self.active_total,
+            "routes": {
+                path: {
+                    "priority": policy.priority.name,
+                    "max_concurrent": policy.max_concurrent,
+                    "active": self.active[path],
+                    "queued": self.queued[path],
+                    **self.counters[path],
+                }
+                for path, policy in self.policies.items()
+            },
+        }
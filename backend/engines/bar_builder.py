@@ -1,20 +1,304 @@
-from collections import defaultdict
-import time
-
-bars = defaultdict(dict)
-
-def update_bar(symbol, price, size, timeframe="1m"):
-    now = int(time.time())
-    bucket = now - (now % 60)
-    bar = bars.setdefault((symbol, timeframe, bucket), {
-        "open": price,
-        "high": price,
-        "low": price,
-        "close": price,
-        "volume": 0
-    })
-    bar["high"] = max(bar["high"], price)
-    bar["low"] = min(bar["low"], price)
-    bar["close"] = price
-    bar["volume"] += size
-    return bar
+"""
+Bar Service - Event-time multi-timeframe bars from ticks
+One base series per symbol (1s or 1m), built from trade timestamps rather
+than wall-clock time. Higher timeframes are rolled up incrementally each
+time a base bar closes, so every timeframe is consistent with the base.
+
+- Ticks from /cme/ingest and the RawOrderRecorder
+- Aligned buckets (same rules as backend.feeds.resampler)
+- Bar-close subscriptions per (symbol, timeframe)
+- Bounded history of closed bars per timeframe
+- Compact export/load of one symbol's series (shared across API workers)
+"""
+
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+from backend.feeds.resampler import SESSION_ALIGNED, SESSION_OFFSET_SECONDS, TIMEFRAME_SECONDS
+from backend.time.clock import Clock, default_clock
+
+BarCallback = Callable[[str, str, Dict], None]
+
+DEFAULT_TIMEFRAMES = ("1m", "5m", "15m", "1h", "4h", "session")
+
+
+def tick_epoch(timestamp) -> float:
+    """Epoch seconds for an ISO string, datetime or number (naive = UTC); None = clock now."""
+    if timestamp is None:
+        return default_clock.time()
+    if isinstance(timestamp, (int, float)):
+        return float(timestamp)
+    if isinstance(timestamp, str):
+        timestamp = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.timestamp()
+
+
+def _new_bar(start: int, price: float, size: int) -> Dict:
+    return {"start": start, "open": price, "high": price, "low": price, "close": price, "volume": size}
+
+
+def _merge(bar: Dict, other: Dict):
+    bar["high"] = max(bar["high"], other["high"])
+    bar["low"] = min(bar["low"], other["low"])
+    bar["close"] = other["close"]
+    bar["volume"] += other["volume"]
+
+
+def _pack(bar: Optional[Dict]) -> Optional[List]:
+    if bar is None:
+        return None
+    return [bar["start"], bar["open"], bar["high"], bar["low"], bar["close"], bar["volume"]]
+
+
+def _unpack(row: Optional[List]) -> Optional[Dict]:
+    if row is None:
+        return None
+    start, open_, high, low, close, volume = row
+    return {"start": start, "open": open_, "high": high, "low": low, "close": close, "volume": volume}
+
+
+def as_candle(bar: Dict) -> Dict:
+    """Bar in the candle-dict shape used by the fetchers and /chart."""
+    return {
+        "timestamp": datetime.fromtimestamp(bar["start"], tz=timezone.utc).isoformat().replace("+00:00", "Z"),
+        "open": bar["open"],
+        "high": bar["high"],
+        "low": bar["low"],
+        "close": bar["close"],
+        "volume": bar["volume"],
+    }
+
+
+class _Timeframe:
+    __slots__ = ("name", "seconds", "offset", "forming", "closed")
+
+    def __init__(self, name: str, seconds: int, offset: int, history: int):
+        self.name = name
+        self.seconds = seconds
+        self.offset = offset
+        self.forming: Optional[Dict] = None
+        self.closed: Deque[Dict] = deque(maxlen=history)
+
+    def bucket(self, epoch: float) -> int:
+        return int((epoch - self.offset) // self.seconds) * self.seconds + self.offset
+
+
+class BarService:
+    """
+    Tick -> base bar -> rolled-up timeframes, keyed by symbol.
+
+    Base bars close when a tick from a later bucket arrives (or when
+    advance() moves event time past them). Ticks older than the forming
+    base bar are counted as late and dropped.
+    """
+
+    def __init__(self, base: str = "1m", timeframes: Iterable[str] = DEFAULT_TIMEFRAMES, history: int = 2000,
+                 clock: Optional[Clock] = None):
+        self.base = base
+        self.clock = clock or default_clock  # Time for trades/advance() calls without a timestamp
+        self.base_seconds = TIMEFRAME_SECONDS[base]
+        self.timeframes = [
+            tf for tf in timeframes
+            if tf != base and TIMEFRAME_SECONDS[tf] % self.base_seconds == 0
+        ]
+        self.history = history
+        self.symbols: Dict[str, Dict[str, _Timeframe]] = {}
+        self.subscribers: List[Tuple[Optional[str], Optional[str], BarCallback]] = []
+        self.lock = threading.RLock()
+        self.counters = {"ticks": 0, "late_ticks": 0, "bars_closed": 0, "callback_errors": 0}
+
+    def _series(self, symbol: str) -> Dict[str, _Timeframe]:
+        series = self.symbols.get(symbol)
+        if series is None:
+            series = {}
+            for name in [self.base] + self.timeframes:
+                offset = SESSION_OFFSET_SECONDS if name in SESSION_ALIGNED else 0
+                series[name] = _Timeframe(name, TIMEFRAME_SECONDS[name], offset, self.history)
+            self.symbols[symbol] = series
+        return series
+
+    # ==================== INGEST ====================
+
+    def ingest_trade(self, symbol: str, price: float, size: int, timestamp=None) -> Dict:
+        """Apply one trade; returns the forming base bar."""
+        epoch = self.clock.time() if timestamp is None else tick_epoch(timestamp)
+        price, size = float(price), int(size)
+        with self.lock:
+            series = self._series(symbol)
+            base = series[self.base]
+            start = base.bucket(epoch)
+            self.counters["ticks"] += 1
+
+            if base.forming is not None and start < base.forming["start"]:
+                self.counters["late_ticks"] += 1
+                return base.forming
+
+            if base.forming is not None and start > base.forming["start"]:
+                self._close_base(symbol, series)
+
+            if base.forming is None:
+                base.forming = _new_bar(start, price, size)
+            else:
+                _merge(base.forming, {"high": price, "low": price, "close": price, "volume": size})
+            return base.forming
+
+    def ingest_trades(self, symbol: str, trades: Iterable[Dict]) -> int:
+        """Apply trade dicts with price/size/timestamp (e.g. CME adapter output)."""
+        count = 0
+        for trade in sorted(trades, key=lambda t: tick_epoch(t.get("timestamp"))):
+            self.ingest_trade(symbol, trade["price"], trade.get("size", 0), trade.get("timestamp"))
+            count += 1
+        return count
+
+    def advance(self, symbol: str, timestamp=None):
+        """Move event time forward: closes the forming base bar once its bucket has ended."""
+        epoch = self.clock.time() if timestamp is None else tick_epoch(timestamp)
+        with self.lock:
+            series = self.symbols.get(symbol)
+            if not series:
+                return
+            base = series[self.base]
+            if base.forming is not None and epoch >= base.forming["start"] + base.seconds:
+                self._close_base(symbol, series)
+
+    def _close_base(self, symbol: str, series: Dict[str, _Timeframe]):
+        base = series[self.base]
+        bar = base.forming
+        base.forming = None
+        base.closed.append(bar)
+        closed = [(self.base, bar)]
+
+        # Incremental rollup: each higher timeframe only sees closed base bars
+        for name in self.timeframes:
+            tf = series[name]
+            start = tf.bucket(bar["start"])
+            if tf.forming is not None and start != tf.forming["start"]:
+                tf.closed.append(tf.forming)
+                closed.append((name, tf.forming))
+                tf.forming = None
+            if tf.forming is None:
+                tf.forming = dict(bar, start=start)
+            else:
+                _merge(tf.forming, bar)
+            if bar["start"] + base.seconds >= start + tf.seconds:
+                # Last base bar of the bucket: publish now, not on the next tick
+                tf.closed.append(tf.forming)
+                closed.append((name, tf.forming))
+                tf.forming = None
+
+        self.counters["bars_closed"] += len(closed)
+        for name, closed_bar in closed:
+            self._emit(symbol, name, closed_bar)
+
+    # ==================== SHARED STATE ====================
+
+    def export_series(self, symbol: str) -> Optional[Dict]:
+        """JSON-safe state of one symbol's series: packed closed + forming bars per timeframe."""
+        with self.lock:
+            series = self.symbols.get(symbol)
+            if not series:
+                return None
+            return {
+                name: {"closed": [_pack(b) for b in tf.closed], "forming": _pack(tf.forming)}
+                for name, tf in series.items()
+            }
+
+    def load_series(self, symbol: str, state: Optional[Dict]):
+        """Replace one symbol's series with an exported state (no bar-close events)."""
+        with self.lock:
+            self.symbols.pop(symbol, None)
+            if not state:
+                return
+            series = self._series(symbol)
+            for name, tf in series.items():
+                packed = state.get(name)
+                if packed:
+                    tf.closed.extend(_unpack(row) for row in packed["closed"])
+                    tf.forming = _unpack(packed["forming"])
+
+    # ==================== SUBSCRIPTIONS ====================
+
+    def subscribe(self, callback: BarCallback, timeframe: Optional[str] = None,
+                  symbol: Optional[str] = None) -> Callable[[], None]:
+        """Call `callback(symbol, timeframe, bar)` on bar close; returns an unsubscribe function."""
+        entry = (symbol, timeframe, callback)
+        self.subscribers.append(entry)
+        return lambda: self.subscribers.remove(entry) if entry in self.subscribers else None
+
+    def _emit(self, symbol: str, timeframe: str, bar: Dict):
+        candle = as_candle(bar)
+        for sub_symbol, sub_tf, callback in list(self.subscribers):
+            if sub_symbol not in (None, symbol) or sub_tf not in (None, timeframe):
+                continue
+            try:
+                callback(symbol, timeframe, candle)
+            except Exception as e:
+                self.counters["callback_errors"] += 1
+                print(f"⚠️ Bar subscriber error ({symbol} {timeframe}): {e}")
+
+    # ==================== QUERIES ====================
+
+    def bars(self, symbol: str, timeframe: str, limit: int = 100, include_forming: bool = True) -> List[Dict]:
+        """Closed bars (plus the live forming bar) as candle dicts, oldest first."""
+        with self.lock:
+            series = self.symbols.get(symbol)
+            if not series or timeframe not in series:
+                return []
+            tf = series[timeframe]
+            out = [as_candle(b) for b in list(tf.closed)[-limit:]]
+            if include_forming:
+                live = series[self.base].forming
+                if (timeframe != self.base and tf.forming is not None and live is not None
+                        and tf.bucket(live["start"]) != tf.forming["start"]):
+                    # Previous bucket is complete but closes with the next base bar
+                    out.append(as_candle(tf.forming))
+                forming = self.forming(symbol, timeframe)
+                if forming is not None:
+                    out.append(forming)
+            return out[-limit:]
+
+    def forming(self, symbol: str, timeframe: str) -> Optional[Dict]:
+        """Live bar for timeframe: rolled-up closed base bars plus the forming base bar."""
+        with self.lock:
+            series = self.symbols.get(symbol)
+            if not series or timeframe not in series:
+                return None
+            tf = series[timeframe]
+            live = series[self.base].forming
+            if timeframe == self.base:
+                return as_candle(live) if live else None
+            if live is not None and (tf.forming is None or tf.bucket(live["start"]) != tf.forming["start"]):
+                return as_candle(dict(live, start=tf.bucket(live["start"])))
+            if tf.forming is None:
+                return None
+            bar = dict(tf.forming)
+            if live is not None:
+                _merge(bar, live)
+            return as_candle(bar)
+
+    def has_history(self, symbol: str, timeframe: str, bars: int) -> bool:
+        series = self.symbols.get(symbol)
+        return bool(series and timeframe in series and len(series[timeframe].closed) >= bars)
+
+    def stats(self) -> Dict:
+        return {
+            **self.counters,
+            "base": self.base,
+            "symbols": {
+                symbol: {name: len(tf.closed) for name, tf in series.items()}
+                for symbol, series in self.symbols.items()
+            },
+        }
+
+
+bar_service = BarService()
+
+
+def update_bar(symbol, price, size, timeframe="1m", timestamp=None):
+    """Feed one trade into the shared bar service and return the live bar for timeframe."""
+    bar_service.ingest_trade(symbol, price, size, timestamp)
+    return bar_service.forming(symbol, timeframe)
@@ -0,0 +1,150 @@
+"""
+Candle Store - Persistent per-symbol/per-interval OHLCV history
+Storage: SQLite (same pattern as the raw order recorder), mirrored in memory.
+
+Loaded once at startup so warm restarts can serve charts before any
+upstream call. Fetchers then only download the tail since the last stored
+bar and merge it in (the last stored bar is overwritten, since it may have
+been captured while still forming).
+"""
+
+import sqlite3
+import threading
+import time
+from bisect import bisect_left
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+DB_PATH = Path(__file__).parent.parent.parent / "data" / "candles.db"
+
+
+def candle_epoch(candle: Dict) -> int:
+    """Epoch seconds for a candle's ISO timestamp."""
+    return int(datetime.fromisoformat(candle["timestamp"].replace("Z", "+00:00")).timestamp())
+
+
+class CandleStore:
+    """Append/merge-only candle history keyed by (symbol, interval)."""
+
+    def __init__(self, db_path: Path = DB_PATH, max_rows: int = 50000):
+        self.db_path = Path(db_path)
+        self.max_rows = max_rows  # Retention per (symbol, interval)
+        self.lock = threading.Lock()
+        self.series: Dict[Tuple[str, str], List[Dict]] = {}
+        self.times: Dict[Tuple[str, str], List[int]] = {}
+        self._init_db()
+
+    def _init_db(self):
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.db_path))
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS candles (
+                symbol TEXT NOT NULL,
+                interval TEXT NOT NULL,
+                ts INTEGER NOT NULL,
+                timestamp TEXT NOT NULL,
+                open REAL NOT NULL,
+                high REAL NOT NULL,
+                low REAL NOT NULL,
+                close REAL NOT NULL,
+                volume INTEGER NOT NULL,
+                PRIMARY KEY (symbol, interval, ts)
+            ) WITHOUT ROWID
+        ''')
+        conn.commit()
+        conn.close()
+
+    def load_all(self) -> int:
+        """Load every stored series into memory (call once at startup)."""
+        conn = sqlite3.connect(str(self.db_path))
+        rows = conn.execute('''
+            SELECT symbol, interval, ts, timestamp, open, high, low, close, volume
+            FROM candles
+            ORDER BY symbol, interval, ts
+        ''').fetchall()
+        conn.close()
+
+        with self.lock:
+            self.series.clear()
+            self.times.clear()
+            for symbol, interval, ts, timestamp, o, h, l, c, v in rows:
+                key = (symbol, interval)
+                self.series.setdefault(key, []).append({
+                    "timestamp": timestamp, "open": o, "high": h, "low": l, "close": c, "volume": v
+                })
+                self.times.setdefault(key, []).append(ts)
+        return len(rows)
+
+    def load(self, symbol: str, interval: str) -> List[Dict]:
+        """In-memory series for a key (empty list when nothing stored)."""
+        with self.lock:
+            return list(self.series.get((symbol, interval), []))
+
+    def seed(self, symbol: str, interval: str, max_age: float, now: Optional[float] = None) -> List[Dict]:
+        """
+        Stored series for serving before any upstream call, or [] when its
+        newest bar is more than max_age seconds old (too stale to show).
+        """
+        last = self.last_epoch(symbol, interval)
+        now = time.time() if now is None else now
+        if last is None or now - last > max_age:
+            return []
+        return self.load(symbol, interval)
+
+    def last_epoch(self, symbol: str, interval: str) -> Optional[int]:
+        times = self.times.get((symbol, interval))
+        return times[-1] if times else None
+
+    def merge(self, symbol: str, interval: str, candles: List[Dict]) -> List[Dict]:
+        """
+        Merge newly fetched candles into the series and persist them.
+
+        Candles with an existing timestamp replace the stored bar; newer ones
+        are appended. Returns the full merged series.
+        """
+        if not candles:
+            return self.load(symbol, interval)
+
+        key = (symbol, interval)
+        incoming = sorted(((candle_epoch(c), c) for c in candles), key=lambda x: x[0])
+
+        with self.lock:
+            series = self.series.get(key, [])
+            times = self.times.get(key, [])
+
+            # Everything before the first incoming bar is untouched
+            split = bisect_left(times, incoming[0][0])
+            tail = dict(zip(times[split:], series[split:]))
+            for ts, candle in incoming:
+                tail[ts] = candle
+            tail_times = sorted(tail)
+
+            times = times[:split] + tail_times
+            series = series[:split] + [tail[ts] for ts in tail_times]
+            if len(series) > self.max_rows:
+                series = series[-self.max_rows:]
+                times = times[-self.max_rows:]
+            self.series[key] = series
+            self.times[key] = times
+
+            self._persist(symbol, interval, incoming, times[0])
+            return list(series)
+
+    def _persist(self, symbol: str, interval: str, incoming: List[Tuple[int, Dict]], oldest_kept: int):
+        conn = sqlite3.connect(str(self.db_path))
+        conn.executemany('''
+            INSERT OR REPLACE INTO candles
+                (symbol, interval, ts, timestamp, open, high, low, close, volume)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', [
+            (symbol, interval, ts, c["timestamp"], float(c["open"]), float(c["high"]),
+             float(c["low"]), float(c["close"]), int(c.get("volume", 0)))
+            for ts, c in incoming
+        ])
+        conn.execute(
+            "DELETE FROM candles WHERE symbol = ? AND interval = ? AND ts < ?",
+            (symbol, interval, oldest_kept),
+        )
+        conn.commit()
+        conn.close()
@@ -3,13 +3,14 @@ CME COMEX API Data Fetcher - Real-time Gold Futures Data
 Provides live tick data, open interest, and full order book from CME Group
 """
 
-import asyncio
-import aiohttp
 import logging
+import os
 from datetime import datetime, timedelta
 from typing import Optional, List, Dict, Any
 from dataclasses import dataclass
 
+from backend.feeds.cme_http import CMEHTTPClient
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -38,19 +39,22 @@ class CMEAPIFetcher:
     - Microsecond precision
     """
     
-    def __init__(self, api_key: str, api_secret: str, endpoint: str = None):
+    def __init__(self, api_key: str, api_secret: str, endpoint: str = None,
+                 rate: float = 5.0, burst: int = 10):
         """
         Initialize CME API fetcher
         
         Args:
             api_key: CME API key
             api_secret: CME API secret
-            endpoint: CME API endpoint (default: production)
+            endpoint: CME API endpoint (default: CME_API_ENDPOINT env or production)
+            rate: Request budget shared by all endpoints (requests/second)
+            burst: Requests that may be spent at once
         """
         self.api_key = api_key
         self.api_secret = api_secret
-        self.endpoint = endpoint or "https://www.cmegroup.com/market-data/v3/"
-        self.session: Optional[aiohttp.ClientSession] = None
+        self.endpoint = endpoint or os.getenv("CME_API_ENDPOINT", "https://www.cmegroup.com/market-data/v3/")
+        self.http = CMEHTTPClient(self.endpoint, self._build_headers(), rate=rate, burst=burst)
         
         # CME Contract symbols
         self.contracts = {
@@ -59,19 +63,22 @@ class CMEAPIFetcher:
         }
         
     async def initialize(self):
-        """Initialize async session"""
-        if not self.session:
-            self.session = aiohttp.ClientSession()
+        """Initialize pooled HTTP client"""
+        if self.http.session is None:
+            await self.http.start()
             logger.info("✅ CME API session initialized")
     
     async def close(self):
-        """Close async session"""
-        if self.session:
-            await self.session.close()
+        """Close pooled HTTP client"""
+        if self.http.session is not None:
+            await self.http.close()
             logger.info("✅ CME API session closed")
     
     async def get_headers(self) -> Dict[str, str]:
-        """Generate authentication headers for CME API"""
+        """Authentication headers for CME API (set once on the pooled session)"""
+        return self._build_headers()
+    
+    def _build_headers(self) -> Dict[str, str]:
         return {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
@@ -98,47 +105,20 @@ class CMEAPIFetcher:
         Returns:
             List of CMECandle objects
         """
-        if not self.session:
-            await self.initialize()
+        params = {
+            "locale": "en_US",
+            "chartAggregationType": self._map_timeframe(timeframe),
+            "period": period,
+            "limit": count
+        }
         
-        try:
-            # Build CME API request
-            url = f"{self.endpoint}quotes/{symbol}"
-            
-            params = {
-                "locale": "en_US",
-                "chartAggregationType": self._map_timeframe(timeframe),
-                "period": period,
-                "limit": count
-            }
-            
-            headers = await self.get_headers()
-            
-            logger.info(f"📊 Fetching {count} candles ({timeframe}) for {symbol} from CME")
-            
-            async with self.session.get(url, params=params, headers=headers, timeout=15) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    candles = self._parse_cme_response(data)
-                    logger.info(f"✅ Parsed {len(candles)} candles from CME")
-                    return candles
-                elif response.status == 401:
-                    logger.error("❌ CME API Authentication failed (invalid credentials)")
-                    return []
-                elif response.status == 429:
-                    logger.warning("⚠️ CME API Rate limited - waiting 60s")
-                    await asyncio.sleep(60)
-                    return await self.fetch_ohlc_candles(symbol, timeframe, count, period)
-                else:
-                    logger.warning(f"⚠️ CME API returned {response.status}")
-                    return []
-                    
-        except asyncio.TimeoutError:
-            logger.error("❌ CME API request timeout (15s)")
-            return []
-        except Exception as e:
-            logger.error(f"❌ Error fetching from CME: {str(e)}")
+        logger.info(f"📊 Fetching {count} candles ({timeframe}) for {symbol} from CME")
+        data = await self.http.get_json(f"quotes/{symbol}", params)
+        if data is None:
             return []
+        candles = self._parse_cme_response(data)
+        logger.info(f"✅ Parsed {len(candles)} candles from CME")
+        return candles
     
     async def fetch_live_quote(self, symbol: str = "GC") -> Optional[Dict[str, Any]]:
         """
@@ -150,22 +130,10 @@ class CMEAPIFetcher:
         Returns:
             Quote dict with: bid, ask, last, volume, open_interest
         """
-        if not self.session:
-            await self.initialize()
-        
-        try:
-            url = f"{self.endpoint}quotes/{symbol}"
-            headers = await self.get_headers()
-            
-            async with self.session.get(url, headers=headers, timeout=10) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    return self._parse_quote(data)
-                return None
-                
-        except Exception as e:
-            logger.error(f"❌ Error fetching live quote: {str(e)}")
+        data = await self.http.get_json(f"quotes/{symbol}")
+        if data is None:
             return None
+        return self._parse_quote(data)
     
     async def fetch_order_book(self, symbol: str = "GC", depth: int = 20) -> Optional[Dict]:
         """
@@ -178,23 +146,10 @@ class CMEAPIFetcher:
         Returns:
             Order book with bids/asks
         """
-        if not self.session:
-            await self.initialize()
-        
-        try:
-            url = f"{self.endpoint}orderbook/{symbol}"
-            params = {"depth": depth}
-            headers = await self.get_headers()
-            
-            async with self.session.get(url, params=params, headers=headers, timeout=10) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    return self._parse_orderbook(data)
-                return None
-                
-        except Exception as e:
-            logger.error(f"❌ Error fetching order book: {str(e)}")
+        data = await self.http.get_json(f"orderbook/{symbol}", {"depth": depth})
+        if data is None:
             return None
+        return self._parse_orderbook(data)
     
     def _map_timeframe(self, timeframe: str) -> str:
         """Map standard timeframe to CME API format"""
@@ -264,6 +219,10 @@ class CMEAPIFetcher:
             "timestamp": datetime.now().isoformat()
         }
     
+    def http_stats(self) -> Dict[str, Any]:
+        """Rate budget, dedup and retry counters for the shared client"""
+        return self.http.stats()
+    
     def validate_credentials(self) -> bool:
         """Validate API credentials format"""
         if not self.api_key or not self.api_secret:
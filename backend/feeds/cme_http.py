@@ -0,0 +1,226 @@
+"""
+CME HTTP Client - Shared, rate-budgeted transport for CMEAPIFetcher
+One pooled keep-alive session for quotes, candles and order book.
+
+- Connection pooling + keep-alive (single aiohttp connector)
+- Token-bucket rate budget shared by every endpoint
+- Request deduplication: identical in-flight GETs share one response
+- 429 / 5xx / timeouts go to a background retry queue; callers return
+  immediately and the retried response is served to the next caller
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+RequestKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens/second, up to `burst` banked."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0  # Set on 429: nobody spends budget until then
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def pause(self, seconds: float):
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self.tokens = 0.0
+
+    async def acquire(self, max_wait: Optional[float] = None) -> bool:
+        """
+        Take one token, waiting at most `max_wait` seconds (None = forever).
+
+        Check-and-spend has no await, so it needs no lock; waiters sleep
+        independently and re-check, each against its own deadline.
+        """
+        deadline = None if max_wait is None else time.monotonic() + max_wait
+        while True:
+            now = time.monotonic()
+            self._refill(now)
+            wait = max(self.paused_until - now, 0.0)
+            if wait == 0.0 and self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            if wait == 0.0:
+                wait = (1 - self.tokens) / self.rate
+            if deadline is not None and now + wait > deadline:
+                return False
+            await asyncio.sleep(wait)
+
+
+class CMEHTTPClient:
+    """Pooled GET client with rate budget, dedup and a non-blocking retry queue."""
+
+    def __init__(self, endpoint: str, headers: Dict[str, str], rate: float = 5.0, burst: int = 10,
+                 max_connections: int = 8, timeout: float = 10.0, max_wait: float = 2.0,
+                 max_retries: int = 3, retry_ttl: float = 30.0):
+        self.endpoint = endpoint
+        self.headers = headers
+        self.budget = TokenBucket(rate, burst)
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.max_wait = max_wait  # Longest a caller waits for a token
+        self.max_retries = max_retries
+        self.retry_ttl = retry_ttl  # How long a retried response stays servable
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.inflight: Dict[RequestKey, asyncio.Future] = {}
+        self.retry_queue: "asyncio.Queue[Tuple[float, RequestKey, int]]" = None
+        self.retry_results: Dict[RequestKey, Tuple[float, Any]] = {}
+        self.retry_pending = set()
+        self.retry_worker: Optional[asyncio.Task] = None
+        self.counters = {
+            "requests": 0, "deduplicated": 0, "budget_rejected": 0, "rate_limited": 0,
+            "errors": 0, "retries_queued": 0, "retries_succeeded": 0, "served_from_retry": 0,
+        }
+
+    async def start(self):
+        if self.session is None:
+            connector = aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=30, ttl_dns_cache=300)
+            self.session = aiohttp.ClientSession(
+                connector=connector, headers=self.headers,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+            self.retry_queue = asyncio.Queue()
+            self.retry_worker = asyncio.ensure_future(self._retry_loop())
+
+    async def close(self):
+        if self.retry_worker is not None:
+            self.retry_worker.cancel()
+            self.retry_worker = None
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    @staticmethod
+    def request_key(path: str, params: Optional[Dict[str, Any]] = None) -> RequestKey:
+        return path, tuple(sorted((k, str(v)) for k, v in (params or {}).items()))
+
+    # ==================== GET ====================
+
+    async def get_json(self, path: str, params: Optional[Dict[str, Any]] = None) -> Optional[Any]:
+        """
+        GET endpoint+path and return parsed JSON, or None.
+
+        None means "no data right now" (auth failure, budget exhausted,
+        rate limited, upstream error); transient failures are retried in the
+        background and the result is handed to the next caller.
+        """
+        await self.start()
+        key = self.request_key(path, params)
+
+        cached = self.retry_results.pop(key, None)
+        if cached is not None and cached[0] > time.monotonic():
+            self.counters["served_from_retry"] += 1
+            return cached[1]
+
+        future = self.inflight.get(key)
+        if future is not None:
+            self.counters["deduplicated"] += 1
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self.inflight[key] = future
+        try:
+            result = await self._request(key, attempt=0, max_wait=self.max_wait)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_result(None)
+            if isinstance(e, Exception):
+                return None
+            raise
+        finally:
+            self.inflight.pop(key, None)
+
+    async def _request(self, key: RequestKey, attempt: int, max_wait: Optional[float]) -> Optional[Any]:
+        if not await self.budget.acquire(max_wait):
+            self.counters["budget_rejected"] += 1
+            self._queue_retry(key, attempt, delay=0.0)
+            return None
+
+        path, params = key
+        self.counters["requests"] += 1
+        try:
+            async with self.session.get(f"{self.endpoint}{path}", params=dict(params)) as response:
+                if response.status == 200:
+                    return await response.json()
+                if response.status == 429:
+                    retry_after = float(response.headers.get("Retry-After", 60))
+                    self.counters["rate_limited"] += 1
+                    logger.warning(f"⚠️ CME API rate limited - pausing budget {retry_after:.0f}s")
+                    self.budget.pause(retry_after)
+                    self._queue_retry(key, attempt, delay=retry_after)
+                    return None
+                if response.status >= 500:
+                    logger.warning(f"⚠️ CME API returned {response.status} for {path}")
+                    self.counters["errors"] += 1
+                    self._queue_retry(key, attempt, delay=2 ** attempt)
+                    return None
+                if response.status == 401:
+                    logger.error("❌ CME API Authentication failed (invalid credentials)")
+                else:
+                    logger.warning(f"⚠️ CME API returned {response.status} for {path}")
+                return None
+        except asyncio.TimeoutError:
+            logger.error(f"❌ CME API request timeout ({self.timeout:.0f}s) for {path}")
+            self.counters["errors"] += 1
+            self._queue_retry(key, attempt, delay=2 ** attempt)
+            return None
+        except aiohttp.ClientError as e:
+            logger.error(f"❌ CME API error for {path}: {str(e)}")
+            self.counters["errors"] += 1
+            self._queue_retry(key, attempt, delay=2 ** attempt)
+            return None
+
+    # ==================== RETRY QUEUE ====================
+
+    def _queue_retry(self, key: RequestKey, attempt: int, delay: float):
+        if attempt >= self.max_retries or key in self.retry_pending or self.retry_queue is None:
+            return
+        self.retry_pending.add(key)
+        self.counters["retries_queued"] += 1
+        self.retry_queue.put_nowait((time.monotonic() + delay, key, attempt + 1))
+
+    async def _retry_loop(self):
+        while True:
+            due, key, attempt = await self.retry_queue.get()
+            wait = due - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self.retry_pending.discard(key)
+            try:
+                result = await self._request(key, attempt, max_wait=None)
+            except Exception:
+                result = None
+            if result is not None:
+                self.counters["retries_succeeded"] += 1
+                self._store_retry_result(key, result)
+
+    def _store_retry_result(self, key: RequestKey, result: Any):
+        """Keep a retried response for the next caller, dropping ones nobody asked for in time."""
+        now = time.monotonic()
+        for expired in [k for k, (until, _) in self.retry_results.items() if until <= now]:
+            del self.retry_results[expired]
+        self.retry_results[key] = (now + self.retry_ttl, result)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.counters,
+            "inflight": len(self.inflight),
+            "retry_pending": len(self.retry_pending),
+            "tokens": round(self.budget.tokens, 2),
+            "paused_for": max(0.0, round(self.budget.paused_until - time.monotonic(), 1)),
+        }
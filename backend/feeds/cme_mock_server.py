@@ -0,0 +1,90 @@
+"""
+Mock CME Server - Local stand-in for the CME market-data API
+Serves the same JSON shapes CMEAPIFetcher parses, with knobs for latency,
+rate limiting and failures so the HTTP client can be exercised offline.
+
+Usage:
+    python -m backend.feeds.cme_mock_server --port 8765 --rate-limit-every 20
+    CME_API_ENDPOINT=http://127.0.0.1:8765/ python backend/server.py
+"""
+
+import argparse
+import asyncio
+import random
+from datetime import datetime, timedelta, timezone
+
+from aiohttp import web
+
+
+class MockCMEServer:
+    """aiohttp app emulating /quotes/{symbol} and /orderbook/{symbol}."""
+
+    def __init__(self, latency: float = 0.0, rate_limit_every: int = 0, retry_after: int = 1,
+                 error_rate: float = 0.0, base_price: float = 2450.0):
+        self.latency = latency
+        self.rate_limit_every = rate_limit_every  # Every Nth request gets 429 (0 = never)
+        self.retry_after = retry_after
+        self.error_rate = error_rate  # Fraction of requests answered with 503
+        self.base_price = base_price
+        self.requests = 0
+        self.paths = []
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/quotes/{symbol}", self.quotes)
+        app.router.add_get("/orderbook/{symbol}", self.orderbook)
+        return app
+
+    async def _gate(self, request: web.Request):
+        """Latency, rate limiting and injected failures shared by every route."""
+        self.requests += 1
+        self.paths.append(request.path_qs)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.rate_limit_every and self.requests % self.rate_limit_every == 0:
+            raise web.HTTPTooManyRequests(headers={"Retry-After": str(self.retry_after)})
+        if self.error_rate and random.random() < self.error_rate:
+            raise web.HTTPServiceUnavailable()
+
+    async def quotes(self, request: web.Request) -> web.Response:
+        await self._gate(request)
+        limit = int(request.query.get("limit", 100))
+        now = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+        charts = []
+        for i in range(limit):
+            open_p = self.base_price + i * 0.1
+            charts.append({
+                "date": (now - timedelta(minutes=5 * (limit - i))).isoformat(),
+                "open": open_p, "high": open_p + 0.5, "low": open_p - 0.4, "close": open_p + 0.2,
+                "volume": 1000 + i, "openInterest": 250000, "vwap": open_p + 0.05,
+            })
+        last = charts[-1]["close"] if charts else self.base_price
+        return web.json_response({
+            "charts": charts,
+            "quote": {"bid": last - 0.1, "ask": last + 0.1, "last": last, "volume": 50000, "openInterest": 250000},
+        })
+
+    async def orderbook(self, request: web.Request) -> web.Response:
+        await self._gate(request)
+        depth = int(request.query.get("depth", 20))
+        bids = [{"price": round(self.base_price - 0.1 * (i + 1), 1), "size": 10 + i} for i in range(depth)]
+        asks = [{"price": round(self.base_price + 0.1 * (i + 1), 1), "size": 10 + i} for i in range(depth)]
+        return web.json_response({"orderBook": {"bids": bids, "asks": asks}})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock CME market-data API")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--rate-limit-every", type=int, default=0)
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = MockCMEServer(args.latency, args.rate_limit_every, args.retry_after, args.error_rate)
+    print(f"🧪 Mock CME API on http://127.0.0.1:{args.port}/")
+    web.run_app(server.app(), host="127.0.0.1", port=args.port)
+
+
+if __name__ == "__main__":
+    main()
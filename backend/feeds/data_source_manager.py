@@ -3,8 +3,11 @@ Data Source Manager - Handles switching between CME (live) and Yahoo Finance (fa
 Provides seamless failover and unified data interface
 """
 
+import asyncio
 import logging
-from typing import Optional, List, Dict, Any
+import time
+from collections import deque
+from typing import Optional, List, Dict, Any, Callable, Awaitable
 from dataclasses import dataclass
 from datetime import datetime
 
@@ -24,17 +27,112 @@ class OHLCV:
     source: str = "unknown"  # "cme", "yahoo", "demo"
 
 
+class SourceHealth:
+    """
+    Latency and failure tracking for one upstream source.
+
+    - EWMA latency (orders sources) and a rolling window for p95 (hedge delay)
+    - Circuit breaker: opens after `failure_threshold` consecutive failures,
+      cool-down doubles on each re-open up to `max_cooldown`; after the
+      cool-down one probe request is let through (half-open)
+    """
+
+    def __init__(self, name: str, penalty_ms: float = 0.0, failure_threshold: int = 3,
+                 base_cooldown: float = 5.0, max_cooldown: float = 300.0, alpha: float = 0.2):
+        self.name = name
+        self.penalty_ms = penalty_ms  # Added to EWMA when ranking (e.g. delayed data)
+        self.failure_threshold = failure_threshold
+        self.base_cooldown = base_cooldown
+        self.max_cooldown = max_cooldown
+        self.alpha = alpha
+        self.ewma_ms: Optional[float] = None
+        self.samples = deque(maxlen=100)
+        self.consecutive_failures = 0
+        self.cooldown = base_cooldown
+        self.open_until = 0.0
+        self.probing = False
+        self.counters = {"requests": 0, "successes": 0, "failures": 0, "wins": 0, "breaker_opens": 0}
+
+    def allow(self) -> bool:
+        """True when the breaker is closed, or half-open with no probe in flight."""
+        if self.open_until == 0.0:
+            return True
+        if time.monotonic() < self.open_until or self.probing:
+            return False
+        self.probing = True
+        return True
+
+    def record_success(self, latency_ms: float):
+        self.counters["successes"] += 1
+        self.samples.append(latency_ms)
+        self.ewma_ms = latency_ms if self.ewma_ms is None else (
+            self.alpha * latency_ms + (1 - self.alpha) * self.ewma_ms
+        )
+        self.consecutive_failures = 0
+        self.cooldown = self.base_cooldown
+        self.open_until = 0.0
+        self.probing = False
+
+    def record_failure(self):
+        self.counters["failures"] += 1
+        self.consecutive_failures += 1
+        if self.probing or self.consecutive_failures >= self.failure_threshold:
+            if self.probing:
+                self.cooldown = min(self.cooldown * 2, self.max_cooldown)
+            self.open_until = time.monotonic() + self.cooldown
+            self.counters["breaker_opens"] += 1
+            self.probing = False
+            logger.warning(f"⚠️ {self.name} circuit open for {self.cooldown:.0f}s")
+
+    def release_probe(self):
+        """Probe admitted but never started, or cancelled without an outcome."""
+        self.probing = False
+
+    def record_cancelled(self, elapsed_ms: float):
+        """Lost a hedge race: elapsed time is a lower bound on latency, so only raise the EWMA."""
+        self.release_probe()
+        if self.ewma_ms is None or elapsed_ms > self.ewma_ms:
+            self.ewma_ms = elapsed_ms if self.ewma_ms is None else (
+                self.alpha * elapsed_ms + (1 - self.alpha) * self.ewma_ms
+            )
+
+    def p95_ms(self) -> Optional[float]:
+        if len(self.samples) < 5:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def rank(self) -> float:
+        """Lower is better: EWMA latency plus the staleness penalty."""
+        return (self.ewma_ms if self.ewma_ms is not None else 0.0) + self.penalty_ms
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.counters,
+            "ewma_ms": round(self.ewma_ms, 1) if self.ewma_ms is not None else None,
+            "p95_ms": self.p95_ms(),
+            "breaker": "open" if self.open_until and time.monotonic() < self.open_until else (
+                "half_open" if self.open_until else "closed"
+            ),
+            "cooldown_s": self.cooldown,
+        }
+
+
 class DataSourceManager:
     """
     Manages multiple data sources with fallback strategy
     
-    Priority order:
+    Sources (ranked by EWMA latency + staleness penalty, re-ranked live):
     1. CME COMEX API (real-time, live trading)
     2. Yahoo Finance (historical, 15-20 min delayed)
     3. Demo data (fallback, no connection)
+    
+    Requests are hedged: the next source fires once the primary has been
+    outstanding longer than its p95 latency, and the first good response wins.
     """
     
-    def __init__(self, cme_api_key: str = None, cme_api_secret: str = None):
+    def __init__(self, cme_api_key: str = None, cme_api_secret: str = None,
+                 default_hedge_delay: float = 1.0, request_timeout: float = 20.0):
         """
         Initialize data source manager
         
@@ -47,6 +145,12 @@ class DataSourceManager:
         self.cme_enabled = bool(cme_api_key and cme_api_secret)
         self.cme_fetcher = None
         self.last_source = "unknown"
+        self.default_hedge_delay = default_hedge_delay  # Until enough samples for a p95
+        self.request_timeout = request_timeout
+        self.health = {
+            "cme": SourceHealth("cme"),
+            "yahoo": SourceHealth("yahoo", penalty_ms=500.0),  # Delayed data: prefer CME when close
+        }
         
         logger.info(f"📊 DataSourceManager initialized - CME: {'ENABLED' if self.cme_enabled else 'DISABLED'}")
     
@@ -83,9 +187,7 @@ class DataSourceManager:
         period: str = "30d"
     ) -> List[OHLCV]:
         """
-        Fetch OHLCV candles with fallback strategy
-        
-        Tries CME first (if enabled), falls back to Yahoo Finance
+        Fetch OHLCV candles from the fastest healthy source (hedged)
         
         Args:
             symbol: Symbol (GC=F, GC, etc.)
@@ -96,79 +198,145 @@ class DataSourceManager:
         Returns:
             List of OHLCV candles from best available source
         """
+        loaders = {
+            "cme": lambda: self._fetch_cme_candles(symbol, timeframe, count, period),
+            "yahoo": lambda: self._fetch_yahoo_candles(timeframe, count),
+        }
+        if not (self.cme_enabled and self.cme_fetcher):
+            loaders.pop("cme")
         
-        # Try CME first if enabled
-        if self.cme_enabled and self.cme_fetcher:
-            try:
-                logger.info(f"📡 Attempting to fetch from CME ({symbol}, {timeframe})")
-                
-                # Normalize symbol for CME (remove =F suffix)
-                cme_symbol = symbol.replace("=F", "").replace("GC", "GC")
-                
-                cme_candles = await self.cme_fetcher.fetch_ohlc_candles(
-                    symbol=cme_symbol,
-                    timeframe=timeframe,
-                    count=count,
-                    period=period
-                )
-                
-                if cme_candles:
-                    logger.info(f"✅ Got {len(cme_candles)} candles from CME (LIVE)")
-                    self.last_source = "cme"
-                    
-                    # Convert CME format to OHLCV
-                    return [
-                        OHLCV(
-                            timestamp=c.timestamp,
-                            open=c.open,
-                            high=c.high,
-                            low=c.low,
-                            close=c.close,
-                            volume=c.volume,
-                            open_interest=c.open_interest,
-                            source="cme"
-                        )
-                        for c in cme_candles
-                    ]
-            
-            except Exception as e:
-                logger.warning(f"⚠️ CME fetch failed: {str(e)} - falling back to Yahoo Finance")
-        
-        # Fallback to Yahoo Finance
-        try:
-            logger.info(f"📡 Fallback: Fetching from Yahoo Finance ({symbol}, {timeframe})")
-            
-            from backend.feeds.market_data_fetcher import fetch_ohlc_candles as yahoo_fetch
-            
-            yahoo_candles = await yahoo_fetch(symbol, timeframe, count, period)
-            
-            if yahoo_candles:
-                logger.info(f"✅ Got {len(yahoo_candles)} candles from Yahoo Finance (DELAYED)")
-                self.last_source = "yahoo"
-                
-                # Convert Yahoo format to OHLCV
-                return [
-                    OHLCV(
-                        timestamp=datetime.fromisoformat(c.get("timestamp", datetime.now().isoformat())),
-                        open=float(c.get("open", 0)),
-                        high=float(c.get("high", 0)),
-                        low=float(c.get("low", 0)),
-                        close=float(c.get("close", 0)),
-                        volume=int(c.get("volume", 0)),
-                        open_interest=c.get("open_interest"),
-                        source="yahoo"
-                    )
-                    for c in yahoo_candles
-                ]
-        
-        except Exception as e:
-            logger.error(f"❌ Yahoo Finance also failed: {str(e)}")
+        result = await self._hedged(loaders)
+        if result is not None:
+            source, candles = result
+            self.last_source = source
+            return candles
         
         # Last resort: demo data
         logger.warning("⚠️ Using demo/cached data (no connection available)")
         self.last_source = "demo"
         return self._generate_demo_candles(count)
     
+    async def _fetch_cme_candles(self, symbol: str, timeframe: str, count: int, period: str) -> Optional[List[OHLCV]]:
+        # Normalize symbol for CME (remove =F suffix)
+        cme_symbol = symbol.replace("=F", "")
+        cme_candles = await self.cme_fetcher.fetch_ohlc_candles(
+            symbol=cme_symbol,
+            timeframe=timeframe,
+            count=count,
+            period=period
+        )
+        if not cme_candles:
+            return None
+        logger.info(f"✅ Got {len(cme_candles)} candles from CME (LIVE)")
+        return [
+            OHLCV(
+                timestamp=c.timestamp,
+                open=c.open,
+                high=c.high,
+                low=c.low,
+                close=c.close,
+                volume=c.volume,
+                open_interest=c.open_interest,
+                source="cme"
+            )
+            for c in cme_candles
+        ]
+    
+    async def _fetch_yahoo_candles(self, timeframe: str, count: int) -> Optional[List[OHLCV]]:
+        from backend.feeds.market_data_fetcher import fetch_ohlc_candles as yahoo_fetch
+        
+        yahoo_candles = await yahoo_fetch(limit=count, interval=timeframe)
+        if not yahoo_candles:
+            return None
+        logger.info(f"✅ Got {len(yahoo_candles)} candles from Yahoo Finance (DELAYED)")
+        return [
+            OHLCV(
+                timestamp=datetime.fromisoformat(c.get("timestamp", datetime.now().isoformat()).replace("Z", "+00:00")),
+                open=float(c.get("open", 0)),
+                high=float(c.get("high", 0)),
+                low=float(c.get("low", 0)),
+                close=float(c.get("close", 0)),
+                volume=int(c.get("volume", 0)),
+                open_interest=c.get("open_interest"),
+                source="yahoo"
+            )
+            for c in yahoo_candles
+        ]
+    
+    # ==================== HEDGING ====================
+    
+    def ranked_sources(self, names) -> List[str]:
+        """Healthy sources, fastest (EWMA + penalty) first; rejected ones skipped by their breaker."""
+        return sorted((n for n in names if self.health[n].allow()), key=lambda n: self.health[n].rank())
+    
+    def _hedge_delay(self, source: str) -> float:
+        p95 = self.health[source].p95_ms()
+        if p95 is None:
+            return self.default_hedge_delay
+        return min(max(p95 / 1000.0, 0.05), self.default_hedge_delay * 3)
+    
+    async def _timed(self, source: str, loader: Callable[[], Awaitable[Any]]):
+        health = self.health[source]
+        health.counters["requests"] += 1
+        started = time.perf_counter()
+        try:
+            result = await loader()
+        except asyncio.CancelledError:
+            health.record_cancelled((time.perf_counter() - started) * 1000)
+            raise
+        except Exception as e:
+            logger.warning(f"⚠️ {source} fetch failed: {str(e)}")
+            health.record_failure()
+            return None
+        if not result:
+            health.record_failure()
+            return None
+        health.record_success((time.perf_counter() - started) * 1000)
+        return result
+    
+    async def _hedged(self, loaders: Dict[str, Callable[[], Awaitable[Any]]]):
+        """
+        Run loaders in ranked order, starting the next one when the current
+        has not answered within its hedge delay (or as soon as it fails).
+        Returns (source, result) for the first good response, or None.
+        """
+        order = self.ranked_sources(loaders)
+        pending: Dict[asyncio.Task, str] = {}
+        deadline = time.monotonic() + self.request_timeout
+        try:
+            while order or pending:
+                if order:
+                    source = order.pop(0)
+                    logger.info(f"📡 Fetching from {source}")
+                    pending[asyncio.ensure_future(self._timed(source, loaders[source]))] = source
+                    wait = self._hedge_delay(source) if order else deadline - time.monotonic()
+                else:
+                    wait = deadline - time.monotonic()
+                if wait <= 0:
+                    break
+                
+                done, _ = await asyncio.wait(pending, timeout=wait, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    source = pending.pop(task)
+                    result = task.result()
+                    if result:
+                        self.health[source].counters["wins"] += 1
+                        return source, result
+        finally:
+            for task, source in pending.items():
+                task.cancel()
+            for source in order:
+                self.health[source].release_probe()  # Admitted by allow() but never started
+        return None
+    
+    def source_stats(self) -> Dict[str, Any]:
+        """Per-source latency, breaker state and win counts."""
+        return {
+            "last_source": self.last_source,
+            "ranking": sorted(self.health, key=lambda n: self.health[n].rank()),
+            "sources": {name: health.stats() for name, health in self.health.items()},
+        }
+    
     async def get_live_price(self, symbol: str = "GC=F") -> Optional[Dict[str, Any]]:
         """
         Get live quote with bid/ask
@@ -180,18 +348,14 @@ class DataSourceManager:
             Quote dict with bid/ask/last prices
         """
         
-        # Try CME first
-        if self.cme_enabled and self.cme_fetcher:
-            try:
-                cme_symbol = symbol.replace("=F", "")
-                quote = await self.cme_fetcher.fetch_live_quote(cme_symbol)
-                
-                if quote:
-                    quote["source"] = "cme"
-                    self.last_source = "cme"
-                    return quote
-            except Exception as e:
-                logger.warning(f"⚠️ CME live quote failed: {str(e)}")
+        # Try CME first (skipped while its circuit is open)
+        if self.cme_enabled and self.cme_fetcher and self.health["cme"].allow():
+            cme_symbol = symbol.replace("=F", "")
+            quote = await self._timed("cme", lambda: self.cme_fetcher.fetch_live_quote(cme_symbol))
+            if quote:
+                quote["source"] = "cme"
+                self.last_source = "cme"
+                return quote
         
         # Fallback - would fetch from Yahoo
         logger.info(f"📡 Getting live price from fallback source...")
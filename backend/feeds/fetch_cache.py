@@ -0,0 +1,160 @@
+"""
+Fetch Cache - Single-flight, stale-while-revalidate cache for upstream fetches
+Used by MarketDataFetcher so concurrent callers share one Yahoo request.
+
+- Single-flight: one in-flight load per key, other callers await it
+- Stale-while-revalidate: expired-but-recent values are served immediately
+  while one background refresh runs
+- Scheduled refresh: a key can be reloaded at a wall-clock moment
+  (e.g. just before the current bar closes)
+- Bounded LRU across all symbols/intervals
+- Hit / miss / latency counters
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+Loader = Callable[[], Awaitable[Any]]
+
+
+class _Entry:
+    __slots__ = ("value", "fresh_until", "stale_until", "ttl", "stale_ttl", "timer")
+
+    def __init__(self, value, ttl: float, stale_ttl: float):
+        now = time.monotonic()
+        self.value = value
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.fresh_until = now + ttl
+        self.stale_until = now + ttl + stale_ttl
+        self.timer = None
+
+
+class FetchCache:
+    """Bounded async cache with single-flight loads and background refresh."""
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self.inflight: Dict[str, asyncio.Task] = {}
+        self.stats_counters = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "refreshes": 0,
+            "errors": 0,
+            "evictions": 0,
+            "loads": 0,
+            "load_ms_total": 0.0,
+            "load_ms_max": 0.0,
+        }
+
+    async def get(self, key: str, loader: Loader, ttl: float, stale_ttl: float = 0.0) -> Optional[Any]:
+        """
+        Return the cached value for key, loading it at most once concurrently.
+
+        A failed load (exception or None) is never cached; callers fall back
+        to the stale value when one exists.
+        """
+        entry = self.entries.get(key)
+        now = time.monotonic()
+
+        if entry is not None and now < entry.fresh_until:
+            self.entries.move_to_end(key)
+            self.stats_counters["hits"] += 1
+            return entry.value
+
+        if entry is not None and now < entry.stale_until:
+            self.entries.move_to_end(key)
+            self.stats_counters["stale_hits"] += 1
+            self._start_load(key, loader, ttl, stale_ttl, background=True)
+            return entry.value
+
+        if key in self.inflight:
+            self.stats_counters["coalesced"] += 1
+        else:
+            self.stats_counters["misses"] += 1
+        value = await asyncio.shield(self._start_load(key, loader, ttl, stale_ttl))
+        if value is None and entry is not None:
+            return entry.value
+        return value
+
+    def seed(self, key: str, value: Any, stale_ttl: float):
+        """Insert an already-stale value (e.g. from disk) so the first get() serves it and refreshes."""
+        if key in self.entries or value is None:
+            return
+        entry = _Entry(value, 0.0, stale_ttl)
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+
+    def schedule_refresh(self, key: str, loader: Loader, delay: float, ttl: float, stale_ttl: float = 0.0):
+        """Reload key in the background after `delay` seconds (replaces any pending timer)."""
+        entry = self.entries.get(key)
+        if entry is None or delay <= 0:
+            return
+        if entry.timer is not None:
+            entry.timer.cancel()
+        loop = asyncio.get_running_loop()
+        entry.timer = loop.call_later(
+            delay, lambda: self._start_load(key, loader, ttl, stale_ttl, background=True)
+        )
+
+    def invalidate(self, key: str):
+        entry = self.entries.pop(key, None)
+        if entry is not None and entry.timer is not None:
+            entry.timer.cancel()
+
+    # ==================== INTERNALS ====================
+
+    def _start_load(self, key: str, loader: Loader, ttl: float, stale_ttl: float,
+                    background: bool = False) -> asyncio.Task:
+        task = self.inflight.get(key)
+        if task is None:
+            if background:
+                self.stats_counters["refreshes"] += 1
+            task = asyncio.ensure_future(self._load(key, loader, ttl, stale_ttl))
+            self.inflight[key] = task
+        return task
+
+    async def _load(self, key: str, loader: Loader, ttl: float, stale_ttl: float):
+        started = time.perf_counter()
+        try:
+            value = await loader()
+        except Exception:
+            value = None
+        finally:
+            self.inflight.pop(key, None)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.stats_counters["loads"] += 1
+            self.stats_counters["load_ms_total"] += elapsed_ms
+            self.stats_counters["load_ms_max"] = max(self.stats_counters["load_ms_max"], elapsed_ms)
+
+        if value is None:
+            self.stats_counters["errors"] += 1
+            return None
+
+        previous = self.entries.get(key)
+        entry = _Entry(value, ttl, stale_ttl)
+        if previous is not None:
+            entry.timer = previous.timer
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            _, evicted = self.entries.popitem(last=False)
+            if evicted.timer is not None:
+                evicted.timer.cancel()
+            self.stats_counters["evictions"] += 1
+        return value
+
+    def stats(self) -> Dict:
+        """Counters plus derived hit ratio and mean load latency."""
+        c = dict(self.stats_counters)
+        lookups = c["hits"] + c["stale_hits"] + c["misses"] + c["coalesced"]
+        c["hit_ratio"] = round((c["hits"] + c["stale_hits"]) / lookups, 3) if lookups else 0.0
+        c["load_ms_avg"] = round(c["load_ms_total"] / c["loads"], 2) if c["loads"] else 0.0
+        c["entries"] = len(self.entries)
+        c["inflight"] = len(self.inflight)
+        return c
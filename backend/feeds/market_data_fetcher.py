@@ -6,7 +6,8 @@ No API key required, no rate limits!
 
 import yfinance as yf
 import asyncio
-from datetime import datetime, timedelta
+import time
+from datetime import datetime, timedelta, timezone
 from typing import Optional, List, Dict
 import random
 import sys
@@ -15,6 +16,25 @@ from pathlib import Path
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
+from backend.feeds.fetch_cache import FetchCache
+from backend.feeds.candle_store import CandleStore
+from backend.feeds.resampler import (
+    SESSION_OFFSET_SECONDS, candles_to_columns, columns_to_candles, history_to_columns, resample
+)
+
+INTERVAL_SECONDS = {
+    "1m": 60,
+    "5m": 300,
+    "15m": 900,
+    "30m": 1800,
+    "1h": 3600,
+    "60m": 3600,
+    "4h": 14400,
+    "1d": 86400,
+}
+
+SEED_MAX_BARS = 48  # Stored history older than this many bars is not served from disk
+
 
 class MarketDataFetcher:
     """Fetcher for live market data from Yahoo Finance"""
@@ -22,25 +42,23 @@ class MarketDataFetcher:
     def __init__(self):
         self.symbol = "GC=F"  # Gold Futures (COMEX) - Real live data!
         self.interval = "5m"  # 5-minute candles
-        self.cache = {}
-        self.last_fetch = {}
-        print(f"📊 Yahoo Finance initialized for {self.symbol} (Gold Futures)")
+        # Shared single-flight / stale-while-revalidate cache (all symbols & intervals)
+        self.cache = FetchCache(max_entries=32)
+        # Persistent candle history: loaded once, then only tails are fetched
+        self.store = CandleStore()
+        stored = self.store.load_all()
+        print(f"📊 Yahoo Finance initialized for {self.symbol} (Gold Futures) - {stored} candles on disk")
         
     async def fetch_current_price(self) -> Optional[Dict]:
         """Fetch current price for symbol from Yahoo Finance"""
-        try:
-            # Check price cache - avoid redundant API calls within 15 seconds
-            price_cache_key = f"{self.symbol}:price"
-            price_ttl = 15
-            now = datetime.utcnow()
-
-            if price_cache_key in self.cache and price_cache_key in self.last_fetch:
-                age = (now - self.last_fetch[price_cache_key]).total_seconds()
-                if age < price_ttl:
-                    cached = self.cache[price_cache_key]
-                    print(f"✅ Price cache hit (age: {age:.0f}s) - ${cached['current_price']}")
-                    return cached
+        # Fresh for 15s, served stale for another 45s while one refresh runs
+        return await self.cache.get(
+            f"{self.symbol}:price", self._load_current_price, ttl=15, stale_ttl=45
+        )
 
+    async def _load_current_price(self) -> Optional[Dict]:
+        """Upstream price fetch (one at a time per symbol via the cache)."""
+        try:
             # Run in thread pool since yfinance is sync
             ticker = await asyncio.to_thread(yf.Ticker, self.symbol)
             info = await asyncio.to_thread(lambda: ticker.info)
@@ -48,7 +66,7 @@ class MarketDataFetcher:
             if info and 'regularMarketPrice' in info:
                 price = info['regularMarketPrice']
                 print(f"📊 Yahoo Finance price: ${price}")
-                result = {
+                return {
                     "symbol": self.symbol,
                     "current_price": float(price),
                     "bid": float(info.get('bid', price)),
@@ -56,13 +74,6 @@ class MarketDataFetcher:
                     "timestamp": datetime.utcnow().isoformat(),
                     "source": "Yahoo Finance"
                 }
-
-                # Cache the price
-                self.cache[price_cache_key] = result
-                self.last_fetch[price_cache_key] = now
-                print(f"💾 Cached current price: ${price}")
-
-                return result
             else:
                 print(f"⚠️ No price data in Yahoo Finance response")
         except Exception as e:
@@ -72,72 +83,109 @@ class MarketDataFetcher:
     
     async def fetch_ohlc_candles(self, limit: int = 100, interval: str = "5m") -> Optional[List[Dict]]:
         """Fetch OHLC candlesticks from Yahoo Finance for the requested interval."""
+        cache_key = f"{self.symbol}:{interval}"
+        cache_ttl = 30 if interval in ["1m", "5m"] else 60
+        loader = lambda: self._load_ohlc_candles(interval)
+
+        # Warm restart: serve stored history immediately, tail-fetch in background
+        if cache_key not in self.cache.entries:
+            self.cache.seed(cache_key, self._stored_candles(interval), stale_ttl=cache_ttl * 4)
+
+        candles = await self.cache.get(cache_key, loader, ttl=cache_ttl, stale_ttl=cache_ttl * 4)
+        if not candles:
+            return None
+
+        # Pre-warm the cache so the closing bar is ready when clients poll
+        self.cache.schedule_refresh(
+            cache_key, loader, self._seconds_to_bar_close(interval),
+            ttl=cache_ttl, stale_ttl=cache_ttl * 4
+        )
+
+        # The cache holds the full window; slice per caller
+        return candles[-limit:] if len(candles) > limit else candles
+
+    def _stored_candles(self, interval: str) -> Optional[List[Dict]]:
+        """Recent candles for interval from the local store only (None when empty or too old)."""
+        yf_interval, _ = self._map_interval(interval)
+        candles = self.store.seed(self.symbol, yf_interval, self._seed_max_age(yf_interval))
+        if candles and interval.lower() == "4h" and yf_interval != "4h":
+            candles = self._resample_multi_hour(candles, 4)
+        return candles or None
+
+    async def _load_ohlc_candles(self, interval: str) -> Optional[List[Dict]]:
+        """Refresh the base series for interval from upstream and derive the interval."""
+        yf_interval, period = self._map_interval(interval)
+        candles = await self._refresh_base_series(yf_interval, period)
+        if not candles:
+            return None
+        
+        # Downsample if user requested a higher timeframe than Yahoo supports (e.g., 4h)
+        if interval.lower() == "4h" and yf_interval != "4h":
+            candles = self._resample_multi_hour(candles, 4)
+        return candles
+
+    async def _refresh_base_series(self, yf_interval: str, period: str) -> Optional[List[Dict]]:
+        """
+        Fetch only the bars since the last stored one and merge them in.
+
+        Falls back to a full `period` download when nothing is stored or the
+        stored history is older than Yahoo's window for this interval.
+        """
+        stored = self.store.load(self.symbol, yf_interval)
+        last_epoch = self.store.last_epoch(self.symbol, yf_interval)
+        window_seconds = int(period.rstrip("d")) * 86400
+        tail_start = None
+        if stored and last_epoch and time.time() - last_epoch < window_seconds:
+            # Re-fetch the last stored bar too: it may have been incomplete
+            tail_start = datetime.fromtimestamp(last_epoch, tz=timezone.utc)
+
         try:
-            # Check cache first - avoid redundant API calls within 30-60 seconds
-            cache_key = f"{self.symbol}:{interval}"
-            cache_ttl = 30 if interval in ["1m", "5m"] else 60
-            now = datetime.utcnow()
-
-            if cache_key in self.cache and cache_key in self.last_fetch:
-                age = (now - self.last_fetch[cache_key]).total_seconds()
-                if age < cache_ttl:
-                    cached = self.cache[cache_key]
-                    print(f"✅ Cache hit for {interval} (age: {age:.0f}s) - returning {len(cached)} candles")
-                    return cached
-
-            yf_interval, period = self._map_interval(interval)
-            print(f"📊 Fetching {limit} candles ({interval} -> {yf_interval}, period={period}) for {self.symbol} from Yahoo Finance")
-            
-            # Fetch historical data - yfinance uses sync calls
             ticker = await asyncio.to_thread(yf.Ticker, self.symbol)
-            hist = await asyncio.to_thread(
-                lambda: ticker.history(period=period, interval=yf_interval)
-            )
-            
-            if hist is not None and not hist.empty:
-                print(f"📊 Yahoo Finance returned {len(hist)} candles")
-                candles = []
-                
-                # Convert DataFrame to our format
-                for timestamp, row in hist.iterrows():
-                    try:
-                        candles.append({
-                            "timestamp": timestamp.isoformat(),
-                            "open": float(row['Open']),
-                            "high": float(row['High']),
-                            "low": float(row['Low']),
-                            "close": float(row['Close']),
-                            "volume": int(row.get('Volume', 0))
-                        })
-                    except (KeyError, ValueError) as e:
-                        print(f"⚠️ Candle parsing error: {e}")
-                        continue
-                
-                # Downsample if user requested a higher timeframe than Yahoo supports (e.g., 4h)
-                if interval.lower() == "4h" and yf_interval != "4h":
-                    candles = self._resample_multi_hour(candles, 4)
-                elif interval.lower() == "1h" and yf_interval in ("60m", "1h"):
-                    # Ensure label consistency
-                    interval = "1h"
-                
-                # Return most recent candles up to limit
-                candles = candles[-limit:] if len(candles) > limit else candles
-                print(f"✅ Parsed {len(candles)} candles successfully")
-
-                # Update cache
-                self.cache[cache_key] = candles
-                self.last_fetch[cache_key] = now
-                print(f"💾 Cached {len(candles)} candles for {interval}")
-
-                return candles if candles else None
+            if tail_start is not None:
+                print(f"📊 Fetching {yf_interval} tail since {tail_start.isoformat()} for {self.symbol} from Yahoo Finance")
+                hist = await asyncio.to_thread(
+                    lambda: ticker.history(start=tail_start, interval=yf_interval)
+                )
             else:
+                print(f"📊 Fetching {yf_interval} candles (period={period}) for {self.symbol} from Yahoo Finance")
+                hist = await asyncio.to_thread(
+                    lambda: ticker.history(period=period, interval=yf_interval)
+                )
+            
+            if hist is None or hist.empty:
                 print(f"⚠️ No historical data returned from Yahoo Finance")
+                return self.store.seed(self.symbol, yf_interval, self._seed_max_age(yf_interval)) or None
+            
+            print(f"📊 Yahoo Finance returned {len(hist)} candles")
+            candles = self._history_to_candles(hist)
+            merged = self.store.merge(self.symbol, yf_interval, candles)
+            print(f"✅ Merged {len(candles)} candles ({len(merged)} stored for {yf_interval})")
+            return merged or None
         except Exception as e:
             print(f"❌ Error fetching OHLC from Yahoo Finance: {e}")
             import traceback
             traceback.print_exc()
             
-        return None
+        return self.store.seed(self.symbol, yf_interval, self._seed_max_age(yf_interval)) or None
+
+    def _seed_max_age(self, yf_interval: str) -> int:
+        """Oldest last-bar age (seconds) at which stored history may still be served."""
+        return INTERVAL_SECONDS.get(yf_interval, 300) * SEED_MAX_BARS
+
+    def _history_to_candles(self, hist) -> List[Dict]:
+        """Convert a yfinance history DataFrame to candle dicts (column-wise, no iterrows)."""
+        return columns_to_candles(history_to_columns(hist))
+
+    def _seconds_to_bar_close(self, interval: str, lead: float = 2.0) -> float:
+        """Seconds until just before the current bar of `interval` closes (UTC-aligned)."""
+        seconds = INTERVAL_SECONDS.get((interval or "5m").lower(), 300)
+        now = time.time()
+        delay = seconds - (now % seconds) - lead
+        return delay if delay > 0 else delay + seconds
+
+    def cache_stats(self) -> Dict:
+        """Hit/miss/latency counters for the fetch cache."""
+        return self.cache.stats()
 
     def _map_interval(self, interval: str) -> (str, str):
         """Map UI interval to Yahoo Finance interval and period window."""
@@ -157,49 +205,18 @@ class MarketDataFetcher:
         return yf_interval, period
 
     def _resample_multi_hour(self, candles: List[Dict], hours: int) -> List[Dict]:
-        """Resample 1h candles into multi-hour aggregates (e.g., 4h)."""
+        """Resample 1h candles into session-aligned multi-hour aggregates (e.g., 4h)."""
         if not candles:
             return candles
-        bucket = []
-        resampled = []
-        current_bucket = None
-        for c in candles:
-            dt = datetime.fromisoformat(c["timestamp"])
-            bucket_start = dt.replace(minute=0, second=0, microsecond=0)
-            bucket_start -= timedelta(hours=dt.hour % hours)
-            if current_bucket is None:
-                current_bucket = bucket_start
-            if bucket_start != current_bucket:
-                agg = self._aggregate_bucket(bucket)
-                if agg:
-                    resampled.append(agg)
-                bucket = []
-                current_bucket = bucket_start
-            bucket.append({**c, "_dt": dt})
-        if bucket:
-            agg = self._aggregate_bucket(bucket)
-            if agg:
-                resampled.append(agg)
-        return resampled
-
-    def _aggregate_bucket(self, bucket: List[Dict]) -> Optional[Dict]:
-        if not bucket:
+        cols = resample(candles_to_columns(candles), hours * 3600, offset=SESSION_OFFSET_SECONDS)
+        return columns_to_candles(cols)
+
+    async def fetch_ohlc_columns(self, limit: int = 100, interval: str = "5m") -> Optional[Dict]:
+        """Same window as fetch_ohlc_candles, as column arrays for vectorized engines."""
+        candles = await self.fetch_ohlc_candles(limit, interval)
+        if not candles:
             return None
-        bucket_sorted = sorted(bucket, key=lambda x: x["_dt"])
-        open_p = bucket_sorted[0]["open"]
-        close_p = bucket_sorted[-1]["close"]
-        high_p = max(c["high"] for c in bucket_sorted)
-        low_p = min(c["low"] for c in bucket_sorted)
-        vol = sum(c.get("volume", 0) for c in bucket_sorted)
-        ts = bucket_sorted[-1]["_dt"].isoformat()
-        return {
-            "timestamp": ts,
-            "open": open_p,
-            "high": high_p,
-            "low": low_p,
-            "close": close_p,
-            "volume": vol
-        }
+        return candles_to_columns(candles)
     
     async def fetch_live_market_data(self) -> Dict:
         """Fetch complete live market data from Yahoo Finance"""
@@ -318,6 +335,12 @@ async def fetch_ohlc_candles(limit: int = 100, interval: str = "5m") -> List[Dic
     return data or []
 
 
+async def fetch_cache_stats() -> Dict:
+    """Cache hit/miss/latency counters for the shared fetcher."""
+    fetcher = await get_fetcher()
+    return fetcher.cache_stats()
+
+
 if __name__ == "__main__":
     # Test the fetcher
     async def test():
@@ -0,0 +1,130 @@
+"""
+Candle Resampler - Vectorized OHLCV conversion and timeframe aggregation
+Works on column arrays (ts, open, high, low, close, volume) instead of
+per-candle dicts, so yfinance frames convert and resample in a few NumPy
+passes.
+
+Buckets are aligned to fixed UTC boundaries: epoch multiples of the
+timeframe, shifted by an optional offset (4h and session bars start at
+the CME trading-day open).
+Every derived bar is labelled with its bucket start.
+"""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from backend.feeds.candle_store import candle_epoch
+
+TIMEFRAME_SECONDS = {
+    "1m": 60,
+    "5m": 300,
+    "15m": 900,
+    "30m": 1800,
+    "1h": 3600,
+    "4h": 14400,
+    "1d": 86400,
+    "session": 86400,
+}
+
+# CME Globex trading day rolls at 22:00 UTC
+SESSION_OFFSET_SECONDS = 22 * 3600
+
+# Frames whose buckets start at the session open rather than UTC midnight
+SESSION_ALIGNED = {"4h", "session"}
+
+COLUMNS = ("ts", "open", "high", "low", "close", "volume")
+
+
+def empty_columns() -> Dict[str, np.ndarray]:
+    return {
+        "ts": np.empty(0, dtype=np.int64),
+        "open": np.empty(0), "high": np.empty(0), "low": np.empty(0), "close": np.empty(0),
+        "volume": np.empty(0, dtype=np.int64),
+    }
+
+
+def history_to_columns(hist) -> Dict[str, np.ndarray]:
+    """Convert a yfinance history DataFrame to column arrays (rows with NaNs dropped)."""
+    if hist is None or len(hist) == 0:
+        return empty_columns()
+
+    index = hist.index
+    if index.tz is not None:
+        index = index.tz_convert("UTC").tz_localize(None)
+    ts = index.to_numpy().astype("datetime64[s]").astype(np.int64)  # UTC epoch seconds
+    o = hist["Open"].to_numpy(dtype=float)
+    h = hist["High"].to_numpy(dtype=float)
+    l = hist["Low"].to_numpy(dtype=float)
+    c = hist["Close"].to_numpy(dtype=float)
+    v = hist["Volume"].to_numpy(dtype=float) if "Volume" in hist else np.zeros(len(ts))
+
+    valid = ~(np.isnan(o) | np.isnan(h) | np.isnan(l) | np.isnan(c) | np.isnan(v))
+    return {
+        "ts": ts[valid], "open": o[valid], "high": h[valid], "low": l[valid], "close": c[valid],
+        "volume": v[valid].astype(np.int64),
+    }
+
+
+def candles_to_columns(candles: List[Dict]) -> Dict[str, np.ndarray]:
+    """Convert candle dicts (ISO timestamps) to column arrays."""
+    if not candles:
+        return empty_columns()
+    n = len(candles)
+    return {
+        "ts": np.fromiter((candle_epoch(c) for c in candles), dtype=np.int64, count=n),
+        "open": np.fromiter((c["open"] for c in candles), dtype=float, count=n),
+        "high": np.fromiter((c["high"] for c in candles), dtype=float, count=n),
+        "low": np.fromiter((c["low"] for c in candles), dtype=float, count=n),
+        "close": np.fromiter((c["close"] for c in candles), dtype=float, count=n),
+        "volume": np.fromiter((c.get("volume", 0) for c in candles), dtype=np.int64, count=n),
+    }
+
+
+def columns_to_candles(cols: Dict[str, np.ndarray]) -> List[Dict]:
+    """Column arrays back to candle dicts with UTC ISO timestamps."""
+    if len(cols["ts"]) == 0:
+        return []
+    stamps = np.datetime_as_string(cols["ts"].astype("datetime64[s]"), timezone="UTC")
+    return [
+        {"timestamp": t, "open": o, "high": h, "low": l, "close": c, "volume": v}
+        for t, o, h, l, c, v in zip(
+            stamps.tolist(), cols["open"].tolist(), cols["high"].tolist(),
+            cols["low"].tolist(), cols["close"].tolist(), cols["volume"].tolist(),
+        )
+    ]
+
+
+def resample(cols: Dict[str, np.ndarray], seconds: int, offset: int = 0) -> Dict[str, np.ndarray]:
+    """
+    Aggregate a time-sorted base series into `seconds`-wide buckets.
+
+    Buckets start at epoch multiples of `seconds` shifted by `offset`.
+    open/close come from the first/last bar, high/low/volume are reduced.
+    """
+    ts = cols["ts"]
+    if len(ts) == 0:
+        return empty_columns()
+
+    bucket = (ts - offset) // seconds
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    ends = np.r_[starts[1:], len(ts)] - 1
+
+    return {
+        "ts": bucket[starts] * seconds + offset,
+        "open": cols["open"][starts],
+        "high": np.maximum.reduceat(cols["high"], starts),
+        "low": np.minimum.reduceat(cols["low"], starts),
+        "close": cols["close"][ends],
+        "volume": np.add.reduceat(cols["volume"], starts),
+    }
+
+
+def resample_timeframe(cols: Dict[str, np.ndarray], timeframe: str,
+                       offset: Optional[int] = None) -> Dict[str, np.ndarray]:
+    """Resample to a named timeframe ("5m", "1h", "4h", "1d", "session", ...)."""
+    timeframe = timeframe.lower()
+    seconds = TIMEFRAME_SECONDS[timeframe]
+    if offset is None:
+        offset = SESSION_OFFSET_SECONDS if timeframe in SESSION_ALIGNED else 0
+    return resample(cols, seconds, offset)
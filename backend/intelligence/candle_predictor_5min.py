@@ -10,11 +10,92 @@ Analyzes order flow WITHIN a 5-minute candle period:
 """
 
 from typing import Dict, List, Any, Optional
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from collections import deque
 import math
 import json
 
+from backend.intelligence.pattern_memory import pattern_features
+from backend.time.clock import Clock, default_clock
+
+
+PERIOD_SECONDS = 300
+
+# Momentum compares the two halves of the most recent orders in the period
+MOMENTUM_WINDOW = 300
+
+
+class PeriodFlow:
+    """
+    Running order-flow accumulators for one 5-minute period.
+    
+    Every order updates side volumes/counts, per-minute buckets,
+    arrival-order prefix sums and time-weighted sums in O(1), so
+    the analysis reads the same figures the per-order loops produced
+    without revisiting the period's orders.
+    """
+
+    __slots__ = ("count", "side_count", "side_volume", "side_index_volume", "cum_volume",
+                 "minute_volume")
+
+    def __init__(self):
+        self.count = 0
+        self.side_count = {'BUY': 0, 'SELL': 0}
+        self.side_volume = {'BUY': 0, 'SELL': 0}
+        self.side_index_volume = {'BUY': 0, 'SELL': 0}  # sum(i * size) over each side's i-th order
+        self.cum_volume = [0]  # Prefix sums of size in arrival order
+        self.minute_volume = {}  # minute -> {'buy': v, 'sell': v}
+
+    def add(self, side: str, size, second: int) -> None:
+        if side in self.side_count:
+            self.side_index_volume[side] += self.side_count[side] * size
+            self.side_count[side] += 1
+            self.side_volume[side] += size
+        self.count += 1
+        self.cum_volume.append(self.cum_volume[-1] + size)
+        
+        minute = self.minute_volume.setdefault(second // 60, {'buy': 0, 'sell': 0})
+        minute['buy' if side == 'BUY' else 'sell'] += size
+
+    def acceleration(self) -> float:
+        """Late vs early half of the period's orders: positive = accelerating."""
+        if self.count < 4:
+            return 0.0
+        mid = self.count // 2
+        early_vol = self.cum_volume[mid]
+        late_vol = self.cum_volume[-1] - early_vol
+        if early_vol == 0:
+            return 0.0
+        return (late_vol - early_vol) / early_vol
+
+    def time_weighted(self, side: str) -> float:
+        """sum(size * (0.5 + i / n)) over the side's orders: weight grows from 0.5 to 1.5."""
+        n = self.side_count[side]
+        if not n:
+            return 0.0
+        return 0.5 * self.side_volume[side] + self.side_index_volume[side] / n
+
+    def momentum(self) -> str:
+        """Recent vs earlier half of the last MOMENTUM_WINDOW orders."""
+        window = min(self.count, MOMENTUM_WINDOW)
+        if window < 5:
+            return "BUILDING"
+        start = self.count - window
+        split = start + window // 2
+        earlier_volume = self.cum_volume[split] - self.cum_volume[start]
+        recent_volume = self.cum_volume[-1] - self.cum_volume[split]
+        
+        if recent_volume > earlier_volume * 1.2:
+            return "ACCELERATING"
+        elif recent_volume < earlier_volume * 0.8:
+            return "DECELERATING"
+        else:
+            return "STEADY"
+
+    def distribution(self) -> Dict[int, Dict[str, Any]]:
+        """Buy/sell volume per minute of the period (0-4)."""
+        return {minute: dict(volumes) for minute, volumes in sorted(self.minute_volume.items())}
+
 
 class FiveMinuteCandlePredictor:
     """
@@ -22,24 +103,33 @@ class FiveMinuteCandlePredictor:
     Uses real order flow volume analysis combined with AI insights and memory patterns.
     """
 
-    def __init__(self, mentor_brain=None, max_history=100):
+    def __init__(self, mentor_brain=None, max_history=100, pattern_memory=None, clock: Optional[Clock] = None):
         """
         Initialize 5-minute predictor.
         
         Args:
             mentor_brain: MentorBrain instance for AI analysis
             max_history: Number of past 5-min patterns to remember
+            pattern_memory: PatternMemory store (persistent k-NN over all past periods)
+            clock: Time source (wall clock by default; EventClock for replays)
         """
         self.mentor_brain = mentor_brain
         self.max_history = max_history
+        self.pattern_memory = pattern_memory
+        self.clock = clock or default_clock
         
-        # Current 5-minute period tracking
+        # Current 5-minute period tracking (running accumulators, no order list)
         self.current_period_start = None
-        self.period_orders = []  # Orders in current 5-min period only
-        self.volume_timeline = deque(maxlen=300)  # Second-by-second volume tracking
+        self.flow = PeriodFlow()
+        
+        # Watermark: newest order timestamp fed so far, plus the orders seen at it
+        self.watermark: Optional[datetime] = None
+        self.watermark_keys = set()
         
         # Historical patterns for memory-based prediction
         self.historical_patterns = deque(maxlen=max_history)
+        # Outcomes whose pattern is not saved yet (period_end -> direction)
+        self.pending_outcomes: Dict[str, str] = {}
         
         # Prediction cache
         self.last_prediction = None
@@ -57,18 +147,27 @@ class FiveMinuteCandlePredictor:
             microsecond=0
         )
 
-    def add_orders(self, orders: List[Dict[str, Any]]) -> None:
+    @property
+    def orders_in_period(self) -> int:
+        return self.flow.count
+
+    def add_orders(self, orders: List[Dict[str, Any]], now: Optional[datetime] = None) -> None:
         """
         Add orders to current 5-minute period.
         Automatically resets when period boundary is crossed.
         
+        Only orders at or after the watermark (newest timestamp already fed)
+        are applied, so re-feeding an overlapping batch costs O(batch) and
+        never double counts.
+        
         Args:
             orders: List of order dicts with timestamp, price, size, side
+            now: Event time (naive UTC) selecting the period; the clock's now if None
         """
         if not orders:
             return
 
-        now = datetime.utcnow()
+        now = now or self.clock.now()
         current_period_start = self.get_5min_period_start(now)
         
         # Reset if period changed
@@ -76,43 +175,44 @@ class FiveMinuteCandlePredictor:
             current_period_start > self.current_period_start):
             
             # Save previous period to history if it had data
-            if self.period_orders and self.current_period_start is not None:
+            if self.flow.count and self.current_period_start is not None:
                 self._save_period_pattern()
             
             self.current_period_start = current_period_start
-            self.period_orders = []
-            self.volume_timeline = deque(maxlen=300)
+            self.flow = PeriodFlow()
         
-        # Filter and add orders from current 5-minute period
+        period_end = self.current_period_start + timedelta(minutes=5)
+        fresh = []
         for order in orders:
             try:
-                order_time = datetime.fromisoformat(order.get('timestamp', ''))
-                # Only include orders within current 5-minute period
-                period_end = self.current_period_start + timedelta(minutes=5)
-                if self.current_period_start <= order_time < period_end:
-                    # Avoid duplicates
-                    if order not in self.period_orders:
-                        self.period_orders.append(order)
-                        self._update_volume_timeline(order, order_time)
-            except (ValueError, TypeError):
+                order_time = datetime.fromisoformat(order.get('timestamp', '').replace('Z', '+00:00'))
+                if order_time.tzinfo is not None:
+                    order_time = order_time.astimezone(timezone.utc).replace(tzinfo=None)
+            except (ValueError, TypeError, AttributeError):
                 # Skip malformed timestamps
                 continue
-
-    def _update_volume_timeline(self, order: Dict, timestamp: datetime) -> None:
-        """Track volume progression second-by-second through the period."""
-        if self.current_period_start is None:
-            return
-        # Determine which second within the 5-minute period (0-299)
-        seconds_into_period = (timestamp - self.current_period_start).total_seconds()
-        if 0 <= seconds_into_period < 300:
-            side = order.get('side', 'BUY')
-            size = order.get('size', 0)
-            self.volume_timeline.append({
-                'second': int(seconds_into_period),
-                'side': side,
-                'volume': size,
-                'timestamp': timestamp.isoformat()
-            })
+            if self.watermark is not None and order_time < self.watermark:
+                continue
+            fresh.append((order_time, order))
+        
+        # Oldest first so the watermark only moves forward
+        fresh.sort(key=lambda item: item[0])
+        for order_time, order in fresh:
+            if order_time >= period_end:
+                break  # Ahead of the clock: leave for the period it belongs to
+            key = (order.get('timestamp'), order.get('price'), order.get('size'), order.get('side'))
+            if order_time == self.watermark:
+                if key in self.watermark_keys:
+                    continue
+            else:
+                self.watermark = order_time
+                self.watermark_keys = set()
+            self.watermark_keys.add(key)
+            
+            # Only include orders within current 5-minute period
+            if self.current_period_start <= order_time:
+                second = int((order_time - self.current_period_start).total_seconds())
+                self.flow.add(order.get('side', 'BUY'), order.get('size', 0), second)
 
     def predict_next_candle(self) -> Dict[str, Any]:
         """
@@ -125,7 +225,7 @@ class FiveMinuteCandlePredictor:
         Returns:
             Dict with prediction, confidence, reasoning, etc.
         """
-        if not self.period_orders:
+        if not self.flow.count:
             return self._neutral_prediction("No orders in current period")
         
         # Analyze order flow within this 5-minute period
@@ -141,22 +241,21 @@ class FiveMinuteCandlePredictor:
         prediction = self._synthesize_prediction(analysis, ai_insights, pattern_match)
         
         self.last_prediction = prediction
-        self.prediction_updated_at = datetime.utcnow()
+        self.prediction_updated_at = self.clock.now()
         
         return prediction
 
     def _analyze_5min_orderflow(self) -> Dict[str, Any]:
-        """Analyze order flow within the 5-minute period."""
-        if not self.period_orders:
+        """Analyze order flow within the 5-minute period (O(1): reads running accumulators)."""
+        flow = self.flow
+        if not flow.count:
             return {}
         
-        # Separate BUY and SELL orders
-        buy_orders = [o for o in self.period_orders if o.get('side') == 'BUY']
-        sell_orders = [o for o in self.period_orders if o.get('side') == 'SELL']
-        
         # Calculate volumes
-        buy_volume = sum(o.get('size', 0) for o in buy_orders)
-        sell_volume = sum(o.get('size', 0) for o in sell_orders)
+        buy_volume = flow.side_volume['BUY']
+        sell_volume = flow.side_volume['SELL']
+        buy_count = flow.side_count['BUY']
+        sell_count = flow.side_count['SELL']
         total_volume = buy_volume + sell_volume
         
         if total_volume == 0:
@@ -167,21 +266,10 @@ class FiveMinuteCandlePredictor:
         buy_ratio = buy_volume / total_volume * 100
         sell_ratio = sell_volume / total_volume * 100
         
-        # Volume progression (is volume accelerating?)
-        volume_acceleration = self._calculate_acceleration()
-        
-        # Time-weighted volume (orders arriving later have more weight)
-        time_weighted_buy = self._calculate_time_weighted_volume(buy_orders)
-        time_weighted_sell = self._calculate_time_weighted_volume(sell_orders)
-        
-        # Average order size (bigger orders = more conviction)
-        avg_buy_size = buy_volume / len(buy_orders) if buy_orders else 0
-        avg_sell_size = sell_volume / len(sell_orders) if sell_orders else 0
-        
         return {
-            'total_orders': len(self.period_orders),
-            'buy_orders': len(buy_orders),
-            'sell_orders': len(sell_orders),
+            'total_orders': flow.count,
+            'buy_orders': buy_count,
+            'sell_orders': sell_count,
             'buy_volume': buy_volume,
             'sell_volume': sell_volume,
             'total_volume': total_volume,
@@ -189,88 +277,18 @@ class FiveMinuteCandlePredictor:
             'buy_ratio': buy_ratio,
             'sell_ratio': sell_ratio,
             'balance_ratio': abs(balance) / total_volume * 100 if total_volume > 0 else 0,
-            'volume_acceleration': volume_acceleration,
-            'time_weighted_buy': time_weighted_buy,
-            'time_weighted_sell': time_weighted_sell,
-            'avg_buy_size': avg_buy_size,
-            'avg_sell_size': avg_sell_size,
-            'order_flow_momentum': self._calculate_momentum(),
-            'volume_distribution': self._analyze_volume_distribution(),
+            # Volume progression (is volume accelerating?)
+            'volume_acceleration': flow.acceleration(),
+            # Time-weighted volume (orders arriving later have more weight)
+            'time_weighted_buy': flow.time_weighted('BUY'),
+            'time_weighted_sell': flow.time_weighted('SELL'),
+            # Average order size (bigger orders = more conviction)
+            'avg_buy_size': buy_volume / buy_count if buy_count else 0,
+            'avg_sell_size': sell_volume / sell_count if sell_count else 0,
+            'order_flow_momentum': flow.momentum(),
+            'volume_distribution': flow.distribution(),
         }
 
-    def _calculate_acceleration(self) -> float:
-        """Calculate if volume is accelerating or decelerating."""
-        if len(self.period_orders) < 4:
-            return 0.0
-        
-        # Compare early vs late volume
-        mid_point = len(self.period_orders) // 2
-        early_orders = self.period_orders[:mid_point]
-        late_orders = self.period_orders[mid_point:]
-        
-        early_vol = sum(o.get('size', 0) for o in early_orders)
-        late_vol = sum(o.get('size', 0) for o in late_orders)
-        
-        if early_vol == 0:
-            return 0.0
-        
-        # Positive = accelerating, negative = decelerating
-        return (late_vol - early_vol) / early_vol
-
-    def _calculate_time_weighted_volume(self, orders: List[Dict]) -> float:
-        """Assign higher weight to orders arriving later in the period."""
-        if not orders:
-            return 0.0
-        
-        total_weighted = 0.0
-        for i, order in enumerate(orders):
-            # Weight increases from 0.5 to 1.5 across the period
-            weight = 0.5 + (i / len(orders)) if orders else 0.5
-            total_weighted += order.get('size', 0) * weight
-        
-        return total_weighted
-
-    def _calculate_momentum(self) -> str:
-        """Determine if order flow momentum is building or declining."""
-        if len(self.volume_timeline) < 5:
-            return "BUILDING"
-        
-        # Look at recent vs earlier volume in timeline
-        mid = len(self.volume_timeline) // 2
-        recent = list(self.volume_timeline)[mid:]
-        earlier = list(self.volume_timeline)[:mid]
-        
-        recent_volume = sum(v.get('volume', 0) for v in recent)
-        earlier_volume = sum(v.get('volume', 0) for v in earlier)
-        
-        if recent_volume > earlier_volume * 1.2:
-            return "ACCELERATING"
-        elif recent_volume < earlier_volume * 0.8:
-            return "DECELERATING"
-        else:
-            return "STEADY"
-
-    def _analyze_volume_distribution(self) -> Dict[str, Any]:
-        """Analyze how volume is distributed across the 5-minute period."""
-        if not self.volume_timeline:
-            return {}
-        
-        # Group by periods (0-60s, 60-120s, etc.)
-        periods = {}
-        for entry in self.volume_timeline:
-            second = entry.get('second', 0)
-            period_key = second // 60  # 0-4 for 5-minute period
-            
-            if period_key not in periods:
-                periods[period_key] = {'buy': 0, 'sell': 0}
-            
-            if entry.get('side') == 'BUY':
-                periods[period_key]['buy'] += entry.get('volume', 0)
-            else:
-                periods[period_key]['sell'] += entry.get('volume', 0)
-        
-        return periods
-
     def _get_ai_insights(self, analysis: Dict) -> Dict[str, Any]:
         """Use MentorBrain for AI-powered prediction insights."""
         if not self.mentor_brain:
@@ -349,6 +367,8 @@ class FiveMinuteCandlePredictor:
 
     def _find_matching_patterns(self, current_analysis: Dict) -> Dict[str, Any]:
         """Find similar historical patterns and their outcomes."""
+        if self.pattern_memory is not None and len(self.pattern_memory):
+            return self._query_pattern_memory(current_analysis)
         if not self.historical_patterns:
             return {'match_found': False, 'similar_patterns': 0}
         
@@ -379,6 +399,24 @@ class FiveMinuteCandlePredictor:
             'memory_confidence': 0.05 * (total_patterns / 100),  # Up to 5% boost from memory
         }
 
+    def _query_pattern_memory(self, current_analysis: Dict) -> Dict[str, Any]:
+        """k nearest past periods on the full feature vector."""
+        result = self.pattern_memory.query(pattern_features(current_analysis))
+        total_patterns = result.get('neighbors', 0)
+        if not total_patterns:
+            return {'match_found': False, 'similar_patterns': 0}
+        
+        success_rate = result['up_rate'] * 100
+        return {
+            'match_found': True,
+            'similar_patterns': total_patterns,
+            'historical_success_rate': success_rate,
+            'historical_accuracy': f"{success_rate:.1f}%",
+            'outcomes': result['outcomes'],
+            'mean_distance': result['mean_distance'],
+            'memory_confidence': 0.05 * (total_patterns / 100),  # Up to 5% boost from memory
+        }
+
     def _synthesize_prediction(
         self,
         analysis: Dict,
@@ -461,7 +499,7 @@ class FiveMinuteCandlePredictor:
                 'historical_accuracy': pattern_match.get('historical_accuracy', 'N/A'),
             },
             
-            'timestamp': datetime.utcnow().isoformat(),
+            'timestamp': self.clock.now().isoformat(),
             'reasoning': self._generate_reasoning(analysis, ai_insights, pattern_match, direction),
         }
 
@@ -506,7 +544,7 @@ class FiveMinuteCandlePredictor:
 
     def _save_period_pattern(self) -> None:
         """Save the completed 5-minute period to historical memory."""
-        if not self.period_orders:
+        if not self.flow.count:
             return
         
         analysis = self._analyze_5min_orderflow()
@@ -526,9 +564,16 @@ class FiveMinuteCandlePredictor:
             'order_count': analysis.get('total_orders', 0),
             'momentum': analysis.get('order_flow_momentum', 'STEADY'),
             'actual_direction': None,  # To be filled by external feedback
-            'stored_at': datetime.utcnow().isoformat(),
+            'stored_at': self.clock.now().isoformat(),
         }
+        if self.pattern_memory is not None:
+            pattern['memory_id'] = self.pattern_memory.add(pattern_features(analysis), period_start)
         self.historical_patterns.append(pattern)
+        
+        # The candle after this period may have closed before the period was saved
+        outcome = self.pending_outcomes.pop(period_end, None) if period_end else None
+        if outcome is not None:
+            self._label_pattern(pattern, outcome)
 
     def _neutral_prediction(self, reason: str) -> Dict[str, Any]:
         """Return a neutral prediction."""
@@ -546,20 +591,51 @@ class FiveMinuteCandlePredictor:
                 'balance': 0,
             },
             'reasoning': reason,
-            'timestamp': datetime.utcnow().isoformat(),
+            'timestamp': self.clock.now().isoformat(),
         }
 
-    def record_actual_outcome(self, actual_direction: str) -> None:
+    def record_actual_outcome(self, actual_direction: str, bar_start: Optional[datetime] = None) -> bool:
         """
         Record actual candle outcome for machine learning feedback.
         Call this after the 5-minute candle closes.
         
         Args:
             actual_direction: 'UP', 'DOWN', or 'SIDEWAYS'
+            bar_start: Start of the closed candle. Only the pattern whose period
+                       ends there is labelled; if that period is not saved yet the
+                       outcome waits for it. None labels the newest pattern.
+        
+        Returns:
+            True if a pattern was labelled now
         """
-        if self.historical_patterns:
-            # Update the most recent pattern with actual outcome
-            self.historical_patterns[-1]['actual_direction'] = actual_direction
+        if bar_start is None:
+            if not self.historical_patterns:
+                return False
+            return self._label_pattern(self.historical_patterns[-1], actual_direction)
+        
+        if bar_start.tzinfo is not None:
+            bar_start = bar_start.astimezone(timezone.utc).replace(tzinfo=None)
+        period_end = bar_start.isoformat()
+        for pattern in reversed(self.historical_patterns):
+            if pattern.get('period_end') == period_end:
+                return self._label_pattern(pattern, actual_direction)
+        
+        # Pattern still forming or unsaved (no orders polled since it ended)
+        if self.current_period_start is not None and bar_start > self.current_period_start:
+            self.pending_outcomes[period_end] = actual_direction
+            while len(self.pending_outcomes) > self.max_history:
+                self.pending_outcomes.pop(next(iter(self.pending_outcomes)))
+        return False
+
+    def _label_pattern(self, pattern: Dict[str, Any], actual_direction: str) -> bool:
+        """Set a pattern's outcome once (and in pattern memory); later labels are ignored."""
+        if pattern.get('actual_direction') is not None:
+            return False
+        pattern['actual_direction'] = actual_direction
+        memory_id = pattern.get('memory_id')
+        if memory_id is not None:
+            self.pattern_memory.record_outcome(memory_id, actual_direction)
+        return True
 
     def get_statistics(self) -> Dict[str, Any]:
         """Get prediction accuracy statistics from memory."""
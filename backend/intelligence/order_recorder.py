@@ -4,6 +4,7 @@ Records: timestamp, price, size, side (buy/sell)
 Storage: SQLite for persistence and queryability
 """
 
+import os
 import sqlite3
 import json
 from datetime import datetime, timedelta
@@ -11,15 +12,27 @@ from typing import List, Dict, Optional
 from pathlib import Path
 import threading
 from collections import deque
+import warnings
 
-DB_PATH = Path(__file__).parent.parent.parent / "data" / "orders.db"
+import numpy as np
+
+from backend.time.clock import Clock, default_clock
+
+DB_PATH = Path(
+    os.getenv(
+        "QMO_ORDERS_DB",
+        str(Path(__file__).parent.parent.parent / "data" / "orders.db"),
+    )
+)
 
 
 class RawOrderRecorder:
     """Record and query raw orders at tick level"""
     
-    def __init__(self, db_path: Path = DB_PATH, max_memory: int = 10000, auto_cleanup_days: int = 15):
+    def __init__(self, db_path: Path = DB_PATH, max_memory: int = 10000, auto_cleanup_days: int = 15,
+                 clock: Optional[Clock] = None):
         self.db_path = db_path
+        self.clock = clock or default_clock  # Stamps orders recorded without a timestamp
         self.max_memory = max_memory
         self.auto_cleanup_days = auto_cleanup_days  # Days to retain data
         self.memory_orders = deque(maxlen=max_memory)  # Recent orders in memory
@@ -112,7 +125,7 @@ class RawOrderRecorder:
             Order record dict
         """
         if timestamp is None:
-            timestamp = datetime.utcnow()
+            timestamp = self.clock.now()
         
         if isinstance(timestamp, datetime):
             timestamp_str = timestamp.isoformat()
@@ -208,6 +221,35 @@ class RawOrderRecorder:
             for row in rows
         ]
     
+    def get_orders_since(self, since, limit: int = 5000) -> List[Dict]:
+        """Orders at or after `since` (datetime or ISO string), oldest first"""
+        since_iso = since.isoformat() if isinstance(since, datetime) else since
+        
+        conn = sqlite3.connect(str(self.db_path))
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT timestamp, price, size, side, contract_type
+            FROM orders
+            WHERE timestamp >= ?
+            ORDER BY timestamp ASC
+            LIMIT ?
+        ''', (since_iso, limit))
+        
+        rows = cursor.fetchall()
+        conn.close()
+        
+        return [
+            {
+                "timestamp": row[0],
+                "price": row[1],
+                "size": row[2],
+                "side": row[3],
+                "contract_type": row[4]
+            }
+            for row in rows
+        ]
+    
     def get_orders_by_time_range(self, start_time: datetime, 
                                  end_time: datetime) -> List[Dict]:
         """Get orders within time range from database"""
@@ -238,6 +280,60 @@ class RawOrderRecorder:
             for row in rows
         ]
     
+    def get_last_timestamp(self, contract_type: Optional[str] = None) -> Optional[str]:
+        """Timestamp of the newest recorded order (optionally for one contract), None if empty"""
+        query = "SELECT timestamp FROM orders"
+        params = []
+        if contract_type:
+            query += " WHERE contract_type = ?"
+            params.append(contract_type)
+        query += " ORDER BY timestamp DESC LIMIT 1"
+        
+        conn = sqlite3.connect(str(self.db_path))
+        row = conn.execute(query, params).fetchone()
+        conn.close()
+        return row[0] if row else None
+    
+    def get_trade_columns(self, start_time, end_time, contract_type: Optional[str] = None,
+                          after_id: int = 0) -> Dict[str, np.ndarray]:
+        """
+        Trades in [start_time, end_time) as column arrays, oldest first
+        
+        Returns id, ts (epoch ms), price, size and buy (aggressor side) arrays;
+        after_id restricts the scan to rows inserted since a previous call.
+        """
+        start_iso = start_time.isoformat() if isinstance(start_time, datetime) else start_time
+        end_iso = end_time.isoformat() if isinstance(end_time, datetime) else end_time
+        query = '''
+            SELECT id, timestamp, price, size, side = 'BUY'
+            FROM orders
+            WHERE timestamp >= ? AND timestamp < ? AND id > ?
+        '''
+        params = [start_iso, end_iso, after_id]
+        if contract_type:
+            query += " AND contract_type = ?"
+            params.append(contract_type)
+        
+        conn = sqlite3.connect(str(self.db_path))
+        rows = conn.execute(query, params).fetchall()
+        conn.close()
+        
+        ids, stamps, price, size, buy = zip(*rows) if rows else ((), (), (), (), ())
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")  # "Z"/"+00:00" suffixes parse as UTC
+            ts = np.array(stamps, dtype="datetime64[ms]").astype(np.int64)
+        columns = {
+            "id": np.array(ids, dtype=np.int64),
+            "ts": ts,
+            "price": np.array(price, dtype=float),
+            "size": np.array(size, dtype=np.int64),
+            "buy": np.array(buy, dtype=bool),
+        }
+        if len(ts) > 1 and (np.diff(ts) < 0).any():
+            order = np.argsort(ts, kind="stable")
+            columns = {name: values[order] for name, values in columns.items()}
+        return columns
+    
     def get_orders_by_price_range(self, min_price: float, 
                                   max_price: float, limit: int = 500) -> List[Dict]:
         """Get orders within price range"""
@@ -365,7 +461,7 @@ class RawOrderRecorder:
             orders = self.get_orders_by_time_range(start_time, end_time)
         else:
             # Last 24 hours
-            end = datetime.utcnow()
+            end = self.clock.now()
             start = end - timedelta(hours=24)
             orders = self.get_orders_by_time_range(start, end)
         
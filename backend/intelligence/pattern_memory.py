@@ -0,0 +1,302 @@
+"""
+Pattern Memory - Persistent k-NN store of closed 5-minute order-flow periods
+
+Each closed period is stored with its full feature vector (signed balance
+ratio, acceleration, momentum, per-minute volume share and imbalance,
+average order sizes) and, once the candle closes, its actual outcome.
+Labelled vectors (and their element-wise squares) live in contiguous
+NumPy matrices, so a k-nearest neighbour query over hundreds of
+thousands of periods is two matrix-vector products plus argpartition
+(milliseconds).
+
+Storage: SQLite (same pattern as the raw order recorder); the index is
+rebuilt from disk on startup and extended in place as outcomes arrive.
+Periods are held in memory until labelled and labelled rows are written
+in batches, so storing a period costs no SQL on the order-polling path.
+Row ids are assigned by SQLite on insert, so several API workers can
+share one database; pending periods are keyed per process.
+"""
+
+import math
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+DB_PATH = Path(__file__).parent.parent.parent / "data" / "pattern_memory.db"
+
+FEATURES = (
+    "balance_ratio",  # Signed (buy - sell) / total * 100
+    "acceleration",
+    "momentum",  # -1 decelerating, 0 steady/building, +1 accelerating
+    "minute_share_0", "minute_share_1", "minute_share_2", "minute_share_3", "minute_share_4",
+    "minute_imbalance_0", "minute_imbalance_1", "minute_imbalance_2", "minute_imbalance_3", "minute_imbalance_4",
+    "log_avg_buy_size",
+    "log_avg_sell_size",
+)
+
+OUTCOMES = ("UP", "DOWN", "SIDEWAYS")
+
+MOMENTUM_CODES = {"ACCELERATING": 1.0, "DECELERATING": -1.0}
+
+MAX_PENDING = 1000  # Unlabelled periods kept (oldest dropped: their candle never reported)
+
+
+def pattern_features(analysis: Dict[str, Any]) -> np.ndarray:
+    """Feature vector (FEATURES order) for a FiveMinuteCandlePredictor analysis dict."""
+    total = analysis.get("total_volume", 0) or 0
+    vector = np.zeros(len(FEATURES))
+    if total <= 0:
+        return vector
+    vector[0] = analysis.get("balance", 0) / total * 100
+    vector[1] = max(-5.0, min(5.0, analysis.get("volume_acceleration", 0.0)))
+    vector[2] = MOMENTUM_CODES.get(analysis.get("order_flow_momentum"), 0.0)
+    for minute, volumes in (analysis.get("volume_distribution") or {}).items():
+        minute = int(minute)
+        if 0 <= minute < 5:
+            buy, sell = volumes.get("buy", 0), volumes.get("sell", 0)
+            vector[3 + minute] = (buy + sell) / total
+            vector[8 + minute] = (buy - sell) / total
+    vector[13] = math.log1p(analysis.get("avg_buy_size", 0))
+    vector[14] = math.log1p(analysis.get("avg_sell_size", 0))
+    return vector
+
+
+class PatternMemory:
+    """Persistent labelled feature vectors with vectorized k-NN outcome queries."""
+
+    def __init__(self, db_path: Path = DB_PATH, k: int = 50, max_patterns: int = 500_000,
+                 flush_every: int = 12):
+        self.db_path = Path(db_path)
+        self.k = k
+        self.max_patterns = max_patterns  # Newest labelled periods kept in the index
+        self.flush_every = flush_every  # Labelled periods buffered per SQLite write (12 = one hour of 5m bars)
+        self.dims = len(FEATURES)
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()  # One batch write at a time
+        self.vectors = np.empty((1024, self.dims))
+        self.squares = np.empty((1024, self.dims))  # vectors ** 2, for the expanded distance
+        self.outcomes = np.empty(1024, dtype=np.int8)
+        self.size = 0
+        self.sums = np.zeros(self.dims)
+        self.sumsq = np.zeros(self.dims)
+        self.pending: Dict[str, Tuple[np.ndarray, Optional[str]]] = {}  # Periods waiting for an outcome
+        self.unsaved: List[Tuple[Optional[str], bytes, str]] = []  # Labelled rows not yet written
+        self.next_key = 1  # Process-local pending keys, never row ids
+        self._init_db()
+        self._load()
+
+    def _init_db(self):
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.db_path))
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS patterns (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                period_start TEXT,
+                features BLOB NOT NULL,
+                outcome TEXT,  -- 'UP', 'DOWN', 'SIDEWAYS' or NULL until the candle closes
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        conn.commit()
+        conn.close()
+
+    def _load(self):
+        """Rebuild the in-memory index from every labelled row."""
+        conn = sqlite3.connect(str(self.db_path))
+        rows = conn.execute('''
+            SELECT features, outcome FROM patterns
+            WHERE outcome IS NOT NULL
+            ORDER BY id DESC
+            LIMIT ?
+        ''', (self.max_patterns,)).fetchall()
+        conn.close()
+        rows.reverse()
+        if rows:
+            vectors = np.frombuffer(b"".join(r[0] for r in rows), dtype=float).reshape(len(rows), self.dims)
+            outcomes = np.array([OUTCOMES.index(r[1]) for r in rows], dtype=np.int8)
+            self._append(vectors, outcomes)
+        print(f"✅ Pattern memory: {self.size} labelled periods loaded")
+
+    def __len__(self) -> int:
+        return self.size
+
+    # ==================== INDEX ====================
+
+    def _append(self, vectors: np.ndarray, outcomes: np.ndarray):
+        count = len(vectors)
+        if self.size + count > len(self.vectors):
+            capacity = max(len(self.vectors) * 2, self.size + count)
+            grown, grown_squares = np.empty((capacity, self.dims)), np.empty((capacity, self.dims))
+            grown[:self.size] = self.vectors[:self.size]
+            grown_squares[:self.size] = self.squares[:self.size]
+            grown_outcomes = np.empty(capacity, dtype=np.int8)
+            grown_outcomes[:self.size] = self.outcomes[:self.size]
+            self.vectors, self.squares, self.outcomes = grown, grown_squares, grown_outcomes
+        self.vectors[self.size:self.size + count] = vectors
+        self.squares[self.size:self.size + count] = vectors ** 2
+        self.outcomes[self.size:self.size + count] = outcomes
+        self.size += count
+        self.sums += vectors.sum(axis=0)
+        self.sumsq += self.squares[self.size - count:self.size].sum(axis=0)
+
+        if self.size > self.max_patterns:
+            # Drop the oldest block; running moments are recomputed once per compaction
+            keep = self.max_patterns * 3 // 4
+            self.vectors[:keep] = self.vectors[self.size - keep:self.size]
+            self.squares[:keep] = self.squares[self.size - keep:self.size]
+            self.outcomes[:keep] = self.outcomes[self.size - keep:self.size]
+            self.size = keep
+            self.sums = self.vectors[:keep].sum(axis=0)
+            self.sumsq = self.squares[:keep].sum(axis=0)
+
+    def _weights(self) -> np.ndarray:
+        """Inverse feature variances: distances are on standardized features."""
+        mean = self.sums / self.size
+        variance = np.maximum(self.sumsq / self.size - mean ** 2, 0.0)
+        return np.where(variance > 1e-12, 1.0 / np.where(variance > 1e-12, variance, 1.0), 0.0)
+
+    # ==================== WRITES ====================
+
+    def add(self, features: np.ndarray, period_start: Optional[str] = None) -> str:
+        """Hold a closed period in memory until its outcome arrives; returns its pending key."""
+        features = np.asarray(features, dtype=float)
+        with self.lock:
+            key = f"period-{self.next_key}"
+            self.next_key += 1
+            self.pending[key] = (features, period_start)
+            while len(self.pending) > MAX_PENDING:
+                self.pending.pop(next(iter(self.pending)))
+        return key
+
+    def record_outcome(self, pattern_id: Union[str, int], outcome: str) -> bool:
+        """
+        Label a period and add it to the index; False if unknown or already labelled.
+
+        pattern_id is a key from add(), or the row id of an unlabelled row
+        stored by an older version.
+        """
+        outcome = outcome.upper()
+        if outcome not in OUTCOMES:
+            return False
+        code = np.array([OUTCOMES.index(outcome)], dtype=np.int8)
+        with self.lock:
+            entry = self.pending.pop(pattern_id, None)
+            if entry is not None:
+                features, period_start = entry
+                self._append(features[None, :], code)
+                self.unsaved.append((period_start, features.tobytes(), outcome))
+                batch_full = len(self.unsaved) >= self.flush_every
+        if entry is not None:
+            if batch_full:
+                self.flush()
+            return True
+        if not isinstance(pattern_id, int):
+            return False
+
+        # Unlabelled row already on disk (stored by an older version)
+        try:
+            conn = sqlite3.connect(str(self.db_path))
+            try:
+                updated = conn.execute(
+                    "UPDATE patterns SET outcome = ? WHERE id = ? AND outcome IS NULL", (outcome, pattern_id)
+                ).rowcount
+                row = conn.execute("SELECT features FROM patterns WHERE id = ?", (pattern_id,)).fetchone()
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            print(f"⚠️ Pattern memory: could not label row {pattern_id}: {e}")
+            return False
+        if not updated:
+            return False
+        with self.lock:
+            self._append(np.frombuffer(row[0], dtype=float)[None, :], code)
+        return True
+
+    def flush(self) -> int:
+        """
+        Write buffered labelled periods in one transaction; returns the row count.
+
+        Rows leave the buffer only once the transaction commits: a failed
+        write is reported and retried with the next flush.
+        """
+        with self.flush_lock:
+            with self.lock:
+                rows = list(self.unsaved)
+            if not rows:
+                return 0
+            try:
+                conn = sqlite3.connect(str(self.db_path))
+                try:
+                    conn.executemany(
+                        "INSERT INTO patterns (period_start, features, outcome) VALUES (?, ?, ?)", rows
+                    )
+                    conn.commit()
+                finally:
+                    conn.close()
+            except sqlite3.Error as e:
+                print(f"⚠️ Pattern memory: {len(rows)} labelled periods not saved yet: {e}")
+                return 0
+            with self.lock:
+                del self.unsaved[:len(rows)]  # Rows labelled meanwhile stay buffered
+            return len(rows)
+
+    def bulk_load(self, features: np.ndarray, outcomes: Iterable[str],
+                  period_starts: Optional[List[str]] = None) -> int:
+        """Insert many labelled periods at once (backfills, offline replays)."""
+        features = np.asarray(features, dtype=float).reshape(-1, self.dims)
+        outcomes = [o.upper() for o in outcomes]
+        starts = period_starts or [None] * len(outcomes)
+        conn = sqlite3.connect(str(self.db_path))
+        conn.executemany(
+            "INSERT INTO patterns (period_start, features, outcome) VALUES (?, ?, ?)",
+            ((s, f.tobytes(), o) for s, f, o in zip(starts, features, outcomes)),
+        )
+        conn.commit()
+        conn.close()
+        with self.lock:
+            self._append(features, np.array([OUTCOMES.index(o) for o in outcomes], dtype=np.int8))
+        return len(outcomes)
+
+    # ==================== QUERIES ====================
+
+    def query(self, features: np.ndarray, k: Optional[int] = None) -> Dict[str, Any]:
+        """Outcome statistics of the k nearest labelled periods."""
+        k = k or self.k
+        with self.lock:
+            if self.size == 0:
+                return {"neighbors": 0}
+            weights = self._weights()
+            features = np.asarray(features, dtype=float)
+            # sum(w * (v - f)^2) = v^2 . w - 2 v . (w * f) + f^2 . w
+            distances = self.squares[:self.size] @ weights
+            distances -= 2 * (self.vectors[:self.size] @ (weights * features))
+            distances += (features ** 2) @ weights
+            np.maximum(distances, 0.0, out=distances)
+            k = min(k, self.size)
+            nearest = np.argpartition(distances, k - 1)[:k] if k < self.size else np.arange(self.size)
+            counts = np.bincount(self.outcomes[nearest], minlength=len(OUTCOMES))
+            mean_distance = float(np.sqrt(distances[nearest]).mean())
+        rates = counts / k
+        return {
+            "neighbors": int(k),
+            "outcomes": {name: int(c) for name, c in zip(OUTCOMES, counts)},
+            "up_rate": float(rates[0]),
+            "down_rate": float(rates[1]),
+            "sideways_rate": float(rates[2]),
+            "mean_distance": round(mean_distance, 3),
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "labelled": self.size,
+            "pending": len(self.pending),
+            "unsaved": len(self.unsaved),
+            "k": self.k,
+            "outcomes": {
+                name: int(c) for name, c in zip(OUTCOMES, np.bincount(self.outcomes[:self.size], minlength=3))
+            },
+        }
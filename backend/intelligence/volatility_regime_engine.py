@@ -7,6 +7,8 @@ from typing import Dict, List
 from datetime import datetime, timedelta
 from collections import deque
 
+from backend.time.clock import Clock, default_clock
+
 
 class VolatilityRegimeEngine:
     """
@@ -14,14 +16,15 @@ class VolatilityRegimeEngine:
     Adapts OIS behavior (position size, stop width, confirmation requirements) per regime.
     """
 
-    def __init__(self, lookback_periods: int = 20):
+    def __init__(self, lookback_periods: int = 20, clock: Clock = None):
         self.lookback_periods = lookback_periods
+        self.clock = clock or default_clock
         self.ranges = deque(maxlen=lookback_periods)
 
         # Regime states
         self.current_regime = "NORMAL"
         self.previous_regime = "NORMAL"
-        self.regime_change_time = datetime.utcnow()
+        self.regime_change_time = self.clock.now()
 
         # Thresholds for regime classification
         self.vol_thresholds = {
@@ -92,7 +95,7 @@ class VolatilityRegimeEngine:
 
             # Track regime changes
             if self.current_regime != self.previous_regime:
-                self.regime_change_time = datetime.utcnow()
+                self.regime_change_time = self.clock.now()
 
         return self.current_regime
 
@@ -106,7 +109,7 @@ class VolatilityRegimeEngine:
 
     def get_regime_age_seconds(self) -> float:
         """How long (seconds) have we been in current regime?"""
-        delta = datetime.utcnow() - self.regime_change_time
+        delta = self.clock.now() - self.regime_change_time
         return delta.total_seconds()
 
     def get_position_size_multiplier(self) -> float:
@@ -165,7 +168,7 @@ class VolatilityRegimeEngine:
     def export_state(self) -> Dict:
         """Export current state for persistence"""
         return {
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": self.clock.now().isoformat(),
             "current_regime": self.current_regime,
             "previous_regime": self.previous_regime,
             "ranges": list(self.ranges),
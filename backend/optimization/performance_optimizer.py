@@ -6,12 +6,15 @@ Session-locked caching, event-driven engines, confidence stabilization, memory d
 from datetime import datetime, timedelta
 import math
 
+from backend.time.clock import Clock, default_clock
+
 
 class PerformanceOptimizer:
     """Master optimizer controlling all speed/stability improvements."""
     
-    def __init__(self):
+    def __init__(self, clock: Clock = None):
         """Initialize optimizer with caching and decay systems."""
+        self.clock = clock or default_clock
         self.cache = {
             "gann_levels": None,
             "gann_session": None,
@@ -22,7 +25,7 @@ class PerformanceOptimizer:
         
         self.prev_confidence = 0.5
         self.memory_log = []
-        self.last_data_time = datetime.now()
+        self.last_data_time = self.clock.local_now()
         self.signal_freeze = False
         
     # ═══════════════════════════════════════════════════════════════════════════
@@ -58,7 +61,7 @@ class PerformanceOptimizer:
                 "2.0x": high + (range_size * 1.0),
             },
             "square_of_9": self._compute_square_of_9(midpoint),
-            "cached_at": datetime.now().isoformat(),
+            "cached_at": self.clock.local_now().isoformat(),
         }
         
         return levels
@@ -134,7 +137,7 @@ class PerformanceOptimizer:
     def reset_cycle_counter(self):
         """Reset counter on session boundary."""
         self.cache["cycle_counter"] = 0
-        self.cache["cycle_origin_time"] = datetime.now()
+        self.cache["cycle_origin_time"] = self.clock.local_now()
     
     # ═══════════════════════════════════════════════════════════════════════════
     # 4️⃣ ICEBERG PROXY OPTIMIZATION — Persistence Filter
@@ -191,7 +194,7 @@ class PerformanceOptimizer:
         
         # Log for monitoring
         self.memory_log.append({
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": self.clock.local_now().isoformat(),
             "raw": raw_confidence,
             "smoothed": smoothed,
             "change": smoothed - self.prev_confidence,
@@ -209,7 +212,7 @@ class PerformanceOptimizer:
         ✅ Old memories become less relevant over time.
         Like a pro trader: remember lessons, forget emotional noise.
         """
-        age = (datetime.now() - created_at).total_seconds()
+        age = (self.clock.local_now() - created_at).total_seconds()
         
         # Decay constants (in seconds)
         decay_constants = {
@@ -237,12 +240,16 @@ class PerformanceOptimizer:
     # 7️⃣ FAILSAFE & CRASH PROTECTION
     # ═══════════════════════════════════════════════════════════════════════════
     
+    def mark_data_received(self):
+        """Reset the watchdog: call on every incoming tick/bar."""
+        self.last_data_time = self.clock.local_now()
+    
     def watchdog_timer(self, data_timeout_seconds: int = 5) -> dict:
         """
         ✅ Watchdog: Freeze signals if data stops coming.
         Prevents trading on stale data.
         """
-        time_since_last_data = (datetime.now() - self.last_data_time).total_seconds()
+        time_since_last_data = (self.clock.local_now() - self.last_data_time).total_seconds()
         
         if time_since_last_data > data_timeout_seconds:
             self.signal_freeze = True
@@ -277,7 +284,7 @@ class PerformanceOptimizer:
         if drop_percentage > kill_threshold:
             result["triggered"] = True
             result["action"] = "PAUSE_SIGNALS"
-            result["reason": "Confidence collapse"
+            result["reason"] = "Confidence collapse"
         
         return result
     
@@ -306,7 +313,7 @@ class PerformanceOptimizer:
             "signal_freeze_active": self.signal_freeze,
             "memory_log_size": len(self.memory_log),
             "confidence_stability": self._calculate_confidence_stability(),
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": self.clock.local_now().isoformat(),
         }
     
     def _calculate_confidence_stability(self) -> float:
@@ -0,0 +1,372 @@
+"""
+Rolling Volume Profile - Incremental volume-at-price over a moving window
+
+Keeps one dense, tick-indexed volume array per profile (plus buy/sell
+splits) that grows at the edges as price explores new levels. Candles and
+trades are added or removed in O(levels they touch); running totals and
+the POC are maintained on the fly, so a new bar never re-walks history.
+
+Windows:
+- None: everything added until reset()
+- N (int): last N candles
+- "session": current CME trading day (rolls at 22:00 UTC)
+- "week": current CME trading week (opens Sunday 22:00 UTC)
+
+The /indicators/volume-profile endpoint and the mentor share one live
+profile per (contract, interval, tick size, bar count) through `live_profiles`.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from backend.feeds.candle_store import candle_epoch
+from backend.feeds.resampler import SESSION_OFFSET_SECONDS
+from backend.volume_profile_engine import VolumeProfileEngine
+
+Window = Union[None, int, str]
+
+MIN_TICK_SIZE = 0.01  # Finer ticks blow up the dense level arrays
+MAX_TICK_SIZE = 100.0
+MAX_WINDOW_BARS = 5000
+
+# First CME week open after the epoch: Sunday 1970-01-04 22:00 UTC
+WEEK_OFFSET_SECONDS = 3 * 86400 + SESSION_OFFSET_SECONDS
+
+# Volume left on a level after removals below this is float residue
+RESIDUE = 1e-6
+
+
+def period_key(epoch: float, window: Window) -> Optional[int]:
+    """Trading-day or trading-week number for session/week windows."""
+    if window == "session":
+        return int((epoch - SESSION_OFFSET_SECONDS) // 86400)
+    if window == "week":
+        return int((epoch - WEEK_OFFSET_SECONDS) // (7 * 86400))
+    return None
+
+
+class RollingVolumeProfile:
+    """
+    Volume profile updated candle by candle (or trade by trade).
+
+    Candle volume is distributed exactly like VolumeProfileEngine.build_profile,
+    so a snapshot matches a full rebuild over the same window up to float
+    summation order (removals are periodically folded into a clean rebuild).
+    """
+
+    def __init__(self, tick_size: float = 0.10, window: Window = None, headroom: int = 256):
+        if window not in (None, "session", "week") and not (isinstance(window, int) and window > 0):
+            raise ValueError(f"Unsupported window: {window!r}")
+        self.engine = VolumeProfileEngine(tick_size)
+        self.tick_size = tick_size
+        self.window = window
+        self.headroom = headroom
+        self.lock = threading.RLock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.base = 0  # Tick level stored at index 0
+            self.volume = np.zeros(0)
+            self.buy = np.zeros(0)
+            self.sell = np.zeros(0)
+            self.candles: "OrderedDict[str, Dict]" = OrderedDict()  # Window contents, oldest first
+            self.cells: Dict[str, Tuple[np.ndarray, np.ndarray, bool]] = {}
+            self.total_volume = 0
+            self.total_buy_volume = 0
+            self.total_sell_volume = 0
+            self.vwap_numerator = 0.0
+            self.trades = 0
+            self.trade_volume: Dict[int, List[float]] = {}  # Tick level -> [buy, sell] from add_trade
+            self.trade_vwap_numerator = 0.0
+            self.poc: Optional[int] = None  # Index into the dense arrays
+            self.poc_dirty = False
+            self.period: Optional[int] = None
+            self.removals = 0
+
+    def __len__(self) -> int:
+        return len(self.candles)
+
+    # ==================== DENSE STORAGE ====================
+
+    def _ensure(self, lo: int, hi: int):
+        """Grow the dense arrays so tick levels lo..hi are addressable."""
+        size = len(self.volume)
+        if size == 0:
+            self.base = lo - self.headroom
+            size = hi - lo + 1 + 2 * self.headroom
+            self.volume, self.buy, self.sell = np.zeros(size), np.zeros(size), np.zeros(size)
+            return
+        grow_low = max(0, self.base - lo)
+        grow_high = max(0, hi - (self.base + size - 1))
+        if not grow_low and not grow_high:
+            return
+        pad_low = grow_low + self.headroom if grow_low else 0
+        pad_high = grow_high + self.headroom if grow_high else 0
+        self.volume = np.pad(self.volume, (pad_low, pad_high))
+        self.buy = np.pad(self.buy, (pad_low, pad_high))
+        self.sell = np.pad(self.sell, (pad_low, pad_high))
+        self.base -= pad_low
+        if self.poc is not None:
+            self.poc += pad_low
+
+    def _apply(self, levels: np.ndarray, weights: np.ndarray, bullish: bool, sign: int):
+        if len(levels) == 0:
+            return
+        self._ensure(int(levels.min()), int(levels.max()))
+        idx = levels - self.base
+        np.add.at(self.volume, idx, sign * weights)
+        np.add.at(self.buy if bullish else self.sell, idx, sign * weights)
+
+        if sign > 0:
+            best = int(idx[np.argmax(self.volume[idx])])
+            if self.poc is None or self.volume[best] > self.volume[self.poc]:
+                self.poc = best
+            return
+
+        lo, hi = int(idx.min()), int(idx.max()) + 1
+        for arr in (self.volume, self.buy, self.sell):
+            segment = arr[lo:hi]
+            segment[np.abs(segment) < RESIDUE] = 0.0
+        if self.poc is not None and lo <= self.poc < hi:
+            self.poc_dirty = True
+
+    # ==================== CANDLES ====================
+
+    def _candle_cells(self, candle: Dict) -> Optional[Tuple[np.ndarray, np.ndarray, bool]]:
+        close = candle.get("close", 0)
+        high = candle.get("high", close)
+        low = candle.get("low", close)
+        open_price = candle.get("open", close)
+        if candle.get("volume", 0) == 0 or high == 0:
+            return None
+        bullish = close >= open_price
+        levels, weights, _ = self.engine._distribute(
+            np.array([high], dtype=float), np.array([low], dtype=float), np.array([close], dtype=float),
+            np.array([candle["volume"]], dtype=float), np.array([bullish]),
+        )
+        return levels, weights, bool(bullish)
+
+    def _account(self, candle: Dict, bullish: bool, sign: int):
+        volume = candle["volume"]
+        typical = (candle.get("high", candle["close"]) + candle.get("low", candle["close"]) + candle["close"]) / 3
+        self.total_volume += sign * volume
+        if bullish:
+            self.total_buy_volume += sign * volume
+        else:
+            self.total_sell_volume += sign * volume
+        self.vwap_numerator += sign * typical * volume
+
+    def add_candle(self, candle: Dict, key: Optional[str] = None) -> bool:
+        """Add one candle (keyed by timestamp); rolls the window. Returns False if ignored."""
+        key = key or candle.get("timestamp")
+        with self.lock:
+            if key in self.candles:
+                self.remove_candle(key)
+
+            period = period_key(candle_epoch(candle), self.window) if self.window in ("session", "week") else None
+            if period is not None:
+                if self.period is not None and period < self.period:
+                    return False  # Belongs to a window that already rolled off
+                if self.period is not None and period > self.period:
+                    self.reset()
+                self.period = period
+
+            cells = self._candle_cells(candle)
+            if cells is None:
+                return False
+            levels, weights, bullish = cells
+            self._apply(levels, weights, bullish, +1)
+            self._account(candle, bullish, +1)
+            self.candles[key] = candle
+            self.cells[key] = cells
+
+            if isinstance(self.window, int):
+                while len(self.candles) > self.window:
+                    self.remove_candle(next(iter(self.candles)))
+            return True
+
+    def remove_candle(self, key: str) -> bool:
+        """Remove a previously added candle by timestamp key."""
+        with self.lock:
+            candle = self.candles.pop(key, None)
+            if candle is None:
+                return False
+            levels, weights, bullish = self.cells.pop(key)
+            self._apply(levels, weights, bullish, -1)
+            self._account(candle, bullish, -1)
+            self.removals += 1
+            if self.removals >= max(64, len(self.candles)):
+                self._rebuild()
+            return True
+
+    def sync(self, candles: Iterable[Dict]) -> Dict[str, int]:
+        """
+        Make the window hold exactly `candles` (oldest first), touching only the diff:
+        vanished bars are removed, revised bars (e.g. the forming bar) replaced,
+        new bars added.
+        """
+        incoming = OrderedDict((c.get("timestamp"), c) for c in candles)
+        added = removed = 0
+        with self.lock:
+            for key in [k for k in self.candles if k not in incoming]:
+                removed += self.remove_candle(key)
+            for key, candle in incoming.items():
+                current = self.candles.get(key)
+                if current is not None and current == candle:
+                    continue
+                if current is not None:
+                    removed += self.remove_candle(key)
+                added += self.add_candle(dict(candle), key)
+        return {"added": added, "removed": removed, "bars": len(self.candles)}
+
+    def _rebuild(self):
+        """Re-accumulate the current window (and all trades) from scratch to shed float residue."""
+        candles = list(self.candles.items())
+        period, trades = self.period, self.trades
+        trade_volume, trade_vwap_numerator = self.trade_volume, self.trade_vwap_numerator
+        self.reset()
+        self.period, self.trades = period, trades
+        for key, candle in candles:
+            cells = self._candle_cells(candle)
+            levels, weights, bullish = cells
+            self._apply(levels, weights, bullish, +1)
+            self._account(candle, bullish, +1)
+            self.candles[key] = candle
+            self.cells[key] = cells
+        for level, (buy, sell) in trade_volume.items():
+            self._apply_trade(level, buy, sell)
+        self.trade_vwap_numerator = trade_vwap_numerator
+        self.vwap_numerator += trade_vwap_numerator
+
+    # ==================== TRADES ====================
+
+    def add_trade(self, price: float, size: float, side: str = "BUY"):
+        """Add one trade at its tick level (trades are not removed by bar windows)."""
+        if size <= 0:
+            return
+        level = int(round(price / self.tick_size))
+        with self.lock:
+            if side.upper() == "BUY":
+                self._apply_trade(level, float(size), 0.0)
+            else:
+                self._apply_trade(level, 0.0, float(size))
+            self.trade_vwap_numerator += price * size
+            self.vwap_numerator += price * size
+            self.trades += 1
+
+    def _apply_trade(self, level: int, buy: float, sell: float):
+        """Add trade volume at one tick level, kept aside so rebuilds can re-apply it."""
+        levels = np.array([level], dtype=np.int64)
+        for size, bullish in ((buy, True), (sell, False)):
+            if size > 0:
+                self._apply(levels, np.array([size]), bullish, +1)
+                self.total_volume += size
+                if bullish:
+                    self.total_buy_volume += size
+                else:
+                    self.total_sell_volume += size
+        cell = self.trade_volume.setdefault(level, [0.0, 0.0])
+        cell[0] += buy
+        cell[1] += sell
+
+    def add_trades(self, trades: Iterable[Dict]) -> int:
+        count = 0
+        for trade in trades:
+            self.add_trade(trade["price"], trade.get("size", 0), trade.get("side", "BUY"))
+            count += 1
+        return count
+
+    # ==================== QUERIES ====================
+
+    def poc_price(self) -> float:
+        with self.lock:
+            self._refresh_poc()
+            return 0 if self.poc is None else round((self.poc + self.base) * self.tick_size, 2)
+
+    def _refresh_poc(self):
+        if self.poc_dirty:
+            self.poc = int(np.argmax(self.volume)) if len(self.volume) and self.volume.max() > 0 else None
+            self.poc_dirty = False
+
+    def snapshot(self, value_area_pct: float = 0.70, columnar: bool = False) -> Dict[str, Any]:
+        """Profile in the same shape as VolumeProfileEngine.build_profile."""
+        with self.lock:
+            self._refresh_poc()
+            if self.poc is None or self.total_volume <= 0:
+                return self.engine._empty_profile()
+            touched = np.flatnonzero(self.volume > 0)
+            vwap = self.vwap_numerator / self.total_volume
+            return self.engine._assemble(
+                (touched + self.base) * self.tick_size, self.volume[touched],
+                self.buy[touched], self.sell[touched],
+                int(np.searchsorted(touched, self.poc)), vwap,
+                self.total_volume, self.total_buy_volume, self.total_sell_volume,
+                value_area_pct, columnar,
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "window": self.window,
+            "bars": len(self.candles),
+            "trades": self.trades,
+            "levels": int(np.count_nonzero(self.volume)),
+            "allocated_levels": len(self.volume),
+            "total_volume": self.total_volume,
+        }
+
+
+def check_profile_window(tick_size: float, window: Window) -> Window:
+    """Reject tick sizes outside [MIN_TICK_SIZE, MAX_TICK_SIZE]; clamp bar windows to [1, MAX_WINDOW_BARS]."""
+    if not MIN_TICK_SIZE <= tick_size <= MAX_TICK_SIZE:
+        raise ValueError(f"tick_size must be between {MIN_TICK_SIZE} and {MAX_TICK_SIZE}")
+    if isinstance(window, int):
+        window = min(max(1, window), MAX_WINDOW_BARS)
+    return window
+
+
+class LiveProfileRegistry:
+    """
+    Shared RollingVolumeProfiles per (contract, interval, tick size, window).
+
+    Callers pass the contract whose bars they sync, not a request symbol.
+    Tick sizes outside [MIN_TICK_SIZE, MAX_TICK_SIZE] are rejected, bar
+    windows are clamped to MAX_WINDOW_BARS, and only the `max_profiles`
+    most recently used profiles are kept.
+    """
+
+    def __init__(self, max_profiles: int = 16):
+        self.max_profiles = max_profiles
+        self.profiles: "OrderedDict[Tuple[str, str, float, Window], RollingVolumeProfile]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, contract: str, interval: str, tick_size: float = 0.10,
+            window: Window = None) -> RollingVolumeProfile:
+        window = check_profile_window(tick_size, window)
+        key = (contract, interval, round(tick_size, 6), window)
+        with self.lock:
+            profile = self.profiles.get(key)
+            if profile is None:
+                profile = RollingVolumeProfile(tick_size, window)
+                self.profiles[key] = profile
+                while len(self.profiles) > self.max_profiles:
+                    self.profiles.popitem(last=False)
+                    self.evictions += 1
+            else:
+                self.profiles.move_to_end(key)
+            return profile
+
+    def stats(self) -> List[Dict[str, Any]]:
+        with self.lock:
+            profiles = list(self.profiles.items())
+        return [
+            {"contract": contract, "interval": interval, "tick_size": tick, **profile.stats()}
+            for (contract, interval, tick, _), profile in profiles
+        ]
+
+
+live_profiles = LiveProfileRegistry()
@@ -0,0 +1,291 @@
+"""
+Tick Volume Profile - Volume at price from recorded trades
+
+Instead of spreading candle volume evenly over each bar's range, this
+aggregates the actual trade prices and aggressor sides captured by the
+RawOrderRecorder. Trades are read as column arrays and accumulated with
+bincount onto integer tick levels.
+
+- Arbitrary [start, end) windows, split along CME sessions (22:00 UTC roll)
+- Finalized sessions: tick columns cached on disk (.npz) and in memory,
+  full-session histograms cached per tick size
+- Live session: only rows inserted since the last scan are read
+- Same POC/VAH/VAL/VWAP/histogram shape as VolumeProfileEngine
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from backend.engines.bar_builder import tick_epoch
+from backend.feeds.resampler import SESSION_OFFSET_SECONDS
+from backend.volume_profile_engine import VolumeProfileEngine
+
+CACHE_DIR = Path(__file__).parent.parent / "data" / "tick_sessions"
+
+SESSION_SECONDS = 86400
+
+TICK_COLUMNS = ("ts", "price", "size", "buy")
+
+# Root + CME month code + year digits, e.g. GCG6, ESH26
+CONTRACT_MONTH = re.compile(r"^([A-Z]{1,3})[FGHJKMNQUVXZ]\d{1,2}$")
+# Bare CME root, what contract_for_symbol returns for a well-formed symbol
+CONTRACT_ROOT = re.compile(r"^[A-Z]{1,3}$")
+
+
+def session_start(epoch: float) -> int:
+    """Epoch of the CME session (22:00 UTC open) containing `epoch`."""
+    return int((epoch - SESSION_OFFSET_SECONDS) // SESSION_SECONDS) * SESSION_SECONDS + SESSION_OFFSET_SECONDS
+
+
+def contract_for_symbol(symbol: Optional[str]) -> Optional[str]:
+    """Recorder contract_type for a chart symbol: GCG6, GC=F and GC all map to GC (None: every contract)."""
+    if not symbol:
+        return None
+    root = symbol.upper().split("=", 1)[0]
+    match = CONTRACT_MONTH.match(root)
+    return match.group(1) if match else root
+
+
+def _iso(epoch: float) -> str:
+    """Naive UTC ISO string, the format RawOrderRecorder stores."""
+    return datetime.fromtimestamp(epoch, tz=timezone.utc).replace(tzinfo=None).isoformat()
+
+
+class LevelHistogram:
+    """Volume per tick level over a contiguous level range starting at `base`."""
+
+    __slots__ = ("base", "volume", "buy", "vwap_numerator", "trades")
+
+    def __init__(self, base: int, volume: np.ndarray, buy: np.ndarray, vwap_numerator: float, trades: int):
+        self.base = base
+        self.volume = volume
+        self.buy = buy
+        self.vwap_numerator = vwap_numerator
+        self.trades = trades
+
+    @classmethod
+    def empty(cls) -> "LevelHistogram":
+        return cls(0, np.zeros(0), np.zeros(0), 0.0, 0)
+
+    @classmethod
+    def from_ticks(cls, price: np.ndarray, size: np.ndarray, buy: np.ndarray, tick_size: float) -> "LevelHistogram":
+        if len(price) == 0:
+            return cls.empty()
+        levels = np.rint(price / tick_size).astype(np.int64)
+        base = int(levels.min())
+        offsets = levels - base
+        weights = size.astype(float)
+        return cls(
+            base,
+            np.bincount(offsets, weights=weights),
+            np.bincount(offsets, weights=weights * buy, minlength=int(offsets.max()) + 1),
+            float(np.dot(price, weights)),
+            len(price),
+        )
+
+    @classmethod
+    def merge(cls, parts: List["LevelHistogram"]) -> "LevelHistogram":
+        """Sum histograms, aligning each by its base level."""
+        parts = [p for p in parts if len(p.volume)]
+        if not parts:
+            return cls.empty()
+        if len(parts) == 1:
+            return parts[0]
+        base = min(p.base for p in parts)
+        span = max(p.base + len(p.volume) for p in parts) - base
+        volume, buy = np.zeros(span), np.zeros(span)
+        for p in parts:
+            lo = p.base - base
+            volume[lo:lo + len(p.volume)] += p.volume
+            buy[lo:lo + len(p.buy)] += p.buy
+        return cls(base, volume, buy, sum(p.vwap_numerator for p in parts), sum(p.trades for p in parts))
+
+    @property
+    def total_volume(self) -> float:
+        return float(self.volume.sum())
+
+
+def profile_from_histogram(hist: LevelHistogram, tick_size: float, value_area_pct: float = 0.70,
+                           columnar: bool = False) -> Dict[str, Any]:
+    """VolumeProfileEngine-shaped profile (plus trade count) for a level histogram."""
+    engine = VolumeProfileEngine(tick_size)
+    total_volume = hist.total_volume
+    if total_volume <= 0:
+        return dict(engine._empty_profile(), trades=0)
+
+    touched = np.flatnonzero(hist.volume > 0)
+    vols = hist.volume[touched]
+    buy = hist.buy[touched]
+    total_buy = float(buy.sum())
+    profile = engine._assemble(
+        (touched + hist.base) * tick_size, vols, buy, vols - buy,
+        int(np.argmax(vols)), hist.vwap_numerator / total_volume,
+        total_volume, total_buy, total_volume - total_buy,
+        value_area_pct, columnar,
+    )
+    profile["trades"] = hist.trades
+    return profile
+
+
+class TickVolumeProfile:
+    """Tick-accurate volume profiles over arbitrary windows of recorded trades."""
+
+    def __init__(self, recorder, cache_dir: Path = CACHE_DIR, max_sessions: int = 16,
+                 settle_seconds: int = 300):
+        self.recorder = recorder
+        self.cache_dir = Path(cache_dir)
+        self.max_sessions = max_sessions  # Finalized sessions kept in memory
+        self.settle_seconds = settle_seconds  # Grace period before a closed session is frozen
+        self.sessions: "OrderedDict[Tuple[Optional[str], int], Dict[str, np.ndarray]]" = OrderedDict()
+        self.histograms: "OrderedDict[Tuple[Optional[str], int, float], LevelHistogram]" = OrderedDict()
+        self.live: Dict[Optional[str], Tuple[int, Dict[str, np.ndarray], int]] = {}
+        self.lock = threading.RLock()
+        self.counters = {"sql_scans": 0, "disk_loads": 0, "session_hits": 0, "histogram_hits": 0}
+
+    # ==================== SESSION TICKS ====================
+
+    def _finalized(self, start: int) -> bool:
+        return start + SESSION_SECONDS + self.settle_seconds <= time.time()
+
+    def _cache_path(self, contract: Optional[str], start: int) -> Path:
+        return self.cache_dir / f"{contract or 'ALL'}_{start}.npz"
+
+    def _scan(self, contract: Optional[str], start: int, after_id: int = 0) -> Dict[str, np.ndarray]:
+        self.counters["sql_scans"] += 1
+        return self.recorder.get_trade_columns(
+            _iso(start), _iso(start + SESSION_SECONDS), contract_type=contract, after_id=after_id
+        )
+
+    def _session_ticks(self, contract: Optional[str], start: int) -> Dict[str, np.ndarray]:
+        """Tick columns for one session: memory, then disk, then a single SQL scan."""
+        if not self._finalized(start):
+            return self._live_ticks(contract, start)
+
+        key = (contract, start)
+        cols = self.sessions.get(key)
+        if cols is not None:
+            self.sessions.move_to_end(key)
+            self.counters["session_hits"] += 1
+            return cols
+
+        path = self._cache_path(contract, start)
+        if path.exists():
+            with np.load(path) as data:
+                cols = {name: data[name] for name in TICK_COLUMNS}
+            self.counters["disk_loads"] += 1
+        else:
+            scanned = self._scan(contract, start)
+            cols = {name: scanned[name] for name in TICK_COLUMNS}
+            if self.covered_until(contract) < start + SESSION_SECONDS:
+                return cols  # Recorder has not reached the close yet (a backfill may follow): don't freeze
+            try:
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                np.savez(path, **cols)
+            except OSError as e:
+                print(f"⚠️ Could not cache tick session {start}: {e}")
+
+        self.sessions[key] = cols
+        while len(self.sessions) > self.max_sessions:
+            self.sessions.popitem(last=False)
+        return cols
+
+    def _live_ticks(self, contract: Optional[str], start: int) -> Dict[str, np.ndarray]:
+        """Live session columns, extended with rows inserted since the last scan."""
+        cached = self.live.get(contract)
+        if cached is None or cached[0] != start:
+            scanned = self._scan(contract, start)
+        else:
+            _, cols, last_id = cached
+            new = self._scan(contract, start, after_id=last_id)
+            if len(new["id"]) == 0:
+                return cols
+            scanned = {name: np.concatenate([cols[name], new[name]]) for name in cols}
+            if len(scanned["ts"]) > 1 and (np.diff(scanned["ts"]) < 0).any():
+                order = np.argsort(scanned["ts"], kind="stable")
+                scanned = {name: values[order] for name, values in scanned.items()}
+        last_id = int(scanned["id"].max()) if len(scanned["id"]) else (cached[2] if cached else 0)
+        self.live[contract] = (start, scanned, last_id)
+        return scanned
+
+    def _session_histogram(self, contract: Optional[str], start: int, tick_size: float,
+                           lo_ms: int, hi_ms: int) -> LevelHistogram:
+        """Histogram of one session clipped to [lo_ms, hi_ms)."""
+        full = lo_ms <= start * 1000 and hi_ms >= (start + SESSION_SECONDS) * 1000
+        key = (contract, start, round(tick_size, 6))
+        if full and self._finalized(start):
+            cached = self.histograms.get(key)
+            if cached is not None:
+                self.histograms.move_to_end(key)
+                self.counters["histogram_hits"] += 1
+                return cached
+
+        cols = self._session_ticks(contract, start)
+        if full:
+            i0, i1 = 0, len(cols["ts"])
+        else:
+            i0, i1 = np.searchsorted(cols["ts"], [lo_ms, hi_ms])
+        hist = LevelHistogram.from_ticks(cols["price"][i0:i1], cols["size"][i0:i1], cols["buy"][i0:i1], tick_size)
+
+        if full and self._finalized(start) and (contract, start) in self.sessions:
+            self.histograms[key] = hist
+            while len(self.histograms) > self.max_sessions * 4:
+                self.histograms.popitem(last=False)
+        return hist
+
+    # ==================== PROFILE ====================
+
+    def histogram(self, start, end=None, tick_size: float = 0.10,
+                  contract: Optional[str] = None) -> LevelHistogram:
+        """Merged level histogram of trades in [start, end) (end defaults to now)."""
+        lo, hi = tick_epoch(start), tick_epoch(end)
+        lo_ms, hi_ms = int(lo * 1000), int(hi * 1000)
+        parts = []
+        with self.lock:
+            session = session_start(lo)
+            while session < hi:
+                parts.append(self._session_histogram(contract, session, tick_size, lo_ms, hi_ms))
+                session += SESSION_SECONDS
+        return LevelHistogram.merge(parts)
+
+    def covered_until(self, contract: Optional[str] = None) -> float:
+        """Epoch of the newest recorded tick (0 when none): sessions closing before it are complete."""
+        last = self.recorder.get_last_timestamp(contract)
+        return tick_epoch(last) if last else 0
+
+    def build_profile(self, start, end=None, tick_size: float = 0.10, contract: Optional[str] = None,
+                      value_area_pct: float = 0.70, columnar: bool = False) -> Dict[str, Any]:
+        """POC/VAH/VAL/VWAP and histogram from actual trades (real aggressor sides)."""
+        hist = self.histogram(start, end, tick_size, contract)
+        return profile_from_histogram(hist, tick_size, value_area_pct, columnar)
+
+    def invalidate(self, start=None, contract: Optional[str] = None):
+        """Drop cached sessions (all, or the one containing `start`), e.g. after a backfill."""
+        with self.lock:
+            if start is None:
+                self.sessions.clear()
+                self.histograms.clear()
+                self.live.clear()
+                targets = list(self.cache_dir.glob("*.npz")) if self.cache_dir.exists() else []
+            else:
+                session = session_start(tick_epoch(start))
+                self.sessions.pop((contract, session), None)
+                for key in [k for k in self.histograms if k[:2] == (contract, session)]:
+                    del self.histograms[key]
+                targets = [self._cache_path(contract, session)]
+            for path in targets:
+                path.unlink(missing_ok=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.counters,
+            "sessions_cached": len(self.sessions),
+            "histograms_cached": len(self.histograms),
+            "live_ticks": {str(c): len(cols["ts"]) for c, (_, cols, _) in self.live.items()},
+        }
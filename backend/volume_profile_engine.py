@@ -11,7 +11,18 @@ Calculates:
 """
 
 from typing import List, Dict, Any
-from collections import defaultdict
+
+import numpy as np
+
+def _round2(values: np.ndarray) -> List[float]:
+    """round(v, 2) for an array: vector rounding, with near-midpoint values redone by round()."""
+    scaled = values * 100
+    rounded = np.round(scaled) / 100
+    ambiguous = np.flatnonzero(np.abs(np.abs(scaled - np.trunc(scaled)) - 0.5) < 1e-6)
+    out = rounded.tolist()
+    for i in ambiguous.tolist():
+        out[i] = round(float(values[i]), 2)
+    return out
 
 
 class VolumeProfileEngine:
@@ -26,128 +37,122 @@ class VolumeProfileEngine:
         self.tick_size = tick_size
         self.volume_by_price = {}
         
-    def build_profile(self, candles: List[Dict[str, Any]], value_area_pct: float = 0.70) -> Dict[str, Any]:
+    def build_profile(self, candles: List[Dict[str, Any]], value_area_pct: float = 0.70,
+                      columnar: bool = False) -> Dict[str, Any]:
         """
         Build volume profile from OHLC candles
         
+        Each candle's volume is spread evenly over the ticks of its range
+        (bullish candles count as buy volume, bearish as sell). The tick
+        walk runs for all candles at once and levels are summed with
+        bincount, so results are identical to a candle-by-candle loop.
+        
         Args:
             candles: List of OHLC candle dictionaries with keys: open, high, low, close, volume
             value_area_pct: Percentage for value area calculation (default 0.70 = 70%)
+            columnar: Return the histogram as {field: [values...]} instead of one dict per level
             
         Returns:
             Dictionary containing POC, VAH, VAL, VWAP, and histogram data
         """
         if not candles:
-            return {
-                "POC": 0,
-                "VAH": 0,
-                "VAL": 0,
-                "VWAP": 0,
-                "histogram": [],
-                "total_volume": 0,
-                "total_buy_volume": 0,
-                "total_sell_volume": 0
-            }
-        
-        volume_by_price = defaultdict(float)
-        buy_volume_by_price = defaultdict(float)
-        sell_volume_by_price = defaultdict(float)
-        total_volume = 0
-        total_buy_volume = 0
-        total_sell_volume = 0
-        vwap_numerator = 0
-        
-        # Distribute volume across price range of each candle
-        for candle in candles:
-            high = candle.get("high", candle.get("close", 0))
-            low = candle.get("low", candle.get("close", 0))
-            close = candle.get("close", 0)
-            open_price = candle.get("open", close)
-            volume = candle.get("volume", 0)
-            
-            if volume == 0 or high == 0:
-                continue
-            
-            # Determine if bullish (buy) or bearish (sell) candle
-            is_bullish = close >= open_price
-            
-            # Calculate typical price for VWAP
-            typical_price = (high + low + close) / 3
-            vwap_numerator += typical_price * volume
-            total_volume += volume
-            
-            if is_bullish:
-                total_buy_volume += volume
-            else:
-                total_sell_volume += volume
-            
-            # Distribute volume across price range using tick size
-            price_range = high - low
-            if price_range == 0:
-                # Single price point
-                price_level = self._round_to_tick(close)
-                volume_by_price[price_level] += volume
-                if is_bullish:
-                    buy_volume_by_price[price_level] += volume
-                else:
-                    sell_volume_by_price[price_level] += volume
+            return self._empty_profile()
+        
+        raw_volume = [c.get("volume", 0) for c in candles]
+        high, low, close, open_price = np.array([
+            (c.get("high", c.get("close", 0)), c.get("low", c.get("close", 0)),
+             c.get("close", 0), c.get("open", c.get("close", 0)))
+            for c in candles
+        ], dtype=float).T
+        volume = np.array(raw_volume, dtype=float)
+        
+        keep = (volume != 0) & (high != 0)
+        if not keep.any():
+            return self._empty_profile()
+        high, low, close, open_price, volume = high[keep], low[keep], close[keep], open_price[keep], volume[keep]
+        
+        # Determine if bullish (buy) or bearish (sell) candle
+        is_bullish = close >= open_price
+        
+        # Running (not pairwise) sums keep totals identical to a per-candle loop
+        typical_price = (high + low + close) / 3
+        vwap_numerator = float(np.cumsum(typical_price * volume)[-1])
+        total_volume = total_buy_volume = total_sell_volume = 0
+        for v, bull in zip((v for v, k in zip(raw_volume, keep) if k), is_bullish.tolist()):
+            total_volume += v
+            if bull:
+                total_buy_volume += v
             else:
-                # Distribute volume proportionally across range
-                num_ticks = max(1, int(price_range / self.tick_size))
-                volume_per_tick = volume / num_ticks
-                
-                current_price = low
-                while current_price <= high:
-                    price_level = self._round_to_tick(current_price)
-                    volume_by_price[price_level] += volume_per_tick
-                    if is_bullish:
-                        buy_volume_by_price[price_level] += volume_per_tick
-                    else:
-                        sell_volume_by_price[price_level] += volume_per_tick
-                    current_price += self.tick_size
-        
-        if not volume_by_price or total_volume == 0:
-            return {
-                "POC": 0,
-                "VAH": 0,
-                "VAL": 0,
-                "VWAP": 0,
-                "histogram": [],
-                "total_volume": 0,
-                "total_buy_volume": 0,
-                "total_sell_volume": 0
-            }
-        
-        # Calculate VWAP
-        vwap = vwap_numerator / total_volume if total_volume > 0 else 0
+                total_sell_volume += v
+        
+        if total_volume == 0:
+            return self._empty_profile()
         
-        # Find POC (Point of Control) - price with highest volume
-        poc = max(volume_by_price.items(), key=lambda x: x[1])[0]
+        # Per-level sums over the walked cells; bincount adds in cell (candle)
+        # order, so every float sum matches the per-candle loop bit for bit
+        levels, shares, buy_shares = self._distribute(high, low, close, volume, is_bullish)
+        if not len(levels):
+            return self._empty_profile()
+        base = int(levels.min())
+        offsets = levels - base
+        span = int(offsets.max()) + 1
+        volume_at = np.bincount(offsets, weights=shares, minlength=span)
+        buy_at = np.bincount(offsets, weights=buy_shares, minlength=span)
+        sell_at = np.bincount(offsets, weights=shares - buy_shares, minlength=span)
+        touched = np.flatnonzero(np.bincount(offsets, minlength=span))
+        vols = volume_at[touched]
+        prices = (touched + base) * self.tick_size
         
-        # Calculate Value Area (70% of volume around POC)
-        sorted_prices = sorted(volume_by_price.keys())
-        value_area_volume = total_volume * value_area_pct
+        # Find POC (Point of Control) - highest volume, earliest-touched level on ties
+        max_volume = vols.max()
+        tied = np.flatnonzero(vols == max_volume)
+        if len(tied) > 1:
+            first_seen = np.full(span, len(offsets))
+            np.minimum.at(first_seen, offsets, np.arange(len(offsets)))
+            poc_index = int(tied[np.argmin(first_seen[touched[tied]])])
+        else:
+            poc_index = int(tied[0])
+        
+        vwap = vwap_numerator / total_volume if total_volume > 0 else 0
+        return self._assemble(prices, vols, buy_at[touched], sell_at[touched], poc_index, vwap,
+                              total_volume, total_buy_volume, total_sell_volume, value_area_pct, columnar)
+    
+    def _assemble(self, prices: np.ndarray, vols: np.ndarray, buy_vols: np.ndarray, sell_vols: np.ndarray,
+                  poc_index: int, vwap: float, total_volume, total_buy_volume, total_sell_volume,
+                  value_area_pct: float, columnar: bool) -> Dict[str, Any]:
+        """Profile dict from the touched levels (ascending price) and running totals."""
+        max_volume = vols[poc_index]
         
         # Start from POC and expand outward to capture value_area_pct of volume
-        vah, val = self._calculate_value_area(volume_by_price, poc, value_area_volume)
+        price_list = prices.tolist()
+        vol_list = vols.tolist()
+        vah_index, val_index = self._value_area_indices(vol_list, poc_index, total_volume * value_area_pct)
+        poc, vah, val = price_list[poc_index], price_list[vah_index], price_list[val_index]
         
         # Build histogram for frontend visualization
-        histogram = []
-        max_volume = max(volume_by_price.values())
-        
-        for price in sorted(volume_by_price.keys()):
-            volume = volume_by_price[price]
-            buy_vol = buy_volume_by_price.get(price, 0)
-            sell_vol = sell_volume_by_price.get(price, 0)
-            histogram.append({
-                "price": round(price, 2),
-                "volume": int(volume),
-                "buy_volume": int(buy_vol),
-                "sell_volume": int(sell_vol),
-                "volume_pct": round((volume / max_volume) * 100, 2),
-                "is_poc": price == poc,
-                "in_value_area": val <= price <= vah
-            })
+        price_col = _round2(prices)
+        volume_pct = _round2(vols / max_volume * 100)
+        in_value_area = np.zeros(len(price_list), dtype=bool)
+        in_value_area[val_index:vah_index + 1] = True
+        is_poc = np.zeros(len(price_list), dtype=bool)
+        is_poc[poc_index] = True
+        columns = {
+            "price": price_col,
+            "volume": vols.astype(np.int64).tolist(),
+            "buy_volume": buy_vols.astype(np.int64).tolist(),
+            "sell_volume": sell_vols.astype(np.int64).tolist(),
+            "volume_pct": volume_pct,
+            "is_poc": is_poc.tolist(),
+            "in_value_area": in_value_area.tolist(),
+        }
+        if columnar:
+            histogram = columns
+        else:
+            histogram = [
+                {"price": p, "volume": v, "buy_volume": b, "sell_volume": s,
+                 "volume_pct": pct, "is_poc": poc_flag, "in_value_area": va_flag}
+                for p, v, b, s, pct, poc_flag, va_flag in zip(*columns.values())
+            ]
         
         self.profile = {
             "POC": round(poc, 2),
@@ -161,50 +166,112 @@ class VolumeProfileEngine:
             "value_area_pct": int(value_area_pct * 100)
         }
         
-        self.volume_by_price = dict(volume_by_price)
+        self.volume_by_price = dict(zip(price_list, vol_list))
         
         return self.profile
     
-    def _round_to_tick(self, price: float) -> float:
-        """Round price to nearest tick size"""
-        return round(price / self.tick_size) * self.tick_size
-    
-    def _calculate_value_area(self, volume_by_price: Dict[float, float], poc: float, target_volume: float) -> tuple:
+    def _distribute(self, high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                    volume: np.ndarray, is_bullish: np.ndarray):
         """
-        Calculate Value Area High (VAH) and Value Area Low (VAL)
+        Expand candles into (tick level, volume share, buy share) cells, in candle order.
         
-        Expands from POC outward until capturing target_volume
+        Same cells as the per-candle loop: a flat candle puts all its volume
+        on round(close / tick); a ranged candle gives volume / max(1,
+        int(range / tick)) to round(price / tick) for price = low, low + tick,
+        ... while price <= high. The running price is a float sum, so levels
+        come from the same sequential sums (a row-wise cumsum) rather than
+        from integer tick indices: that keeps the exact levels the loop
+        visits, float drift included. The buy share is the volume share on
+        bullish candles and 0.0 otherwise, which leaves every sum unchanged.
         """
-        accumulated_volume = volume_by_price[poc]
-        val = vah = poc
+        tick = self.tick_size
+        price_range = high - low
+        flat = price_range == 0
+        share = np.where(flat, volume, volume / np.maximum(1, np.trunc(price_range / tick)))
+        # A flat candle is a one-step walk from close
+        start = np.where(flat, close, low)
+        stop = np.where(flat, close, high)
+        width = np.floor(np.maximum(stop - start, 0) / tick).astype(np.int64) + 2
         
-        sorted_prices = sorted(volume_by_price.keys())
-        poc_index = sorted_prices.index(poc)
+        # Rows of [start, tick, tick, ...] cumsum'd along the row: add.accumulate
+        # adds sequentially, so row k holds exactly the loop's k-th price.
+        # Rows are cut into runs of consecutive candles whose padding stays
+        # within twice their cells, so the runs concatenate in candle order.
+        counts = np.empty(len(high), dtype=np.int64)
+        levels = []
+        for first, last in self._walk_runs(width):
+            run = slice(first, last)
+            walk = np.full((last - first, int(width[run].max())), tick)
+            walk[:, 0] = start[run]
+            walk = np.cumsum(walk, axis=1)
+            visited = walk <= stop[run, None]  # A prefix of each row: prices only increase
+            counts[run] = visited.sum(axis=1)
+            levels.append(np.rint(walk[visited] / tick).astype(np.int64))
+        levels = np.concatenate(levels) if levels else np.empty(0, dtype=np.int64)
+        return levels, np.repeat(share, counts), np.repeat(share * is_bullish, counts)
+    
+    @staticmethod
+    def _walk_runs(width: np.ndarray):
+        """Split candles into consecutive (first, last) runs with bounded padding."""
+        if len(width) * int(width.max(initial=0)) <= 2 * int(width.sum()):
+            return [(0, len(width))] if len(width) else []
+        widths = width.tolist()
+        runs = []
+        first, widest, cells = 0, 0, 0
+        for i, w in enumerate(widths):
+            if i > first and (i - first + 1) * max(widest, w) > 2 * (cells + w):
+                runs.append((first, i))
+                first, widest, cells = i, 0, 0
+            widest = max(widest, w)
+            cells += w
+        runs.append((first, len(widths)))
+        return runs
+    
+    def _empty_profile(self) -> Dict[str, Any]:
+        return {
+            "POC": 0,
+            "VAH": 0,
+            "VAL": 0,
+            "VWAP": 0,
+            "histogram": [],
+            "total_volume": 0,
+            "total_buy_volume": 0,
+            "total_sell_volume": 0
+        }
+    
+    def _value_area_indices(self, volumes: List[float], poc_index: int, target_volume: float) -> tuple:
+        """
+        Value area as (upper, lower) indices into the sorted level volumes
         
-        lower_index = poc_index - 1
-        upper_index = poc_index + 1
+        Expands from POC outward, taking the heavier neighbour each step,
+        until target_volume is captured.
+        """
+        accumulated_volume = volumes[poc_index]
+        lower_index = upper_index = poc_index
+        count = len(volumes)
         
-        # Expand outward from POC
         while accumulated_volume < target_volume:
-            lower_vol = volume_by_price.get(sorted_prices[lower_index], 0) if lower_index >= 0 else 0
-            upper_vol = volume_by_price.get(sorted_prices[upper_index], 0) if upper_index < len(sorted_prices) else 0
+            lower_vol = volumes[lower_index - 1] if lower_index > 0 else 0
+            upper_vol = volumes[upper_index + 1] if upper_index + 1 < count else 0
             
             if lower_vol == 0 and upper_vol == 0:
                 break
             
             # Add the side with more volume
-            if lower_vol >= upper_vol and lower_index >= 0:
+            if lower_vol >= upper_vol and lower_index > 0:
                 accumulated_volume += lower_vol
-                val = sorted_prices[lower_index]
                 lower_index -= 1
-            elif upper_index < len(sorted_prices):
+            elif upper_index + 1 < count:
                 accumulated_volume += upper_vol
-                vah = sorted_prices[upper_index]
                 upper_index += 1
             else:
                 break
         
-        return vah, val
+        return upper_index, lower_index
+    
+    def _round_to_tick(self, price: float) -> float:
+        """Round price to nearest tick size"""
+        return round(price / self.tick_size) * self.tick_size
     
     def get_poc(self) -> float:
         """Get Point of Control (POC)"""
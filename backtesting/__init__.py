@@ -9,7 +9,7 @@ from backtesting.replay_engine import ReplayEngine
 from backtesting.ai_snapshot import AISnapshotStore
 from backtesting.trade_outcome import TradeOutcomeAnalyzer
 from backtesting.edge_metrics import EdgeMetrics
-from backtesting.replay_runner import run_replay, replay_report
+from backtesting.replay_runner import run_replay, run_streaming_replay, replay_report
 from backtesting.replay_config import ReplayConfig, get_test_scenario
 from backtesting.session_engine import SessionEngine
 from backtesting.news_engine import NewsEngine
@@ -20,7 +20,11 @@ from backtesting.timeline_builder import TimelineBuilder
 from backtesting.chart_packet_builder import ChartPacketBuilder
 from backtesting.signal_lifecycle import SignalLifecycle
 from backtesting.replay_cursor import ReplayCursor
+from backtesting.timeline_pages import TimelinePages
 from backtesting.heatmap_engine import HeatmapEngine
+from backtesting.replay_columns import ReplayColumns
+from backtesting.parallel_replay import run_parallel_replay, split_shards
+from backtesting.parameter_sweep import ParameterSweep
 
 __all__ = [
     "ReplayEngine",
@@ -28,6 +32,7 @@ __all__ = [
     "TradeOutcomeAnalyzer",
     "EdgeMetrics",
     "run_replay",
+    "run_streaming_replay",
     "replay_report",
     "ReplayConfig",
     "get_test_scenario",
@@ -40,5 +45,10 @@ __all__ = [
     "ChartPacketBuilder",
     "SignalLifecycle",
     "ReplayCursor",
+    "TimelinePages",
     "HeatmapEngine",
+    "ReplayColumns",
+    "run_parallel_replay",
+    "split_shards",
+    "ParameterSweep",
 ]
@@ -7,6 +7,8 @@ This is the gold — allows full debugging and analysis
 import json
 from datetime import datetime
 
+from backtesting.spill_file import SpillFile
+
 
 class AISnapshotStore:
     """
@@ -14,10 +16,22 @@ class AISnapshotStore:
     Later: replay visually, debug decisions, learn patterns.
     """
 
-    def __init__(self):
-        self.history = []
+    def __init__(self, spill_path=None, tail=1000):
+        """
+        Args:
+            spill_path: Optional JSONL file; snapshots stream to disk and
+                        self.history keeps only the last `tail` snapshots
+            tail: In-memory snapshots kept when spilling
+        """
+        self.spill = SpillFile(spill_path, tail) if spill_path else None
+        self.history = self.spill.tail if self.spill else []
         self.signal_count = 0
         self.skip_count = 0
+        # Running confidence stats (confidence_distribution)
+        self.confidence_sum = 0.0
+        self.confidence_min = None
+        self.confidence_max = None
+        self.above_70 = 0
 
     def store(self, candle, context, decision):
         """
@@ -45,48 +59,66 @@ class AISnapshotStore:
         else:
             self.skip_count += 1
 
-        self.history.append(snapshot)
+        confidence = snapshot["decision"].get("confidence", 0.0)
+        self.confidence_sum += confidence
+        if self.confidence_min is None or confidence < self.confidence_min:
+            self.confidence_min = confidence
+        if self.confidence_max is None or confidence > self.confidence_max:
+            self.confidence_max = confidence
+        self.above_70 += confidence >= 0.70
+
+        if self.spill:
+            self.spill.append(snapshot)
+        else:
+            self.history.append(snapshot)
+        return snapshot
 
     def all(self):
-        """Return all snapshots in order"""
+        """Return all snapshots in order (only the tail when spilling)"""
         return self.history
 
+    def entries(self):
+        """Iterate every snapshot (streamed back from disk when spilling)"""
+        return iter(self.spill) if self.spill else iter(self.history)
+
     def signals_only(self):
         """Return only candles where AI generated a signal"""
-        return [s for s in self.history if s["decision"]["action"] != "WAIT"]
+        return [s for s in self.entries() if s["decision"]["action"] != "WAIT"]
 
     def count(self):
         """Return {total_candles, signals, skips}"""
+        total = self.signal_count + self.skip_count
         return {
-            "total_candles": len(self.history),
+            "total_candles": total,
             "signals": self.signal_count,
             "skips": self.skip_count,
             "signal_rate": (
-                self.signal_count / len(self.history)
-                if len(self.history) > 0
+                self.signal_count / total
+                if total > 0
                 else 0.0
             ),
         }
 
     def confidence_distribution(self):
         """Return confidence stats"""
-        confidences = [
-            s["decision"].get("confidence", 0.0) for s in self.history
-        ]
-        if not confidences:
+        total = self.signal_count + self.skip_count
+        if not total:
             return {}
 
         return {
-            "min": min(confidences),
-            "max": max(confidences),
-            "avg": sum(confidences) / len(confidences),
-            "total_above_70": sum(1 for c in confidences if c >= 0.70),
+            "min": self.confidence_min,
+            "max": self.confidence_max,
+            "avg": self.confidence_sum / total,
+            "total_above_70": self.above_70,
         }
 
     def export_json(self, filepath):
         """Export all snapshots to JSON for analysis"""
         with open(filepath, "w") as f:
-            json.dump(self.history, f, indent=2, default=str)
+            if self.spill:
+                self.spill.write_json_array(f)
+            else:
+                json.dump(self.history, f, indent=2, default=str)
 
     def export_signals_csv(self, filepath):
         """Export signals only to CSV for quick review"""
@@ -9,13 +9,24 @@ This is the interface between backtesting (internal) and UI (future).
 - Confidence-tagged (how much to trust it)
 """
 
+from backtesting.spill_file import SpillFile
+
 
 class ChartPacketBuilder:
     """Converts internal replay state → clean chart data packets."""
     
-    def __init__(self):
-        """Initialize packet builder."""
-        self.packets = []
+    def __init__(self, spill_path=None, tail=1000):
+        """
+        Initialize packet builder.
+        
+        Args:
+            spill_path: Optional JSONL file; packets stream to disk and
+                        self.packets keeps only the last `tail` packets
+            tail: In-memory packets kept when spilling
+        """
+        self.spill = SpillFile(spill_path, tail) if spill_path else None
+        self.packets = self.spill.tail if self.spill else []
+        self.signals = 0
     
     def build(self, candle, context, decision, explanation=None):
         """
@@ -85,47 +96,59 @@ class ChartPacketBuilder:
             The packet that was stored
         """
         packet = self.build(candle, context, decision, explanation)
-        self.packets.append(packet)
+        if self.spill:
+            self.spill.append(packet)
+        else:
+            self.packets.append(packet)
+        if packet["signal"] is not None:
+            self.signals += 1
         return packet
     
     def export(self):
-        """Return all packets as list."""
+        """Return all packets as list (only the tail when spilling)."""
         return self.packets
     
+    def entries(self):
+        """Iterate every packet (streamed back from disk when spilling)."""
+        return iter(self.spill) if self.spill else iter(self.packets)
+    
     def export_json(self, filepath):
         """Save all packets to JSON file."""
         import json
         with open(filepath, "w") as f:
-            json.dump(self.packets, f, indent=2)
+            if self.spill:
+                self.spill.write_json_array(f)
+            else:
+                json.dump(self.packets, f, indent=2)
         return filepath
     
     def get_signals(self):
         """Get only packets with signals (buys/sells)."""
-        return [p for p in self.packets if p["signal"] is not None]
+        return [p for p in self.entries() if p["signal"] is not None]
     
     def get_by_session(self, session_name):
         """Get all packets from specific session."""
-        return [p for p in self.packets if p["session"] == session_name]
+        return [p for p in self.entries() if p["session"] == session_name]
     
     def get_high_confidence(self, min_confidence=0.70):
         """Get packets with confidence above threshold."""
         return [
-            p for p in self.packets 
+            p for p in self.entries() 
             if p["confidence"] >= min_confidence
         ]
     
     def get_killzone_packets(self):
         """Get packets marked as killzone."""
-        return [p for p in self.packets if p["killzone"]]
+        return [p for p in self.entries() if p["killzone"]]
     
     def get_news_packets(self):
         """Get packets with active news."""
-        return [p for p in self.packets if p["news_active"]]
+        return [p for p in self.entries() if p["news_active"]]
     
     def length(self):
         """Number of packets recorded."""
-        return len(self.packets)
+        return len(self.spill) if self.spill else len(self.packets)
     
     def signal_count(self):
         """Number of signal packets (trades)."""
-        return len(self.get_signals())
+        return self.signals
@@ -2,8 +2,36 @@
 STEP 23: Edge Metrics
 Institutional-grade quality metrics
 Timing accuracy, liquidity respect, false signal rate
+
+Metrics are kept as running accumulators (sums, counts, a timing
+histogram and a compact worked/failed sequence) rather than lists of
+snapshots and outcomes, so shards of a parallel replay merge exactly.
+In streaming mode the worked/failed sequence is spilled to disk too.
+Float sums are kept as exact partials (as math.fsum does), so the merge
+order never changes a rounded figure.
 """
 
+import math
+from collections import Counter
+from itertools import islice
+
+from backtesting.spill_file import SpillFile
+
+
+def _add_exact(partials, x):
+    """Add x to a list of non-overlapping partial sums without rounding error."""
+    i = 0
+    for y in partials:
+        if abs(x) < abs(y):
+            x, y = y, x
+        hi = x + y
+        lo = y - (hi - x)
+        if lo:
+            partials[i] = lo
+            i += 1
+        x = hi
+    partials[i:] = [x]
+
 
 class EdgeMetrics:
     """
@@ -12,34 +40,115 @@ class EdgeMetrics:
     Timing precision. Edge clarity. Risk management.
     """
 
-    def __init__(self):
-        self.outcomes = []
-        self.snapshots = []
+    def __init__(self, spill_path=None):
+        """
+        Args:
+            spill_path: Optional JSONL file for the worked/failed sequence
+                        (streaming mode); kept in memory otherwise
+        """
+        self.recorded = 0  # Snapshots recorded (outcome may be None)
+        self.valid_outcomes = 0
+        self.worked = 0
+        self.trapped = 0
+        self.timing_histogram = Counter()  # timing_bars -> count
+        self.timing_sum = 0
+        self.high_confidence = 0
+        self.high_conf_failed = 0
+        self.heat_partials = []
+        self.heat_max = None
+        self.heat_gt_10 = 0
+        self.ratio_partials = []
+        self.clean_holds = 0
+        # 1 per recorded outcome, in order (decay check)
+        self.worked_sequence = SpillFile(spill_path, tail=0) if spill_path else bytearray()
 
     def record(self, snapshot, outcome):
         """Record a signal + its outcome"""
-        self.snapshots.append(snapshot)
-        self.outcomes.append(outcome)
+        self.recorded += 1
+        worked = bool(outcome and outcome.get("signal_worked"))
+        self.worked_sequence.append(int(worked))
+
+        if snapshot.get("decision", {}).get("confidence", 0) >= 0.70:
+            self.high_confidence += 1
+            if outcome and not outcome.get("signal_worked"):
+                self.high_conf_failed += 1
+
+        if not outcome:
+            return
+        self.valid_outcomes += 1
+        self.worked += worked
+        self.trapped += bool(outcome.get("was_trapped"))
+
+        timing = outcome["timing_bars"]
+        self.timing_histogram[timing] += 1
+        self.timing_sum += timing
+
+        heat = outcome["heat_pips"]
+        _add_exact(self.heat_partials, heat)
+        self.heat_max = heat if self.heat_max is None else max(self.heat_max, heat)
+        self.heat_gt_10 += heat > 10
+
+        ratio = outcome["reaction_pips"] / (heat + 0.1)
+        _add_exact(self.ratio_partials, ratio)
+        self.clean_holds += ratio >= 2.0
+
+    def merge(self, other):
+        """Fold in another EdgeMetrics (e.g. the next replay shard, in time order)."""
+        self.recorded += other.recorded
+        self.valid_outcomes += other.valid_outcomes
+        self.worked += other.worked
+        self.trapped += other.trapped
+        self.timing_histogram.update(other.timing_histogram)
+        self.timing_sum += other.timing_sum
+        self.high_confidence += other.high_confidence
+        self.high_conf_failed += other.high_conf_failed
+        for value in other.heat_partials:
+            _add_exact(self.heat_partials, value)
+        if other.heat_max is not None:
+            self.heat_max = other.heat_max if self.heat_max is None else max(self.heat_max, other.heat_max)
+        self.heat_gt_10 += other.heat_gt_10
+        for value in other.ratio_partials:
+            _add_exact(self.ratio_partials, value)
+        self.clean_holds += other.clean_holds
+        if isinstance(self.worked_sequence, bytearray) and isinstance(other.worked_sequence, bytearray):
+            self.worked_sequence += other.worked_sequence
+        else:
+            for worked in other.worked_sequence:
+                self.worked_sequence.append(worked)
+        return self
+
+    def close(self):
+        """Close the spilled worked/failed sequence (streaming mode)."""
+        if isinstance(self.worked_sequence, SpillFile):
+            self.worked_sequence.close()
 
     def timing_accuracy(self):
         """
         Did reversal happen within expected bars?
         Professional metric: consistency of reaction timing
         """
-        if not self.outcomes:
+        if not self.recorded:
             return None
 
-        timings = [o["timing_bars"] for o in self.outcomes if o]
-        if not timings:
+        count = self.valid_outcomes
+        if not count:
             return None
 
+        # Median = sorted(timings)[count // 2], read off the histogram
+        position, median = count // 2, None
+        for value in sorted(self.timing_histogram):
+            position -= self.timing_histogram[value]
+            if position < 0:
+                median = value
+                break
+
         return {
-            "avg_bars_to_reaction": round(sum(timings) / len(timings), 1),
-            "median_bars": sorted(timings)[len(timings) // 2],
-            "fast_reactions": sum(1 for t in timings if t <= 5),
-            "slow_reactions": sum(1 for t in timings if t > 15),
+            "avg_bars_to_reaction": round(self.timing_sum / count, 1),
+            "median_bars": median,
+            "fast_reactions": sum(n for t, n in self.timing_histogram.items() if t <= 5),
+            "slow_reactions": sum(n for t, n in self.timing_histogram.items() if t > 15),
             "consistency": "GOOD"
-            if len(set(timings)) < len(timings) / 3
+            if len(self.timing_histogram) < count / 3
             else "VARIABLE",
         }
 
@@ -48,26 +157,14 @@ class EdgeMetrics:
         Did price react at liquidity zones?
         Did iceberg absorption match?
         """
-        outcomes_with_reaction = [
-            o for o in self.outcomes if o and o.get("signal_worked")
-        ]
-        if not self.outcomes:
+        if not self.recorded:
             return None
 
-        success_rate = (
-            len(outcomes_with_reaction) / len(self.outcomes)
-        )
         return {
-            "signals_with_favorable_reaction": len(outcomes_with_reaction),
-            "liquidity_respect_rate": round(success_rate, 2),
-            "trapped_signals": sum(
-                1 for o in self.outcomes if o and o.get("was_trapped")
-            ),
-            "trap_rate": round(
-                sum(1 for o in self.outcomes if o and o.get("was_trapped"))
-                / len(self.outcomes),
-                2,
-            ),
+            "signals_with_favorable_reaction": self.worked,
+            "liquidity_respect_rate": round(self.worked / self.recorded, 2),
+            "trapped_signals": self.trapped,
+            "trap_rate": round(self.trapped / self.recorded, 2),
         }
 
     def false_signal_rate(self):
@@ -75,30 +172,14 @@ class EdgeMetrics:
         How often confidence >= 70% but signal failed?
         Professional risk metric
         """
-        high_confidence = [
-            s for s in self.snapshots
-            if s.get("decision", {}).get("confidence", 0) >= 0.70
-        ]
-        if not high_confidence:
+        if not self.high_confidence:
             return None
 
-        # Match with outcomes
-        failed_high_confidence = 0
-        for s, o in zip(self.snapshots, self.outcomes):
-            if (
-                s.get("decision", {}).get("confidence", 0) >= 0.70
-                and o
-                and not o.get("signal_worked")
-            ):
-                failed_high_confidence += 1
-
         return {
-            "high_confidence_signals": len(high_confidence),
-            "high_conf_failed": failed_high_confidence,
+            "high_confidence_signals": self.high_confidence,
+            "high_conf_failed": self.high_conf_failed,
             "false_signal_rate": round(
-                failed_high_confidence / len(high_confidence)
-                if high_confidence
-                else 0,
+                self.high_conf_failed / self.high_confidence,
                 2,
             ),
         }
@@ -108,20 +189,14 @@ class EdgeMetrics:
         Worst drawdown before target?
         Maximum adverse excursion metric
         """
-        if not self.outcomes:
-            return None
-
-        heats = [o["heat_pips"] for o in self.outcomes if o]
-        if not heats:
+        if not self.recorded or not self.valid_outcomes:
             return None
 
         return {
-            "max_heat": round(max(heats), 2),
-            "avg_heat": round(sum(heats) / len(heats), 2),
-            "signals_with_heat_gt_10": sum(
-                1 for h in heats if h > 10
-            ),
-            "max_heat_rate": round(max(heats) / 10, 2),  # In 10-pip units
+            "max_heat": round(self.heat_max, 2),
+            "avg_heat": round(math.fsum(self.heat_partials) / self.valid_outcomes, 2),
+            "signals_with_heat_gt_10": self.heat_gt_10,
+            "max_heat_rate": round(self.heat_max / 10, 2),  # In 10-pip units
         }
 
     def hold_quality(self):
@@ -129,27 +204,16 @@ class EdgeMetrics:
         How clean was the move?
         Reaction vs heat ratio (R/R-like metric)
         """
-        if not self.outcomes:
-            return None
-
-        outcomes_valid = [o for o in self.outcomes if o]
-        if not outcomes_valid:
+        if not self.recorded or not self.valid_outcomes:
             return None
 
-        ratios = [
-            o["reaction_pips"] / (o["heat_pips"] + 0.1)
-            for o in outcomes_valid
-        ]
-
         return {
             "avg_reaction_to_heat_ratio": round(
-                sum(ratios) / len(ratios), 2
+                math.fsum(self.ratio_partials) / self.valid_outcomes, 2
             ),
-            "clean_holds": sum(
-                1 for r in ratios if r >= 2.0
-            ),  # 2:1 or better
+            "clean_holds": self.clean_holds,  # 2:1 or better
             "clean_hold_rate": round(
-                sum(1 for r in ratios if r >= 2.0) / len(ratios), 2
+                self.clean_holds / self.valid_outcomes, 2
             ),
         }
 
@@ -158,32 +222,25 @@ class EdgeMetrics:
         Did performance degrade in chop?
         Session-specific quality tracking
         """
-        if not self.outcomes:
+        if not self.recorded:
             return None
 
         if not session_data:
-            # Simple time-based decay check
-            first_half = self.outcomes[: len(self.outcomes) // 2]
-            second_half = self.outcomes[len(self.outcomes) // 2 :]
-
-            first_success = sum(
-                1 for o in first_half if o and o.get("signal_worked")
-            )
-            second_success = sum(
-                1 for o in second_half if o and o.get("signal_worked")
-            )
+            # Simple time-based decay check; the sequence sums to self.worked,
+            # so only the first half is read (streamed back when spilled)
+            half = self.recorded // 2
+            first_success = sum(islice(iter(self.worked_sequence), half))
+            second_success = self.worked - first_success
 
             return {
                 "first_half_success_rate": round(
-                    first_success / len(first_half)
-                    if first_half
+                    first_success / half
+                    if half
                     else 0,
                     2,
                 ),
                 "second_half_success_rate": round(
-                    second_success / len(second_half)
-                    if second_half
-                    else 0,
+                    second_success / (self.recorded - half),
                     2,
                 ),
                 "decay_detected": first_success > second_success * 1.2,
@@ -200,8 +257,6 @@ class EdgeMetrics:
             "heat": self.max_heat_analysis(),
             "hold_quality": self.hold_quality(),
             "decay": self.edge_decay_check(),
-            "total_snapshots": len(self.snapshots),
-            "total_outcomes": len(
-                [o for o in self.outcomes if o]
-            ),
+            "total_snapshots": self.recorded,
+            "total_outcomes": self.valid_outcomes,
         }
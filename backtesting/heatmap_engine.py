@@ -96,44 +96,51 @@ class HeatmapEngine:
         Returns:
             Dict with session statistics
         """
-        sessions = {}
-        
+        self.heatmaps["session"] = {}
         for item in timeline:
-            session = item.get("session", "UNKNOWN")
-            is_trade = item.get("decision", {}).get("is_trade", False)
-            confidence = item.get("confidence", 0.0)
-            
-            if session not in sessions:
-                sessions[session] = {
-                    "count": 0,
-                    "trades": 0,
-                    "avg_confidence": 0.0,
-                    "high_confidence_trades": 0,
-                }
-            
-            sessions[session]["count"] += 1
-            if is_trade:
-                sessions[session]["trades"] += 1
-            
-            # Update running average
-            prev_avg = sessions[session]["avg_confidence"]
-            sessions[session]["avg_confidence"] = (
-                (prev_avg * (sessions[session]["count"] - 1) + confidence) / 
-                sessions[session]["count"]
-            )
-            
-            if is_trade and confidence >= 0.75:
-                sessions[session]["high_confidence_trades"] += 1
-        
-        # Add trade ratios
-        for session in sessions:
-            count = sessions[session]["count"]
-            sessions[session]["trade_ratio"] = (
-                sessions[session]["trades"] / count if count > 0 else 0
-            )
-        
-        self.heatmaps["session"] = sessions
-        return sessions
+            self.update_session_heatmap(item)
+        return self.heatmaps["session"]
+    
+    def update_session_heatmap(self, item):
+        """
+        Fold one timeline entry into the session heatmap (streaming replays).
+        
+        Args:
+            item: Timeline entry
+        
+        Returns:
+            Updated stats for the entry's session
+        """
+        sessions = self.heatmaps.setdefault("session", {})
+        session = item.get("session", "UNKNOWN")
+        is_trade = item.get("decision", {}).get("is_trade", False)
+        confidence = item.get("confidence", 0.0)
+        
+        if session not in sessions:
+            sessions[session] = {
+                "count": 0,
+                "trades": 0,
+                "avg_confidence": 0.0,
+                "high_confidence_trades": 0,
+            }
+        stats = sessions[session]
+        
+        stats["count"] += 1
+        if is_trade:
+            stats["trades"] += 1
+        
+        # Update running average
+        prev_avg = stats["avg_confidence"]
+        stats["avg_confidence"] = (
+            (prev_avg * (stats["count"] - 1) + confidence) / 
+            stats["count"]
+        )
+        
+        if is_trade and confidence >= 0.75:
+            stats["high_confidence_trades"] += 1
+        
+        stats["trade_ratio"] = stats["trades"] / stats["count"]
+        return stats
     
     def generate_killzone_heatmap(self, timeline):
         """
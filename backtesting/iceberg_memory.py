@@ -4,6 +4,8 @@ Tracks institutional persistence of volume at price levels
 Distinguishes institutional defense from random volume
 """
 
+import numpy as np
+
 
 class IcebergMemory:
     """
@@ -14,6 +16,7 @@ class IcebergMemory:
 
     def __init__(self):
         self.zones = []
+        self.version = 0  # Bumped on every zone change (invalidates precomputed scores)
 
     def record(self, price, volume, direction, candle_index):
         """
@@ -32,6 +35,7 @@ class IcebergMemory:
             "first_seen": candle_index,
             "hit_count": 1,  # How many times price returned here
         })
+        self.version += 1
 
     def record_hit(self, price, tolerance=2):
         """
@@ -41,6 +45,7 @@ class IcebergMemory:
         for zone in self.zones:
             if abs(zone["price"] - price) <= tolerance:
                 zone["hit_count"] += 1
+                self.version += 1
                 break
 
     def persistence_score(self, price, tolerance=2):
@@ -72,6 +77,25 @@ class IcebergMemory:
         avg_hits = sum(z["hit_count"] for z in matching_zones) / len(matching_zones)
         return min(avg_hits / 5.0, 1.0)  # Normalize (5+ hits = 1.0)
 
+    def persistence_scores(self, prices, tolerance=2, chunk=65536):
+        """Vectorized persistence_score for an array of prices."""
+        prices = np.asarray(prices, dtype=float)
+        scores = np.zeros(len(prices))
+        if not self.zones:
+            return scores
+
+        zone_prices = np.array([z["price"] for z in self.zones], dtype=float)
+        hits = np.array([z["hit_count"] for z in self.zones], dtype=float)
+        for start in range(0, len(prices), chunk):
+            block = prices[start:start + chunk]
+            near = np.abs(zone_prices[None, :] - block[:, None]) <= tolerance
+            count = near.sum(axis=1)
+            total = near.astype(float) @ hits
+            scores[start:start + chunk] = np.where(
+                count > 0, np.minimum(total / np.maximum(count, 1) / 5.0, 1.0), 0.0
+            )
+        return scores
+
     def persistence_type(self, price, tolerance=2):
         """
         Classify the type of institutional activity.
@@ -116,6 +140,7 @@ class IcebergMemory:
         """
         if len(self.zones) > max_zones:
             self.zones = self.zones[-max_zones:]
+            self.version += 1
 
     def export_zones(self):
         """Export all recorded zones for analysis"""
@@ -6,6 +6,8 @@ Prevents fake confidence during high-impact events
 
 from datetime import datetime, timedelta
 
+import numpy as np
+
 
 class NewsEngine:
     """
@@ -93,6 +95,42 @@ class NewsEngine:
             "minutes_since": None,
         }
 
+    def check_news_windows(self, candle_us, window_minutes=10):
+        """
+        Vectorized check_news_window for a whole replay.
+
+        Event times are sorted once; each candle's active window
+        [t - window_minutes, t + 5 min] is located with searchsorted. When
+        several events overlap a candle, the earliest-added one wins, as in
+        the scalar scan.
+
+        Args:
+            candle_us: int64 array of naive-UTC candle times in epoch microseconds
+
+        Returns:
+            (event index into self.events or -1, minutes_since int array)
+        """
+        candle_us = np.asarray(candle_us, dtype=np.int64)
+        index = np.full(len(candle_us), -1, dtype=np.int64)
+        minutes = np.zeros(len(candle_us), dtype=np.int64)
+        if not self.events or not len(candle_us):
+            return index, minutes
+
+        event_us = np.array([e["time"] for e in self.events], dtype="datetime64[us]").astype(np.int64)
+        order = np.argsort(event_us, kind="stable")
+        sorted_us = event_us[order]
+        lo = np.searchsorted(sorted_us, candle_us - window_minutes * 60 * 10**6, side="left")
+        hi = np.searchsorted(sorted_us, candle_us + 5 * 60 * 10**6, side="right")
+
+        hit = np.flatnonzero(hi > lo)
+        index[hit] = order[lo[hit]]
+        for i in hit[hi[hit] - lo[hit] > 1]:
+            index[i] = order[lo[i]:hi[i]].min()  # Overlapping events: first in list order
+
+        delta_minutes = (candle_us[hit] - event_us[index[hit]]) / 10**6 / 60
+        minutes[hit] = np.trunc(delta_minutes).astype(np.int64)
+        return index, minutes
+
     def get_news_before(self, candle_time, hours_before=24):
         """Get all news events in past N hours"""
         if isinstance(candle_time, str):
@@ -0,0 +1,209 @@
+"""
+STEP 23: Parallel Replay
+Multi-day / multi-week replay across a process pool
+
+The candle range is split into independent day or week shards. Each shard
+is replayed in a worker with fresh engine instances (built by a picklable
+factory), optionally preceded by warm-up bars that prime engine state but
+are not scored, and followed by a lookahead tail so signals near the shard
+end are scored exactly as in a single run. Workers return mergeable
+accumulators (EdgeMetrics, counts, confidence sums); timelines are written
+to one ordered file per shard plus a manifest.
+"""
+
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from backtesting.ai_snapshot import AISnapshotStore
+from backtesting.edge_metrics import EdgeMetrics
+from backtesting.replay_engine import ReplayEngine
+from backtesting.replay_runner import MAX_LOOKAHEAD, score_snapshots
+
+
+def _shard_key(candle_time, by):
+    if isinstance(candle_time, str):
+        candle_time = datetime.fromisoformat(candle_time)
+    day = candle_time.date()
+    if by == "day":
+        return day.isoformat()
+    if by == "week":
+        year, week, _ = day.isocalendar()
+        return f"{year}-W{week:02d}"
+    raise ValueError(f"Unknown shard size: {by}")
+
+
+def split_shards(candles, by="day"):
+    """
+    Split time-ordered candles into contiguous shards.
+
+    Returns:
+        list of (label, start index, end index)
+    """
+    shards = []
+    start, label = 0, None
+    for i, candle in enumerate(candles):
+        key = _shard_key(candle["time"], by)
+        if key != label:
+            if label is not None:
+                shards.append((label, start, i))
+            start, label = i, key
+    if label is not None:
+        shards.append((label, start, len(candles)))
+    return shards
+
+
+def _confidence_stats(snapshots):
+    confidences = [s["decision"].get("confidence", 0.0) for s in snapshots]
+    return {
+        "count": len(confidences),
+        "sum": sum(confidences),
+        "min": min(confidences) if confidences else None,
+        "max": max(confidences) if confidences else None,
+        "above_70": sum(1 for c in confidences if c >= 0.70),
+    }
+
+
+def replay_shard(shard):
+    """
+    Replay one shard in a fresh engine set (runs inside a pool worker).
+
+    Args:
+        shard: dict with index, label, candles (warm-up + shard), warmup,
+               tail (lookahead-only candles), engine_factory, news_events,
+               timeline_dir
+    """
+    started = time.perf_counter()
+    engines = shard["engine_factory"]()
+    snapshot_store = AISnapshotStore()
+    replay = ReplayEngine(
+        qmo=engines["qmo"],
+        imo=engines["imo"],
+        gann=engines["gann"],
+        astro=engines["astro"],
+        cycle=engines["cycle"],
+        mentor=engines["mentor"],
+        snapshot_store=snapshot_store,
+        news_events=shard["news_events"],
+    )
+    replay.run(shard["candles"])
+
+    warmup = shard["warmup"]
+    snapshots = snapshot_store.all()[warmup:]
+    _, metrics = score_snapshots(snapshots, shard["candles"][warmup:] + shard["tail"])
+    signals = sum(1 for s in snapshots if s["decision"].get("action") != "WAIT")
+
+    timeline_file = None
+    if shard["timeline_dir"]:
+        replay.timeline.trim(warmup)
+        timeline_file = str(Path(shard["timeline_dir"]) / f"shard_{shard['index']:05d}_{shard['label']}.json")
+        replay.export_timeline_json(timeline_file)
+
+    return {
+        "index": shard["index"],
+        "label": shard["label"],
+        "candles": len(snapshots),
+        "signals": signals,
+        "metrics": metrics,
+        "confidence": _confidence_stats(snapshots),
+        "timeline_file": timeline_file,
+        "elapsed_seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def _merge_results(parts):
+    metrics = EdgeMetrics()
+    total = signals = count = above_70 = 0
+    conf_sum, conf_min, conf_max = 0.0, None, None
+    for part in parts:
+        metrics.merge(part["metrics"])
+        total += part["candles"]
+        signals += part["signals"]
+        stats = part["confidence"]
+        count += stats["count"]
+        conf_sum += stats["sum"]
+        above_70 += stats["above_70"]
+        if stats["count"]:
+            conf_min = stats["min"] if conf_min is None else min(conf_min, stats["min"])
+            conf_max = stats["max"] if conf_max is None else max(conf_max, stats["max"])
+
+    confidence_dist = {}
+    if count:
+        confidence_dist = {"min": conf_min, "max": conf_max, "avg": conf_sum / count, "total_above_70": above_70}
+    return metrics, {
+        "total_candles": total,
+        "signals": signals,
+        "skips": total - signals,
+        "signal_rate": signals / total if total > 0 else 0.0,
+    }, confidence_dist
+
+
+def run_parallel_replay(candles, engine_factory, news_events=None, shard_by="day",
+                        warmup_bars=0, workers=None, timeline_dir=None):
+    """
+    Replay a long candle range as independent shards across a process pool.
+
+    Args:
+        candles: time-ordered list of OHLCV dicts
+        engine_factory: picklable callable returning {qmo, imo, gann, astro, cycle, mentor}
+        news_events: optional list of news dicts (shared by all shards)
+        shard_by: "day" | "week"
+        warmup_bars: bars before each shard replayed to prime engines (not scored)
+        workers: process count (default: CPU count); 1 runs in-process
+        timeline_dir: if set, write one timeline JSON per shard + manifest.json
+
+    Returns:
+        Same summary keys as run_replay (metrics, snapshot_stats,
+        confidence_dist) plus per-shard details, without per-candle snapshots.
+    """
+    started = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    if timeline_dir:
+        Path(timeline_dir).mkdir(parents=True, exist_ok=True)
+
+    shards = []
+    for index, (label, start, end) in enumerate(split_shards(candles, shard_by)):
+        first = max(0, start - warmup_bars)
+        shards.append({
+            "index": index,
+            "label": label,
+            "candles": candles[first:end],
+            "warmup": start - first,
+            "tail": candles[end:end + MAX_LOOKAHEAD],
+            "engine_factory": engine_factory,
+            "news_events": news_events,
+            "timeline_dir": str(timeline_dir) if timeline_dir else None,
+        })
+
+    if workers > 1 and len(shards) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(shards))) as pool:
+            parts = list(pool.map(replay_shard, shards, chunksize=1))
+    else:
+        parts = [replay_shard(shard) for shard in shards]
+
+    metrics, snapshot_stats, confidence_dist = _merge_results(parts)
+    timeline_files = [p["timeline_file"] for p in parts if p["timeline_file"]]
+    if timeline_dir:
+        manifest = [
+            {"shard": p["index"], "label": p["label"], "candles": p["candles"],
+             "file": os.path.basename(p["timeline_file"])}
+            for p in parts
+        ]
+        with open(Path(timeline_dir) / "manifest.json", "w") as f:
+            json.dump({"shard_by": shard_by, "warmup_bars": warmup_bars, "shards": manifest}, f, indent=2)
+
+    return {
+        "metrics": metrics.summary(),
+        "edge_metrics": metrics,
+        "snapshot_stats": snapshot_stats,
+        "confidence_dist": confidence_dist,
+        "shards": [
+            {k: p[k] for k in ("label", "candles", "signals", "elapsed_seconds")} for p in parts
+        ],
+        "timeline_files": timeline_files,
+        "workers": workers,
+        "elapsed_seconds": round(time.perf_counter() - started, 2),
+    }
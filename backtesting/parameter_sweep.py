@@ -0,0 +1,436 @@
+"""
+STEP 23: Parameter Sweep
+Parallel parameter sweeps and walk-forward optimization over replays
+
+A sweep replays one candle range once per parameter configuration across a
+process pool. Candles are shared read-only with the workers through one
+shared-memory block of OHLCV columns; each worker materializes only the
+candle dicts of the chunk it is replaying.
+
+Parameter space: {name: [choices]} or {name: (low, high)} ranges.
+- "filters.<attr>" parameters are applied to the replay's ReplayFilters
+  (min_confidence, min_iceberg_score, allow_killzone, ...)
+- every other parameter (e.g. "iceberg.volume_multiplier",
+  "absorption.threshold", "regime.lookback_periods") is passed to the
+  picklable engine_factory(params), which builds the engines with them
+
+Configs are replayed in day-sized chunks so clearly bad ones can stop
+early, and ranked by an objective computed from EdgeMetrics.
+"""
+
+import csv
+import itertools
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from backtesting.ai_snapshot import AISnapshotStore
+from backtesting.edge_metrics import EdgeMetrics
+from backtesting.parallel_replay import split_shards
+from backtesting.replay_engine import ReplayEngine
+from backtesting.replay_runner import MAX_LOOKAHEAD, score_snapshots
+
+MIN_OUTCOMES = 20  # Fewer scored signals than this: config is not ranked
+_EPOCH = datetime(1970, 1, 1)
+_COLUMNS = ("open", "high", "low", "close", "volume", "utc_offset")
+
+
+# ---- SHARED CANDLES ----
+
+class SharedCandles:
+    """OHLCV columns in one shared-memory block, read by workers without copying."""
+
+    def __init__(self, candles):
+        times = [datetime.fromisoformat(c["time"]) if isinstance(c["time"], str) else c["time"] for c in candles]
+        self.size = len(candles)
+        self.as_string = bool(candles) and isinstance(candles[0]["time"], str)
+        self.aware = any(t.tzinfo is not None for t in times)
+
+        self.shm = SharedMemory(create=True, size=max(8, 7 * 8 * self.size))
+        wall, values = self._views(self.shm, self.size)
+        # Wall-clock time (what the session engine reads) + UTC offset per bar
+        wall[:] = [(t.replace(tzinfo=None) - _EPOCH) // timedelta(microseconds=1) for t in times]
+        for row, field in enumerate(_COLUMNS[:4]):
+            values[row] = [c.get(field, c["close"]) for c in candles]
+        values[4] = [c.get("volume") or 0 for c in candles]
+        values[5] = [t.utcoffset().total_seconds() if t.tzinfo else 0 for t in times]
+
+    @staticmethod
+    def _views(shm, size):
+        wall = np.ndarray((size,), dtype=np.int64, buffer=shm.buf)
+        values = np.ndarray((len(_COLUMNS), size), dtype=np.float64, buffer=shm.buf, offset=8 * size)
+        return wall, values
+
+    @property
+    def spec(self):
+        """Picklable handle for attach()."""
+        return {"name": self.shm.name, "size": self.size, "as_string": self.as_string, "aware": self.aware}
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+
+class _AttachedCandles:
+    """Worker-side view of a SharedCandles block."""
+
+    def __init__(self, spec):
+        # Pool workers share the creator's resource tracker; the creator unlinks
+        self.shm = SharedMemory(name=spec["name"])
+        self.size = spec["size"]
+        self.as_string = spec["as_string"]
+        self.aware = spec["aware"]
+        self.wall, self.values = SharedCandles._views(self.shm, self.size)
+
+    def slice(self, start, end):
+        """Candle dicts for bars [start, end)."""
+        end = min(end, self.size)
+        if start >= end:
+            return []
+        columns = self.values[:, start:end].tolist()
+        candles = []
+        for j, wall in enumerate(self.wall[start:end].tolist()):
+            moment = _EPOCH + timedelta(microseconds=wall)
+            if self.aware:
+                moment = moment.replace(tzinfo=timezone(timedelta(seconds=columns[5][j])))
+            candles.append({
+                "time": moment.isoformat() if self.as_string else moment,
+                "open": columns[0][j],
+                "high": columns[1][j],
+                "low": columns[2][j],
+                "close": columns[3][j],
+                "volume": columns[4][j],
+            })
+        return candles
+
+
+_worker_candles = None
+
+
+def _attach_worker(spec):
+    global _worker_candles
+    _worker_candles = _AttachedCandles(spec)
+
+
+# ---- PARAMETER SAMPLING ----
+
+def _is_range(spec):
+    return isinstance(spec, tuple) and len(spec) == 2
+
+
+def _range_value(low, high, value):
+    value = min(max(value, low), high)
+    return int(round(value)) if isinstance(low, int) and isinstance(high, int) else value
+
+
+def grid_configs(space, points=5):
+    """Every combination; (low, high) ranges contribute `points` evenly spaced values."""
+    axes = []
+    for name, spec in space.items():
+        if _is_range(spec):
+            values = list(dict.fromkeys(_range_value(*spec, v) for v in np.linspace(*spec, points).tolist()))
+        else:
+            values = list(spec)
+        axes.append([(name, v) for v in values])
+    return [dict(combo) for combo in itertools.product(*axes)]
+
+
+def random_configs(space, count, rng):
+    """Independent uniform samples of the space."""
+    configs = []
+    for _ in range(count):
+        configs.append({
+            name: _range_value(*spec, rng.uniform(*spec)) if _is_range(spec) else rng.choice(list(spec))
+            for name, spec in space.items()
+        })
+    return configs
+
+
+def refine_configs(space, parents, count, rng, scale=0.25):
+    """
+    Samples concentrated around the best configs so far (adaptive search).
+    Ranges are perturbed by a Gaussian of `scale` x range width; choices keep
+    the parent's value with probability 0.7.
+    """
+    configs = []
+    for _ in range(count):
+        parent = rng.choice(parents)
+        config = {}
+        for name, spec in space.items():
+            if _is_range(spec):
+                low, high = spec
+                config[name] = _range_value(low, high, rng.gauss(parent[name], scale * (high - low)))
+            else:
+                config[name] = parent[name] if rng.random() < 0.7 else rng.choice(list(spec))
+        configs.append(config)
+    return configs
+
+
+def _config_key(params):
+    return tuple(sorted(params.items()))
+
+
+# ---- OBJECTIVE ----
+
+def hit_rate_objective(metrics):
+    """Share of scored signals that worked; None until MIN_OUTCOMES are scored."""
+    if metrics.valid_outcomes < MIN_OUTCOMES:
+        return None
+    return metrics.worked / metrics.valid_outcomes
+
+
+# ---- WORKER ----
+
+def evaluate_config(task):
+    """
+    Replay bars [start, end) with one parameter config (runs inside a pool worker).
+
+    Signals are scored only against bars inside the window, so a train window
+    never sees its test window.
+    """
+    started = time.perf_counter()
+    candles, params = _worker_candles, task["params"]
+    start, end = task["start"], task["end"]
+
+    engines = task["engine_factory"](params)
+    snapshot_store = AISnapshotStore()
+    replay = ReplayEngine(
+        qmo=engines["qmo"],
+        imo=engines["imo"],
+        gann=engines["gann"],
+        astro=engines["astro"],
+        cycle=engines["cycle"],
+        mentor=engines["mentor"],
+        snapshot_store=snapshot_store,
+        news_events=task["news_events"],
+    )
+    for name, value in params.items():
+        if name.startswith("filters."):
+            setattr(replay.replay_filters, name.split(".", 1)[1], value)
+
+    # Chunks run through the core loop with the global bar offset (like
+    # ReplayEngine.stream), so index-driven engines see the same bar numbers
+    # as one run over [first, end) whatever chunk_bars is
+    first = max(0, start - task["warmup_bars"])
+    if first < start:
+        for _ in replay._replay(candles.slice(first, start)):  # Warm-up: primes state, not scored
+            pass
+    scored = len(snapshot_store.all())
+
+    metrics = EdgeMetrics()
+    status, signals = "complete", 0
+    for chunk_start in range(start, end, task["chunk_bars"]):
+        chunk_end = min(end, chunk_start + task["chunk_bars"])
+        window = candles.slice(chunk_start, min(end, chunk_end + MAX_LOOKAHEAD))
+        for _ in replay._replay(window[:chunk_end - chunk_start], chunk_start - first):
+            pass
+
+        snapshots = snapshot_store.all()[scored:]
+        scored += len(snapshots)
+        score_snapshots(snapshots, window, metrics)
+        signals += sum(1 for s in snapshots if s["decision"].get("action") != "WAIT")
+
+        # ---- EARLY STOP: clearly bad configs ----
+        done = (chunk_end - start) / (end - start)
+        if task["early_stop_below"] is not None and done >= task["early_stop_after"] and chunk_end < end:
+            score = task["objective"](metrics)
+            if signals == 0 or (score is not None and score < task["early_stop_below"]):
+                status = "stopped"
+                break
+
+    summary = metrics.summary()
+    return {
+        "params": params,
+        "score": task["objective"](metrics),
+        "status": status,
+        "candles": scored - (start - first),
+        "signals": signals,
+        "outcomes": metrics.valid_outcomes,
+        "hit_rate": round(metrics.worked / metrics.valid_outcomes, 4) if metrics.valid_outcomes else None,
+        "false_signal_rate": (summary["false_signals"] or {}).get("false_signal_rate"),
+        "avg_heat": (summary["heat"] or {}).get("avg_heat"),
+        "elapsed_seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+# ---- SWEEP ----
+
+class ParameterSweep:
+    """
+    Parallel parameter sweeps + walk-forward optimization.
+
+    Usage:
+        with ParameterSweep(candles, make_engines, space, early_stop_below=0.45) as sweep:
+            rows = sweep.run(method="random", samples=64)
+            sweep.write_results(rows, "sweep.csv")
+    """
+
+    def __init__(self, candles, engine_factory, space, objective=hit_rate_objective,
+                 news_events=None, config=None, workers=None, chunk_bars=1440,
+                 warmup_bars=0, early_stop_after=0.25, early_stop_below=None):
+        """
+        Args:
+            candles: time-ordered list of OHLCV dicts
+            engine_factory: picklable callable(params) -> {qmo, imo, gann, astro, cycle, mentor}
+            space: {name: [choices] | (low, high)}
+            objective: picklable callable(EdgeMetrics) -> float | None (higher is better)
+            news_events: optional list of news dicts
+            config: optional ReplayConfig; candles are limited to its date range
+            workers: process count (default: CPU count); 1 runs in-process
+            chunk_bars: bars replayed between early-stop checks
+            warmup_bars: bars before each window replayed to prime engines (not scored)
+            early_stop_after: fraction of a window replayed before a config may be stopped
+            early_stop_below: stop configs scoring below this (or with no signals); None disables
+        """
+        if config is not None:
+            candles = [c for c in candles if self._in_config(c["time"], config)]
+        self.candles = candles
+        self.engine_factory = engine_factory
+        self.space = space
+        self.objective = objective
+        self.news_events = news_events
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_bars = chunk_bars
+        self.warmup_bars = warmup_bars
+        self.early_stop_after = early_stop_after
+        self.early_stop_below = early_stop_below
+
+        self.shared = SharedCandles(candles)
+        self.pool = None
+        if self.workers > 1:
+            self.pool = ProcessPoolExecutor(
+                max_workers=self.workers, initializer=_attach_worker, initargs=(self.shared.spec,)
+            )
+        else:
+            _attach_worker(self.shared.spec)
+
+    @staticmethod
+    def _in_config(candle_time, config):
+        day = (datetime.fromisoformat(candle_time) if isinstance(candle_time, str) else candle_time).date()
+        if config.start_date and day < date.fromisoformat(config.start_date):
+            return False
+        return not (config.end_date and day > date.fromisoformat(config.end_date))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Shut down the pool and release the shared candles."""
+        if self.pool:
+            self.pool.shutdown()
+            self.pool = None
+        if self.shared:
+            if _worker_candles is not None and _worker_candles.shm.name == self.shared.shm.name:
+                _worker_candles.shm.close()
+            self.shared.close()
+            self.shared = None
+
+    def evaluate(self, configs, start=0, end=None):
+        """Replay each config over bars [start, end); returns result rows, ranked."""
+        end = len(self.candles) if end is None else end
+        tasks = [{
+            "params": params,
+            "start": start,
+            "end": end,
+            "chunk_bars": self.chunk_bars,
+            "warmup_bars": self.warmup_bars,
+            "early_stop_after": self.early_stop_after,
+            "early_stop_below": self.early_stop_below,
+            "objective": self.objective,
+            "engine_factory": self.engine_factory,
+            "news_events": self.news_events,
+        } for params in configs]
+
+        if self.pool:
+            rows = list(self.pool.map(evaluate_config, tasks, chunksize=1))
+        else:
+            rows = [evaluate_config(task) for task in tasks]
+        return self.rank(rows)
+
+    def run(self, method="grid", samples=32, rounds=4, points=5, start=0, end=None, seed=0):
+        """
+        Sweep the parameter space.
+
+        Args:
+            method: "grid" | "random" | "adaptive" (random first round, then
+                    rounds sampled around the top quarter with shrinking spread)
+            samples: configs for random / adaptive (total over all rounds)
+            points: values per (low, high) range for grid
+            start, end: bar range to replay (default: all candles)
+        """
+        rng = random.Random(seed)
+        if method == "grid":
+            return self.evaluate(grid_configs(self.space, points), start, end)
+        if method == "random":
+            return self.evaluate(random_configs(self.space, samples, rng), start, end)
+        if method != "adaptive":
+            raise ValueError(f"Unknown sweep method: {method}")
+
+        per_round = max(1, samples // rounds)
+        rows, seen = [], set()
+        configs = random_configs(self.space, per_round, rng)
+        for round_index in range(rounds):
+            fresh = {_config_key(c): c for c in configs if _config_key(c) not in seen}
+            configs = list(fresh.values())
+            seen.update(fresh)
+            rows = self.rank(rows + self.evaluate(configs, start, end))
+            parents = [r["params"] for r in rows if r["score"] is not None]
+            parents = parents[:max(1, len(parents) // 4)] or [r["params"] for r in rows[:1]]
+            configs = refine_configs(self.space, parents, per_round, rng, scale=0.25 / 2 ** round_index)
+        return rows
+
+    def walk_forward(self, train_days, test_days, step_days=None, method="grid", top=1, **sweep_args):
+        """
+        Rolling train/test windows over trading days: sweep each train window,
+        then replay its top configs on the following (unseen) test window.
+
+        Returns:
+            list of {train, test, best_params, train_score, test_score, train_results, test_results}
+        """
+        days = split_shards(self.candles, by="day")
+        step_days = step_days or test_days
+        windows = []
+        for i in range(0, len(days) - train_days - test_days + 1, step_days):
+            train, test = days[i:i + train_days], days[i + train_days:i + train_days + test_days]
+            train_rows = self.run(method=method, start=train[0][1], end=train[-1][2], **sweep_args)
+            best = [r["params"] for r in train_rows[:top]]
+            test_rows = self.evaluate(best, start=test[0][1], end=test[-1][2])
+            windows.append({
+                "train": (train[0][0], train[-1][0]),
+                "test": (test[0][0], test[-1][0]),
+                "best_params": train_rows[0]["params"] if train_rows else None,
+                "train_score": train_rows[0]["score"] if train_rows else None,
+                "test_score": next((r["score"] for r in test_rows if r["params"] == best[0]), None) if best else None,
+                "train_results": train_rows,
+                "test_results": test_rows,
+            })
+        return windows
+
+    @staticmethod
+    def rank(rows):
+        """Sort by score (unscored last) and number the rows."""
+        rows = sorted(rows, key=lambda r: (r["score"] is None, -(r["score"] or 0.0)))
+        for rank, row in enumerate(rows, 1):
+            row["rank"] = rank
+        return rows
+
+    @staticmethod
+    def write_results(rows, filepath):
+        """Save a ranked results table to CSV (one column per parameter)."""
+        names = list(dict.fromkeys(name for row in rows for name in row["params"]))
+        fields = ["rank", "score", "status", "candles", "signals", "outcomes",
+                  "hit_rate", "false_signal_rate", "avg_heat", "elapsed_seconds"]
+        with open(filepath, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=fields + names)
+            writer.writeheader()
+            for row in rows:
+                writer.writerow({**{k: row.get(k) for k in fields}, **row["params"]})
+        return filepath
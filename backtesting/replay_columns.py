@@ -0,0 +1,85 @@
+"""
+STEP 23: Replay Columns
+Columnar precomputation stage for ReplayEngine
+
+Turns the candle list into column arrays once and computes everything that
+does not depend on replay state in vectorized passes:
+- session ids and kill-zone flags (SessionEngine.classify)
+- news-window membership (NewsEngine.check_news_windows, searchsorted)
+- iceberg persistence scores (IcebergMemory.persistence_scores)
+
+The per-candle loop then only runs the stateful engines and decision logic.
+"""
+
+from datetime import datetime
+
+import numpy as np
+
+from backtesting.session_engine import SESSION_NAMES
+
+_DAY_US = 86400 * 10**6
+
+
+def _parse_time(value):
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+
+class ReplayColumns:
+    """Column arrays + precomputed context for one replay."""
+
+    def __init__(self, candles, session_engine, news_engine, iceberg_memory):
+        """
+        Args:
+            candles: list of dicts with at least time and close
+            session_engine / news_engine / iceberg_memory: the replay's engines
+        """
+        n = len(candles)
+        self.size = n
+        self.times = [_parse_time(c["time"]) for c in candles]
+        self.close = np.array([c["close"] for c in candles], dtype=float)
+
+        # ---- SESSION & KILL ZONE ----
+        # Sessions use the wall-clock time of day as given (like SessionEngine.get_session)
+        aware = any(t.tzinfo is not None for t in self.times)
+        wall = [t.replace(tzinfo=None) for t in self.times] if aware else self.times
+        wall_us = np.array(wall, dtype="datetime64[us]").astype(np.int64) if n else np.zeros(0, np.int64)
+        codes, self.killzone = session_engine.classify(wall_us % _DAY_US)
+        self.session = [SESSION_NAMES[c] for c in codes.tolist()]
+
+        # ---- NEWS WINDOWS ----
+        self.news_engine = news_engine
+        events_aware = any(getattr(e["time"], "tzinfo", None) is not None for e in news_engine.events)
+        self.news_vectorized = not aware and not events_aware
+        self.news_count = len(news_engine.events)
+        if self.news_vectorized:
+            index, minutes = news_engine.check_news_windows(wall_us)
+            self.news_index, self.news_minutes = index.tolist(), minutes.tolist()
+        else:
+            # Time-zone aware data: keep the exact scalar semantics
+            self.news_index = self.news_minutes = None
+
+        # ---- ICEBERG PERSISTENCE ----
+        self.iceberg_memory = iceberg_memory
+        self.iceberg_version = iceberg_memory.version
+        self.iceberg_score = iceberg_memory.persistence_scores(self.close)
+
+    def news(self, i):
+        """check_news_window result for candle i."""
+        if not self.news_vectorized or len(self.news_engine.events) != self.news_count:
+            return self.news_engine.check_news_window(self.times[i])
+        event_index = self.news_index[i]
+        if event_index < 0:
+            return {"active": False, "impact": None, "name": None, "minutes_since": None}
+        event = self.news_engine.events[event_index]
+        return {
+            "active": True,
+            "impact": event["impact"],
+            "name": event["name"],
+            "minutes_since": self.news_minutes[i],
+        }
+
+    def iceberg(self, i):
+        """persistence_score for candle i (rescored if zones changed mid-replay)."""
+        if self.iceberg_memory.version != self.iceberg_version:
+            return self.iceberg_memory.persistence_score(float(self.close[i]))
+        return float(self.iceberg_score[i])
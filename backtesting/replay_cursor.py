@@ -6,27 +6,133 @@ Allows stepping through replay candle-by-candle:
 - next() — move forward
 - prev() — move backward
 - jump_to(index) — jump to specific candle
+- jump_to_time(time) — binary search on a sorted int64 time index
 - current() — get current candle
 
 Essential for professional signal debugging and visual scrubbing.
+Candle → timeline lookups are O(1), ranges are views (no copies), the
+navigation history is bounded, and from_output() pages a streaming
+replay's files in lazily.
 """
 
+import warnings
+from collections import deque
+from collections.abc import Sequence
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import numpy as np
+
+from backtesting.timeline_pages import TimelinePages
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _instant_us(value):
+    """Microseconds since epoch (aware times in UTC, naive times as given)."""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - _EPOCH) // timedelta(microseconds=1)
+
+
+def _to_us(values):
+    """Vectorized ISO/datetime → int64 µs, falling back to per-item parsing."""
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            return np.array(values, dtype="datetime64[us]").astype(np.int64)
+    except (ValueError, TypeError, Warning):
+        return np.array([_instant_us(v) for v in values], dtype=np.int64)
+
+
+def _time_key(value):
+    """Time as the timeline stores it."""
+    return value.isoformat() if hasattr(value, "isoformat") else str(value)
+
+
+class SequenceView(Sequence):
+    """Read-only window [start, stop) over a sequence, without copying it."""
+
+    def __init__(self, data, start, stop):
+        self.data = data
+        self.start = start
+        self.stop = max(start, stop)
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step == 1:
+                return SequenceView(self.data, self.start + start, self.start + stop)
+            return [self.data[self.start + i] for i in range(start, stop, step)]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("range index out of range")
+        return self.data[self.start + index]
+
+    def __eq__(self, other):
+        if isinstance(other, Sequence):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self):
+        return f"SequenceView([{self.start}:{self.stop}] of {len(self.data)})"
+
 
 class ReplayCursor:
     """Navigate through replay candles (time-travel)."""
     
-    def __init__(self, candles, timeline=None):
+    def __init__(self, candles, timeline=None, timeline_offset=0, history_limit=1000):
         """
         Initialize cursor.
         
         Args:
-            candles: List of candle dicts (time, open, high, low, close, volume)
+            candles: Sequence of candle dicts (time, open, high, low, close, volume)
+                     — a list, or TimelinePages over replay output
             timeline: Optional timeline from TimelineBuilder for context lookup
+            timeline_offset: Timeline position of candles[0] (entries recorded
+                             before this replay)
+            history_limit: Navigation positions remembered
         """
         self.candles = candles
-        self.timeline = timeline or []
+        self.timeline = timeline if timeline is not None else []
+        self.timeline_offset = timeline_offset
         self.index = 0
-        self._position_history = []
+        self._position_history = deque(maxlen=history_limit)
+        self._times = None  # Sorted int64 µs time index (built on first time lookup)
+        self._order = None  # Candle index per sorted position, if candles are unsorted
+        self._timeline_by_time = None  # Fallback when timeline is not aligned with candles
+    
+    @classmethod
+    def from_output(cls, output_dir, page_size=1024, cache_pages=16, history_limit=1000):
+        """
+        Cursor over a streaming replay's files (chart_packets.jsonl as candles,
+        timeline.jsonl as context), loaded page by page on demand.
+        """
+        output_dir = Path(output_dir)
+        return cls(
+            TimelinePages(output_dir / "chart_packets.jsonl", page_size, cache_pages),
+            TimelinePages(output_dir / "timeline.jsonl", page_size, cache_pages),
+            history_limit=history_limit,
+        )
+    
+    def _time_index(self):
+        if self._times is None:
+            if isinstance(self.candles, TimelinePages):
+                times = self.candles.times()
+            else:
+                times = [candle.get("time") for candle in self.candles]
+            times = _to_us(times)
+            if len(times) > 1 and (np.diff(times) < 0).any():
+                self._order = np.argsort(times, kind="stable")
+                times = times[self._order]
+            self._times = times
+        return self._times
     
     def next(self):
         """
@@ -68,22 +174,33 @@ class ReplayCursor:
         self.index = max(0, min(index, len(self.candles) - 1))
         return self.current()
     
-    def jump_to_time(self, target_time):
+    def jump_to_time(self, target_time, nearest=False):
         """
-        Jump to candle by time.
+        Jump to candle by time (binary search).
         
         Args:
-            target_time: Datetime or timestamp to find
+            target_time: Datetime or ISO timestamp to find
+            nearest: If True, jump to the last candle at or before the time
+                     (scrubbing) instead of requiring an exact match
         
         Returns:
             Current candle dict, or None if time not found
         """
-        for i, candle in enumerate(self.candles):
-            if candle.get("time") == target_time:
-                self._position_history.append(self.index)
-                self.index = i
-                return self.current()
-        return None
+        times = self._time_index()
+        if not len(times):
+            return None
+        target = _instant_us(target_time)
+        
+        position = int(np.searchsorted(times, target, side="left"))
+        if position == len(times) or times[position] != target:
+            if not nearest or position == 0:
+                return None
+            position -= 1  # Last candle before the target
+        
+        index = int(self._order[position]) if self._order is not None else position
+        self._position_history.append(self.index)
+        self.index = index
+        return self.current()
     
     def current(self):
         """
@@ -96,6 +213,26 @@ class ReplayCursor:
             return self.candles[self.index]
         return None
     
+    def timeline_entry(self, index):
+        """Timeline entry for candle `index` (O(1)), or None."""
+        candle = self.candles[index] if 0 <= index < len(self.candles) else None
+        if not self.timeline or candle is None:
+            return None
+        key = _time_key(candle.get("time"))
+        
+        # Aligned case: entry i belongs to candle i
+        position = self.timeline_offset + index
+        if position < len(self.timeline):
+            entry = self.timeline[position]
+            if entry.get("time") == key:
+                return entry
+        
+        if self._timeline_by_time is None:
+            self._timeline_by_time = {}
+            for entry in self.timeline:
+                self._timeline_by_time.setdefault(entry.get("time"), entry)
+        return self._timeline_by_time.get(key)
+    
     def current_context(self):
         """
         Get current candle + timeline context.
@@ -103,19 +240,9 @@ class ReplayCursor:
         Returns:
             Dict with candle and timeline entry
         """
-        candle = self.current()
-        context = None
-        
-        if self.timeline and candle:
-            # Find matching timeline entry
-            for entry in self.timeline:
-                if entry.get("time") == candle.get("time"):
-                    context = entry
-                    break
-        
         return {
-            "candle": candle,
-            "timeline": context,
+            "candle": self.current(),
+            "timeline": self.timeline_entry(self.index),
             "index": self.index,
         }
     
@@ -152,8 +279,8 @@ class ReplayCursor:
         return self.current()
     
     def get_navigation_history(self):
-        """Return history of positions visited."""
-        return self._position_history
+        """Return history of positions visited (most recent history_limit)."""
+        return list(self._position_history)
     
     def peek_forward(self, steps=1):
         """
@@ -194,8 +321,24 @@ class ReplayCursor:
             end_index: End (inclusive)
         
         Returns:
-            List of candles in range
+            SequenceView of candles in range (no copy)
         """
         start = max(0, start_index)
         end = min(len(self.candles), end_index + 1)
-        return self.candles[start:end]
+        return SequenceView(self.candles, start, end)
+    
+    def get_time_range(self, start_time, end_time):
+        """
+        Get candles with start_time <= time <= end_time (binary search).
+        
+        Returns:
+            SequenceView of candles in range (no copy), or a time-ordered
+            list when the candles themselves are unsorted
+        """
+        times = self._time_index()
+        start = int(np.searchsorted(times, _instant_us(start_time), side="left"))
+        end = int(np.searchsorted(times, _instant_us(end_time), side="right"))
+        if self._order is not None:
+            # Positions are in sorted order: map them back to candle indexes
+            return [self.candles[int(i)] for i in self._order[start:end]]
+        return SequenceView(self.candles, start, end)
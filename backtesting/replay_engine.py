@@ -4,8 +4,16 @@ Candle-by-candle reconstruction of AI decision logic
 Institutional-grade backtesting (not bulk optimization)
 
 STEP 23-B: Session + News + Iceberg-aware replay
+
+Streaming mode (spill_dir): timeline, chart packets and lifecycle history
+are appended to JSONL files with a bounded in-memory tail, and stream()
+pulls candles from any iterable chunk by chunk, so memory stays flat
+however long the replay is.
 """
 
+from itertools import islice
+from pathlib import Path
+
 from backtesting.session_engine import SessionEngine
 from backtesting.news_engine import NewsEngine
 from backtesting.iceberg_memory import IcebergMemory
@@ -16,6 +24,7 @@ from backtesting.chart_packet_builder import ChartPacketBuilder
 from backtesting.signal_lifecycle import SignalLifecycle
 from backtesting.replay_cursor import ReplayCursor
 from backtesting.heatmap_engine import HeatmapEngine
+from backtesting.replay_columns import ReplayColumns
 
 
 class ReplayEngine:
@@ -36,6 +45,8 @@ class ReplayEngine:
         mentor,
         snapshot_store,
         news_events=None,
+        spill_dir=None,
+        tail=1000,
     ):
         self.qmo = qmo
         self.imo = imo
@@ -51,16 +62,22 @@ class ReplayEngine:
         self.iceberg_memory = IcebergMemory()
         self.replay_filters = ReplayFilters()
         
+        # ---- STREAMING: spill per-candle records to disk ----
+        self.spill_dir = Path(spill_dir) if spill_dir else None
+        self.tail = tail
+        spill = (lambda name: self.spill_dir / name) if self.spill_dir else (lambda name: None)
+        
         # ---- STEP 23-C ADDITIONS ----
         self.explainer = ExplanationEngine()
-        self.timeline = TimelineBuilder()
-        self.chart_packet_builder = ChartPacketBuilder()
+        self.timeline = TimelineBuilder(spill("timeline.jsonl"), tail)
+        self.chart_packet_builder = ChartPacketBuilder(spill("chart_packets.jsonl"), tail)
         
         # ---- STEP 23-D ADDITIONS ----
-        self.lifecycle = SignalLifecycle()
+        self.lifecycle = SignalLifecycle(spill("lifecycle.jsonl"), tail)
         self.cursor = None  # Will be initialized in run()
         self.heatmap_engine = HeatmapEngine()
         self.candles_store = None  # Store for cursor access
+        self.columns = None  # Precomputed ReplayColumns (set in run())
 
     def run(self, candles):
         """
@@ -72,7 +89,50 @@ class ReplayEngine:
         """
         # ---- STEP 23-D: INITIALIZE CURSOR & STORE CANDLES ----
         self.candles_store = candles
-        self.cursor = ReplayCursor(candles, self.timeline.export())
+        timeline = self.timeline.export()
+        self.cursor = ReplayCursor(candles, timeline, timeline_offset=len(timeline))
+        
+        for _ in self._replay(candles):
+            pass
+
+    def stream(self, candles, chunk_bars=1440):
+        """
+        Replay candles from any iterable (e.g. a generator over months of
+        data), one chunk at a time.
+        
+        Yields:
+            (candle, snapshot) per bar, in order
+        """
+        recent = []
+        offset = 0
+        iterator = iter(candles)
+        while True:
+            chunk = list(islice(iterator, chunk_bars))
+            if not chunk:
+                break
+            yield from self._replay(chunk, offset)
+            offset += len(chunk)
+            recent = (recent + chunk)[-self.tail:]
+
+        # ---- STEP 23-D: cursor over the whole replay ----
+        self.candles_store = recent
+        if self.spill_dir:
+            # Paged in lazily from the spilled chart packets + timeline
+            self.timeline.spill.flush()
+            self.chart_packet_builder.spill.flush()
+            self.cursor = ReplayCursor.from_output(self.spill_dir)
+        else:
+            timeline = self.timeline.export()
+            self.cursor = ReplayCursor(recent, timeline, timeline_offset=len(timeline) - len(recent))
+
+    def _replay(self, candles, offset=0):
+        """Core loop over one list of candles; `offset` = bars already replayed."""
+        # ---- PRECOMPUTE: session / news / iceberg ----
+        columns = self.columns = ReplayColumns(
+            candles, self.session_engine, self.news_engine, self.iceberg_memory
+        )
+        sessions = columns.session
+        killzones = columns.killzone.tolist()
         
         for i in range(len(candles)):
             candle = candles[i]
@@ -83,17 +143,15 @@ class ReplayEngine:
             liquidity = self.imo.update(candle)
             gann_levels = self.gann.update(candle)
             astro_state = self.astro.update(candle)
-            cycle_state = self.cycle.update(i)
+            cycle_state = self.cycle.update(offset + i)
             
-            # ---- STEP 23-B: SESSION & NEWS ----
-            session = self.session_engine.get_session(candle["time"])
-            killzone = self.session_engine.is_killzone(session, candle["time"])
-            news = self.news_engine.check_news_window(candle["time"])
+            # ---- STEP 23-B: SESSION & NEWS (precomputed) ----
+            session = sessions[i]
+            killzone = killzones[i]
+            news = columns.news(i)
             
-            # ---- STEP 23-B: ICEBERG MEMORY ----
-            iceberg_score = self.iceberg_memory.persistence_score(
-                candle["close"]
-            )
+            # ---- STEP 23-B: ICEBERG MEMORY (precomputed) ----
+            iceberg_score = columns.iceberg(i)
 
             # ---- AI CONTEXT ----
             context = {
@@ -128,12 +186,15 @@ class ReplayEngine:
             explanation = self.explainer.build(context, decision)
             
             # Record to institutional audit trail
-            self.timeline.record(
+            entry = self.timeline.record(
                 candle=candle,
                 context=context,
                 decision=decision,
                 explanation=explanation,
             )
+            if self.spill_dir:
+                # Streaming: session heatmap is kept incrementally
+                self.heatmap_engine.update_session_heatmap(entry)
             
             # Build chart-ready packet
             chart_packet = self.chart_packet_builder.record(
@@ -144,11 +205,12 @@ class ReplayEngine:
             )
 
             # ---- SNAPSHOT SAVE ----
-            self.snapshots.store(
+            snapshot = self.snapshots.store(
                 candle=candle,
                 context=context,
                 decision=decision,
             )
+            yield candle, snapshot
 
     def get_snapshots(self):
         """Return all recorded snapshots"""
@@ -186,8 +248,20 @@ class ReplayEngine:
         """Return signal lifecycle summary (STEP 23-D)"""
         return self.lifecycle.lifecycle_summary()
     
+    def close(self):
+        """Flush and close spill files (streaming mode)."""
+        for store in (self.timeline, self.chart_packet_builder, self.lifecycle, self.snapshots):
+            if getattr(store, "spill", None):
+                store.spill.close()
+
     def get_heatmaps(self):
-        """Return all generated heatmaps (STEP 23-D)"""
+        """
+        Return all generated heatmaps (STEP 23-D).
+        Streaming mode: only the incrementally kept session heatmap; per-candle
+        heatmaps can be built from self.timeline.entries().
+        """
+        if self.spill_dir:
+            return {"session": self.heatmap_engine.get_heatmap("session") or {}}
         if not self.timeline.export():
             return {}
         return self.heatmap_engine.generate_all_heatmaps(self.timeline.export())
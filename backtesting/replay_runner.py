@@ -3,11 +3,17 @@ STEP 23: Replay Runner
 One-command entry point to run institutional replay
 """
 
+import json
+from collections import deque
+from pathlib import Path
+
 from backtesting.replay_engine import ReplayEngine
 from backtesting.ai_snapshot import AISnapshotStore
 from backtesting.trade_outcome import TradeOutcomeAnalyzer
 from backtesting.edge_metrics import EdgeMetrics
 
+MAX_LOOKAHEAD = 30  # Bars after a signal used to measure its outcome
+
 
 def run_replay(candles, engines, config=None, news_events=None):
     """
@@ -44,34 +50,148 @@ def run_replay(candles, engines, config=None, news_events=None):
     replay.run(candles)
     snapshots = snapshot_store.all()
 
-    # ---- EVALUATE OUTCOMES ----
+    # ---- EVALUATE OUTCOMES + CALCULATE METRICS ----
+    outcomes, metrics = score_snapshots(snapshots, candles)
+
+    return {
+        "snapshots": snapshots,
+        "outcomes": outcomes,
+        "metrics": metrics.summary(),
+        "snapshot_stats": snapshot_store.count(),
+        "confidence_dist": snapshot_store.confidence_distribution(),
+    }
+
+
+def score_snapshots(snapshots, candles, metrics=None, max_lookahead=MAX_LOOKAHEAD):
+    """
+    Evaluate each snapshot's outcome and record it into EdgeMetrics.
+
+    Args:
+        snapshots: snapshots in candle order (snapshot i belongs to candles[i])
+        candles: replayed candles; may extend past the snapshots (lookahead tail)
+        metrics: optional EdgeMetrics to accumulate into
+
+    Returns:
+        (outcomes list, EdgeMetrics)
+    """
     analyzer = TradeOutcomeAnalyzer()
+    metrics = metrics or EdgeMetrics()
     outcomes = []
 
     for i, snapshot in enumerate(snapshots):
         if i + 1 < len(candles):
-            future_candles = candles[i + 1 :]
+            # Only the lookahead window is read; avoid copying the whole future
+            future_candles = candles[i + 1 : i + 1 + max_lookahead]
             outcome = analyzer.evaluate_signal(
-                snapshot, future_candles, max_lookahead=30
+                snapshot, future_candles, max_lookahead=max_lookahead
             )
         else:
             outcome = None
 
         outcomes.append(outcome)
-
-    # ---- CALCULATE METRICS ----
-    metrics = EdgeMetrics()
-    for snapshot, outcome in zip(snapshots, outcomes):
         if outcome:
             metrics.record(snapshot, outcome)
 
-    return {
-        "snapshots": snapshots,
-        "outcomes": outcomes,
+    return outcomes, metrics
+
+
+class StreamingScorer:
+    """
+    Scores snapshots as soon as their lookahead window has arrived.
+    Holds at most max_lookahead + 1 bars; same outcomes as score_snapshots.
+    """
+
+    def __init__(self, metrics=None, max_lookahead=MAX_LOOKAHEAD):
+        self.analyzer = TradeOutcomeAnalyzer()
+        self.metrics = metrics or EdgeMetrics()
+        self.max_lookahead = max_lookahead
+        self.pending = deque()  # (snapshot, candle), oldest first
+
+    def add(self, snapshot, candle):
+        """Add the next bar; scores the bar max_lookahead bars back."""
+        self.pending.append((snapshot, candle))
+        if len(self.pending) > self.max_lookahead:
+            self._score_oldest()
+
+    def finish(self):
+        """Score the remaining bars against the shortened tail."""
+        while self.pending:
+            self._score_oldest()
+        return self.metrics
+
+    def _score_oldest(self):
+        snapshot, _ = self.pending.popleft()
+        if not self.pending:
+            return  # Last bar: nothing to measure against
+        future_candles = [candle for _, candle in self.pending]
+        outcome = self.analyzer.evaluate_signal(
+            snapshot, future_candles, max_lookahead=self.max_lookahead
+        )
+        if outcome:
+            self.metrics.record(snapshot, outcome)
+
+
+def run_streaming_replay(candles, engines, output_dir, news_events=None,
+                         chunk_bars=1440, tail=1000):
+    """
+    Constant-memory replay: candles come from any iterable, per-candle
+    records are spilled to JSONL files in output_dir and every summary is
+    computed incrementally.
+
+    Args:
+        candles: iterable of OHLCV dicts (e.g. a generator over months of data)
+        engines: dict with keys {qmo, imo, gann, astro, cycle, mentor}
+        output_dir: directory for timeline/chart_packets/snapshots/lifecycle
+                    (+ edge_sequence) JSONL files and summary.json
+        news_events: optional list of news dicts
+        chunk_bars: candles pulled from the iterable per precompute pass
+        tail: records of each kind kept in memory
+
+    Returns:
+        Same summary keys as run_replay (metrics, snapshot_stats,
+        confidence_dist) plus lifecycle, session heatmap, timeline summary
+        and the written files; no per-candle lists.
+    """
+    output_dir = Path(output_dir)
+    snapshot_store = AISnapshotStore(output_dir / "snapshots.jsonl", tail)
+
+    replay = ReplayEngine(
+        qmo=engines["qmo"],
+        imo=engines["imo"],
+        gann=engines["gann"],
+        astro=engines["astro"],
+        cycle=engines["cycle"],
+        mentor=engines["mentor"],
+        snapshot_store=snapshot_store,
+        news_events=news_events,
+        spill_dir=output_dir,
+        tail=tail,
+    )
+
+    scorer = StreamingScorer(EdgeMetrics(output_dir / "edge_sequence.jsonl"))
+    for candle, snapshot in replay.stream(candles, chunk_bars):
+        scorer.add(snapshot, candle)
+    metrics = scorer.finish()
+    replay.close()
+
+    result = {
         "metrics": metrics.summary(),
         "snapshot_stats": snapshot_store.count(),
         "confidence_dist": snapshot_store.confidence_distribution(),
+        "lifecycle": replay.get_lifecycle_summary(),
+        "session_heatmap": replay.get_heatmaps()["session"],
+        "timeline": replay.timeline.get_summary(),
+        "files": {
+            "timeline": str(replay.timeline.spill.path),
+            "chart_packets": str(replay.chart_packet_builder.spill.path),
+            "snapshots": str(snapshot_store.spill.path),
+            "lifecycle": str(replay.lifecycle.spill.path),
+        },
     }
+    metrics.close()
+    with open(output_dir / "summary.json", "w") as f:
+        json.dump(result, f, indent=2, default=str)
+    return result
 
 
 def replay_report(replay_result):
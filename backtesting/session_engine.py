@@ -6,6 +6,12 @@ Asia / London / NewYork with high-risk periods
 
 from datetime import datetime, time
 
+import numpy as np
+
+SESSION_NAMES = ("ASIA", "LONDON", "NEW_YORK", "OFF_SESSION")
+
+_HOUR_US = 3600 * 10**6
+
 
 class SessionEngine:
     """
@@ -82,6 +88,29 @@ class SessionEngine:
 
         return False
 
+    def classify(self, time_of_day_us):
+        """
+        Vectorized get_session + is_killzone for a whole replay.
+
+        Args:
+            time_of_day_us: int64 array, microseconds since midnight (UTC)
+
+        Returns:
+            (session codes indexing SESSION_NAMES, killzone bool array)
+        """
+        t = np.asarray(time_of_day_us, dtype=np.int64)
+        codes = np.select(
+            [t < 6 * _HOUR_US, t < 13 * _HOUR_US, t < 21 * _HOUR_US],
+            [0, 1, 2],
+            default=3,
+        ).astype(np.int8)
+        killzone = (
+            ((codes == 1) & (t >= 7 * _HOUR_US) & (t <= 10 * _HOUR_US))
+            | ((codes == 2) & (t >= 13 * _HOUR_US + _HOUR_US // 2) & (t <= 16 * _HOUR_US))
+            | (codes == 3)
+        )
+        return codes, killzone
+
     def session_quality(self, session):
         """
         Return expected volatility and reliability for each session.
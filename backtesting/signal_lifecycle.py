@@ -13,6 +13,8 @@ Signals are not instant trades. They evolve through states:
 This enables professional signal tracking and debugging.
 """
 
+from backtesting.spill_file import SpillFile
+
 
 class SignalLifecycle:
     """State machine for signal evolution tracking."""
@@ -26,10 +28,19 @@ class SignalLifecycle:
         "INVALIDATED",
     ]
     
-    def __init__(self):
-        """Initialize with no active signal."""
-        self.current_signal = None
-        self.history = []
+    def __init__(self, spill_path=None, tail=1000):
+        """
+        Initialize with no active signal.
+        
+        Args:
+            spill_path: Optional JSONL file; history streams to disk and
+                        self.history keeps only the last `tail` records
+            tail: In-memory records kept when spilling
+        """
+        self.spill_path = spill_path
+        self.tail = tail
+        self.spill = None
+        self.reset()
     
     def update(self, context, decision):
         """
@@ -55,7 +66,7 @@ class SignalLifecycle:
                 "born_at": context.get("time"),
                 "bars_alive": 0,
             }
-            self.history.append(self.current_signal.copy())
+            self._archive(self.current_signal.copy())
             return self.current_signal
         
         # Case 2: Active signal exists
@@ -72,7 +83,7 @@ class SignalLifecycle:
                 self.current_signal["state"] = "INVALIDATED"
                 self.current_signal["invalidated_at"] = context.get("time")
                 self.current_signal["reason"] = "conditions_failed"
-                self.history.append(self.current_signal.copy())
+                self._archive(self.current_signal.copy())
                 self.current_signal = None
                 return self.current_signal
             
@@ -81,7 +92,7 @@ class SignalLifecycle:
                 self.current_signal["state"] = "COMPLETED"
                 self.current_signal["completed_at"] = context.get("time")
                 self.current_signal["exit_price"] = context.get("price")
-                self.history.append(self.current_signal.copy())
+                self._archive(self.current_signal.copy())
                 self.current_signal = None
                 return self.current_signal
             
@@ -94,6 +105,17 @@ class SignalLifecycle:
         
         return None
     
+    def _archive(self, record):
+        """Append a state record to history and the running summary counts."""
+        if self.spill:
+            self.spill.append(record)
+        else:
+            self.history.append(record)
+        self.records += 1
+        self.completed += record["state"] == "COMPLETED"
+        self.invalidated += record["state"] == "INVALIDATED"
+        self.bars_alive_sum += record["bars_alive"]
+    
     def _should_invalidate(self, context, decision):
         """Check if signal should be invalidated."""
         # Signal invalidates if killzone blocks it
@@ -124,17 +146,28 @@ class SignalLifecycle:
         return self.current_signal
     
     def get_history(self):
-        """Return full signal history."""
+        """Return full signal history (only the tail when spilling)."""
         return self.history
     
     def reset(self):
         """Reset to initial state."""
         self.current_signal = None
-        self.history = []
+        if self.spill:
+            self.spill.close()
+        if self.spill_path:
+            self.spill = SpillFile(self.spill_path, self.tail)
+            self.history = self.spill.tail
+        else:
+            self.spill = None
+            self.history = []
+        self.records = 0
+        self.completed = 0
+        self.invalidated = 0
+        self.bars_alive_sum = 0
     
     def lifecycle_summary(self):
         """Return summary stats of signal lifecycle."""
-        if not self.history:
+        if not self.records:
             return {
                 "total_signals": 0,
                 "completed": 0,
@@ -142,19 +175,10 @@ class SignalLifecycle:
                 "avg_bars_alive": 0,
             }
         
-        completed = [s for s in self.history if s["state"] == "COMPLETED"]
-        invalidated = [s for s in self.history if s["state"] == "INVALIDATED"]
-        
-        avg_bars = (
-            sum(s["bars_alive"] for s in self.history) / len(self.history)
-            if self.history
-            else 0
-        )
-        
         return {
-            "total_signals": len(self.history),
-            "completed": len(completed),
-            "invalidated": len(invalidated),
-            "avg_bars_alive": avg_bars,
-            "completion_rate": len(completed) / len(self.history) if self.history else 0,
+            "total_signals": self.records,
+            "completed": self.completed,
+            "invalidated": self.invalidated,
+            "avg_bars_alive": self.bars_alive_sum / self.records,
+            "completion_rate": self.completed / self.records,
         }
@@ -0,0 +1,86 @@
+# backtesting/spill_file.py
+"""
+SpillFile: Append-only JSONL storage with a bounded in-memory tail.
+
+Used by the replay builders in streaming mode so that timelines, chart
+packets, snapshots and lifecycle history go to disk as they are produced
+while memory holds only the most recent entries.
+"""
+
+import json
+import os
+from collections import deque
+from pathlib import Path
+
+
+class SpillFile:
+    """Append-only JSONL file + last `tail` entries in memory."""
+
+    def __init__(self, path, tail=1000):
+        """
+        Args:
+            path: JSONL file to write (truncated on open)
+            tail: number of most recent entries kept in memory
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.tail = deque(maxlen=tail)
+        self.count = 0
+        self._file = open(self.path, "w")
+
+    def append(self, item):
+        """Write one entry to disk and keep it in the tail."""
+        self._file.write(json.dumps(item, default=str))
+        self._file.write("\n")
+        self.tail.append(item)
+        self.count += 1
+
+    def flush(self):
+        if not self._file.closed:
+            self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def drop(self, count):
+        """Remove the first `count` entries from disk; the tail is reloaded."""
+        was_open = not self._file.closed
+        self.close()
+        partial = self.path.with_name(self.path.name + ".tmp")
+        kept = deque(maxlen=self.tail.maxlen)
+        self.count = 0
+        with open(self.path) as source, open(partial, "w") as target:
+            for i, line in enumerate(source):
+                if i >= count:
+                    target.write(line)
+                    kept.append(line)
+                    self.count += 1
+        os.replace(partial, self.path)
+        self.tail.clear()
+        self.tail.extend(json.loads(line) for line in kept)
+        if was_open:
+            self._file = open(self.path, "a")
+
+    def __len__(self):
+        return self.count
+
+    def __bool__(self):
+        return True  # An open spill is in use even before the first entry
+
+    def __iter__(self):
+        """Stream every entry back from disk (in write order)."""
+        self.flush()
+        with open(self.path) as f:
+            for line in f:
+                yield json.loads(line)
+
+    def write_json_array(self, f):
+        """Copy all entries to an open file as a JSON array, one entry at a time."""
+        self.flush()
+        f.write("[")
+        with open(self.path) as source:
+            for i, line in enumerate(source):
+                f.write(",\n" if i else "\n")
+                f.write(line.rstrip("\n"))
+        f.write("\n]")
@@ -12,13 +12,23 @@ Stores candle-by-candle reasoning so you can:
 from datetime import datetime
 import json
 
+from backtesting.spill_file import SpillFile
+
 
 class TimelineBuilder:
     """Records every candle's decision context and reasoning."""
     
-    def __init__(self):
-        """Initialize empty timeline."""
-        self.timeline = []
+    def __init__(self, spill_path=None, tail=1000):
+        """
+        Initialize empty timeline.
+        
+        Args:
+            spill_path: Optional JSONL file; entries stream to disk and
+                        self.timeline keeps only the last `tail` entries
+            tail: In-memory entries kept when spilling
+        """
+        self.spill = SpillFile(spill_path, tail) if spill_path else None
+        self.timeline = self.spill.tail if self.spill else []
         self.metadata = {
             "start_time": None,
             "end_time": None,
@@ -64,7 +74,10 @@ class TimelineBuilder:
             "details": explanation.get("details") if explanation else [],
         }
         
-        self.timeline.append(entry)
+        if self.spill:
+            self.spill.append(entry)
+        else:
+            self.timeline.append(entry)
         
         # Update metadata
         if not self.metadata["start_time"]:
@@ -75,13 +88,47 @@ class TimelineBuilder:
             self.metadata["total_trades"] += 1
         else:
             self.metadata["skipped_trades"] += 1
+        return entry
+    
+    def trim(self, count):
+        """Drop the first `count` entries (e.g. warm-up bars) and recompute metadata."""
+        if self.spill:
+            self.spill.drop(count)  # Rewrites the file; self.timeline is the reloaded tail
+        else:
+            self.timeline = self.timeline[count:]
+        
+        start_time = end_time = None
+        total = trades = 0
+        for entry in self.entries():
+            start_time = start_time or entry["time"]
+            end_time = entry["time"]
+            total += 1
+            trades += entry["decision"]["is_trade"]
+        self.metadata.update({
+            "start_time": start_time,
+            "end_time": end_time,
+            "total_candles": total,
+            "total_trades": trades,
+            "skipped_trades": total - trades,
+        })
     
     def export(self):
-        """Export full timeline as list of dicts."""
+        """Export full timeline as list of dicts (only the tail when spilling)."""
         return self.timeline
     
+    def entries(self):
+        """Iterate every entry (streamed back from disk when spilling)."""
+        return iter(self.spill) if self.spill else iter(self.timeline)
+    
     def export_json(self, filepath):
         """Save timeline to JSON file."""
+        if self.spill:
+            with open(filepath, "w") as f:
+                f.write('{"metadata": ' + json.dumps(self.metadata) + ', "timeline": ')
+                self.spill.write_json_array(f)
+                f.write("}")
+            return filepath
+
         output = {
             "metadata": self.metadata,
             "timeline": self.timeline,
@@ -113,7 +160,7 @@ class TimelineBuilder:
                 ],
             )
             writer.writeheader()
-            for entry in self.timeline:
+            for entry in self.entries():
                 writer.writerow({
                     "time": entry["time"],
                     "price": entry["price"]["close"],
@@ -129,16 +176,16 @@ class TimelineBuilder:
     
     def get_trades_only(self):
         """Filter timeline to only trades (decisions != None)."""
-        return [e for e in self.timeline if e["decision"]["is_trade"]]
+        return [e for e in self.entries() if e["decision"]["is_trade"]]
     
     def get_skipped_only(self):
         """Filter timeline to only skipped candles."""
-        return [e for e in self.timeline if not e["decision"]["is_trade"]]
+        return [e for e in self.entries() if not e["decision"]["is_trade"]]
     
     def get_session_trades(self, session_name):
         """Get all trades in specific session (ASIA, LONDON, NEW_YORK, OFF_SESSION)."""
         return [
-            e for e in self.timeline 
+            e for e in self.entries() 
             if e["session"] == session_name and e["decision"]["is_trade"]
         ]
     
@@ -159,11 +206,11 @@ class TimelineBuilder:
     
     def get_by_time(self, timestamp):
         """Get single timeline entry by timestamp."""
-        for entry in self.timeline:
+        for entry in self.entries():
             if entry["time"] == timestamp:
                 return entry
         return None
     
     def length(self):
         """Return number of candles recorded."""
-        return len(self.timeline)
+        return len(self.spill) if self.spill else len(self.timeline)
@@ -0,0 +1,77 @@
+# backtesting/timeline_pages.py
+"""
+TimelinePages: Lazy, paged access to on-disk replay output.
+
+Wraps a JSONL file written by a streaming replay (timeline.jsonl,
+chart_packets.jsonl, ...) as a read-only sequence. One pass records the
+byte offset of every page; entries are parsed only when their page is
+touched, and a small LRU cache keeps recently viewed pages in memory.
+"""
+
+import json
+import re
+from collections import OrderedDict
+from collections.abc import Sequence
+from pathlib import Path
+
+_TIME_FIELD = re.compile(rb'"time": "([^"]*)"')
+
+
+class TimelinePages(Sequence):
+    """Read-only sequence over a JSONL file, loaded one page at a time."""
+
+    def __init__(self, path, page_size=1024, cache_pages=16):
+        """
+        Args:
+            path: JSONL file (one entry per line)
+            page_size: entries per page
+            cache_pages: pages kept in memory (least recently used evicted)
+        """
+        self.path = Path(path)
+        self.page_size = page_size
+        self.cache_pages = cache_pages
+        self._cache = OrderedDict()
+        self._offsets = []  # Byte offset of each page's first line
+        self.size = 0
+
+        offset = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                if self.size % page_size == 0:
+                    self._offsets.append(offset)
+                offset += len(line)
+                self.size += 1
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.size))]
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError("timeline index out of range")
+        page, row = divmod(index, self.page_size)
+        return self._page(page)[row]
+
+    def _page(self, page):
+        entries = self._cache.get(page)
+        if entries is not None:
+            self._cache.move_to_end(page)
+            return entries
+
+        entries = []
+        with open(self.path, "rb") as f:
+            f.seek(self._offsets[page])
+            for _ in range(min(self.page_size, self.size - page * self.page_size)):
+                entries.append(json.loads(f.readline()))
+        self._cache[page] = entries
+        if len(self._cache) > self.cache_pages:
+            self._cache.popitem(last=False)
+        return entries
+
+    def times(self):
+        """Every entry's "time" field, read without parsing whole entries."""
+        with open(self.path, "rb") as f:
+            return [_TIME_FIELD.search(line).group(1).decode() for line in f]
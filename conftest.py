@@ -0,0 +1,19 @@
+"""
+Pytest setup - keep test runs off the tracked databases in data/
+
+Module-level recorders (order_recorder, shared state) open their SQLite
+files on import, so the paths are redirected before any test module loads.
+"""
+
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+_DATA_DIR = Path(tempfile.mkdtemp(prefix="qmo_test_data_"))
+os.environ.setdefault("QMO_ORDERS_DB", str(_DATA_DIR / "orders.db"))
+os.environ.setdefault("QMO_SHARED_STATE_DB", str(_DATA_DIR / "market_state.db"))
+
+
+def pytest_unconfigure(config):
+    shutil.rmtree(_DATA_DIR, ignore_errors=True)
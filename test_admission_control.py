@@ -0,0 +1,156 @@
+"""
+Test Admission Control - route limits, priority order, queue deadlines and 503 shedding
+"""
+
+import asyncio
+
+import httpx
+
+from backend.api import routes, server
+from backend.deployment.admission_control import (
+    AdmissionController, AdmissionRejected, RoutePolicy, RoutePriority
+)
+
+LIVE = RoutePolicy("/live", RoutePriority.LIVE, max_concurrent=2, queue_timeout=1.0, max_queue=4, retry_after=1)
+ANALYTICS = RoutePolicy("/analytics", RoutePriority.ANALYTICS, max_concurrent=2, queue_timeout=1.0, max_queue=4, retry_after=5)
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_route_limit_and_priority():
+    """Per-route limits hold; freed slots go to LIVE waiters before older ANALYTICS ones."""
+    print("\n" + "=" * 70)
+    print("TEST: Admission limits + priority")
+    print("=" * 70)
+
+    async def scenario():
+        control = AdmissionController([LIVE, ANALYTICS], total_slots=3)
+        admitted = []
+
+        async def request(policy, name):
+            await control.acquire(policy)
+            admitted.append(name)
+
+        # Route limit: only 2 of 3 analytics requests start, although 3 slots exist
+        tasks = [asyncio.create_task(request(ANALYTICS, f"a{i}")) for i in range(3)]
+        await _settle()
+        assert admitted == ["a0", "a1"]
+        assert control.stats()["routes"]["/analytics"]["queued"] == 1
+
+        # A live request takes the third shared slot immediately
+        tasks.append(asyncio.create_task(request(LIVE, "l0")))
+        await _settle()
+        assert admitted == ["a0", "a1", "l0"]
+
+        # Pool full: a later live request queues behind a2
+        tasks.append(asyncio.create_task(request(LIVE, "l1")))
+        await _settle()
+        control.release(ANALYTICS)  # a0 done: l1 (LIVE) jumps ahead of a2
+        await _settle()
+        assert admitted == ["a0", "a1", "l0", "l1"]
+        control.release(LIVE)
+        await _settle()
+        assert admitted[-1] == "a2"
+        await asyncio.gather(*tasks)
+
+        stats = control.stats()
+        assert stats["active_total"] == 3
+        assert stats["routes"]["/analytics"]["admitted"] == 3
+        assert stats["routes"]["/analytics"]["max_queue_depth"] == 1
+        print(f"  ✅ admission order {admitted}")
+
+    asyncio.run(scenario())
+
+
+def test_queue_timeout_full_and_cancel():
+    """Waiters past their deadline or beyond max_queue are shed; cancelled waiters free their place."""
+    print("\n" + "=" * 70)
+    print("TEST: Admission deadlines and queue limits")
+    print("=" * 70)
+
+    async def scenario():
+        policy = RoutePolicy("/slow", RoutePriority.ANALYTICS, max_concurrent=1, queue_timeout=0.05, max_queue=2, retry_after=3)
+        control = AdmissionController([policy], total_slots=4)
+        await control.acquire(policy)  # Hold the only slot for this route
+
+        # Deadline
+        try:
+            await control.acquire(policy)
+            assert False, "expected shed"
+        except AdmissionRejected as e:
+            assert e.reason == "queue deadline exceeded" and e.policy is policy
+        assert control.queued["/slow"] == 0
+
+        # Queue full
+        waiters = [asyncio.create_task(control.acquire(policy)) for _ in range(2)]
+        await _settle()
+        try:
+            await control.acquire(policy)
+            assert False, "expected shed"
+        except AdmissionRejected as e:
+            assert e.reason == "queue full"
+
+        # Cancelled waiter leaves the queue and never takes the slot
+        waiters[0].cancel()
+        await _settle()
+        assert control.queued["/slow"] == 1
+        control.release(policy)
+        await waiters[1]
+        assert control.active["/slow"] == 1 and control.queued["/slow"] == 0
+        control.release(policy)
+
+        counters = control.stats()["routes"]["/slow"]
+        assert counters["shed_timeout"] == 1 and counters["shed_queue_full"] == 1
+        assert counters["admitted"] == 2
+        assert control.active_total == 0
+        print(f"  ✅ counters {counters}")
+
+    asyncio.run(scenario())
+
+
+def test_shedding_under_load():
+    """Concurrent /chart calls beyond the queue deadline get 503 + Retry-After; the rest succeed."""
+    print("\n" + "=" * 70)
+    print("TEST: 503 shedding under concurrent load")
+    print("=" * 70)
+
+    policy = RoutePolicy("/api/v1/chart", RoutePriority.LIVE, max_concurrent=2, queue_timeout=0.3, max_queue=3, retry_after=7)
+    saved_admission, saved_candles = server.admission, routes._chart_candles
+    server.admission = AdmissionController([policy], total_slots=4)
+
+    async def slow_candles(interval, limit):
+        await asyncio.sleep(0.2)
+        return None  # Sample candles
+
+    routes._chart_candles = slow_candles
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            responses = await asyncio.gather(*[
+                client.post("/api/v1/chart", json={"bars": 10}) for _ in range(8)
+            ])
+        return [r.status_code for r in responses], responses
+
+    try:
+        codes, responses = asyncio.run(scenario())
+    finally:
+        server.admission, routes._chart_candles = saved_admission, saved_candles
+
+    # 2 run at once, 3 may queue, each wave takes ~0.2s against a 0.3s deadline
+    assert codes.count(200) == 4, codes
+    assert codes.count(503) == 4, codes
+    shed = [r for r in responses if r.status_code == 503]
+    assert all(r.headers["Retry-After"] == "7" for r in shed)
+    reasons = sorted(r.json()["reason"] for r in shed)
+    assert reasons == ["queue deadline exceeded"] + ["queue full"] * 3
+    print(f"  ✅ status codes {codes}")
+
+
+if __name__ == "__main__":
+    test_route_limit_and_priority()
+    test_queue_timeout_full_and_cancel()
+    test_shedding_under_load()
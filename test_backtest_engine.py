@@ -0,0 +1,96 @@
+"""
+Test Backtest Engine - indexed signal evaluation over long candle histories
+"""
+
+import random
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from backend.backtesting.backtest_engine import BacktestEngine, forward_extrema, time_array
+
+
+class ScriptedPipeline:
+    """Pipeline stand-in: BUY/SELL on a fixed schedule of candle closes."""
+
+    def __init__(self, every=7):
+        self.every = every
+        self.calls = 0
+
+    def process_tick(self, trades, context):
+        self.calls += 1
+        assert len(context) <= 51
+        if self.calls % self.every:
+            return {"decision": "WAIT", "confidence": 0.0}
+        return {"decision": "BUY" if self.calls % 2 else "SELL", "confidence": 0.75}
+
+
+def _engine(pipeline):
+    engine = BacktestEngine.__new__(BacktestEngine)  # Skip loading the live engines
+    engine.pipeline = pipeline
+    engine.trades_log = []
+    engine.performance_stats = {}
+    engine.condition_analysis = {}
+    return engine
+
+
+def _candles(count, seed=0):
+    rng = random.Random(seed)
+    start, price, candles = datetime(2025, 1, 6), 2500.0, []
+    for i in range(count):
+        price += rng.uniform(-2, 2)
+        candles.append({
+            "time": (start + timedelta(minutes=i)).isoformat(),
+            "open": price, "high": price + rng.uniform(0, 3), "low": price - rng.uniform(0, 3),
+            "close": price + rng.uniform(-1, 1), "volume": 100,
+        })
+    return candles
+
+
+def test_exit_window_and_extrema():
+    candles = [
+        {"time": "2026-01-10T10:00:00", "open": 3348, "high": 3365, "low": 3342, "close": 3362},
+        {"time": "2026-01-10T10:05:00", "open": 3362, "high": 3368, "low": 3360, "close": 3363},
+        {"time": "2026-01-10T10:10:00", "open": 3363, "high": 3371, "low": 3355, "close": 3358},
+    ]
+    engine = _engine(ScriptedPipeline(every=1))  # Signal on every candle: BUY, SELL, BUY
+    results = engine.run_backtest(candles, datetime(2026, 1, 1), datetime(2026, 1, 31))
+    # BUY @3362: window high 3371 -> win 0.9R; SELL @3363: window low 3355 -> win 0.8R; last: no exit
+    assert results["total_signals"] == 3
+    assert (results["winning_trades"], results["losing_trades"]) == (2, 0)
+    assert abs(results["avg_r_multiple"] - 0.85) < 1e-9
+
+    values = np.array([5.0, 1.0, 4.0, 2.0, 3.0])
+    assert forward_extrema(values, 2, -np.inf).tolist() == [5.0, 4.0, 4.0, 3.0, 3.0]
+    assert forward_extrema(values, 3, np.inf).tolist() == [1.0, 1.0, 2.0, 2.0, 3.0]
+    assert time_array([{"time": "2025-01-06T00:00:01"}]).tolist() == [1736121601000000]
+
+
+def test_evaluation_scales_linearly():
+    """Run time grows with the data, not with data x signals."""
+    print("\n" + "=" * 70)
+    print("TEST: Backtest engine scaling")
+    print("=" * 70)
+
+    timings = {}
+    for count in (20_000, 80_000):
+        candles = _candles(count)
+        engine = _engine(ScriptedPipeline())
+        started = time.perf_counter()
+        results = engine.run_backtest(candles, datetime(2025, 1, 1), datetime(2026, 1, 1))
+        timings[count] = time.perf_counter() - started
+        assert results["total_signals"] == count // 7
+        assert results["winning_trades"] + results["losing_trades"] == count // 7
+
+    ratio = timings[80_000] / timings[20_000]
+    assert ratio < 8  # Quadratic evaluation would be ~16x
+    print(f"  ✅ 20k bars {timings[20_000]:.2f}s, 80k bars {timings[80_000]:.2f}s (x{ratio:.1f})")
+
+    decay = engine.measure_edge_decay()
+    assert decay["wr_first"] == decay["wr_second"] == 1.0
+
+
+if __name__ == "__main__":
+    test_exit_window_and_extrema()
+    test_evaluation_scales_linearly()
@@ -0,0 +1,83 @@
+"""
+Test Bar Service - event-time base bars and incremental rollups
+"""
+
+import json
+from datetime import datetime, timedelta, timezone
+
+from backend.engines.bar_builder import BarService
+
+
+def test_rollup_and_bar_close_events():
+    """1m ticks roll into 5m bars that match the base series; closes are published."""
+    print("\n" + "=" * 70)
+    print("TEST: Event-time bars and rollups")
+    print("=" * 70)
+
+    service = BarService(timeframes=("5m", "15m"))
+    closed = []
+    service.subscribe(lambda symbol, tf, bar: closed.append((tf, bar)), timeframe="5m")
+
+    start = datetime(2026, 1, 5, 14, 0, tzinfo=timezone.utc)
+    for i in range(12 * 60):  # 12 minutes, one tick every second
+        price = 2500 + (i % 37) * 0.1
+        service.ingest_trade("GC", price, 1, (start + timedelta(seconds=i)).isoformat())
+
+    # Late tick is dropped, not applied to a closed bar
+    service.ingest_trade("GC", 9999.0, 1, start.isoformat())
+    assert service.counters["late_ticks"] == 1
+
+    one_min = service.bars("GC", "1m", limit=100, include_forming=False)
+    five_min = service.bars("GC", "5m", limit=100, include_forming=False)
+    assert len(one_min) == 11 and len(five_min) == 2
+    assert [tf for tf, _ in closed] == ["5m", "5m"]
+
+    first = five_min[0]
+    assert first["timestamp"] == "2026-01-05T14:00:00Z"
+    assert first["open"] == one_min[0]["open"] and first["close"] == one_min[4]["close"]
+    assert first["high"] == max(b["high"] for b in one_min[:5])
+    assert first["volume"] == 300
+
+    # Forming 15m bar covers everything so far
+    live = service.forming("GC", "15m")
+    assert live["volume"] == 12 * 60
+    service.advance("GC", start + timedelta(minutes=12))
+    assert len(service.bars("GC", "1m", include_forming=False)) == 12
+    print(f"  ✅ {len(one_min)} x 1m -> {len(five_min)} x 5m, live 15m volume {live['volume']}")
+
+
+def test_series_export_and_load():
+    """A worker loading the exported series serves the same bars and can continue ingesting."""
+    print("\n" + "=" * 70)
+    print("TEST: Bar series shared across workers")
+    print("=" * 70)
+
+    writer, reader = BarService(), BarService()
+    closed = []
+    reader.subscribe(lambda symbol, tf, bar: closed.append(tf))
+    start = datetime(2026, 1, 5, 14, 0, tzinfo=timezone.utc)
+    ticks = [(2500 + (i % 53) * 0.1, 1 + i % 3, (start + timedelta(seconds=7 * i)).isoformat()) for i in range(3000)]
+    for price, size, ts in ticks[:2000]:
+        writer.ingest_trade("GC", price, size, ts)
+    reader.ingest_trade("GC", 1.0, 1, start.isoformat())  # Stale local state is replaced
+
+    reader.load_series("GC", json.loads(json.dumps(writer.export_series("GC"))))
+    assert not closed  # Loading publishes no bar closes
+    for tf in ("1m", "5m", "1h", "session"):
+        assert reader.bars("GC", tf, 500) == writer.bars("GC", tf, 500)
+        assert reader.has_history("GC", tf, 3) == writer.has_history("GC", tf, 3)
+
+    for service in (writer, reader):
+        for price, size, ts in ticks[2000:]:
+            service.ingest_trade("GC", price, size, ts)
+    assert reader.bars("GC", "15m", 500) == writer.bars("GC", "15m", 500)
+    assert "15m" in closed
+
+    reader.load_series("GC", None)
+    assert reader.bars("GC", "1m") == []
+    print(f"  ✅ {len(writer.bars('GC', '1m', 2000))} x 1m bars identical after load")
+
+
+if __name__ == "__main__":
+    test_rollup_and_bar_close_events()
+    test_series_export_and_load()
@@ -0,0 +1,97 @@
+"""
+Test Batch Endpoint - shared engine inputs, per-call failures and the call cap
+"""
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.api import routes
+
+
+def _client():
+    app = FastAPI()
+    app.include_router(routes.router)
+    return TestClient(app)
+
+
+def test_batch_memoizes_shared_inputs():
+    """Identical engine inputs are computed once per batch and never across batches."""
+    print("\n" + "=" * 70)
+    print("TEST: Batch memoization")
+    print("=" * 70)
+
+    calls = []
+    original = routes.liquidity_engine.detect_liquidity_pool
+
+    def counting_pool(support, resistance, volume):
+        calls.append((support, resistance, volume))
+        return original(support, resistance, volume)
+
+    routes.liquidity_engine.detect_liquidity_pool = counting_pool
+    try:
+        client = _client()
+        zone = {"support": 2400.0, "resistance": 2500.0, "volume": 1500.0}
+        batch = {"calls": [
+            {"id": "l1", "engine": "liquidity", "params": zone},
+            {"id": "l2", "engine": "liquidity", "params": zone},
+            {"id": "l3", "engine": "liquidity", "params": {**zone, "volume": 900.0}},
+            {"id": "m1", "engine": "market", "params": {}},
+            {"id": "m2", "engine": "market", "params": {"interval": "5m"}},
+            {"id": "c1", "engine": "cycle", "params": {"bars": 90}},
+            {"id": "c2", "engine": "cycle", "params": {"bars": 90}},
+        ]}
+        response = client.post("/api/v1/batch", json=batch)
+        assert response.status_code == 200
+        payload = response.json()
+        assert [r["id"] for r in payload["results"]] == ["l1", "l2", "l3", "m1", "m2", "c1", "c2"]
+        assert all(r["ok"] for r in payload["results"])
+
+        # l2 reuses pool + sweep, m2 reuses m1's Gann levels, c2 reuses c1's cycle check
+        assert payload["shared_inputs_reused"] == 4
+        assert calls == [(2400.0, 2500.0, 1500.0), (2400.0, 2500.0, 900.0)]
+
+        # Memoized results match the standalone endpoint
+        standalone = client.post("/api/v1/liquidity", json=zone).json()
+        for field in ("detected", "pool_level", "pool_strength", "sweep_probability"):
+            assert payload["results"][1]["result"][field] == standalone[field]
+
+        # A new batch starts with an empty memo
+        client.post("/api/v1/batch", json={"calls": batch["calls"][:1]})
+        assert len(calls) == 4
+        print(f"  ✅ {payload['shared_inputs_reused']} shared inputs reused")
+    finally:
+        routes.liquidity_engine.detect_liquidity_pool = original
+
+
+def test_batch_errors_and_limit():
+    """A bad call fails alone; oversized batches are rejected with 413."""
+    print("\n" + "=" * 70)
+    print("TEST: Batch errors and call limit")
+    print("=" * 70)
+
+    client = _client()
+    response = client.post("/api/v1/batch", json={"calls": [
+        {"engine": "liquidity", "params": {"support": 2400.0}},
+        {"engine": "nope", "params": {}},
+        {"engine": "CYCLE", "params": {"bars": 90}},
+    ]})
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["id"] for r in results] == ["0", "1", "2"]
+    assert [r["ok"] for r in results] == [False, False, True]
+    assert "resistance" in results[0]["error"]
+    assert "Unknown engine" in results[1]["error"]
+    assert results[2]["engine"] == "cycle" and results[2]["result"]["bars"] == 90
+
+    limit = routes.MAX_BATCH_CALLS
+    cycle = {"engine": "cycle", "params": {"bars": 30}}
+    assert client.post("/api/v1/batch", json={"calls": [cycle] * limit}).status_code == 200
+    over = client.post("/api/v1/batch", json={"calls": [cycle] * (limit + 1)})
+    assert over.status_code == 413
+    assert str(limit) in over.json()["detail"]
+    print(f"  ✅ per-call errors isolated, cap {limit} enforced")
+
+
+if __name__ == "__main__":
+    test_batch_memoizes_shared_inputs()
+    test_batch_errors_and_limit()
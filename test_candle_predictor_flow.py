@@ -0,0 +1,139 @@
+"""
+Test 5-Minute Predictor Order Flow - running accumulators and watermark feed
+"""
+
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from backend.intelligence.candle_predictor_5min import FiveMinuteCandlePredictor
+from backend.intelligence.pattern_memory import PatternMemory
+
+
+def _period_orders(count, seed):
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    start = now.replace(minute=(now.minute // 5) * 5, second=0, microsecond=0)
+    span = max(1.0, min(299.0, (now - start).total_seconds()))
+    offsets = sorted(rng.uniform(0, span) for _ in range(count))
+    return [
+        {
+            "timestamp": (start + timedelta(seconds=s)).isoformat(),
+            "price": round(2650 + rng.uniform(-5, 5), 1),
+            "size": rng.randint(1, 40),
+            "side": rng.choice(["BUY", "SELL"]),
+        }
+        for s in offsets
+    ], start
+
+
+def _reference(orders, start):
+    """The per-order loops the predictor used before the accumulators."""
+    buys = [o for o in orders if o["side"] == "BUY"]
+    sells = [o for o in orders if o["side"] == "SELL"]
+    mid = len(orders) // 2
+    early = sum(o["size"] for o in orders[:mid])
+    late = sum(o["size"] for o in orders[mid:])
+    timeline = orders[-300:]
+    half = len(timeline) // 2
+    recent = sum(o["size"] for o in timeline[half:])
+    earlier = sum(o["size"] for o in timeline[:half])
+    momentum = ("BUILDING" if len(timeline) < 5 else "ACCELERATING" if recent > earlier * 1.2
+                else "DECELERATING" if recent < earlier * 0.8 else "STEADY")
+    minutes = {}
+    for o in orders:
+        second = int((datetime.fromisoformat(o["timestamp"]) - start).total_seconds())
+        bucket = minutes.setdefault(second // 60, {"buy": 0, "sell": 0})
+        bucket["buy" if o["side"] == "BUY" else "sell"] += o["size"]
+
+    def weighted(side):
+        return sum(o["size"] * (0.5 + i / len(side)) for i, o in enumerate(side))
+
+    return {
+        "buy_volume": sum(o["size"] for o in buys),
+        "sell_volume": sum(o["size"] for o in sells),
+        "total_orders": len(orders),
+        "volume_acceleration": (late - early) / early if len(orders) >= 4 and early else 0.0,
+        "time_weighted_buy": weighted(buys),
+        "time_weighted_sell": weighted(sells),
+        "order_flow_momentum": momentum,
+        "volume_distribution": dict(sorted(minutes.items())),
+    }
+
+
+def test_accumulators_match_loops_and_refeed_is_deduplicated():
+    """Overlapping re-feeds never double count; analysis equals the per-order loops."""
+    print("\n" + "=" * 70)
+    print("TEST: 5-minute predictor running accumulators")
+    print("=" * 70)
+
+    orders, start = _period_orders(2000, 5)
+    predictor = FiveMinuteCandlePredictor()
+    for end in range(500, len(orders) + 1, 500):
+        # Like /candle/5min/predict: every call re-sends an overlapping, newest-first window
+        predictor.add_orders(list(reversed(orders[max(0, end - 700):end])))
+    if predictor.current_period_start != start:
+        print("  ⚠️ Period rolled over during the test; skipping comparison")
+        return
+
+    analysis = predictor._analyze_5min_orderflow()
+    expected = _reference(orders, start)
+    assert predictor.orders_in_period == len(orders)
+    for key, value in expected.items():
+        if isinstance(value, float):
+            assert abs(analysis[key] - value) < 1e-6 * max(1.0, abs(value)), key
+        else:
+            assert analysis[key] == value, key
+
+    started = time.perf_counter()
+    for _ in range(200):
+        predictor.add_orders(orders[-1:])  # Already seen: skipped by the watermark
+        predictor._analyze_5min_orderflow()
+    per_call_us = (time.perf_counter() - started) / 200 * 1e6
+    assert predictor.orders_in_period == len(orders)
+    print(f"  ✅ {len(orders)} orders, re-feed + analyze {per_call_us:.0f}µs per call")
+
+
+def test_outcomes_label_the_period_they_follow():
+    """A closed candle labels only the pattern ending at its start, even if that pattern is saved later."""
+    print("\n" + "=" * 70)
+    print("TEST: 5-minute outcomes by bar start")
+    print("=" * 70)
+
+    def orders_at(start, count=20):
+        return [{"timestamp": (start + timedelta(seconds=10 * i)).isoformat(), "price": 2650.0,
+                 "size": 5, "side": "BUY" if i % 3 else "SELL"} for i in range(count)]
+
+    t0 = datetime(2025, 1, 6, 9, 0)
+    with tempfile.TemporaryDirectory() as tmp:
+        memory = PatternMemory(db_path=Path(tmp) / "patterns.db")
+        predictor = FiveMinuteCandlePredictor(pattern_memory=memory)
+
+        predictor.add_orders(orders_at(t0), now=t0 + timedelta(minutes=4))
+        predictor.add_orders(orders_at(t0 + timedelta(minutes=5)), now=t0 + timedelta(minutes=9))
+        first = predictor.historical_patterns[-1]
+        assert first["period_end"] == "2025-01-06T09:05:00"
+
+        # 09:05 candle closes: labels the 09:00 period (aware bar times are fine)
+        assert predictor.record_actual_outcome("UP", bar_start=(t0 + timedelta(minutes=5)).replace(tzinfo=timezone.utc))
+        # 09:10 candle closes before any order after 09:10 was polled: waits for the 09:05 pattern
+        assert not predictor.record_actual_outcome("DOWN", bar_start=t0 + timedelta(minutes=10))
+        assert first["actual_direction"] == "UP" and len(predictor.historical_patterns) == 1
+        # A late or repeated close never relabels
+        assert not predictor.record_actual_outcome("SIDEWAYS", bar_start=t0 + timedelta(minutes=5))
+        assert not predictor.record_actual_outcome("SIDEWAYS", bar_start=t0)
+
+        predictor.add_orders(orders_at(t0 + timedelta(minutes=15)), now=t0 + timedelta(minutes=19))
+        second = predictor.historical_patterns[-1]
+        assert second["period_end"] == "2025-01-06T09:10:00"
+        assert second["actual_direction"] == "DOWN" and not predictor.pending_outcomes
+        assert first["actual_direction"] == "UP"
+        assert memory.stats()["outcomes"] == {"UP": 1, "DOWN": 1, "SIDEWAYS": 0}
+    print("  ✅ outcomes matched to their periods")
+
+
+if __name__ == "__main__":
+    test_accumulators_match_loops_and_refeed_is_deduplicated()
+    test_outcomes_label_the_period_they_follow()
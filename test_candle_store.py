@@ -0,0 +1,111 @@
+"""
+Test Candle Store - persistent history, tail merges and the warm-start age cutoff
+"""
+
+import asyncio
+import tempfile
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from backend.feeds.candle_store import CandleStore, candle_epoch
+from backend.feeds.market_data_fetcher import INTERVAL_SECONDS, SEED_MAX_BARS, MarketDataFetcher
+from backend.feeds.fetch_cache import FetchCache
+
+
+def _candles(count, start, step=timedelta(minutes=5), price=2650.0):
+    return [
+        {
+            "timestamp": (start + step * i).isoformat(),
+            "open": price + i, "high": price + i + 1.5, "low": price + i - 1.0, "close": price + i + 0.5,
+            "volume": 100 + i,
+        }
+        for i in range(count)
+    ]
+
+
+def test_merge_and_reload():
+    """Tail merges replace the forming bar, append new ones, trim to max_rows and survive a restart."""
+    print("\n" + "=" * 70)
+    print("TEST: Candle store merge + reload")
+    print("=" * 70)
+
+    db_path = Path(tempfile.mkdtemp()) / "candles.db"
+    start = datetime(2025, 1, 6, 9, 0, tzinfo=timezone.utc)
+    store = CandleStore(db_path, max_rows=12)
+
+    store.merge("GC=F", "5m", _candles(10, start))
+    tail = _candles(4, start + timedelta(minutes=45), price=2700.0)  # Overlaps the last stored bar
+    merged = store.merge("GC=F", "5m", tail)
+
+    assert len(merged) == 12  # 13 distinct bars, trimmed to max_rows
+    assert merged[-4:] == tail
+    assert [candle_epoch(c) for c in merged] == sorted(candle_epoch(c) for c in merged)
+    assert merged[0]["timestamp"] == (start + timedelta(minutes=5)).isoformat()
+    assert store.last_epoch("GC=F", "5m") == candle_epoch(tail[-1])
+    assert store.load("GC=F", "1h") == [] and store.last_epoch("GC=F", "1h") is None
+
+    restarted = CandleStore(db_path, max_rows=12)
+    assert restarted.load_all() == 12
+    assert restarted.load("GC=F", "5m") == merged
+    print(f"  ✅ {len(merged)} bars persisted and reloaded")
+
+
+def test_seed_max_age():
+    """Warm-start history is served only while its newest bar is recent enough."""
+    print("\n" + "=" * 70)
+    print("TEST: Candle store seed cutoff")
+    print("=" * 70)
+
+    store = CandleStore(Path(tempfile.mkdtemp()) / "candles.db")
+    start = datetime(2025, 1, 6, 9, 0, tzinfo=timezone.utc)
+    candles = _candles(6, start)
+    store.merge("GC=F", "5m", candles)
+    last = candle_epoch(candles[-1])
+
+    assert store.seed("GC=F", "5m", max_age=3600, now=last + 600) == candles
+    assert store.seed("GC=F", "5m", max_age=3600, now=last + 3600) == candles
+    assert store.seed("GC=F", "5m", max_age=3600, now=last + 3601) == []
+    assert store.seed("GC=F", "1h", max_age=3600, now=last) == []
+    print("  ✅ stale history past max_age is not served")
+
+
+def test_fetcher_warm_start_cutoff():
+    """MarketDataFetcher seeds its cache from disk only within SEED_MAX_BARS of the interval."""
+    print("\n" + "=" * 70)
+    print("TEST: Fetcher warm start cutoff")
+    print("=" * 70)
+
+    fetcher = MarketDataFetcher.__new__(MarketDataFetcher)  # Skip load_all on the real store
+    fetcher.symbol = "GC=F"
+    fetcher.cache = FetchCache()
+    fetcher.store = CandleStore(Path(tempfile.mkdtemp()) / "candles.db")
+
+    now = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+    max_age = timedelta(seconds=INTERVAL_SECONDS["5m"] * SEED_MAX_BARS)
+    old = _candles(5, now - max_age - timedelta(hours=1))
+    fetcher.store.merge("GC=F", "5m", old)
+    assert fetcher._stored_candles("5m") is None
+
+    recent = _candles(5, now - timedelta(minutes=30))
+    fetcher.store.merge("GC=F", "5m", recent)
+    assert fetcher._stored_candles("5m")[-5:] == recent
+
+    # Upstream down: recent history is served instead of nothing
+    async def upstream_down(interval):
+        return None
+
+    fetcher._load_ohlc_candles = upstream_down
+    served = asyncio.run(fetcher.fetch_ohlc_candles(limit=5, interval="5m"))
+    assert served == recent
+
+    # Same store, hour bars far older than 48 hours: nothing to serve
+    fetcher.store.merge("GC=F", "60m", _candles(3, now - timedelta(days=5), step=timedelta(hours=1)))
+    fetcher.cache = FetchCache()
+    assert asyncio.run(fetcher.fetch_ohlc_candles(limit=5, interval="1h")) is None
+    print(f"  ✅ cutoff {max_age} for 5m bars")
+
+
+if __name__ == "__main__":
+    test_merge_and_reload()
+    test_seed_max_age()
+    test_fetcher_warm_start_cutoff()
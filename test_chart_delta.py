@@ -0,0 +1,134 @@
+"""
+Test Chart Delta - ETag/304 and `since` cursors on /api/v1/chart
+"""
+
+from datetime import datetime, timedelta
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.api import encoding, routes
+from backend.api.chart_delta import etag_version, representation_etag
+
+
+def _candles(count, start=datetime(2025, 1, 6, 9, 0)):
+    return [
+        {
+            "timestamp": (start + timedelta(minutes=5 * i)).isoformat(),
+            "open": 2650.0 + i, "high": 2651.5 + i, "low": 2649.0 + i, "close": 2650.5 + i,
+            "volume": 100 + 10 * i,
+        }
+        for i in range(count)
+    ]
+
+
+def _client(feed):
+    async def chart_candles(interval, limit):
+        return feed["candles"][-limit:]
+
+    routes._chart_candles = chart_candles
+    app = FastAPI()
+    app.include_router(routes.router)
+    return TestClient(app)
+
+
+def test_etag_per_representation():
+    """Model JSON, columnar JSON and delta bodies get distinct ETags; each revalidates to 304."""
+    print("\n" + "=" * 70)
+    print("TEST: Chart ETag per representation")
+    print("=" * 70)
+
+    saved = routes._chart_candles
+    feed = {"candles": _candles(20)}
+    try:
+        client = _client(feed)
+        body = {"symbol": "XAUUSD", "interval": "5m", "bars": 20}
+
+        full = client.post("/api/v1/chart", json=body)
+        assert full.status_code == 200
+        assert full.headers["Vary"] == "Accept"
+        assert len(full.json()["bars"]) == 20
+
+        col = client.post("/api/v1/chart", json={**body, "columnar": True})
+        assert col.status_code == 200 and col.headers["Vary"] == "Accept"
+        assert len(col.json()["bars"]["close"]) == 20
+
+        cursor = full.json()["cursor"]
+        delta = client.post("/api/v1/chart", json={**body, "since": cursor})
+        assert delta.json()["is_delta"] is True and len(delta.json()["bars"]) == 1
+
+        etags = {full.headers["ETag"], col.headers["ETag"], delta.headers["ETag"]}
+        assert len(etags) == 3
+        assert len({etag_version(e) for e in etags}) == 1  # Same candles underneath
+
+        # A cached body never validates a different representation
+        stale = client.post("/api/v1/chart", json=body, headers={"If-None-Match": col.headers["ETag"]})
+        assert stale.status_code == 200 and len(stale.json()["bars"]) == 20
+        stale = client.post("/api/v1/chart", json=body, headers={"If-None-Match": delta.headers["ETag"]})
+        assert stale.status_code == 200 and len(stale.json()["bars"]) == 20
+
+        # Each representation revalidates against its own ETag
+        for request, response in ((body, full), ({**body, "columnar": True}, col), ({**body, "since": cursor}, delta)):
+            again = client.post("/api/v1/chart", json=request, headers={"If-None-Match": response.headers["ETag"]})
+            assert again.status_code == 304
+            assert again.headers["ETag"] == response.headers["ETag"]
+            assert again.headers["Vary"] == "Accept"
+            assert again.content == b""
+
+        # msgpack is its own representation
+        packed = client.post("/api/v1/chart", json={**body, "columnar": True},
+                             headers={"Accept": encoding.MSGPACK_MEDIA_TYPE})
+        if encoding.msgpack is not None:
+            assert packed.headers["content-type"] == encoding.MSGPACK_MEDIA_TYPE
+            assert packed.headers["ETag"] != col.headers["ETag"]
+        else:
+            assert packed.headers["ETag"] == col.headers["ETag"]
+        print(f"  ✅ {len(etags)} representations, 304 only on own ETag")
+    finally:
+        routes._chart_candles = saved
+
+
+def test_since_delta_after_update():
+    """A new bar changes the ETag; the delta from the old cursor carries the forming and new bars."""
+    print("\n" + "=" * 70)
+    print("TEST: Chart since delta")
+    print("=" * 70)
+
+    saved = routes._chart_candles
+    feed = {"candles": _candles(30)}
+    try:
+        client = _client(feed)
+        body = {"symbol": "XAUUSD", "interval": "5m", "bars": 30}
+
+        first = client.post("/api/v1/chart", json=body).json()
+        cursor = first["cursor"]
+        polled = client.post("/api/v1/chart", json={**body, "since": cursor})
+        etag = polled.headers["ETag"]
+
+        # Nothing changed: the poll is a 304
+        assert client.post("/api/v1/chart", json={**body, "since": cursor},
+                           headers={"If-None-Match": etag}).status_code == 304
+
+        # Last bar updates and a new one opens
+        feed["candles"] = _candles(31)
+        feed["candles"][-2]["close"] += 1.25
+        update = client.post("/api/v1/chart", json={**body, "since": cursor}, headers={"If-None-Match": etag})
+        assert update.status_code == 200
+        assert update.headers["ETag"] != etag
+        payload = update.json()
+        assert payload["is_delta"] is True
+        assert [b["close"] for b in payload["bars"]] == [c["close"] for c in feed["candles"][-2:]]
+        assert payload["cursor"].startswith(feed["candles"][-1]["timestamp"])
+        assert payload["removed_zones"] is not None
+
+        # The new ETag is a different candle version, same representation rule
+        since = datetime.fromisoformat(cursor)
+        assert etag == representation_etag(etag_version(etag), False, "application/json", since)
+        print(f"  ✅ delta of {len(payload['bars'])} bars after update")
+    finally:
+        routes._chart_candles = saved
+
+
+if __name__ == "__main__":
+    test_etag_per_representation()
+    test_since_delta_after_update()
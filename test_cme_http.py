@@ -0,0 +1,108 @@
+"""
+Test CME HTTP Client - pooled fetcher against the local mock CME server
+"""
+
+import asyncio
+import time
+
+from aiohttp import web
+
+from backend.feeds.cme_api_fetcher import CMEAPIFetcher
+from backend.feeds.cme_http import CMEHTTPClient, TokenBucket
+from backend.feeds.cme_mock_server import MockCMEServer
+
+
+async def _with_mock(server: MockCMEServer, scenario):
+    runner = web.AppRunner(server.app())
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    fetcher = CMEAPIFetcher("k" * 16, "s" * 16, endpoint=f"http://127.0.0.1:{port}/", rate=50, burst=5)
+    try:
+        return await scenario(fetcher)
+    finally:
+        await fetcher.close()
+        await runner.cleanup()
+
+
+def test_dedup_and_non_blocking_retry():
+    """Identical concurrent calls share one request; a 429 returns fast and is retried in the background."""
+    print("\n" + "=" * 70)
+    print("TEST: CME HTTP client dedup + retry queue")
+    print("=" * 70)
+
+    server = MockCMEServer(latency=0.05, rate_limit_every=2, retry_after=0)
+
+    async def scenario(fetcher):
+        # 5 concurrent identical candle calls -> one upstream request
+        results = await asyncio.gather(*[fetcher.fetch_ohlc_candles("GC", "5m", 10) for _ in range(5)])
+        assert all(len(r) == 10 for r in results)
+        assert server.requests == 1
+        assert fetcher.http_stats()["deduplicated"] == 4
+
+        # Second distinct request is rate limited: caller gets nothing, retry fills in
+        assert await fetcher.fetch_order_book("GC", depth=5) is None
+        await asyncio.sleep(0.3)
+        book = await fetcher.fetch_order_book("GC", depth=5)
+        assert len(book["bids"]) == 5
+        stats = fetcher.http_stats()
+        assert stats["rate_limited"] == 1 and stats["served_from_retry"] == 1
+        print(f"  ✅ {server.requests} upstream requests, stats: {stats}")
+
+    asyncio.run(_with_mock(server, scenario))
+
+
+def test_paused_bucket_does_not_block_bounded_callers():
+    """A retry sleeping on a paused bucket never holds up callers with their own max_wait."""
+    print("\n" + "=" * 70)
+    print("TEST: Token bucket waiters are independent")
+    print("=" * 70)
+
+    async def scenario():
+        bucket = TokenBucket(rate=50, burst=5)
+        bucket.pause(5.0)  # 429 with Retry-After: 5
+
+        # Retry worker style: waits as long as it takes
+        retry = asyncio.ensure_future(bucket.acquire(max_wait=None))
+        await asyncio.sleep(0.05)
+
+        # Live caller with a 2s budget gives up at once (the pause outlasts it)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        assert await bucket.acquire(max_wait=2.0) is False
+        assert loop.time() - started < 0.1
+        assert not retry.done()
+
+        # Pause shorter than its budget: a bounded caller waits it out, alongside the sleeper
+        bucket.paused_until = time.monotonic() + 0.2
+        started = loop.time()
+        assert await bucket.acquire(max_wait=2.0) is True
+        assert 0.15 < loop.time() - started < 0.5
+        assert not retry.done()
+        retry.cancel()
+        print("  ✅ bounded callers unaffected by the sleeping retry")
+
+    asyncio.run(scenario())
+
+
+def test_retry_results_expire():
+    """Retried responses nobody asks for again are dropped after retry_ttl."""
+    print("\n" + "=" * 70)
+    print("TEST: Retry results expire")
+    print("=" * 70)
+
+    client = CMEHTTPClient("http://127.0.0.1:1/", {}, retry_ttl=0.05)
+    stale_key = client.request_key("/quote", {"symbol": "GC"})
+    client._store_retry_result(stale_key, {"bid": 1})
+    time.sleep(0.06)
+    fresh_key = client.request_key("/book", {"symbol": "GC"})
+    client._store_retry_result(fresh_key, {"bids": []})
+    assert list(client.retry_results) == [fresh_key]
+    print("  ✅ expired retry results pruned")
+
+
+if __name__ == "__main__":
+    test_dedup_and_non_blocking_retry()
+    test_paused_bucket_does_not_block_bounded_callers()
+    test_retry_results_expire()
@@ -0,0 +1,193 @@
+"""
+Test Composite Profile Cache - merged per-session profiles vs. raw trades
+"""
+
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import numpy as np
+
+from backend.composite_profile import CompositeProfileCache, TickHistogramSource
+from backend.intelligence.order_recorder import RawOrderRecorder
+from backend.tick_volume_profile import TickVolumeProfile
+
+
+def _weekday_trades(start, days, per_hour, seed, contract="GC", base=2650.0):
+    """Hourly trades, closed from Friday 22:00 to Sunday 22:00 UTC like the CME week."""
+    rng = np.random.default_rng(seed)
+    trades, price = [], base
+    for hour in range(days * 24):
+        at = start + timedelta(hours=hour)
+        if (at + timedelta(hours=2)).weekday() >= 5:
+            continue
+        for second in np.sort(rng.uniform(0, 3600, per_hour)):
+            price = round(price + float(rng.choice([-0.1, 0.0, 0.1])), 1)
+            trades.append({
+                "timestamp": (at + timedelta(seconds=float(second))).replace(tzinfo=None).isoformat(),
+                "price": price, "size": int(rng.integers(1, 20)),
+                "side": "BUY" if rng.random() < 0.5 else "SELL", "contract_type": contract,
+            })
+    return trades
+
+
+def _reference(trades, windows):
+    volume = defaultdict(int)
+    for t in trades:
+        for lo, hi in windows:
+            if lo.replace(tzinfo=None).isoformat() <= t["timestamp"] < hi.replace(tzinfo=None).isoformat():
+                volume[round(t["price"], 2)] += t["size"]
+    return dict(volume)
+
+
+def test_composite_matches_trades_and_reads_from_cache():
+    """Last 5 London sessions skip the weekend, match raw trades, and reload from disk."""
+    print("\n" + "=" * 70)
+    print("TEST: Composite volume profile")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        recorder = RawOrderRecorder(db_path=tmp / "orders.db", auto_cleanup_days=0)
+        trades = _weekday_trades(datetime(2025, 2, 23, tzinfo=timezone.utc), 35, 40, seed=3)
+        recorder.record_orders_batch(trades)
+        ticks = TickVolumeProfile(recorder, cache_dir=tmp / "sessions")
+
+        end = datetime(2025, 3, 24, 12, tzinfo=timezone.utc)  # Monday, mid-London
+        cache = CompositeProfileCache({"ticks": ticks}, db_path=tmp / "profiles.db")
+        profile = cache.build_profile("ticks", "london", count=5, end=end)
+        assert profile["sessions"] == 5
+
+        london = [(datetime(2025, 3, 24, 7, tzinfo=timezone.utc), end)] + [
+            (datetime(2025, 3, d, 7, tzinfo=timezone.utc), datetime(2025, 3, d, 16, tzinfo=timezone.utc))
+            for d in (21, 20, 19, 18)  # Fri..Tue: the weekend has no London session
+        ]
+        got = {h["price"]: h["volume"] for h in profile["histogram"]}
+        assert got == _reference(trades, london)
+        assert cache.counters["computed"] == 6 and cache.counters["live"] == 1  # 4 + two empty weekend days
+
+        month = cache.build_profile("ticks", "globex", period="month", end=end)
+        assert month["total_volume"] == sum(
+            t["size"] for t in trades if "2025-02-28T22:00" <= t["timestamp"] < "2025-03-24T12:00"
+        )
+
+        reopened = CompositeProfileCache({"ticks": ticks}, db_path=tmp / "profiles.db")
+        started = time.perf_counter()
+        again = reopened.build_profile("ticks", "globex", period="month", end=end)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        assert again["histogram"] == month["histogram"]
+        assert reopened.counters["computed"] == 0 and reopened.counters["disk_hits"] >= 20
+    print(f"  ✅ London x5 matches trades; month composite from disk in {elapsed_ms:.1f}ms")
+
+
+def test_sessions_freeze_only_once_covered():
+    """A closed session the recorder has not reached yet stays live, so a later backfill shows up."""
+    print("\n" + "=" * 70)
+    print("TEST: Composite freeze waits for coverage")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        recorder = RawOrderRecorder(db_path=tmp / "orders.db", auto_cleanup_days=0)
+        trades = _weekday_trades(datetime(2025, 3, 2, 22, tzinfo=timezone.utc), 4, 30, seed=5)
+        recorded = [t for t in trades if t["timestamp"] < "2025-03-04T22:00"]  # Wed/Thu not ingested yet
+        recorder.record_orders_batch(recorded)
+        cache = CompositeProfileCache({"ticks": TickHistogramSource(TickVolumeProfile(recorder, cache_dir=tmp / "s"), "GC")},
+                                      db_path=tmp / "profiles.db")
+        end = datetime(2025, 3, 6, 23, tzinfo=timezone.utc)
+
+        before = cache.build_profile("ticks", "globex", period="week", end=end)
+        assert before["total_volume"] == sum(t["size"] for t in recorded)
+        frozen = {key[2] for key in cache.memory}
+        assert max(frozen) < datetime(2025, 3, 4, 22, tzinfo=timezone.utc).timestamp()
+
+        recorder.record_orders_batch([t for t in trades if t["timestamp"] >= "2025-03-04T22:00"])
+        after = cache.build_profile("ticks", "globex", period="week", end=end)
+        assert after["total_volume"] == sum(t["size"] for t in trades if t["timestamp"] < "2025-03-06T23:00")
+        assert after["sessions"] == before["sessions"]
+    print(f"  ✅ backfill picked up: {before['total_volume']} -> {after['total_volume']} contracts")
+
+
+def test_session_memory_is_bounded():
+    """Finalized sessions beyond max_sessions are evicted from memory and reloaded from disk."""
+    print("\n" + "=" * 70)
+    print("TEST: Composite session memory limit")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        recorder = RawOrderRecorder(db_path=tmp / "orders.db", auto_cleanup_days=0)
+        trades = _weekday_trades(datetime(2025, 3, 2, 22, tzinfo=timezone.utc), 5, 30, seed=7)
+        recorder.record_orders_batch(trades)
+        source = {"ticks": TickHistogramSource(TickVolumeProfile(recorder, cache_dir=tmp / "s"), "GC")}
+        cache = CompositeProfileCache(source, db_path=tmp / "profiles.db", max_sessions=2)
+        end = datetime(2025, 3, 7, 23, tzinfo=timezone.utc)
+
+        first = cache.build_profile("ticks", "globex", period="week", end=end)
+        assert len(cache.memory) == 2 and cache.counters["evictions"] >= 2
+        again = cache.build_profile("ticks", "globex", period="week", end=end)
+        assert again == first and cache.counters["disk_hits"] >= 2
+        assert first["total_volume"] == sum(t["size"] for t in trades)
+    print(f"  ✅ {len(cache.memory)} sessions in memory, {cache.counters['evictions']} evicted")
+
+
+def test_composite_endpoint_per_contract():
+    """The composite endpoint reads only the requested symbol's contract."""
+    print("\n" + "=" * 70)
+    print("TEST: Composite endpoint per contract")
+    print("=" * 70)
+
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from backend.api import routes
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        recorder = RawOrderRecorder(db_path=tmp / "orders.db", auto_cleanup_days=0)
+        # The endpoint composes up to now: trades over the last 30 hours, weekends included
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        gold, spx = [], []
+        for trades, contract, price in ((gold, "GC", 2650.0), (spx, "ES", 5800.0)):
+            for minute in range(30 * 60, 0, -7):
+                trades.append({
+                    "timestamp": (now - timedelta(minutes=minute)).isoformat(),
+                    "price": price + (minute % 13) * 0.1, "size": 1 + minute % 9, "side": "BUY", "contract_type": contract,
+                })
+        recorder.record_orders_batch(gold + spx)
+
+        saved = routes.tick_volume_profile, routes.composite_profiles
+        routes.tick_volume_profile = TickVolumeProfile(recorder, cache_dir=tmp / "sessions")
+        routes.composite_profiles = CompositeProfileCache({}, db_path=tmp / "profiles.db")
+        try:
+            app = FastAPI()
+            app.include_router(routes.router)
+            client = TestClient(app)
+            by_symbol = {
+                symbol: client.post("/api/v1/indicators/volume-profile/composite",
+                                    json={"symbol": symbol, "sessions": 5}).json()
+                for symbol in ("GCG6", "ESH6")
+            }
+            bad = client.post("/api/v1/indicators/volume-profile/composite", json={"source": "bogus"})
+            assert bad.status_code == 400
+            for symbol in ("NQH6", "GC; DROP", "X" * 64):  # Unrecorded or malformed contracts
+                bad = client.post("/api/v1/indicators/volume-profile/composite", json={"symbol": symbol})
+                assert bad.status_code == 400
+            assert sorted(routes.composite_profiles.sources) == ["ticks:ES", "ticks:GC"]
+        finally:
+            routes.tick_volume_profile, routes.composite_profiles = saved
+
+        gold_total, spx_total = (sum(t["size"] for t in trades) for trades in (gold, spx))
+        assert by_symbol["GCG6"]["total_volume"] == gold_total
+        assert by_symbol["ESH6"]["total_volume"] == spx_total
+        assert by_symbol["GCG6"]["poc"] < 3000 < by_symbol["ESH6"]["poc"]
+    print(f"  ✅ GC {gold_total} / ES {spx_total} contracts kept apart")
+
+
+if __name__ == "__main__":
+    test_composite_matches_trades_and_reads_from_cache()
+    test_sessions_freeze_only_once_covered()
+    test_session_memory_is_bounded()
+    test_composite_endpoint_per_contract()
@@ -0,0 +1,204 @@
+"""
+Test Data Source Manager - hedged fetches, first-wins cancellation and circuit breakers
+"""
+
+import asyncio
+import time
+
+from backend.feeds.data_source_manager import DataSourceManager, SourceHealth
+
+
+def _loader(delay, result="ok", error=None, log=None, name=None):
+    async def load():
+        if log is not None:
+            log.append((name, time.perf_counter()))
+        await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        return result
+    return load
+
+
+def test_hedge_fires_after_delay_and_first_wins():
+    """A slow primary gets a hedge after the delay; the faster answer wins and the loser is cancelled."""
+    print("\n" + "=" * 70)
+    print("TEST: Hedged fetch")
+    print("=" * 70)
+
+    async def scenario():
+        manager = DataSourceManager(default_hedge_delay=0.05, request_timeout=2.0)
+        log = []
+
+        # Fast primary: the hedge never starts
+        result = await manager._hedged({
+            "cme": _loader(0.01, "cme-bars", log=log, name="cme"),
+            "yahoo": _loader(0.01, "yahoo-bars", log=log, name="yahoo"),
+        })
+        assert result == ("cme", "cme-bars")
+        assert [name for name, _ in log] == ["cme"]
+        assert manager.health["yahoo"].counters["requests"] == 0
+
+        # Slow primary: hedge starts after ~50ms and wins long before the primary would answer
+        log.clear()
+        cme_ewma = manager.health["cme"].ewma_ms
+        started = time.perf_counter()
+        result = await manager._hedged({
+            "cme": _loader(0.5, "cme-bars", log=log, name="cme"),
+            "yahoo": _loader(0.02, "yahoo-bars", log=log, name="yahoo"),
+        })
+        elapsed = time.perf_counter() - started
+        assert result == ("yahoo", "yahoo-bars")
+        hedge_gap = log[1][1] - log[0][1]
+        assert 0.04 <= hedge_gap < 0.2, hedge_gap
+        assert elapsed < 0.3
+        await asyncio.sleep(0)  # Let the cancelled primary unwind
+
+        cme, yahoo = manager.health["cme"], manager.health["yahoo"]
+        assert yahoo.counters["wins"] == 1 and cme.counters["wins"] == 1
+        assert cme.counters["successes"] == 1  # Cancelled, never completed
+        assert cme.counters["failures"] == 0  # Losing a race is not a failure
+        assert cme.ewma_ms > cme_ewma  # ...but its elapsed time raises the latency estimate
+        assert yahoo.ewma_ms < cme.ewma_ms
+        print(f"  ✅ hedge after {hedge_gap * 1000:.0f}ms, answered in {elapsed * 1000:.0f}ms")
+
+    asyncio.run(scenario())
+
+
+def test_failure_hedges_immediately_and_timeout():
+    """A failing source hands over without waiting for the delay; all-slow sources hit the deadline."""
+    print("\n" + "=" * 70)
+    print("TEST: Hedged fetch failures")
+    print("=" * 70)
+
+    async def scenario():
+        manager = DataSourceManager(default_hedge_delay=0.5, request_timeout=0.3)
+        started = time.perf_counter()
+        result = await manager._hedged({
+            "cme": _loader(0.01, error=ConnectionError("down")),
+            "yahoo": _loader(0.01, "yahoo-bars"),
+        })
+        assert result == ("yahoo", "yahoo-bars")
+        assert time.perf_counter() - started < 0.2
+        assert manager.health["cme"].counters["failures"] == 1
+
+        # Empty results count as failures too
+        result = await manager._hedged({"cme": _loader(0.01, result=[]), "yahoo": _loader(0.01, result=None)})
+        assert result is None
+        assert manager.health["cme"].consecutive_failures == 2
+
+        started = time.perf_counter()
+        assert await manager._hedged({"yahoo": _loader(5.0)}) is None
+        assert time.perf_counter() - started < 0.5
+        print("  ✅ failures hand over at once, deadline enforced")
+
+    asyncio.run(scenario())
+
+
+def test_hedge_delay_follows_p95():
+    """The hedge delay is the primary's p95 latency, clamped; ranking uses EWMA plus penalty."""
+    print("\n" + "=" * 70)
+    print("TEST: Hedge delay + ranking")
+    print("=" * 70)
+
+    manager = DataSourceManager(default_hedge_delay=1.0)
+    assert manager._hedge_delay("cme") == 1.0  # Too few samples
+    for ms in (100, 120, 110, 400, 130, 125, 115, 105, 135, 140):
+        manager.health["cme"].record_success(ms)
+    assert manager._hedge_delay("cme") == 0.4
+    for _ in range(10):
+        manager.health["yahoo"].record_success(10_000)
+    assert manager._hedge_delay("yahoo") == 3.0  # Clamped to 3x default
+    fast = SourceHealth("fast")
+    for _ in range(5):
+        fast.record_success(1)
+    manager.health["fast"] = fast
+    assert manager._hedge_delay("fast") == 0.05  # Floor
+
+    # Yahoo's staleness penalty ranks it behind CME at similar latency
+    manager.health["yahoo"] = SourceHealth("yahoo", penalty_ms=500.0)
+    manager.health["yahoo"].record_success(50)
+    assert manager.ranked_sources(["yahoo", "cme"]) == ["cme", "yahoo"]
+    manager.health["cme"].record_success(5_000)
+    assert manager.ranked_sources(["yahoo", "cme"]) == ["yahoo", "cme"]
+    print("  ✅ p95 delay with clamp, ranked by EWMA + penalty")
+
+
+def test_circuit_breaker_transitions():
+    """Closed → open after N failures → half-open single probe → closed on success, re-open with backoff on failure."""
+    print("\n" + "=" * 70)
+    print("TEST: Circuit breaker")
+    print("=" * 70)
+
+    health = SourceHealth("cme", failure_threshold=3, base_cooldown=0.05, max_cooldown=0.15)
+    for _ in range(2):
+        health.record_failure()
+        assert health.allow() and health.stats()["breaker"] == "closed"
+    health.record_failure()
+    assert not health.allow() and health.stats()["breaker"] == "open"
+
+    # Half-open: exactly one probe
+    time.sleep(0.06)
+    assert health.stats()["breaker"] == "half_open"
+    assert health.allow()
+    assert not health.allow()
+
+    # Probe fails: open again with a doubled cool-down
+    health.record_failure()
+    assert health.cooldown == 0.1 and not health.allow()
+    time.sleep(0.11)
+    assert health.allow()
+    health.record_failure()
+    assert health.cooldown == 0.15  # Capped
+    time.sleep(0.16)
+
+    # Unstarted probe is handed back; the next caller may probe
+    assert health.allow()
+    health.release_probe()
+    assert health.allow()
+
+    # Probe succeeds: closed, cool-down reset
+    health.record_success(20)
+    assert health.allow() and health.allow()
+    assert health.cooldown == 0.05 and health.consecutive_failures == 0
+    assert health.stats()["breaker"] == "closed" and health.counters["breaker_opens"] == 3
+    print(f"  ✅ {health.stats()}")
+
+
+def test_open_breaker_is_skipped_by_hedging():
+    """Sources with an open breaker are not called; an unused half-open probe is released."""
+    print("\n" + "=" * 70)
+    print("TEST: Hedging with breakers")
+    print("=" * 70)
+
+    async def scenario():
+        manager = DataSourceManager(default_hedge_delay=0.05, request_timeout=1.0)
+        manager.health["cme"] = SourceHealth("cme", failure_threshold=1, base_cooldown=0.05)
+        manager.health["cme"].record_failure()
+
+        calls = []
+        result = await manager._hedged({
+            "cme": _loader(0.01, "cme-bars", log=calls, name="cme"),
+            "yahoo": _loader(0.01, "yahoo-bars", log=calls, name="yahoo"),
+        })
+        assert result == ("yahoo", "yahoo-bars") and [n for n, _ in calls] == ["yahoo"]
+
+        # Half-open CME ranked second: admitted by allow(), never started, probe handed back
+        await asyncio.sleep(0.06)
+        manager.health["cme"].ewma_ms = 10_000
+        result = await manager._hedged({
+            "cme": _loader(0.01, "cme-bars"),
+            "yahoo": _loader(0.01, "yahoo-bars"),
+        })
+        assert result == ("yahoo", "yahoo-bars")
+        assert not manager.health["cme"].probing and manager.health["cme"].allow()
+        print("  ✅ open breaker skipped, probe released")
+
+    asyncio.run(scenario())
+
+
+if __name__ == "__main__":
+    test_hedge_fires_after_delay_and_first_wins()
+    test_failure_hedges_immediately_and_timeout()
+    test_hedge_delay_follows_p95()
+    test_circuit_breaker_transitions()
+    test_open_breaker_is_skipped_by_hedging()
@@ -0,0 +1,120 @@
+"""
+Test Response Encoding - columnar payloads, compact JSON and msgpack
+"""
+
+import json
+from datetime import datetime
+
+from backend.api import encoding
+from backend.api.encoding import BAR_FIELDS, HISTOGRAM_FIELDS, MSGPACK_MEDIA_TYPE, columnar, encode_payload
+from backend.api.schemas import ChartBarData
+
+
+def _bars(count):
+    return [
+        ChartBarData.construct(
+            timestamp=datetime(2025, 1, 6, 9, 5 * i), open=2650.0 + i, high=2651.0 + i,
+            low=2649.0 + i, close=2650.5 + i, volume=100 * i, iceberg_detected=i % 2 == 0,
+        )
+        for i in range(count)
+    ]
+
+
+def _histogram(count):
+    return [
+        {"price": 2650.0 + i / 10, "volume": 10 + i, "buy_volume": 6 + i, "sell_volume": 4,
+         "volume_pct": 1.5, "is_poc": i == 3, "in_value_area": 1 <= i <= 5}
+        for i in range(count)
+    ]
+
+
+def test_columnar_transpose():
+    """Dict rows and model rows both become one array per field, in row order."""
+    print("\n" + "=" * 70)
+    print("TEST: Columnar transpose")
+    print("=" * 70)
+
+    rows = _histogram(8)
+    columns = columnar(rows, HISTOGRAM_FIELDS)
+    assert list(columns) == list(HISTOGRAM_FIELDS)
+    for field in HISTOGRAM_FIELDS:
+        assert columns[field] == [row[field] for row in rows]
+
+    bars = _bars(5)
+    columns = columnar(bars, BAR_FIELDS)
+    assert columns["close"] == [bar.close for bar in bars]
+    assert columns["iceberg_detected"] == [True, False, True, False, True]
+    assert columnar([], BAR_FIELDS) == {field: [] for field in BAR_FIELDS}
+    print("  ✅ rows → columns")
+
+
+def test_json_encoding_round_trip():
+    """Compact JSON (orjson or stdlib) decodes to the same payload, datetimes as ISO strings."""
+    print("\n" + "=" * 70)
+    print("TEST: JSON encoding")
+    print("=" * 70)
+
+    bars = _bars(4)
+    payload = {
+        "symbol": "XAUUSD",
+        "bars": columnar(bars, BAR_FIELDS),
+        "levels": [bars[0]],  # Models fall back to .dict()
+        "timestamp": datetime(2025, 1, 6, 12, 0),
+    }
+    expected = {
+        "symbol": "XAUUSD",
+        "bars": {f: [v.isoformat() if isinstance(v, datetime) else v for v in values]
+                 for f, values in payload["bars"].items()},
+        "levels": [{k: v.isoformat() if isinstance(v, datetime) else v for k, v in bars[0].dict().items()}],
+        "timestamp": "2025-01-06T12:00:00",
+    }
+
+    fast = encode_payload(payload, headers={"ETag": 'W/"abc"'})
+    assert fast.media_type == "application/json"
+    assert fast.headers["ETag"] == 'W/"abc"'
+    assert json.loads(fast.body) == expected
+
+    # Without orjson the stdlib path must produce the same document
+    saved, encoding.orjson = encoding.orjson, None
+    try:
+        plain = encode_payload(payload)
+    finally:
+        encoding.orjson = saved
+    assert json.loads(plain.body) == expected
+    assert b" " not in plain.body.replace(b"XAUUSD", b"")  # Compact separators
+    print(f"  ✅ {len(fast.body)} bytes, stdlib fallback identical")
+
+
+def test_msgpack_negotiation():
+    """Accept: application/msgpack gets msgpack when installed, JSON otherwise."""
+    print("\n" + "=" * 70)
+    print("TEST: msgpack negotiation")
+    print("=" * 70)
+
+    payload = {"bars": columnar(_bars(3), BAR_FIELDS), "cursor": datetime(2025, 1, 6, 9, 10)}
+
+    assert encoding.negotiated_media_type(None) == "application/json"
+    assert encoding.negotiated_media_type("text/html") == "application/json"
+
+    response = encode_payload(payload, accept=f"{MSGPACK_MEDIA_TYPE}, application/json;q=0.5")
+    if encoding.msgpack is None:
+        assert encoding.negotiated_media_type(MSGPACK_MEDIA_TYPE) == "application/json"
+        assert response.media_type == "application/json"
+        print("  ⚠️ msgpack not installed: JSON fallback served")
+        return
+
+    assert encoding.negotiated_media_type(MSGPACK_MEDIA_TYPE) == MSGPACK_MEDIA_TYPE
+    assert response.media_type == MSGPACK_MEDIA_TYPE
+    decoded = encoding.msgpack.unpackb(response.body, raw=False)
+    assert decoded["cursor"] == "2025-01-06T09:10:00"
+    assert decoded["bars"]["close"] == payload["bars"]["close"]
+    assert decoded["bars"]["timestamp"] == [t.isoformat() for t in payload["bars"]["timestamp"]]
+
+    json_size = len(encode_payload(payload).body)
+    print(f"  ✅ msgpack {len(response.body)} bytes vs JSON {json_size} bytes")
+
+
+if __name__ == "__main__":
+    test_columnar_transpose()
+    test_json_encoding_round_trip()
+    test_msgpack_negotiation()
@@ -0,0 +1,157 @@
+"""
+Test Fetch Cache - single-flight loads, stale-while-revalidate and refresh failures
+"""
+
+import asyncio
+
+from backend.feeds.fetch_cache import FetchCache
+
+
+class Upstream:
+    """Loader stand-in: counts calls, can be slowed down or made to fail."""
+
+    def __init__(self, delay=0.02):
+        self.delay = delay
+        self.calls = 0
+        self.fail = False
+        self.version = 0
+
+    async def load(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError("upstream down")
+        self.version += 1
+        return {"version": self.version}
+
+
+def test_single_flight():
+    """Concurrent misses for one key share one upstream load; other keys load separately."""
+    print("\n" + "=" * 70)
+    print("TEST: Fetch cache single-flight")
+    print("=" * 70)
+
+    async def scenario():
+        cache, upstream = FetchCache(), Upstream()
+        results = await asyncio.gather(*[cache.get("GC:5m", upstream.load, ttl=10) for _ in range(20)])
+        assert upstream.calls == 1
+        assert all(r == {"version": 1} for r in results)
+
+        # Fresh hit: no load
+        assert await cache.get("GC:5m", upstream.load, ttl=10) == {"version": 1}
+        assert upstream.calls == 1
+
+        other = Upstream()
+        await asyncio.gather(cache.get("GC:1h", other.load, ttl=10), cache.get("GC:1h", other.load, ttl=10))
+        assert other.calls == 1
+
+        stats = cache.stats()
+        assert stats["misses"] == 2 and stats["coalesced"] == 20 and stats["hits"] == 1
+        assert stats["loads"] == 2 and stats["inflight"] == 0
+        print(f"  ✅ 23 lookups, {stats['loads']} loads")
+
+    asyncio.run(scenario())
+
+
+def test_stale_while_revalidate():
+    """Expired values inside the stale window are served at once while one refresh runs."""
+    print("\n" + "=" * 70)
+    print("TEST: Fetch cache stale-while-revalidate")
+    print("=" * 70)
+
+    async def scenario():
+        cache, upstream = FetchCache(), Upstream(delay=0.05)
+        assert await cache.get("k", upstream.load, ttl=0.02, stale_ttl=5) == {"version": 1}
+        await asyncio.sleep(0.03)  # Now stale
+
+        # Stale reads return immediately (no waiting on the 50ms load) and share one refresh
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        stale = await asyncio.gather(*[cache.get("k", upstream.load, ttl=10, stale_ttl=5) for _ in range(5)])
+        assert loop.time() - started < 0.04
+        assert all(v == {"version": 1} for v in stale)
+        assert upstream.calls == 2 and cache.stats()["refreshes"] == 1
+
+        await asyncio.sleep(0.07)  # Refresh lands
+        assert await cache.get("k", upstream.load, ttl=10, stale_ttl=5) == {"version": 2}
+        assert cache.stats()["stale_hits"] == 5
+        print(f"  ✅ stats {cache.stats()}")
+
+    asyncio.run(scenario())
+
+
+def test_refresh_errors():
+    """Failed loads are never cached: the last good value keeps serving and the next read retries."""
+    print("\n" + "=" * 70)
+    print("TEST: Fetch cache refresh errors")
+    print("=" * 70)
+
+    async def scenario():
+        cache, upstream = FetchCache(), Upstream(delay=0.01)
+
+        # Cold miss that fails: None, nothing cached, next call retries
+        upstream.fail = True
+        assert await cache.get("k", upstream.load, ttl=0.02, stale_ttl=0.05) is None
+        assert "k" not in cache.entries
+        upstream.fail = False
+        assert await cache.get("k", upstream.load, ttl=0.02, stale_ttl=0.05) == {"version": 1}
+
+        # Background refresh fails: stale value stays and is served again
+        await asyncio.sleep(0.03)
+        upstream.fail = True
+        assert await cache.get("k", upstream.load, ttl=0.02, stale_ttl=0.05) == {"version": 1}
+        await asyncio.sleep(0.02)
+        assert cache.stats()["errors"] == 2
+        assert cache.entries["k"].value == {"version": 1}
+
+        # Past the stale window a failing foreground load still falls back to the old value
+        await asyncio.sleep(0.06)
+        calls = upstream.calls
+        assert await cache.get("k", upstream.load, ttl=0.02, stale_ttl=0.05) == {"version": 1}
+        assert upstream.calls == calls + 1
+
+        # Recovery replaces it
+        upstream.fail = False
+        assert await cache.get("k", upstream.load, ttl=10) == {"version": 2}
+
+        # None from the loader counts as a failure too
+        async def empty():
+            return None
+
+        assert await cache.get("none", empty, ttl=10) is None
+        assert "none" not in cache.entries
+        assert cache.stats()["errors"] == 4 and cache.stats()["inflight"] == 0
+        print(f"  ✅ stats {cache.stats()}")
+
+    asyncio.run(scenario())
+
+
+def test_lru_bound_and_seed():
+    """Entries are capped LRU-first; seeded values are served stale and refreshed."""
+    print("\n" + "=" * 70)
+    print("TEST: Fetch cache bound + seed")
+    print("=" * 70)
+
+    async def scenario():
+        cache = FetchCache(max_entries=3)
+        for key in "abcd":
+            await cache.get(key, Upstream(delay=0).load, ttl=10)
+        assert list(cache.entries) == ["b", "c", "d"]
+        assert cache.stats()["evictions"] == 1
+
+        upstream = Upstream(delay=0.01)
+        cache.seed("disk", {"version": 0}, stale_ttl=5)
+        assert await cache.get("disk", upstream.load, ttl=10, stale_ttl=5) == {"version": 0}
+        await asyncio.sleep(0.03)
+        assert await cache.get("disk", upstream.load, ttl=10, stale_ttl=5) == {"version": 1}
+        assert upstream.calls == 1
+        print("  ✅ LRU capped, seed served then refreshed")
+
+    asyncio.run(scenario())
+
+
+if __name__ == "__main__":
+    test_single_flight()
+    test_stale_while_revalidate()
+    test_refresh_errors()
+    test_lru_bound_and_seed()
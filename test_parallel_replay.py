@@ -0,0 +1,113 @@
+"""
+Test Parallel Replay - sharded multi-day replay vs. a single run
+"""
+
+import json
+import time
+
+import pytest
+
+from backtesting.edge_metrics import EdgeMetrics
+from backtesting.parallel_replay import run_parallel_replay, split_shards
+from backtesting.replay_filters import ReplayFilters
+from backtesting.replay_runner import run_replay
+from test_step23_first import MockEngine, MockMentorBrain, generate_sample_candles
+
+
+def make_engines():
+    """Picklable engine factory (module level, so pool workers can import it)."""
+    return {
+        "qmo": MockEngine("QMO"),
+        "imo": MockEngine("IMO"),
+        "gann": MockEngine("Gann"),
+        "astro": MockEngine("Astro"),
+        "cycle": MockEngine("Cycle"),
+        "mentor": MockMentorBrain(),
+    }
+
+
+@pytest.fixture
+def open_filters(monkeypatch):
+    # The mock context carries no confidence, so the default filters block everything
+    monkeypatch.setattr(ReplayFilters, "allow_signal", lambda self, context: True)
+
+
+def test_split_shards():
+    candles = generate_sample_candles(4 * 1440)
+    days = split_shards(candles, by="day")
+    assert [label for label, _, _ in days] == ["2025-01-06", "2025-01-07", "2025-01-08", "2025-01-09", "2025-01-10"]
+    assert days[0][1] == 0 and days[-1][2] == len(candles)
+    assert all(a[2] == b[1] for a, b in zip(days, days[1:]))
+    assert split_shards(candles, by="week") == [("2025-W02", 0, len(candles))]
+
+
+def test_parallel_replay_matches_single_run(open_filters, tmp_path):
+    """Merged shard metrics equal a single replay over the same candles."""
+    print("\n" + "=" * 70)
+    print("TEST: Parallel sharded replay")
+    print("=" * 70)
+
+    candles = generate_sample_candles(3 * 1440)
+    started = time.perf_counter()
+    single = run_replay(candles, make_engines())
+    single_elapsed = time.perf_counter() - started
+    assert single["snapshot_stats"]["signals"] > 0
+
+    for workers in (1, 2):
+        result = run_parallel_replay(candles, make_engines, workers=workers, timeline_dir=tmp_path / str(workers))
+        assert result["metrics"] == single["metrics"]
+        assert result["snapshot_stats"] == single["snapshot_stats"]
+        assert result["confidence_dist"]["total_above_70"] == single["confidence_dist"]["total_above_70"]
+        assert result["confidence_dist"]["avg"] == pytest.approx(single["confidence_dist"]["avg"])
+        assert [s["label"] for s in result["shards"]] == ["2025-01-06", "2025-01-07", "2025-01-08", "2025-01-09"]
+
+        manifest = json.loads((tmp_path / str(workers) / "manifest.json").read_text())
+        assert [s["shard"] for s in manifest["shards"]] == [0, 1, 2, 3]
+        timeline = []
+        for path in result["timeline_files"]:
+            timeline.extend(json.loads(open(path).read())["timeline"])
+        assert len(timeline) == len(candles)
+        assert [e["time"] for e in timeline] == [c["time"] for c in candles]
+        print(f"  ✅ {workers} worker(s): {result['elapsed_seconds']}s (single run {single_elapsed:.2f}s)")
+
+    # Warm-up bars prime each shard without being scored or exported
+    warm = run_parallel_replay(candles, make_engines, warmup_bars=120, workers=1, timeline_dir=tmp_path / "warm")
+    assert warm["metrics"] == single["metrics"]
+    assert sum(s["candles"] for s in warm["shards"]) == len(candles)
+
+    weekly = run_parallel_replay(candles, make_engines, shard_by="week", workers=1)
+    assert weekly["metrics"] == single["metrics"]
+
+
+def test_edge_metrics_merge_is_order_exact():
+    """Merging shard accumulators gives the same summary as one accumulator."""
+    import random
+
+    for seed in range(200):
+        rng = random.Random(seed)
+        whole, parts = EdgeMetrics(), [EdgeMetrics() for _ in range(3)]
+        for k in range(60):
+            snapshot = {"decision": {"confidence": rng.choice([0.5, 0.7, 0.9])}}
+            outcome = None if rng.random() < 0.2 else {
+                "timing_bars": rng.randint(0, 30),
+                "heat_pips": round(rng.uniform(0, 20), 2),
+                "reaction_pips": round(rng.uniform(0, 20), 2),
+                "signal_worked": rng.random() < 0.5,
+                "was_trapped": rng.random() < 0.3,
+            }
+            whole.record(snapshot, outcome)
+            parts[k // 20].record(snapshot, outcome)
+        merged = EdgeMetrics()
+        for part in parts:
+            merged.merge(part)
+        assert merged.summary() == whole.summary()
+
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+
+    ReplayFilters.allow_signal = lambda self, context: True
+    test_split_shards()
+    test_parallel_replay_matches_single_run(None, Path(tempfile.mkdtemp()))
+    test_edge_metrics_merge_is_order_exact()
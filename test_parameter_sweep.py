@@ -0,0 +1,183 @@
+"""
+Test Parameter Sweep - parallel sweeps, early stopping and walk-forward windows
+"""
+
+import csv
+import random
+import time
+
+from backtesting.parameter_sweep import (
+    ParameterSweep,
+    SharedCandles,
+    _AttachedCandles,
+    grid_configs,
+    random_configs,
+)
+from backtesting.replay_config import ReplayConfig
+from backtesting.replay_filters import ReplayFilters
+from backtesting.replay_runner import run_replay
+from test_step23_first import MockEngine, generate_sample_candles
+
+OPEN_FILTERS = {
+    "filters.min_confidence": 0.0,
+    "filters.min_iceberg_score": 0.0,
+    "filters.allow_off_session": True,
+    "filters.allow_killzone": True,
+}
+
+
+class ThresholdMentor:
+    """MockMentorBrain with a tunable signal threshold"""
+
+    def __init__(self, threshold):
+        self.threshold = threshold
+
+    def evaluate(self, context):
+        rng = random.Random(int(context["price"] * 10))
+        if rng.random() > self.threshold:
+            return {"action": "BUY" if rng.random() > 0.5 else "SELL", "confidence": 0.8}
+        return {"action": "WAIT", "confidence": 0.0}
+
+
+def make_engines(params):
+    """Picklable engine factory: "mentor.threshold" configures the mentor."""
+    engines = {name: MockEngine(name.upper()) for name in ("qmo", "imo", "gann", "astro", "cycle")}
+    engines["mentor"] = ThresholdMentor(params.get("mentor.threshold", 0.85))
+    return engines
+
+
+class CycleMentor:
+    """Signals on fixed bar numbers: only agrees across chunkings if the bar index is global"""
+
+    def evaluate(self, context):
+        index = context["cycle"]["index"]
+        if index % 7 == 0:
+            return {"action": "BUY" if (index // 7) % 2 else "SELL", "confidence": 0.8}
+        return {"action": "WAIT", "confidence": 0.0}
+
+
+def make_cycle_engines(params):
+    engines = make_engines(params)
+    engines["mentor"] = CycleMentor()
+    return engines
+
+
+def _strip(rows):
+    return [{k: v for k, v in row.items() if k != "elapsed_seconds"} for row in rows]
+
+
+def test_shared_candles_round_trip():
+    candles = generate_sample_candles(500)
+    shared = SharedCandles(candles)
+    try:
+        view = _AttachedCandles(shared.spec)
+        assert view.slice(0, 500) == candles
+        assert view.slice(490, 600) == candles[490:]
+        view.shm.close()
+    finally:
+        shared.close()
+
+
+def test_samplers():
+    space = {"a": [1, 2, 3], "b": (0, 10), "c": (0.5, 1.0)}
+    grid = grid_configs(space, points=3)
+    assert len(grid) == 27 and {g["b"] for g in grid} == {0, 5, 10}
+    samples = random_configs(space, 50, random.Random(1))
+    assert all(0 <= s["b"] <= 10 and isinstance(s["b"], int) and 0.5 <= s["c"] <= 1.0 for s in samples)
+
+
+def test_sweep_ranks_configs_and_stops_bad_ones(monkeypatch, tmp_path):
+    """Parallel and in-process sweeps agree, and rows match a plain replay."""
+    print("\n" + "=" * 70)
+    print("TEST: Parameter sweep")
+    print("=" * 70)
+
+    candles = generate_sample_candles(3 * 1440)
+    space = {**{k: [v] for k, v in OPEN_FILTERS.items()}, "mentor.threshold": [0.6, 0.75, 0.9]}
+    space["filters.min_confidence"] = [0.0, 0.9]  # 0.9 blocks every mock signal
+
+    runs = {}
+    for workers in (1, 2):
+        started = time.perf_counter()
+        with ParameterSweep(candles, make_engines, space, workers=workers, early_stop_below=0.2) as sweep:
+            runs[workers] = sweep.run(method="grid")
+            sweep.write_results(runs[workers], tmp_path / "sweep.csv")
+        print(f"  ✅ {len(runs[workers])} configs on {workers} worker(s) in {time.perf_counter() - started:.2f}s")
+    assert _strip(runs[1]) == _strip(runs[2])
+
+    rows = runs[2]
+    assert [r["rank"] for r in rows] == list(range(1, 7))
+    scored = [r for r in rows if r["score"] is not None]
+    assert len(scored) == 3 and scored == rows[:3]
+    assert [r["score"] for r in scored] == sorted((r["score"] for r in scored), reverse=True)
+    for row in rows[3:]:
+        assert row["status"] == "stopped" and row["signals"] == 0 and row["candles"] < len(candles)
+
+    # A ranked row is exactly what a single replay with the same parameters measures
+    best = rows[0]
+    monkeypatch.setattr(ReplayFilters, "allow_signal", lambda self, context: True)
+    single = run_replay(candles, make_engines(best["params"]))
+    assert best["status"] == "complete" and best["candles"] == len(candles)
+    assert best["outcomes"] == single["metrics"]["total_outcomes"]
+    assert best["signals"] == single["snapshot_stats"]["signals"]
+    assert best["avg_heat"] == single["metrics"]["heat"]["avg_heat"]
+
+    with open(tmp_path / "sweep.csv") as f:
+        table = list(csv.DictReader(f))
+    assert [int(r["rank"]) for r in table] == list(range(1, 7))
+    assert "mentor.threshold" in table[0] and "filters.min_confidence" in table[0]
+
+
+def test_chunk_size_does_not_change_results(monkeypatch):
+    """Bar-index engines score the same for any chunk_bars, and match one plain replay."""
+    candles = generate_sample_candles(1000)
+    space = {k: [v] for k, v in OPEN_FILTERS.items()}
+    rows = {}
+    for chunk_bars in (1440, 97):
+        with ParameterSweep(candles, make_cycle_engines, space, workers=1, chunk_bars=chunk_bars) as sweep:
+            rows[chunk_bars] = sweep.run(method="grid")
+    assert _strip(rows[1440]) == _strip(rows[97])
+
+    monkeypatch.setattr(ReplayFilters, "allow_signal", lambda self, context: True)
+    single = run_replay(candles, make_cycle_engines({}))
+    row = rows[97][0]
+    assert row["signals"] == single["snapshot_stats"]["signals"] == 143
+    assert row["outcomes"] == single["metrics"]["total_outcomes"]
+
+
+def test_adaptive_and_walk_forward():
+    candles = generate_sample_candles(5 * 1440)
+    space = {**OPEN_FILTERS, "mentor.threshold": (0.5, 0.95)}
+    space = {k: ([v] if not isinstance(v, tuple) else v) for k, v in space.items()}
+
+    config = ReplayConfig(asset="GC", start_date="2025-01-07", end_date="2025-01-10")
+    with ParameterSweep(candles, make_engines, space, config=config, workers=2, warmup_bars=60) as sweep:
+        assert sweep.candles[0]["time"].startswith("2025-01-07")
+        rows = sweep.run(method="adaptive", samples=12, rounds=3)
+        keys = [tuple(sorted(r["params"].items())) for r in rows]
+        assert len(keys) == len(set(keys)) and rows[0]["score"] is not None
+
+        windows = sweep.walk_forward(train_days=2, test_days=1, method="random", samples=4)
+    assert [(w["train"], w["test"]) for w in windows] == [
+        (("2025-01-07", "2025-01-08"), ("2025-01-09", "2025-01-09")),
+        (("2025-01-08", "2025-01-09"), ("2025-01-10", "2025-01-10")),
+    ]
+    for window in windows:
+        assert window["best_params"] == window["train_results"][0]["params"]
+        assert window["test_results"][0]["candles"] == 1440
+        assert window["test_score"] is not None
+
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+
+    class _Patch:
+        def setattr(self, target, name, value):
+            setattr(target, name, value)
+
+    test_shared_candles_round_trip()
+    test_samplers()
+    test_sweep_ranks_configs_and_stops_bad_ones(_Patch(), Path(tempfile.mkdtemp()))
+    test_chunk_size_does_not_change_results(_Patch())
+    test_adaptive_and_walk_forward()
@@ -0,0 +1,154 @@
+"""
+Test Pattern Memory - persistent k-NN over closed 5-minute periods
+"""
+
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from backend.intelligence.candle_predictor_5min import FiveMinuteCandlePredictor
+from backend.intelligence.pattern_memory import FEATURES, OUTCOMES, PatternMemory
+
+
+def _labelled(count, seed):
+    rng = np.random.default_rng(seed)
+    features = rng.normal(size=(count, len(FEATURES))) * np.linspace(1, 50, len(FEATURES))
+    outcomes = [OUTCOMES[i] for i in rng.integers(0, 3, count)]
+    return features, outcomes
+
+
+def test_knn_matches_brute_force_and_persists():
+    """Neighbour outcomes equal a standardized brute-force scan; index survives a reopen."""
+    print("\n" + "=" * 70)
+    print("TEST: Pattern memory k-NN")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Path(tmp) / "patterns.db"
+        memory = PatternMemory(db_path=db, k=25)
+        features, outcomes = _labelled(2000, 1)
+        memory.bulk_load(features[:1500], outcomes[:1500])
+        for vector, outcome in zip(features[1500:], outcomes[1500:]):
+            memory.record_outcome(memory.add(vector), outcome)  # Incremental path
+
+        query = features[7] + 0.1
+        scaled = (features - query) / features.std(axis=0)
+        nearest = np.argsort((scaled ** 2).sum(axis=1))[:25]
+        expected = {name: sum(outcomes[i] == name for i in nearest) for name in OUTCOMES}
+        assert memory.query(query)["outcomes"] == expected
+
+        assert memory.stats()["unsaved"] == 500 % 12  # Labelled rows are written 12 at a time
+        assert memory.flush() == 500 % 12 and memory.flush() == 0
+        reopened = PatternMemory(db_path=db, k=25)
+        assert len(reopened) == 2000
+        assert reopened.query(query)["outcomes"] == expected
+    print("  ✅ k-NN matches brute force; 2000 periods reloaded from disk")
+
+
+def test_query_speed_at_scale():
+    """Hundreds of thousands of stored periods answer in milliseconds."""
+    with tempfile.TemporaryDirectory() as tmp:
+        memory = PatternMemory(db_path=Path(tmp) / "patterns.db")
+        features, outcomes = _labelled(300_000, 2)
+        memory.bulk_load(features, outcomes)
+        started = time.perf_counter()
+        for i in range(20):
+            result = memory.query(features[i])
+        per_query_ms = (time.perf_counter() - started) / 20 * 1000
+        assert result["neighbors"] == 50
+        assert per_query_ms < 100
+    print(f"  ✅ 300k periods: {per_query_ms:.1f}ms per query")
+
+
+def test_predictor_stores_and_queries_periods():
+    """Closed periods are stored with their outcome and drive pattern matching."""
+    with tempfile.TemporaryDirectory() as tmp:
+        memory = PatternMemory(db_path=Path(tmp) / "patterns.db", k=10)
+        predictor = FiveMinuteCandlePredictor(pattern_memory=memory)
+        for side, size in (("BUY", 5), ("SELL", 2), ("BUY", 7)):
+            predictor.flow.add(side, size, 30)
+        predictor._save_period_pattern()
+        predictor.record_actual_outcome("UP")
+        assert len(memory) == 1 and memory.stats()["outcomes"]["UP"] == 1
+
+        match = predictor._find_matching_patterns(predictor._analyze_5min_orderflow())
+        assert match["match_found"] and match["historical_success_rate"] == 100.0
+    print("  ✅ Predictor period stored, labelled and matched")
+
+
+def test_outcome_is_recorded_once():
+    """A second label is refused on disk and in the index; old unlabelled rows can still be labelled."""
+    print("\n" + "=" * 70)
+    print("TEST: Pattern memory labels once")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Path(tmp) / "patterns.db"
+        features, _ = _labelled(4, 3)
+        PatternMemory(db_path=db)  # Creates the table
+        conn = sqlite3.connect(str(db))  # Older versions stored every period unlabelled up front
+        legacy = conn.execute("INSERT INTO patterns (features) VALUES (?)", (features[2].tobytes(),)).lastrowid
+        conn.commit()
+        conn.close()
+
+        memory = PatternMemory(db_path=db, k=5, flush_every=2)
+        first, second = memory.add(features[0]), memory.add(features[1], "2025-03-03T14:00:00")
+        assert first != second and not memory.record_outcome(str(legacy), "UP")
+        assert memory.record_outcome(first, "UP")
+        assert not memory.record_outcome(first, "DOWN")  # Buffered, not yet on disk
+        assert memory.record_outcome(second, "DOWN") and memory.stats()["unsaved"] == 0
+        assert not memory.record_outcome(second, "UP")  # Already on disk
+        assert not memory.record_outcome(999, "UP")
+        assert memory.record_outcome(legacy, "SIDEWAYS")
+        assert not memory.record_outcome(legacy, "UP")
+        assert memory.stats()["outcomes"] == {"UP": 1, "DOWN": 1, "SIDEWAYS": 1}
+
+        reopened = PatternMemory(db_path=db, k=5)
+        assert reopened.stats()["outcomes"] == memory.stats()["outcomes"]
+    print("  ✅ Repeat labels refused; disk and index agree")
+
+
+def test_workers_share_one_database():
+    """Two instances (API workers) on one file get SQLite row ids; a failed flush keeps its batch."""
+    print("\n" + "=" * 70)
+    print("TEST: Pattern memory across workers")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Path(tmp) / "patterns.db"
+        features, outcomes = _labelled(6, 4)
+        workers = [PatternMemory(db_path=db, flush_every=2), PatternMemory(db_path=db, flush_every=2)]
+        keys = [[worker.add(features[2 * i + j]) for j in range(2)] for i, worker in enumerate(workers)]
+        for worker, pair in zip(workers, keys):
+            for key in pair:
+                assert worker.record_outcome(key, "UP")  # Second label fills the batch and flushes
+            assert worker.stats()["unsaved"] == 0
+
+        conn = sqlite3.connect(str(db))
+        conn.execute("ALTER TABLE patterns RENAME TO patterns_away")  # Writes fail until it is back
+        conn.commit()
+        worker = workers[0]
+        assert worker.record_outcome(worker.add(features[4]), "DOWN")
+        assert worker.record_outcome(worker.add(features[5]), "DOWN")  # Flush fails: no exception
+        assert worker.stats()["unsaved"] == 2 and worker.flush() == 0
+        conn.execute("ALTER TABLE patterns_away RENAME TO patterns")
+        conn.commit()
+        assert worker.flush() == 2 and worker.stats()["unsaved"] == 0
+        ids = [row[0] for row in conn.execute("SELECT id FROM patterns ORDER BY id")]
+        conn.close()
+        assert ids == list(range(1, 7))
+
+        reopened = PatternMemory(db_path=db)
+        assert reopened.stats()["outcomes"] == {"UP": 4, "DOWN": 2, "SIDEWAYS": 0}
+    print(f"  ✅ {len(ids)} rows from two workers, failed batch kept and written later")
+
+
+if __name__ == "__main__":
+    test_knn_matches_brute_force_and_persists()
+    test_query_speed_at_scale()
+    test_predictor_stores_and_queries_periods()
+    test_outcome_is_recorded_once()
+    test_workers_share_one_database()
@@ -0,0 +1,74 @@
+"""
+Test Replay Columns - vectorized session/news/iceberg context vs. the scalar engines
+"""
+
+import random
+import time
+from datetime import datetime, timedelta
+
+from backtesting.ai_snapshot import AISnapshotStore
+from backtesting.replay_engine import ReplayEngine
+from test_step23_first import MockEngine, MockMentorBrain, generate_sample_candles
+
+
+def _engine(news):
+    engine = ReplayEngine(
+        MockEngine("QMO"), MockEngine("IMO"), MockEngine("Gann"), MockEngine("Astro"),
+        MockEngine("Cycle"), MockMentorBrain(), AISnapshotStore(), news_events=news,
+    )
+    for price in range(2490, 2530, 3):
+        engine.iceberg_memory.record(float(price), 100, "BUY", 0)
+        for _ in range(price % 7):
+            engine.iceberg_memory.record_hit(float(price))
+    return engine
+
+
+def test_precomputed_context_matches_scalar_engines():
+    """Every timeline entry carries the same session/killzone/news/iceberg as the per-candle calls."""
+    print("\n" + "=" * 70)
+    print("TEST: Replay columnar precompute")
+    print("=" * 70)
+
+    rng = random.Random(4)
+    candles = generate_sample_candles(6000)
+    for c in candles[::7]:
+        c["time"] = (datetime.fromisoformat(c["time"]) + timedelta(seconds=rng.randint(0, 59))).isoformat()
+    start = datetime(2025, 1, 6, 9, 0)
+    news = [
+        {"time": start + timedelta(minutes=rng.randint(0, 6000), seconds=rng.randint(0, 59)),
+         "name": rng.choice(["CPI", "NFP", "HOUSING"]), "impact": rng.choice(["HIGH", "MEDIUM", "LOW"])}
+        for _ in range(80)
+    ]
+    news.append({"time": news[3]["time"] + timedelta(minutes=2), "name": "FOMC", "impact": "HIGH"})  # Overlap
+
+    engine = _engine(news)
+    started = time.perf_counter()
+    engine.run(candles)
+    elapsed = time.perf_counter() - started
+
+    reference = _engine(news)
+    for candle, entry in zip(candles, engine.get_timeline()):
+        session = reference.session_engine.get_session(candle["time"])
+        news_window = reference.news_engine.check_news_window(candle["time"])
+        assert entry["session"] == session
+        assert entry["killzone"] == reference.session_engine.is_killzone(session, candle["time"])
+        assert entry["news"] == {k: news_window[k] for k in ("active", "name", "impact")}
+        assert entry["iceberg_score"] == reference.iceberg_memory.persistence_score(candle["close"])
+
+    for i in rng.sample(range(len(candles)), 300):
+        assert engine.columns.news(i) == reference.news_engine.check_news_window(candles[i]["time"])
+    print(f"  ✅ {len(candles)} candles match the scalar engines ({elapsed:.2f}s)")
+
+
+def test_zone_changes_during_replay_are_seen():
+    """Zones recorded mid-replay invalidate the precomputed iceberg scores."""
+    candles = generate_sample_candles(50)
+    engine = _engine([])
+    engine.run(candles[:1])
+    engine.iceberg_memory.record(candles[0]["close"], 500, "SELL", 1)
+    assert engine.columns.iceberg(0) == engine.iceberg_memory.persistence_score(candles[0]["close"])
+
+
+if __name__ == "__main__":
+    test_precomputed_context_matches_scalar_engines()
+    test_zone_changes_during_replay_are_seen()
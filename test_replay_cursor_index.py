@@ -0,0 +1,117 @@
+"""
+Test Replay Cursor Index - binary-search time navigation, O(1) context, paged output
+"""
+
+import random
+import time
+from datetime import datetime, timedelta
+
+from backtesting.replay_cursor import ReplayCursor, SequenceView
+from backtesting.replay_runner import run_streaming_replay
+from test_streaming_replay import candle_stream, make_engines
+
+START = datetime(2025, 1, 6, 9, 0)
+
+
+def _month(count=30 * 1440):
+    candles = list(candle_stream(count))
+    timeline = [{"time": c["time"], "confidence": i / count} for i, c in enumerate(candles)]
+    return candles, timeline
+
+
+def test_jump_to_time_scales_to_a_month():
+    """Scrubbing a month of 1-minute bars: binary search, O(1) context lookups."""
+    print("\n" + "=" * 70)
+    print("TEST: Indexed replay cursor")
+    print("=" * 70)
+
+    candles, timeline = _month()
+    cursor = ReplayCursor(candles, timeline)
+    rng = random.Random(7)
+    targets = rng.sample(range(len(candles)), 2000)
+
+    started = time.perf_counter()
+    for i in targets:
+        assert cursor.jump_to_time(candles[i]["time"]) is candles[i]
+        assert cursor.current_context()["timeline"] is timeline[i]
+    elapsed = time.perf_counter() - started
+
+    assert cursor.jump_to_time(START + timedelta(minutes=125)) is candles[125]  # datetime target
+    assert cursor.jump_to_time("2025-01-06T09:05:30") is None  # Between bars: no exact match
+    assert cursor.jump_to_time("2025-01-06T09:05:30", nearest=True) is candles[5]
+    assert cursor.jump_to_time("2025-01-06T08:00:00", nearest=True) is None  # Before the first bar
+    assert elapsed / len(targets) < 0.001
+    print(f"  ✅ {len(targets)} jumps over {len(candles)} bars in {elapsed * 1000:.0f}ms")
+
+
+def test_ranges_are_views_and_history_is_bounded():
+    candles, timeline = _month(2000)
+    cursor = ReplayCursor(candles, timeline, history_limit=100)
+
+    window = cursor.get_range(100, 199)
+    assert isinstance(window, SequenceView) and window.data is candles
+    assert len(window) == 100 and window == candles[100:200] and window[-1] is candles[199]
+    assert window[10:20] == candles[110:120]
+    assert cursor.get_range(1990, 5000) == candles[1990:]
+    assert cursor.get_time_range("2025-01-06T09:10:00", "2025-01-06T09:19:30") == candles[10:20]
+
+    shuffled = candles[:50]
+    random.Random(3).shuffle(shuffled)
+    unsorted = ReplayCursor(shuffled, [])
+    assert unsorted.get_time_range("2025-01-06T09:10:00", "2025-01-06T09:19:30") == candles[10:20]
+
+    for _ in range(1500):
+        cursor.next()
+    history = cursor.get_navigation_history()
+    assert len(history) == 100 and history[-1] == 1499
+
+
+def test_context_lookup_without_aligned_timeline():
+    """Timelines with earlier entries, or unsorted candles, still resolve."""
+    candles, timeline = _month(500)
+    earlier = [{"time": "2024-12-31T23:59:00", "confidence": 0.0}] * 3
+    cursor = ReplayCursor(candles, earlier + timeline, timeline_offset=3)
+    cursor.jump_to(250)
+    assert cursor.current_context()["timeline"] is timeline[250]
+
+    misaligned = ReplayCursor(candles, timeline[::-1])
+    assert misaligned.timeline_entry(42) is timeline[42]
+
+    shuffled = [dict(c, time=datetime.fromisoformat(c["time"])) for c in candles]
+    random.Random(1).shuffle(shuffled)
+    cursor = ReplayCursor(shuffled)
+    target = START + timedelta(minutes=321)
+    assert cursor.jump_to_time(target)["time"] == target
+
+
+def test_cursor_pages_streaming_output(monkeypatch, tmp_path):
+    """from_output() navigates a spilled replay without loading it all."""
+    from backtesting.replay_filters import ReplayFilters
+
+    monkeypatch.setattr(ReplayFilters, "allow_signal", lambda self, context: True)
+    run_streaming_replay(candle_stream(5000), make_engines(), tmp_path, chunk_bars=1000, tail=20)
+
+    cursor = ReplayCursor.from_output(tmp_path, page_size=256, cache_pages=2)
+    assert len(cursor.candles) == 5000
+    for minute in (4321, 7, 2048, 4999):
+        candle = cursor.jump_to_time(START + timedelta(minutes=minute))
+        assert cursor.index == minute
+        assert cursor.current_context()["timeline"]["time"] == candle["time"]
+    assert len(cursor.candles._cache) <= 2 and len(cursor.timeline._cache) <= 2
+    assert [c["time"] for c in cursor.get_range(3000, 3004)] == [
+        (START + timedelta(minutes=m)).isoformat() for m in range(3000, 3005)
+    ]
+
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+
+    class _Patch:
+        def setattr(self, target, name, value):
+            setattr(target, name, value)
+
+    test_jump_to_time_scales_to_a_month()
+    test_ranges_are_views_and_history_is_bounded()
+    test_context_lookup_without_aligned_timeline()
+    test_cursor_pages_streaming_output(_Patch(), Path(tempfile.mkdtemp()))
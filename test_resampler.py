@@ -0,0 +1,55 @@
+"""
+Test Candle Resampler - vectorized aggregation vs. a per-bucket reference
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from backend.feeds.resampler import (
+    candles_to_columns, columns_to_candles, resample_timeframe, TIMEFRAME_SECONDS
+)
+
+
+def _hourly(count=30):
+    base = datetime(2026, 1, 5, 20, tzinfo=timezone.utc)
+    return [
+        {"timestamp": (base + timedelta(hours=i)).isoformat(), "open": 100 + i, "high": 101 + i + (i % 3),
+         "low": 99 + i - (i % 2), "close": 100.5 + i, "volume": 10 + i}
+        for i in range(count)
+    ]
+
+
+def _reference(candles, seconds, offset):
+    buckets = {}
+    for c in candles:
+        ts = int(datetime.fromisoformat(c["timestamp"]).timestamp())
+        buckets.setdefault((ts - offset) // seconds, []).append(c)
+    return [
+        {"open": b[0]["open"], "high": max(c["high"] for c in b), "low": min(c["low"] for c in b),
+         "close": b[-1]["close"], "volume": sum(c["volume"] for c in b), "start": key * seconds + offset}
+        for key, b in sorted(buckets.items())
+    ]
+
+
+def test_resample_matches_reference():
+    """4h / session / daily buckets match a straightforward dict aggregation."""
+    print("\n" + "=" * 70)
+    print("TEST: Vectorized resample vs reference")
+    print("=" * 70)
+
+    candles = _hourly()
+    cols = candles_to_columns(candles)
+    for timeframe, offset in (("4h", 22 * 3600), ("session", 22 * 3600), ("1d", 0)):
+        bars = columns_to_candles(resample_timeframe(cols, timeframe))
+        expected = _reference(candles, TIMEFRAME_SECONDS[timeframe], offset)
+        assert len(bars) == len(expected)
+        for bar, ref in zip(bars, expected):
+            assert bar["open"] == ref["open"] and bar["close"] == ref["close"]
+            assert bar["high"] == ref["high"] and bar["low"] == ref["low"]
+            assert bar["volume"] == ref["volume"]
+            start = datetime.fromisoformat(bar["timestamp"].replace("Z", "+00:00"))
+            assert int(start.timestamp()) == ref["start"]
+        print(f"  ✅ {timeframe}: {len(bars)} bars")
+
+
+if __name__ == "__main__":
+    test_resample_matches_reference()
@@ -0,0 +1,161 @@
+"""
+Test Rolling Volume Profile - incremental window vs. a full build_profile
+"""
+
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from backend.rolling_volume_profile import MAX_WINDOW_BARS, LiveProfileRegistry, RollingVolumeProfile
+from backend.volume_profile_engine import VolumeProfileEngine
+
+
+def _candles(count, seed, start=datetime(2026, 3, 2, tzinfo=timezone.utc), minutes=5):
+    rng = random.Random(seed)
+    price, candles = 2650.0, []
+    for i in range(count):
+        span = rng.uniform(0, 8.0)
+        low = round(price - rng.uniform(0, span), 1)
+        high = round(low + span, 1) if i % 11 else low
+        candles.append({
+            "timestamp": (start + timedelta(minutes=minutes * i)).isoformat().replace("+00:00", "Z"),
+            "open": round(rng.uniform(low, high), 1), "high": high, "low": low,
+            "close": round(rng.uniform(low, high), 1), "volume": rng.randint(1, 9000),
+        })
+        price = candles[-1]["close"]
+    return candles
+
+
+def _levels(profile):
+    return [(h["price"], h["volume"], h["buy_volume"], h["sell_volume"]) for h in profile["histogram"]]
+
+
+def _assert_close(rolling, full):
+    assert rolling["total_volume"] == full["total_volume"]
+    assert rolling["total_buy_volume"] == full["total_buy_volume"]
+    assert abs(rolling["VWAP"] - full["VWAP"]) <= 0.01
+    got, want = _levels(rolling), _levels(full)
+    assert [g[0] for g in got] == [w[0] for w in want]
+    assert all(abs(g[i] - w[i]) <= 1 for g, w in zip(got, want) for i in (1, 2, 3))
+
+
+def test_rolling_window_matches_rebuild():
+    """Last-N-bars window tracks a full rebuild while bars roll in and out."""
+    print("\n" + "=" * 70)
+    print("TEST: Rolling volume profile (last 100 bars)")
+    print("=" * 70)
+
+    candles = _candles(600, 7)
+    engine = VolumeProfileEngine(0.10)
+    rolling = RollingVolumeProfile(0.10, window=100)
+    for i, candle in enumerate(candles):
+        rolling.add_candle(candle)
+        if i % 37 == 0 or i == len(candles) - 1:
+            window = candles[max(0, i - 99):i + 1]
+            snap, full = rolling.snapshot(), engine.build_profile(window)
+            _assert_close(snap, full)
+            volume_at = {h["price"]: h["volume"] for h in full["histogram"]}
+            assert volume_at[snap["POC"]] >= volume_at[full["POC"]] - 1  # Same level or a float tie
+    assert len(rolling) == 100
+
+    started = time.perf_counter()
+    for candle in _candles(500, 8, start=datetime(2026, 4, 1, tzinfo=timezone.utc)):
+        rolling.add_candle(candle)
+    per_bar_us = (time.perf_counter() - started) / 500 * 1e6
+    print(f"  ✅ Matches rebuild; {per_bar_us:.0f}µs per bar update")
+
+
+def test_sync_replaces_forming_bar_and_session_rolls():
+    """sync() only touches changed bars; session windows reset at 22:00 UTC."""
+    print("\n" + "=" * 70)
+    print("TEST: Profile sync and session window")
+    print("=" * 70)
+
+    candles = _candles(120, 3)
+    profile = LiveProfileRegistry().get("GCG6", "5m", 0.10)
+    assert profile.sync(candles[:100])["added"] == 100
+
+    revised = [dict(c) for c in candles[1:101]]
+    revised[-2]["volume"] += 500  # Forming bar grew
+    result = profile.sync(revised)
+    assert result == {"added": 2, "removed": 2, "bars": 100}
+    _assert_close(profile.snapshot(), VolumeProfileEngine(0.10).build_profile(revised))
+
+    session = RollingVolumeProfile(0.10, window="session")
+    day = _candles(48, 4, start=datetime(2026, 3, 2, 18, tzinfo=timezone.utc), minutes=15)
+    for candle in day:
+        session.add_candle(candle)
+    after_open = [c for c in day if c["timestamp"] >= "2026-03-02T22:00"]
+    assert len(session) == len(after_open)
+    _assert_close(session.snapshot(), VolumeProfileEngine(0.10).build_profile(after_open))
+
+    session.add_trade(2700.0, 25, "SELL")
+    assert session.snapshot()["total_sell_volume"] >= 25
+    print("  ✅ Sync diffed 2 bars; session window rolled at the CME open")
+
+
+def test_trades_survive_rebuild_and_windows_are_keyed():
+    """Trade volume outlives the periodic residue rebuild; each bar count gets its own live profile."""
+    print("\n" + "=" * 70)
+    print("TEST: Trades across rebuilds + registry keys")
+    print("=" * 70)
+
+    rolling = RollingVolumeProfile(0.10, window=10)
+    rolling.add_trade(2650.0, 1000, "BUY")
+    rolling.add_trade(2650.04, 200, "SELL")
+    candles = _candles(80, 5)
+    for candle in candles:
+        rolling.add_candle(candle)
+    assert rolling.removals < 70  # At least one rebuild ran
+
+    bars = VolumeProfileEngine(0.10).build_profile(candles[-10:])
+    snap = rolling.snapshot()
+    assert snap["total_volume"] == bars["total_volume"] + 1200
+    assert snap["total_buy_volume"] == bars["total_buy_volume"] + 1000
+    assert snap["total_sell_volume"] == bars["total_sell_volume"] + 200
+    at_level = {h["price"]: h for h in snap["histogram"]}[2650.0]
+    bar_level = {h["price"]: h for h in bars["histogram"]}.get(2650.0, {"volume": 0})
+    assert abs(at_level["volume"] - bar_level["volume"] - 1200) <= 1
+    assert rolling.trades == 2
+
+    registry = LiveProfileRegistry()
+    chart = registry.get("GC", "5m", 0.10, window=100)
+    mentor = registry.get("GC", "5m", 0.10, window=50)
+    assert chart is not mentor and registry.get("GC", "5m", 0.10, window=100) is chart
+    chart.sync(candles)
+    mentor.sync(candles)
+    assert (len(chart), len(mentor)) == (80, 50)
+    print("  ✅ 1200 traded contracts kept through rebuilds; windows keyed by bar count")
+
+
+def test_registry_is_bounded():
+    """Tick sizes are validated, bar windows clamped, and least recently used profiles evicted."""
+    print("\n" + "=" * 70)
+    print("TEST: Live profile registry limits")
+    print("=" * 70)
+
+    registry = LiveProfileRegistry(max_profiles=3)
+    for tick_size in (0.0, -1.0, 1e-6, 1e6):
+        try:
+            registry.get("GC", "5m", tick_size, window=100)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"tick_size {tick_size} accepted")
+    assert registry.get("GC", "5m", 0.10, window=10**9) is registry.get("GC", "5m", 0.10, window=MAX_WINDOW_BARS)
+    assert registry.get("GC", "5m", 0.10, window=-5).window == 1
+
+    first = registry.get("GC", "5m", 0.10, window=100)
+    for bars in range(200, 210):
+        registry.get("GC", "5m", 0.10, window=bars)
+        registry.get("GC", "5m", 0.10, window=100)  # Recently used: survives
+    assert len(registry.profiles) == 3 and registry.evictions == 10
+    assert registry.get("GC", "5m", 0.10, window=100) is first
+    print(f"  ✅ {len(registry.profiles)} profiles kept, {registry.evictions} evicted")
+
+
+if __name__ == "__main__":
+    test_rolling_window_matches_rebuild()
+    test_sync_replaces_forming_bar_and_session_rolls()
+    test_trades_survive_rebuild_and_windows_are_keyed()
+    test_registry_is_bounded()
@@ -0,0 +1,136 @@
+"""
+Test Shared Market State - multi-worker snapshot store
+Simulates two API workers sharing one SQLite state file.
+"""
+
+import asyncio
+import tempfile
+import threading
+from pathlib import Path
+
+from backend.api.shared_state import SharedMarketState, export_route_state, apply_route_state
+from backend.intelligence.advanced_iceberg_engine import IcebergDetector, AbsorptionZoneMemory
+from data.cme_adapter import GCPriceCache
+
+
+def _worker_globals():
+    return {"current_price": 2450.5, "session": "LONDON"}, GCPriceCache(), AbsorptionZoneMemory(), IcebergDetector()
+
+
+def test_shared_state_across_workers():
+    """Writer publishes, second worker picks up the new version lazily."""
+    print("\n" + "=" * 70)
+    print("TEST: Shared state across workers")
+    print("=" * 70)
+
+    db_path = Path(tempfile.mkdtemp()) / "market_state.db"
+    worker_a = SharedMarketState(db_path)
+    worker_b = SharedMarketState(db_path)
+
+    assert worker_b.snapshot() is None
+
+    state_a, cache_a, memory_a, detector_a = _worker_globals()
+    with worker_a.writer():
+        state_a["current_price"] = 3362.4
+        cache_a.add(3362.4, "2026-01-17T14:30:45Z")
+        memory_a.record({"price": 3362.5, "volume": 400, "confidence": 0.8})
+        detector_a._record_zone({"price": 3362.5, "volume": 400, "direction": "BUY_SIDE"})
+        worker_a.publish(export_route_state(state_a, cache_a, memory_a, detector_a))
+
+    snapshot = worker_b.snapshot()
+    assert worker_b.version == 1
+    state_b, cache_b, memory_b, detector_b = _worker_globals()
+    apply_route_state(snapshot, state_b, cache_b, memory_b, detector_b)
+
+    assert state_b["current_price"] == 3362.4
+    assert cache_b.prices == [3362.4]
+    assert memory_b.zones[0]["volume"] == 400
+    assert 3362.5 in detector_b.absorption_zones
+    print(f"✓ Worker B sees version {worker_b.version}: price {state_b['current_price']}")
+
+    # Unchanged version -> cached snapshot object is reused
+    assert worker_b.snapshot() is snapshot
+
+    # Second writer continues from the latest version
+    with worker_b.writer():
+        current = worker_b.current()
+        current["market_state"]["bid"] = 3362.2
+        worker_b.publish(current)
+    assert worker_a.snapshot()["market_state"]["bid"] == 3362.2
+    assert worker_a.version == 2
+    print("✓ Versions advance monotonically across writers")
+
+
+def test_writer_section_across_threads():
+    """begin/commit may run on different threads; readers are never blocked by an open writer."""
+    print("\n" + "=" * 70)
+    print("TEST: Shared state writer off the event loop")
+    print("=" * 70)
+
+    db_path = Path(tempfile.mkdtemp()) / "market_state.db"
+    writer, reader = SharedMarketState(db_path), SharedMarketState(db_path)
+
+    async def scenario():
+        version, state = await asyncio.to_thread(writer.begin)
+        assert (version, state) == (0, None)
+        # Open writer section: this worker's reads still answer immediately
+        assert await asyncio.wait_for(asyncio.to_thread(writer.latest), 1.0) == (0, None)
+        return await asyncio.to_thread(writer.commit, {"market_state": {"bid": 1.0}})
+
+    assert asyncio.run(scenario()) == 1
+    assert reader.latest() == (1, {"market_state": {"bid": 1.0}})
+
+    # Rolled-back sections publish nothing and release the lock
+    version, state = writer.begin()
+    writer.publish({"market_state": {"bid": 2.0}})
+    worker = threading.Thread(target=writer.rollback)
+    worker.start()
+    worker.join()
+    assert writer.latest() == (1, {"market_state": {"bid": 1.0}})
+    with writer.writer():
+        writer.publish({"market_state": {"bid": 3.0}})
+    assert reader.snapshot()["market_state"]["bid"] == 3.0 and reader.version == 2
+    print("✓ begin/commit across threads, rollback reloads the last good version")
+
+
+def test_read_routes_do_not_publish():
+    """Chart iceberg detection publishes only the zones it records; quotes publish through the writer."""
+    from backend.api import routes
+    ChartBarData = routes.ChartBarData
+
+    print("\n" + "=" * 70)
+    print("TEST: Only ingest publishes")
+    print("=" * 70)
+
+    published = []
+    original = routes.shared_state.commit
+    routes.shared_state.commit = lambda state: published.append(state) or original(state)
+    try:
+        async def scenario():
+            await routes._sync_shared_state()
+            version = routes.shared_state.version
+            quiet = [ChartBarData(timestamp="2026-01-05T10:00:00", open=100, high=101, low=99, close=100.5, volume=10)] * 12
+            await routes._detect_icebergs_from_bars(quiet)
+            assert not published and routes.shared_state.version == version
+
+            # Volume spike at one price: the zone reaches the shared detector via the writer
+            spike = quiet[:11] + [ChartBarData(timestamp="2026-01-05T11:00:00", open=150, high=151, low=149, close=150.2, volume=900)]
+            flags, visuals = await routes._detect_icebergs_from_bars(spike)
+            assert flags[-1] and visuals
+            assert len(published) == 1 and routes.shared_state.version == version + 1
+            assert 150.0 in routes.iceberg_detector.absorption_zones
+
+            await routes.ingest_cme_quote({"bid_price": 3362.2, "ask_price": 3362.5, "bid_size": 1, "ask_size": 1})
+            assert published[-1]["market_state"]["bid"] == routes.market_state["bid"]
+            assert published[-1]["live_bars"] == routes.bar_service.export_series(routes.LIVE_BAR_SYMBOL)
+
+        asyncio.run(scenario())
+    finally:
+        routes.shared_state.commit = original
+    print(f"✓ {len(published)} publishes, all from ingest or recorded zones")
+
+
+if __name__ == "__main__":
+    test_shared_state_across_workers()
+    test_writer_section_across_threads()
+    test_read_routes_do_not_publish()
@@ -0,0 +1,181 @@
+"""
+Test Streaming Replay - constant-memory replay with on-disk spill
+"""
+
+import json
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from backtesting.ai_snapshot import AISnapshotStore
+from backtesting.edge_metrics import EdgeMetrics
+from backtesting.replay_engine import ReplayEngine
+from backtesting.replay_filters import ReplayFilters
+from backtesting.replay_runner import run_replay, run_streaming_replay
+from test_step23_first import MockEngine, MockMentorBrain, generate_sample_candles
+
+
+def make_engines():
+    return {
+        "qmo": MockEngine("QMO"),
+        "imo": MockEngine("IMO"),
+        "gann": MockEngine("Gann"),
+        "astro": MockEngine("Astro"),
+        "cycle": MockEngine("Cycle"),
+        "mentor": MockMentorBrain(),
+    }
+
+
+def candle_stream(count):
+    """Generator of synthetic 1-minute candles (nothing held in memory)."""
+    start = datetime(2025, 1, 6, 9, 0)
+    for i in range(count):
+        price = 2500 + (i * 7919 % 2000) / 100
+        yield {
+            "time": (start + timedelta(minutes=i)).isoformat(),
+            "open": price,
+            "high": price + 1.5,
+            "low": price - 1.5,
+            "close": price + 0.25,
+            "volume": 1000 + i % 500,
+        }
+
+
+def _read_jsonl(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_streaming_matches_in_memory_replay(monkeypatch, tmp_path):
+    """Spilled files and incremental summaries equal a plain in-memory replay."""
+    monkeypatch.setattr(ReplayFilters, "allow_signal", lambda self, context: True)
+    candles = generate_sample_candles(3000)
+
+    single = run_replay(candles, make_engines())
+    reference = ReplayEngine(**make_engines(), snapshot_store=AISnapshotStore())
+    reference.run(candles)
+
+    streamed = run_streaming_replay(iter(candles), make_engines(), tmp_path, chunk_bars=700, tail=50)
+    for key in ("metrics", "snapshot_stats", "confidence_dist"):
+        assert streamed[key] == single[key]
+    assert streamed["snapshot_stats"]["signals"] > 0
+    assert streamed["lifecycle"] == reference.get_lifecycle_summary()
+    assert streamed["session_heatmap"] == reference.get_heatmaps()["session"]
+    assert streamed["timeline"] == reference.timeline.get_summary()
+
+    assert _read_jsonl(streamed["files"]["timeline"]) == reference.get_timeline()
+    assert _read_jsonl(streamed["files"]["chart_packets"]) == reference.get_chart_packets()
+    assert _read_jsonl(streamed["files"]["snapshots"]) == json.loads(json.dumps(single["snapshots"]))
+    assert _read_jsonl(streamed["files"]["lifecycle"]) == reference.get_lifecycle_history()
+    assert json.loads((tmp_path / "summary.json").read_text())["metrics"] == single["metrics"]
+
+
+def test_spilled_builders_export_everything(tmp_path):
+    """Exports and queries cover the whole run, not just the in-memory tail."""
+    engine = ReplayEngine(**make_engines(), snapshot_store=AISnapshotStore(tmp_path / "s.jsonl", 10),
+                          spill_dir=tmp_path, tail=10)
+    for _ in engine.stream(candle_stream(500), chunk_bars=64):
+        pass
+    engine.close()
+
+    assert len(engine.get_timeline()) == 10 and engine.timeline.length() == 500
+    assert len(engine.candles_store) == 10
+    cursor = engine.get_cursor()  # Pages the whole replay back in from disk
+    assert len(cursor.candles) == 500 and cursor.jump_to_time("2025-01-06T12:00:00")["close"] == cursor.candles[180]["close"]
+    engine.export_timeline_json(tmp_path / "timeline.json")
+    exported = json.loads((tmp_path / "timeline.json").read_text())
+    assert exported["metadata"]["total_candles"] == 500 and len(exported["timeline"]) == 500
+    engine.export_chart_packets(tmp_path / "packets.json")
+    assert len(json.loads((tmp_path / "packets.json").read_text())) == 500
+    assert len(engine.chart_packet_builder.get_by_session("LONDON")) == sum(
+        1 for e in engine.timeline.entries() if e["session"] == "LONDON"
+    )
+
+
+def test_trim_spilled_timeline(tmp_path):
+    """trim() drops warm-up entries from the spill file as it does in memory."""
+    spilled = ReplayEngine(**make_engines(), snapshot_store=AISnapshotStore(), spill_dir=tmp_path, tail=10)
+    in_memory = ReplayEngine(**make_engines(), snapshot_store=AISnapshotStore())
+    candles = list(candle_stream(300))
+    spilled.run(candles)
+    in_memory.run(candles)
+
+    spilled.timeline.trim(120)
+    in_memory.timeline.trim(120)
+    assert spilled.timeline.get_summary() == in_memory.timeline.get_summary()
+    assert spilled.timeline.length() == 180
+    assert list(spilled.timeline.entries()) == in_memory.get_timeline()
+    assert list(spilled.timeline.export()) == in_memory.get_timeline()[-10:]
+
+    # The spill keeps appending after the trim
+    spilled.timeline.record(candles[0], {}, None, None)
+    assert list(spilled.timeline.entries())[-1]["time"] == candles[0]["time"]
+    assert spilled.timeline.length() == 181
+    spilled.close()
+
+
+def test_spilled_edge_metrics_match(tmp_path):
+    """A spilled worked/failed sequence gives the same summary and merges both ways."""
+    import random
+
+    rng = random.Random(7)
+    in_memory, spilled = EdgeMetrics(), EdgeMetrics(tmp_path / "edge.jsonl")
+    for _ in range(501):
+        snapshot = {"decision": {"confidence": rng.choice([0.5, 0.7, 0.9])}}
+        outcome = None if rng.random() < 0.2 else {
+            "timing_bars": rng.randint(0, 30),
+            "heat_pips": round(rng.uniform(0, 20), 2),
+            "reaction_pips": round(rng.uniform(0, 20), 2),
+            "signal_worked": rng.random() < 0.6 - len(in_memory.worked_sequence) / 1000,
+            "was_trapped": False,
+        }
+        in_memory.record(snapshot, outcome)
+        spilled.record(snapshot, outcome)
+
+    assert isinstance(in_memory.worked_sequence, bytearray)
+    assert spilled.summary() == in_memory.summary()
+    assert spilled.summary()["decay"]["decay_detected"]
+
+    doubled = EdgeMetrics().merge(spilled).merge(in_memory)
+    assert doubled.summary()["decay"] == EdgeMetrics().merge(in_memory).merge(in_memory).summary()["decay"]
+    assert EdgeMetrics(tmp_path / "merged.jsonl").merge(in_memory).summary() == in_memory.summary()
+    spilled.close()
+
+
+def _peak_bytes(count, directory):
+    tracemalloc.start()
+    run_streaming_replay(candle_stream(count), make_engines(), directory, chunk_bars=1440, tail=200)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def test_memory_stays_flat(monkeypatch, tmp_path):
+    """Peak memory does not grow with replay length."""
+    print("\n" + "=" * 70)
+    print("TEST: Streaming replay memory")
+    print("=" * 70)
+    monkeypatch.setattr(ReplayFilters, "allow_signal", lambda self, context: True)
+
+    started = time.perf_counter()
+    short = _peak_bytes(2 * 1440, tmp_path / "short")
+    long = _peak_bytes(8 * 1440, tmp_path / "long")
+    elapsed = time.perf_counter() - started
+
+    assert long < short * 1.25
+    print(f"  ✅ Peak {short / 1e6:.1f} MB (2 days) vs {long / 1e6:.1f} MB (8 days), {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+
+    class _Patch:
+        def setattr(self, target, name, value):
+            setattr(target, name, value)
+
+    test_streaming_matches_in_memory_replay(_Patch(), Path(tempfile.mkdtemp()))
+    test_spilled_builders_export_everything(Path(tempfile.mkdtemp()))
+    test_trim_spilled_timeline(Path(tempfile.mkdtemp()))
+    test_spilled_edge_metrics_match(Path(tempfile.mkdtemp()))
+    test_memory_stays_flat(_Patch(), Path(tempfile.mkdtemp()))
@@ -0,0 +1,169 @@
+"""
+Test Tick Volume Profile - trade-accurate profiles from the order recorder
+"""
+
+import asyncio
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+
+from backend.intelligence.order_recorder import RawOrderRecorder
+from backend.tick_volume_profile import SESSION_SECONDS, TickVolumeProfile, contract_for_symbol, session_start
+
+
+def _trades(count, seed, start, hours, contract="GC", base=2650):
+    rng = np.random.default_rng(seed)
+    offsets = np.sort(rng.uniform(0, hours * 3600, count))
+    prices = np.round(base + np.cumsum(rng.choice([-0.1, 0.0, 0.1], count)), 1)
+    return [
+        {
+            "timestamp": (start + timedelta(seconds=float(s))).isoformat(),
+            "price": float(p), "size": int(z), "side": "BUY" if b else "SELL", "contract_type": contract,
+        }
+        for s, p, z, b in zip(offsets, prices, rng.integers(1, 25, count), rng.random(count) < 0.55)
+    ]
+
+
+def _reference(trades, start, end, tick_size=0.10):
+    volume, buy = defaultdict(int), defaultdict(int)
+    for t in trades:
+        if start.isoformat() <= t["timestamp"] < end.isoformat():
+            level = round(round(t["price"] / tick_size) * tick_size, 2)
+            volume[level] += t["size"]
+            if t["side"] == "BUY":
+                buy[level] += t["size"]
+    return volume, buy
+
+
+def test_tick_profile_matches_trades_and_caches_sessions():
+    """Window cutting across sessions matches a per-trade loop; sessions are cached."""
+    print("\n" + "=" * 70)
+    print("TEST: Tick volume profile")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        recorder = RawOrderRecorder(db_path=Path(tmp) / "orders.db", auto_cleanup_days=0)
+        trades = _trades(30000, 1, datetime(2025, 3, 2, 20), hours=60)
+        recorder.record_orders_batch(trades)
+
+        profiles = TickVolumeProfile(recorder, cache_dir=Path(tmp) / "sessions")
+        start, end = datetime(2025, 3, 3, 1, 30), datetime(2025, 3, 4, 19, 45)
+        profile = profiles.build_profile(start, end)
+        volume, buy = _reference(trades, start, end)
+
+        got = {h["price"]: (h["volume"], h["buy_volume"]) for h in profile["histogram"]}
+        assert got == {p: (v, buy[p]) for p, v in volume.items()}
+        assert profile["total_volume"] == sum(volume.values())
+        assert profile["POC"] == max(sorted(volume), key=lambda p: volume[p])
+        assert profile["VAL"] <= profile["POC"] <= profile["VAH"]
+        scans = profiles.counters["sql_scans"]
+        assert scans == 2  # One scan per touched session
+
+        profiles.build_profile(start, end)
+        assert profiles.counters["sql_scans"] == scans
+        assert profiles.counters["session_hits"] >= 2
+
+        reloaded = TickVolumeProfile(recorder, cache_dir=Path(tmp) / "sessions")
+        assert reloaded.build_profile(start, end)["histogram"] == profile["histogram"]
+        assert reloaded.counters["sql_scans"] == 0 and reloaded.counters["disk_loads"] == 2
+    print(f"  ✅ {profile['trades']} trades, POC {profile['POC']}, 2 sessions scanned once")
+
+
+def test_tick_profile_week_under_a_second():
+    """A week of GC-sized sessions (2M ticks) from the columnar session cache."""
+    print("\n" + "=" * 70)
+    print("TEST: Tick volume profile - one week of ticks")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        recorder = RawOrderRecorder(db_path=Path(tmp) / "orders.db", auto_cleanup_days=0)
+        cache = Path(tmp) / "sessions"
+        cache.mkdir()
+        rng = np.random.default_rng(7)
+        first = session_start(datetime(2025, 3, 2, 22).timestamp() + 3600)
+        per_session = 400_000
+        for day in range(5):
+            start = first + day * SESSION_SECONDS
+            np.savez(
+                cache / f"ALL_{start}.npz",
+                ts=np.sort(rng.integers(start * 1000, (start + SESSION_SECONDS) * 1000, per_session)),
+                price=np.round(2650 + np.cumsum(rng.choice([-0.1, 0.0, 0.1], per_session)), 1),
+                size=rng.integers(1, 25, per_session),
+                buy=rng.random(per_session) < 0.5,
+            )
+
+        profiles = TickVolumeProfile(recorder, cache_dir=cache)
+        started = time.perf_counter()
+        profile = profiles.build_profile(first + 3600, first + 5 * SESSION_SECONDS - 3600)
+        elapsed = time.perf_counter() - started
+        assert profiles.counters["sql_scans"] == 0
+        assert 0.9 * 5 * per_session < profile["trades"] < 5 * per_session
+        assert elapsed < 1.0
+    print(f"  ✅ {profile['trades']:,} ticks profiled in {elapsed * 1000:.0f}ms")
+
+
+def test_endpoint_profiles_only_the_requested_contract():
+    """ES and GC ticks share the recorder; /volume-profile?source=ticks keeps them apart by symbol."""
+    print("\n" + "=" * 70)
+    print("TEST: Tick volume profile per contract")
+    print("=" * 70)
+
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from backend.api import routes
+
+    assert [contract_for_symbol(s) for s in ("GCG6", "GC=F", "GC", "esh26", "")] == ["GC", "GC", "GC", "ES", None]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        recorder = RawOrderRecorder(db_path=Path(tmp) / "orders.db", auto_cleanup_days=0)
+        start = datetime(2025, 3, 3, 1)
+        gold = _trades(3000, 2, start, hours=4)
+        spx = _trades(3000, 3, start, hours=4, contract="ES", base=5800)
+        recorder.record_orders_batch(gold + spx)
+
+        saved = routes.tick_volume_profile
+        profiler = TickVolumeProfile(recorder, cache_dir=Path(tmp) / "sessions")
+        on_loop = []
+        build = profiler.build_profile
+
+        def build_profile(*args, **kwargs):
+            try:
+                asyncio.get_running_loop()
+                on_loop.append(True)
+            except RuntimeError:
+                on_loop.append(False)
+            return build(*args, **kwargs)
+
+        profiler.build_profile = build_profile
+        routes.tick_volume_profile = profiler
+        try:
+            app = FastAPI()
+            app.include_router(routes.router)
+            client = TestClient(app)
+            window = {"source": "ticks", "start": start.isoformat(), "end": (start + timedelta(hours=5)).isoformat()}
+            by_symbol = {
+                symbol: client.post("/api/v1/indicators/volume-profile", json={"symbol": symbol, **window}).json()
+                for symbol in ("GCG6", "ESH6")
+            }
+        finally:
+            routes.tick_volume_profile = saved
+
+        for symbol, trades in (("GCG6", gold), ("ESH6", spx)):
+            volume, _ = _reference(trades, start, start + timedelta(hours=5))
+            profile = by_symbol[symbol]
+            assert profile["total_volume"] == sum(volume.values())
+            assert {h["price"]: h["volume"] for h in profile["histogram"]} == dict(volume)
+        assert by_symbol["GCG6"]["poc"] < 3000 < by_symbol["ESH6"]["poc"]
+        assert on_loop == [False, False]  # The SQL scan runs in a worker thread
+    print(f"  ✅ GC POC {by_symbol['GCG6']['poc']}, ES POC {by_symbol['ESH6']['poc']}")
+
+
+if __name__ == "__main__":
+    test_tick_profile_matches_trades_and_caches_sessions()
+    test_tick_profile_week_under_a_second()
+    test_endpoint_profiles_only_the_requested_contract()